@@ -0,0 +1,239 @@
+#!/usr/bin/env python
+
+# Copyright 2025 The HuggingFace Inc. team. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Measure the overhead of the recording and teleoperation loops without hardware.
+
+The loops of `lerobot-record` and `lerobot-teleoperate` are run against the mock robot and teleoperator of
+`tests/mocks`, with synthetic camera frames, and every stage is timed with `ControlLoopProfiler`. As the mocks
+return instantly, the measured latencies are the overhead of LeRobot itself (processors, `add_frame`, image
+writing...), which should stay well within the time budget of an iteration.
+See the provided README.md or run `python benchmarks/control_loop/run_control_loop_benchmark.py --help` for usage.
+"""
+
+import argparse
+import itertools
+import shutil
+import sys
+import tempfile
+import time
+from functools import cached_property
+from pathlib import Path
+
+import numpy as np
+
+# The mocks live in the tests of the repository
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from benchmarks.utils import add_output_args, compare, report_failures, write_results  # noqa: E402
+from lerobot.datasets.lerobot_dataset import LeRobotDataset  # noqa: E402
+from lerobot.datasets.pipeline_features import (  # noqa: E402
+    aggregate_pipeline_dataset_features,
+    create_initial_features,
+)
+from lerobot.datasets.utils import combine_feature_dicts  # noqa: E402
+from lerobot.processor import make_default_processors  # noqa: E402
+from lerobot.scripts.lerobot_record import record_loop  # noqa: E402
+from lerobot.scripts.lerobot_teleoperate import teleop_loop  # noqa: E402
+from lerobot.utils.loop_profiler import ControlLoopProfiler  # noqa: E402
+from tests.mocks.mock_robot import MockRobot, MockRobotConfig  # noqa: E402
+from tests.mocks.mock_teleop import MockTeleop, MockTeleopConfig  # noqa: E402
+
+
+class CameraMockRobot(MockRobot):
+    """MockRobot returning synthetic camera frames, as `MockRobotConfig` does not support cameras yet.
+
+    `io_latency_ms` simulates the time spent waiting on the motor bus when reading and writing.
+    """
+
+    def __init__(self, config: MockRobotConfig, num_cameras: int, image_shape: tuple, io_latency_ms: float):
+        super().__init__(config)
+        rng = np.random.default_rng(0)
+        self.frames = {
+            f"cam{i}": rng.integers(0, 256, image_shape, dtype=np.uint8) for i in range(num_cameras)
+        }
+        self.io_latency_s = io_latency_ms / 1000
+
+    @cached_property
+    def observation_features(self) -> dict[str, type | tuple]:
+        return {**self._motors_ft, **{cam: frame.shape for cam, frame in self.frames.items()}}
+
+    def get_observation(self):
+        time.sleep(self.io_latency_s)
+        # Cameras hand over a copy of their latest frame
+        return super().get_observation() | {cam: frame.copy() for cam, frame in self.frames.items()}
+
+    def send_action(self, action):
+        time.sleep(self.io_latency_s)
+        return super().send_action(action)
+
+
+def run_benchmark(
+    mode: str,
+    num_cameras: int,
+    image_shape: tuple,
+    fps: int,
+    duration_s: float,
+    io_latency_ms: float,
+    video: bool,
+) -> dict:
+    robot = CameraMockRobot(MockRobotConfig(n_motors=6), num_cameras, image_shape, io_latency_ms)
+    teleop = MockTeleop(MockTeleopConfig(n_motors=6))
+    teleop_action_processor, robot_action_processor, robot_observation_processor = make_default_processors()
+    profiler = ControlLoopProfiler(fps)
+    robot.connect()
+    teleop.connect()
+
+    if mode == "teleoperate":
+        teleop_loop(
+            teleop=teleop,
+            robot=robot,
+            fps=fps,
+            teleop_action_processor=teleop_action_processor,
+            robot_action_processor=robot_action_processor,
+            robot_observation_processor=robot_observation_processor,
+            duration=duration_s,
+            profiler=profiler,
+        )
+        return profiler.summary()
+
+    dataset_features = combine_feature_dicts(
+        aggregate_pipeline_dataset_features(
+            pipeline=teleop_action_processor,
+            initial_features=create_initial_features(action=robot.action_features),
+            use_videos=video,
+        ),
+        aggregate_pipeline_dataset_features(
+            pipeline=robot_observation_processor,
+            initial_features=create_initial_features(observation=robot.observation_features),
+            use_videos=video,
+        ),
+    )
+    root = Path(tempfile.mkdtemp()) / "dataset"
+    try:
+        # Same image writer settings as lerobot-record
+        dataset = LeRobotDataset.create(
+            "benchmark/control_loop",
+            fps,
+            root=root,
+            robot_type=robot.name,
+            features=dataset_features,
+            use_videos=video,
+            image_writer_threads=4 * num_cameras,
+        )
+        record_loop(
+            robot=robot,
+            events={"exit_early": False},
+            fps=fps,
+            teleop_action_processor=teleop_action_processor,
+            robot_action_processor=robot_action_processor,
+            robot_observation_processor=robot_observation_processor,
+            dataset=dataset,
+            teleop=teleop,
+            control_time_s=duration_s,
+            single_task="benchmark",
+            profiler=profiler,
+        )
+        dataset.stop_image_writer()
+    finally:
+        shutil.rmtree(root.parent)
+    return profiler.summary()
+
+
+def main(
+    modes: list[str],
+    num_cameras: list[int],
+    image_shape: tuple,
+    fps: int,
+    duration_s: float,
+    io_latency_ms: float,
+    video: bool,
+    output_path: Path | None,
+    compare_to: Path | None,
+    tolerance: float,
+):
+    results = []
+    for mode, cameras in itertools.product(modes, num_cameras):
+        summary = run_benchmark(mode, cameras, image_shape, fps, duration_s, io_latency_ms, video)
+        results.append({"mode": mode, "num_cameras": cameras, **summary})
+
+    header = (
+        f"{'mode':<12} {'cams':>4} {'stage':<24} {'count':>6} {'mean ms':>8} {'p50 ms':>8} {'p99 ms':>8} "
+        f"{'max ms':>8}"
+    )
+    print("\n" + header)
+    print("-" * len(header))
+    for r in results:
+        for stage, stats in r["stages"].items():
+            print(
+                f"{r['mode']:<12} {r['num_cameras']:>4} {stage:<24} {stats['count']:>6} {stats['mean_ms']:>8.3f} "
+                f"{stats['p50_ms']:>8.3f} {stats['p99_ms']:>8.3f} {stats['max_ms']:>8.3f}"
+            )
+        print(f"{'':<17} overruns: {r['num_overruns']}/{r['num_loops']} ({r['budget_ms']:.1f} ms budget)")
+
+    if output_path is not None:
+        config = {
+            "image_shape": image_shape,
+            "duration_s": duration_s,
+            "io_latency_ms": io_latency_ms,
+            "video": video,
+        }
+        write_results(output_path, results, config=config)
+
+    if compare_to is not None:
+        report_failures(
+            compare(
+                results,
+                compare_to,
+                tolerance,
+                key_fields=["mode", "num_cameras", "fps"],
+                get_metrics=lambda result: {
+                    f"loop {metric}": result["stages"]["loop"][metric] for metric in ["p50_ms", "p99_ms"]
+                },
+                higher_is_better=False,
+            )
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--modes",
+        type=str,
+        nargs="*",
+        choices=["record", "teleoperate"],
+        default=["record", "teleoperate"],
+        help="Loops to benchmark: the recording loop of lerobot-record or the loop of lerobot-teleoperate.",
+    )
+    parser.add_argument("--num-cameras", type=int, nargs="*", default=[0, 1, 3], help="Synthetic cameras.")
+    parser.add_argument(
+        "--image-shape",
+        type=lambda value: tuple(int(x) for x in value.split("x")),
+        default=(480, 640, 3),
+        help="Shape of the camera frames, as 'heightxwidthxchannels'.",
+    )
+    parser.add_argument("--fps", type=int, default=30, help="Frequency of the loop.")
+    parser.add_argument("--duration-s", type=float, default=10, help="Duration of each run.")
+    parser.add_argument(
+        "--io-latency-ms",
+        type=float,
+        default=0,
+        help="Simulated latency of the motor bus reads and writes. 0 measures the overhead of LeRobot only.",
+    )
+    parser.add_argument(
+        "--no-video", dest="video", action="store_false", help="Record images instead of videos."
+    )
+    add_output_args(parser, metric="loop latency", higher_is_better=False, tolerance=0.2)
+    args = parser.parse_args()
+    main(**vars(args))
@@ -0,0 +1,492 @@
+#!/usr/bin/env python
+
+# Copyright 2025 The HuggingFace Inc. team. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Measure the end-to-end throughput of the training input pipeline.
+
+Batches are loaded from a `LeRobotDataset` or a `StreamingLeRobotDataset` with a torch DataLoader, optionally with
+the delta timestamps and the preprocessor of a policy and with image transforms, as in `lerobot-train`. Every
+combination of dataset class, video backend, number of workers, batch size and number of cameras is timed, and
+the time spent in each stage, the memory and file descriptors of the workers and the size of their video decoder
+caches are reported.
+See the provided README.md or run `python benchmarks/dataloading/run_dataloading_benchmark.py --help` for usage.
+"""
+
+import argparse
+import functools
+import importlib
+import itertools
+import logging
+import os
+import resource
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+
+import numpy as np
+import torch
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from benchmarks.utils import add_output_args, compare, report_failures, write_results  # noqa: E402
+from lerobot.configs.types import FeatureType
+from lerobot.datasets import lerobot_dataset, streaming_dataset, video_utils
+from lerobot.datasets.factory import resolve_delta_timestamps
+from lerobot.datasets.lerobot_dataset import LeRobotDataset, LeRobotDatasetMetadata
+from lerobot.datasets.streaming_dataset import StreamingLeRobotDataset
+from lerobot.datasets.transforms import ImageTransforms, ImageTransformsConfig
+from lerobot.datasets.utils import dataset_to_policy_features
+from lerobot.policies.factory import make_policy_config, make_pre_post_processors
+from lerobot.utils.constants import ACTION, OBS_IMAGES, OBS_STATE
+
+BENCH_PREFIX = "benchmark."
+TORCHCODEC_AVAILABLE = importlib.util.find_spec("torchcodec") is not None
+# Time spent in the instrumented functions by the current process (main process or DataLoader worker)
+STAGE_TIMES: dict[str, float] = defaultdict(float)
+STAGE_CALLS: dict[str, int] = defaultdict(int)
+
+
+def timed(fn, stage: str):
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            STAGE_TIMES[stage] += time.perf_counter() - start
+            STAGE_CALLS[stage] += 1
+
+    wrapper.__benchmark_stage__ = stage
+    return wrapper
+
+
+def instrument(module, name: str, stage: str):
+    fn = getattr(module, name)
+    if getattr(fn, "__benchmark_stage__", None) is None:
+        setattr(module, name, timed(fn, stage))
+
+
+def instrument_pipeline(worker_id: int | None = None):
+    """Times video decoding and decoder lookups. Also called in the workers, in case they are spawned."""
+    instrument(lerobot_dataset, "decode_video_frames", "decode")
+    instrument(streaming_dataset, "decode_video_frames_torchcodec", "decode")
+    instrument(video_utils.SequentialVideoReader, "get_frames", "decode")
+    instrument(video_utils.VideoDecoderCache, "get_decoder", "decoder_lookup")
+
+
+def get_process_stats(decoder_caches: list) -> dict[str, float]:
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    max_rss_mb = max_rss / 1024**2 if sys.platform == "darwin" else max_rss / 1024
+    num_fds = len(os.listdir("/proc/self/fd")) if os.path.isdir("/proc/self/fd") else -1
+    worker_info = torch.utils.data.get_worker_info()
+    return {
+        "worker_id": worker_info.id if worker_info is not None else -1,
+        "max_rss_mb": max_rss_mb,
+        "num_fds": num_fds,
+        "decoder_cache_size": sum(cache.size() for cache in decoder_caches),
+        "decoder_lookups": STAGE_CALLS["decoder_lookup"],
+    }
+
+
+class InstrumentedDataset(torch.utils.data.Dataset):
+    """Adds the per-sample stage times and the stats of the loading process to the items of a dataset.
+
+    Image transforms are applied here rather than by the dataset, so that they can be timed.
+    """
+
+    def __init__(self, dataset: LeRobotDataset, image_transforms: ImageTransforms | None):
+        self.dataset = dataset
+        self.image_transforms = image_transforms
+
+    def __len__(self):
+        return len(self.dataset)
+
+    def __getitem__(self, idx) -> dict:
+        decode_s = STAGE_TIMES["decode"]
+        start = time.perf_counter()
+        item = self.dataset[idx]
+        getitem_s = time.perf_counter() - start
+        return self._add_stats(item, getitem_s, STAGE_TIMES["decode"] - decode_s)
+
+    def _add_stats(self, item: dict, getitem_s: float, decode_s: float) -> dict:
+        transforms_s = 0.0
+        if self.image_transforms is not None:
+            start = time.perf_counter()
+            for cam in self.dataset.meta.camera_keys:
+                item[cam] = self.image_transforms(item[cam])
+            transforms_s = time.perf_counter() - start
+
+        stats = {
+            "getitem_s": getitem_s + transforms_s,
+            "decode_s": decode_s,
+            "transforms_s": transforms_s,
+            # Parquet reads, delta timestamps and padding
+            "other_s": getitem_s - decode_s,
+            **get_process_stats(self._decoder_caches()),
+        }
+        return {**item, **{f"{BENCH_PREFIX}{key}": value for key, value in stats.items()}}
+
+    def _decoder_caches(self) -> list:
+        return [video_utils._default_decoder_cache]
+
+
+class InstrumentedIterableDataset(InstrumentedDataset, torch.utils.data.IterableDataset):
+    def __iter__(self):
+        iterator = iter(self.dataset)
+        while True:
+            decode_s = STAGE_TIMES["decode"]
+            start = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            getitem_s = time.perf_counter() - start
+            yield self._add_stats(item, getitem_s, STAGE_TIMES["decode"] - decode_s)
+
+    def _decoder_caches(self) -> list:
+        return [self.dataset.video_decoder_cache]
+
+
+def make_synthetic_dataset(
+    root: Path,
+    num_cameras: int,
+    num_episodes: int,
+    episode_length: int,
+    fps: int,
+    image_size: int,
+    vcodec: str,
+) -> tuple[str, Path]:
+    """Records a dataset of moving gradients, which is reused if it already exists in `root`."""
+    repo_id = f"benchmark/synthetic_{num_cameras}cams"
+    root = root / repo_id
+    if (root / "meta" / "info.json").exists():
+        return repo_id, root
+
+    features = {
+        f"{OBS_IMAGES}.cam{i}": {
+            "dtype": "video",
+            "shape": (image_size, image_size, 3),
+            "names": ["height", "width", "channels"],
+        }
+        for i in range(num_cameras)
+    }
+    features[OBS_STATE] = {"dtype": "float32", "shape": (6,), "names": None}
+    features[ACTION] = {"dtype": "float32", "shape": (6,), "names": None}
+
+    logging.info(f"Recording synthetic dataset with {num_cameras} cameras to {root}")
+    dataset = LeRobotDataset.create(repo_id, fps, features, root=root, vcodec=vcodec)
+    gradient = np.linspace(0, 255, image_size, dtype=np.uint8)
+    image = np.stack(np.broadcast_arrays(gradient[None, :], gradient[:, None], gradient[None, ::-1]), axis=-1)
+    rng = np.random.default_rng(0)
+    for _ in range(num_episodes):
+        for frame_index in range(episode_length):
+            frame = {
+                f"{OBS_IMAGES}.cam{i}": np.roll(image, frame_index + i, axis=1) for i in range(num_cameras)
+            }
+            frame[OBS_STATE] = rng.standard_normal(6, dtype=np.float32)
+            frame[ACTION] = rng.standard_normal(6, dtype=np.float32)
+            dataset.add_frame(frame | {"task": "benchmark"})
+        dataset.save_episode()
+    dataset.finalize()
+    return repo_id, root
+
+
+def make_preprocessor(policy_type: str, meta: LeRobotDatasetMetadata, device: str):
+    config = make_policy_config(policy_type, device=device)
+    features = dataset_to_policy_features(meta.features)
+    config.output_features = {key: ft for key, ft in features.items() if ft.type is FeatureType.ACTION}
+    config.input_features = {key: ft for key, ft in features.items() if key not in config.output_features}
+    preprocessor, _ = make_pre_post_processors(config, dataset_stats=meta.stats)
+    return config, preprocessor
+
+
+def make_dataset(
+    dataset_class: str,
+    repo_id: str,
+    root: Path,
+    backend: str,
+    delta_timestamps: dict | None,
+) -> LeRobotDataset | StreamingLeRobotDataset:
+    if dataset_class == "streaming":
+        # Streaming always decodes with torchcodec
+        return StreamingLeRobotDataset(repo_id, root=root, delta_timestamps=delta_timestamps)
+    return LeRobotDataset(repo_id, root=root, delta_timestamps=delta_timestamps, video_backend=backend)
+
+
+def iterate_forever(dataloader: torch.utils.data.DataLoader):
+    while True:
+        num_batches = 0
+        for batch in dataloader:
+            num_batches += 1
+            yield batch
+        if num_batches == 0:
+            raise ValueError("The dataset has less samples than a batch.")
+
+
+def run_benchmark(
+    dataset: LeRobotDataset | StreamingLeRobotDataset,
+    image_transforms: ImageTransforms | None,
+    preprocessor,
+    num_workers: int,
+    batch_size: int,
+    num_warmup: int,
+    num_batches: int,
+) -> dict:
+    if isinstance(dataset, StreamingLeRobotDataset):
+        dataset = InstrumentedIterableDataset(dataset, image_transforms)
+        shuffle = False
+    else:
+        dataset = InstrumentedDataset(dataset, image_transforms)
+        shuffle = True
+    dataloader = torch.utils.data.DataLoader(
+        dataset,
+        batch_size=batch_size,
+        shuffle=shuffle,
+        num_workers=num_workers,
+        drop_last=True,
+        worker_init_fn=instrument_pipeline,
+        prefetch_factor=2 if num_workers > 0 else None,
+    )
+
+    start = time.perf_counter()
+    batches = iterate_forever(dataloader)
+    wait_s, preprocessor_s = [], []
+    stages = defaultdict(list)
+    workers = {}
+    for step in range(num_warmup + num_batches):
+        if step == num_warmup:
+            start = time.perf_counter()
+        wait_start = time.perf_counter()
+        batch = next(batches)
+        wait_s.append(time.perf_counter() - wait_start)
+        if step == 0:
+            first_batch_s = wait_s[-1]
+
+        stats = {key.removeprefix(BENCH_PREFIX): batch.pop(key) for key in list(batch) if BENCH_PREFIX in key}
+        if preprocessor is not None:
+            preprocessor_start = time.perf_counter()
+            preprocessor(batch)
+            preprocessor_s.append(time.perf_counter() - preprocessor_start)
+
+        if step >= num_warmup:
+            for key in ["getitem_s", "decode_s", "transforms_s", "other_s"]:
+                stages[key].extend(stats[key].tolist())
+        # Stats of the last sample loaded by each worker, which are monotonic
+        for i, worker_id in enumerate(stats["worker_id"].tolist()):
+            workers[worker_id] = {
+                key: stats[key][i].item()
+                for key in ["max_rss_mb", "num_fds", "decoder_cache_size", "decoder_lookups"]
+            }
+    elapsed_s = time.perf_counter() - start
+    del batches, dataloader
+
+    wait_s = wait_s[num_warmup:]
+    preprocessor_s = preprocessor_s[num_warmup:]
+    return {
+        "samples_per_s": num_batches * batch_size / elapsed_s,
+        "first_batch_s": first_batch_s,
+        # Time the training loop is blocked waiting for data, per batch
+        "wait_ms_median": 1000 * float(np.median(wait_s)),
+        "wait_ms_p90": 1000 * float(np.percentile(wait_s, 90)),
+        "preprocessor_ms_median": 1000 * float(np.median(preprocessor_s)) if preprocessor_s else 0.0,
+        # Time spent by the workers in each stage, per sample
+        **{f"{key[:-2]}_ms_mean": 1000 * float(np.mean(values)) for key, values in stages.items()},
+        "num_workers_seen": len(workers),
+        "worker_max_rss_mb": max(w["max_rss_mb"] for w in workers.values()),
+        "worker_max_num_fds": max(w["num_fds"] for w in workers.values()),
+        "decoder_cache_size": sum(w["decoder_cache_size"] for w in workers.values()),
+        "decoder_lookups": sum(w["decoder_lookups"] for w in workers.values()),
+    }
+
+
+def main(
+    repo_id: str | None,
+    root: Path | None,
+    synthetic_root: Path,
+    dataset_classes: list[str],
+    backends: list[str],
+    num_workers: list[int],
+    batch_sizes: list[int],
+    num_cameras: list[int],
+    num_episodes: int,
+    episode_length: int,
+    image_size: int,
+    vcodec: str,
+    policy_type: str | None,
+    image_transforms: bool,
+    num_warmup: int,
+    num_batches: int,
+    device: str,
+    output_path: Path | None,
+    compare_to: Path | None,
+    tolerance: float,
+):
+    instrument_pipeline()
+    if repo_id is not None:
+        datasets = [(repo_id, root)]
+    else:
+        datasets = [
+            make_synthetic_dataset(synthetic_root, n, num_episodes, episode_length, 30, image_size, vcodec)
+            for n in num_cameras
+        ]
+    transforms = ImageTransforms(ImageTransformsConfig(enable=True)) if image_transforms else None
+
+    results = []
+    for dataset_repo_id, dataset_root in datasets:
+        meta = LeRobotDatasetMetadata(dataset_repo_id, root=dataset_root)
+        delta_timestamps, preprocessor = None, None
+        if policy_type is not None:
+            policy_config, preprocessor = make_preprocessor(policy_type, meta, device)
+            delta_timestamps = resolve_delta_timestamps(policy_config, meta)
+
+        for dataset_class, backend in itertools.product(dataset_classes, backends):
+            if (dataset_class == "streaming" or backend == "torchcodec") and not TORCHCODEC_AVAILABLE:
+                logging.warning(f"Skipping {dataset_class} with {backend}, as torchcodec is not available")
+                continue
+            if dataset_class == "streaming" and backend != "torchcodec":
+                continue
+            dataset = make_dataset(dataset_class, dataset_repo_id, dataset_root, backend, delta_timestamps)
+            for workers, batch_size in itertools.product(num_workers, batch_sizes):
+                logging.info(f"{dataset_repo_id} {dataset_class} {backend} {workers=} {batch_size=}")
+                metrics = run_benchmark(
+                    dataset, transforms, preprocessor, workers, batch_size, num_warmup, num_batches
+                )
+                results.append(
+                    {
+                        "dataset": dataset_repo_id,
+                        "dataset_class": dataset_class,
+                        "backend": backend,
+                        "num_cameras": len(meta.camera_keys),
+                        "num_workers": workers,
+                        "batch_size": batch_size,
+                        **metrics,
+                    }
+                )
+
+    header = (
+        f"{'dataset class':<14} {'backend':<11} {'cams':>4} {'workers':>7} {'batch':>5} {'samples/s':>10} "
+        f"{'wait ms':>8} {'decode ms':>9} {'other ms':>8} {'tf ms':>6} {'prep ms':>7} "
+        f"{'rss MB':>7} {'fds':>5} {'decoders':>8}"
+    )
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        print(
+            f"{r['dataset_class']:<14} {r['backend']:<11} {r['num_cameras']:>4} {r['num_workers']:>7} "
+            f"{r['batch_size']:>5} {r['samples_per_s']:>10.1f} {r['wait_ms_median']:>8.2f} "
+            f"{r['decode_ms_mean']:>9.2f} {r['other_ms_mean']:>8.2f} {r['transforms_ms_mean']:>6.2f} "
+            f"{r['preprocessor_ms_median']:>7.2f} "
+            f"{r['worker_max_rss_mb']:>7.0f} {r['worker_max_num_fds']:>5} {r['decoder_cache_size']:>8}"
+        )
+
+    if output_path is not None:
+        environment = {
+            "torch": torch.__version__,
+            "cpu_count": os.cpu_count(),
+            "torchcodec_available": TORCHCODEC_AVAILABLE,
+        }
+        config = {
+            "policy_type": policy_type,
+            "image_transforms": image_transforms,
+            "num_warmup": num_warmup,
+            "num_batches": num_batches,
+        }
+        write_results(output_path, results, environment, config=config)
+
+    if compare_to is not None:
+        report_failures(
+            compare(
+                results,
+                compare_to,
+                tolerance,
+                key_fields=[
+                    "dataset",
+                    "dataset_class",
+                    "backend",
+                    "num_cameras",
+                    "num_workers",
+                    "batch_size",
+                ],
+                get_metrics=lambda result: {"samples_per_s": result["samples_per_s"]},
+                higher_is_better=True,
+            )
+        )
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--repo-id",
+        type=str,
+        default=None,
+        help="Local dataset to benchmark, found in --root. Synthetic datasets are recorded if unset.",
+    )
+    parser.add_argument("--root", type=Path, default=None, help="Root directory of --repo-id.")
+    parser.add_argument(
+        "--synthetic-root",
+        type=Path,
+        default=Path("outputs/dataloading_benchmark"),
+        help="Directory where the synthetic datasets are recorded, and reused across runs.",
+    )
+    parser.add_argument(
+        "--dataset-classes",
+        type=str,
+        nargs="*",
+        choices=["lerobot", "streaming"],
+        default=["lerobot", "streaming"],
+        help="Datasets to benchmark. Streaming always decodes with torchcodec.",
+    )
+    parser.add_argument(
+        "--backends",
+        type=str,
+        nargs="*",
+        choices=["torchcodec", "pyav"],
+        default=["torchcodec", "pyav"],
+        help="Video decoding backends of LeRobotDataset.",
+    )
+    parser.add_argument("--num-workers", type=int, nargs="*", default=[0, 4, 8], help="DataLoader workers.")
+    parser.add_argument("--batch-sizes", type=int, nargs="*", default=[8, 64], help="Batch sizes.")
+    parser.add_argument(
+        "--num-cameras", type=int, nargs="*", default=[1, 3], help="Cameras of the synthetic datasets."
+    )
+    parser.add_argument("--num-episodes", type=int, default=10, help="Episodes of the synthetic datasets.")
+    parser.add_argument("--episode-length", type=int, default=300, help="Frames per synthetic episode.")
+    parser.add_argument(
+        "--image-size", type=int, default=96, help="Height and width of the synthetic images."
+    )
+    parser.add_argument("--vcodec", type=str, default="libsvtav1", help="Codec of the synthetic videos.")
+    parser.add_argument(
+        "--policy-type",
+        type=str,
+        default=None,
+        help="Policy whose delta timestamps and preprocessor are used, e.g. 'diffusion'. None to load single "
+        "frames without preprocessing.",
+    )
+    parser.add_argument(
+        "--image-transforms", action="store_true", help="Apply the default training image transforms."
+    )
+    parser.add_argument("--num-warmup", type=int, default=5, help="Untimed batches, e.g. spawning workers.")
+    parser.add_argument("--num-batches", type=int, default=50, help="Timed batches per configuration.")
+    parser.add_argument(
+        "--device",
+        type=str,
+        default="cuda" if torch.cuda.is_available() else "cpu",
+        help="Device the preprocessor moves the batches to.",
+    )
+    add_output_args(parser, metric="throughput", higher_is_better=True, tolerance=0.1)
+    args = parser.parse_args()
+    main(**vars(args))
@@ -0,0 +1,207 @@
+#!/usr/bin/env python
+
+# Copyright 2025 The HuggingFace Inc. team. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Compare the accuracy and latency of the Diffusion Policy samplers.
+
+Every sampler configuration (noise scheduler, number of inference steps and denoising loop backend) denoises
+the same initial noise with the same conditioning. Accuracy is measured against a reference configuration
+(DDIM with 100 steps run eagerly by default) and latency is the time to generate one action chunk.
+See the provided README.md or run `python benchmarks/diffusion/run_sampler_benchmark.py --help` for usage.
+"""
+
+import argparse
+import json
+import time
+from dataclasses import replace
+from pathlib import Path
+
+import numpy as np
+import torch
+
+from lerobot.configs.types import FeatureType, PolicyFeature
+from lerobot.policies.diffusion.configuration_diffusion import DiffusionConfig
+from lerobot.policies.diffusion.modeling_diffusion import DiffusionModel, DiffusionPolicy
+from lerobot.utils.constants import ACTION, OBS_IMAGES, OBS_STATE
+
+
+def parse_sampler(value: str) -> tuple[str, int, str]:
+    """Parse a "scheduler:num_steps[:backend]" string, e.g. "DPMSolver++:10:cuda_graph"."""
+    parts = value.split(":")
+    if len(parts) not in (2, 3):
+        raise argparse.ArgumentTypeError(f"Expected 'scheduler:num_steps[:backend]', got {value}")
+    backend = parts[2] if len(parts) == 3 else "eager"
+    return parts[0], int(parts[1]), backend
+
+
+def make_reference_model(policy_path: str | None, device: str) -> DiffusionModel:
+    if policy_path is not None:
+        policy = DiffusionPolicy.from_pretrained(policy_path)
+        return policy.diffusion.to(device).eval()
+
+    # Randomly initialized PushT-like policy: latencies are representative, accuracies are not.
+    config = DiffusionConfig(
+        device=device,
+        input_features={
+            OBS_STATE: PolicyFeature(type=FeatureType.STATE, shape=(2,)),
+            f"{OBS_IMAGES}.top": PolicyFeature(type=FeatureType.VISUAL, shape=(3, 96, 96)),
+        },
+        output_features={ACTION: PolicyFeature(type=FeatureType.ACTION, shape=(2,))},
+    )
+    return DiffusionModel(config).to(device).eval()
+
+
+def make_sampler_model(
+    reference: DiffusionModel, scheduler: str, num_steps: int, backend: str
+) -> DiffusionModel:
+    config = replace(
+        reference.config,
+        inference_noise_scheduler_type=scheduler,
+        num_inference_steps=num_steps,
+        denoise_loop_backend=backend,
+    )
+    model = DiffusionModel(config)
+    model.load_state_dict(reference.state_dict())
+    return model.to(get_device(reference)).eval()
+
+
+def get_device(model: DiffusionModel) -> torch.device:
+    return next(iter(model.parameters())).device
+
+
+def synchronize(device: torch.device):
+    if device.type == "cuda":
+        torch.cuda.synchronize()
+
+
+@torch.no_grad()
+def time_sampler(
+    model: DiffusionModel, noise: torch.Tensor, global_cond: torch.Tensor, num_warmup: int, num_trials: int
+) -> tuple[torch.Tensor, list[float]]:
+    device = noise.device
+    for _ in range(num_warmup):
+        model.conditional_sample(noise.shape[0], global_cond=global_cond, noise=noise)
+
+    latencies_ms = []
+    for _ in range(num_trials):
+        synchronize(device)
+        start = time.perf_counter()
+        actions = model.conditional_sample(noise.shape[0], global_cond=global_cond, noise=noise)
+        synchronize(device)
+        latencies_ms.append((time.perf_counter() - start) * 1000)
+    return actions, latencies_ms
+
+
+def main(
+    policy_path: str | None,
+    samplers: list[tuple[str, int, str]],
+    reference_sampler: tuple[str, int, str],
+    batch_size: int,
+    num_warmup: int,
+    num_trials: int,
+    device: str,
+    output_path: Path | None,
+    seed: int,
+):
+    torch.manual_seed(seed)
+    base_model = make_reference_model(policy_path, device)
+    config = base_model.config
+    cond_dim = base_model.unet.down_modules[0][0].cond_encoder[1].in_features
+    global_cond_dim = cond_dim - config.diffusion_step_embed_dim
+    global_cond = torch.randn(batch_size, global_cond_dim, device=device)
+    noise = torch.randn(batch_size, config.horizon, config.action_feature.shape[0], device=device)
+
+    reference = make_sampler_model(base_model, *reference_sampler)
+    reference_actions, reference_latencies = time_sampler(
+        reference, noise, global_cond, num_warmup, num_trials
+    )
+
+    results = []
+    for sampler, (model, latencies) in [
+        (reference_sampler, (reference, reference_latencies)),
+        *[(s, (None, None)) for s in samplers],
+    ]:
+        if model is None:
+            model = make_sampler_model(base_model, *sampler)
+            actions, latencies = time_sampler(model, noise, global_cond, num_warmup, num_trials)
+        else:
+            actions = reference_actions
+        scheduler, num_steps, backend = sampler
+        results.append(
+            {
+                "scheduler": scheduler,
+                "num_inference_steps": num_steps,
+                "backend": backend,
+                "latency_ms_median": float(np.median(latencies)),
+                "latency_ms_p90": float(np.percentile(latencies, 90)),
+                "mse_vs_reference": float(torch.mean((actions - reference_actions) ** 2)),
+                "max_abs_err_vs_reference": float(torch.max(torch.abs(actions - reference_actions))),
+            }
+        )
+
+    header = f"{'scheduler':<12} {'steps':>5} {'backend':<10} {'median ms':>10} {'p90 ms':>8} {'mse':>10} {'max err':>8}"
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        print(
+            f"{r['scheduler']:<12} {r['num_inference_steps']:>5} {r['backend']:<10} "
+            f"{r['latency_ms_median']:>10.2f} {r['latency_ms_p90']:>8.2f} "
+            f"{r['mse_vs_reference']:>10.2e} {r['max_abs_err_vs_reference']:>8.4f}"
+        )
+
+    if output_path is not None:
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(output_path, "w") as f:
+            json.dump({"policy_path": policy_path, "batch_size": batch_size, "results": results}, f, indent=4)
+        print(f"\nResults written to {output_path}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--policy-path",
+        type=str,
+        default=None,
+        help="Pretrained diffusion policy (hub repo id or local path). Uses a random PushT-like policy if unset.",
+    )
+    parser.add_argument(
+        "--samplers",
+        type=parse_sampler,
+        nargs="*",
+        default=[
+            parse_sampler("DDIM:10"),
+            parse_sampler("DPMSolver++:10"),
+            parse_sampler("DPMSolver++:5"),
+            parse_sampler("UniPC:10"),
+            parse_sampler("UniPC:5"),
+        ],
+        help="Sampler configurations to benchmark, as 'scheduler:num_steps[:backend]' with backend one of "
+        "'eager' (default), 'compile' or 'cuda_graph'.",
+    )
+    parser.add_argument(
+        "--reference-sampler",
+        type=parse_sampler,
+        default=parse_sampler("DDIM:100"),
+        help="Sampler configuration the accuracy is measured against.",
+    )
+    parser.add_argument("--batch-size", type=int, default=1, help="Number of action chunks per call.")
+    parser.add_argument("--num-warmup", type=int, default=3, help="Untimed calls before measuring.")
+    parser.add_argument("--num-trials", type=int, default=20, help="Timed calls per sampler.")
+    parser.add_argument(
+        "--device", type=str, default="cuda" if torch.cuda.is_available() else "cpu", help="Torch device."
+    )
+    parser.add_argument("--output-path", type=Path, default=None, help="Optional JSON file for the results.")
+    parser.add_argument("--seed", type=int, default=1000, help="Seed of the noise and conditioning.")
+    args = parser.parse_args()
+    main(**vars(args))
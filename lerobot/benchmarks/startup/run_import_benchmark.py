@@ -0,0 +1,161 @@
+#!/usr/bin/env python
+
+# Copyright 2025 The HuggingFace Inc. team. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Measure the import time of the LeRobot CLIs, which is paid every time they are started.
+
+Every module is imported in a new interpreter with `python -X importtime`, which reports the time spent importing
+each module, including the modules it imports. The heaviest third-party packages imported by each CLI are listed
+as well, and the script fails if a CLI imports a package it shouldn't (e.g. `transformers` for teleoperation) or
+if its import time regressed compared to a previous run.
+See the provided README.md or run `python benchmarks/startup/run_import_benchmark.py --help` for usage.
+"""
+
+import argparse
+import subprocess
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from benchmarks.utils import add_output_args, compare, report_failures, write_results  # noqa: E402
+
+DEFAULT_MODULES = [
+    "lerobot.scripts.lerobot_find_port",
+    "lerobot.scripts.lerobot_calibrate",
+    "lerobot.scripts.lerobot_teleoperate",
+    "lerobot.scripts.lerobot_record",
+    "lerobot.scripts.lerobot_replay",
+    "lerobot.scripts.lerobot_eval",
+    "lerobot.scripts.lerobot_train",
+]
+
+# Packages that must not be imported when starting a CLI, as it never uses them or only imports them on demand.
+FORBIDDEN_IMPORTS = {
+    "lerobot.scripts.lerobot_find_port": ["torch", "transformers", "torchvision", "datasets"],
+    "lerobot.scripts.lerobot_calibrate": ["transformers", "torchvision", "datasets", "accelerate"],
+    "lerobot.scripts.lerobot_teleoperate": ["transformers", "torchvision", "datasets", "accelerate"],
+    "lerobot.scripts.lerobot_record": ["transformers", "diffusers"],
+    "lerobot.scripts.lerobot_replay": ["transformers", "diffusers"],
+    "lerobot.scripts.lerobot_eval": ["transformers", "diffusers"],
+    "lerobot.scripts.lerobot_train": ["transformers", "diffusers"],
+}
+
+
+def parse_importtime(stderr: str) -> dict[str, tuple[int, int]]:
+    """Returns the self and cumulative import times, in microseconds, of every module in `python -X importtime` logs."""
+    times = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line.removeprefix("import time:").split("|")
+        times[name.strip()] = (int(self_us), int(cumulative_us))
+    return times
+
+
+def measure(module: str) -> dict[str, tuple[int, int]]:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr[-2000:]}")
+    return parse_importtime(result.stderr)
+
+
+def run_benchmark(module: str, num_runs: int, num_top_packages: int) -> dict:
+    # The first import also fills the bytecode and file system caches, so it is reported separately
+    first_ms = measure(module)[module][1] / 1000
+    runs = [measure(module) for _ in range(num_runs)]
+    import_ms = sorted(run[module][1] / 1000 for run in runs)
+
+    # Third-party packages are attributed the cumulative time of their top-level import, in the fastest run
+    fastest = min(runs, key=lambda run: run[module][1])
+    packages = {
+        name: cumulative_us / 1000
+        for name, (_, cumulative_us) in fastest.items()
+        if "." not in name and name != "lerobot"
+    }
+    top_packages = dict(sorted(packages.items(), key=lambda item: -item[1])[:num_top_packages])
+    forbidden = [package for package in FORBIDDEN_IMPORTS.get(module, []) if package in fastest]
+    return {
+        "module": module,
+        "import_ms_first": first_ms,
+        "import_ms_min": import_ms[0],
+        "import_ms_median": import_ms[len(import_ms) // 2],
+        "num_modules": len(fastest),
+        "top_packages_ms": top_packages,
+        "forbidden_imports": forbidden,
+    }
+
+
+def main(
+    modules: list[str],
+    num_runs: int,
+    num_top_packages: int,
+    output_path: Path | None,
+    compare_to: Path | None,
+    tolerance: float,
+):
+    results = [run_benchmark(module, num_runs, num_top_packages) for module in modules]
+
+    header = f"{'module':<40} {'first ms':>9} {'min ms':>8} {'median ms':>10} {'modules':>8}  heaviest packages (ms)"
+    print("\n" + header)
+    print("-" * len(header))
+    for r in results:
+        packages = ", ".join(f"{name} {ms:.0f}" for name, ms in r["top_packages_ms"].items())
+        print(
+            f"{r['module']:<40} {r['import_ms_first']:>9.0f} {r['import_ms_min']:>8.0f} {r['import_ms_median']:>10.0f} {r['num_modules']:>8}  "
+            f"{packages}"
+        )
+
+    if output_path is not None:
+        write_results(output_path, results, num_runs=num_runs)
+
+    failures = [
+        f"{r['module']} imports {', '.join(r['forbidden_imports'])}"
+        for r in results
+        if r["forbidden_imports"]
+    ]
+    if compare_to is not None:
+        failures += compare(
+            results,
+            compare_to,
+            tolerance,
+            key_fields=["module"],
+            get_metrics=lambda result: {"import_ms_min": result["import_ms_min"]},
+            higher_is_better=False,
+        )
+    report_failures(failures)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--modules", type=str, nargs="*", default=DEFAULT_MODULES, help="Modules whose import is timed."
+    )
+    parser.add_argument(
+        "--num-runs",
+        type=int,
+        default=5,
+        help="Imports of each module, after a first import warming up the caches. The fastest one is reported.",
+    )
+    parser.add_argument(
+        "--num-top-packages", type=int, default=5, help="Number of heaviest third-party packages to list."
+    )
+    add_output_args(parser, metric="import time", higher_is_better=False, tolerance=0.2)
+    args = parser.parse_args()
+    main(**vars(args))
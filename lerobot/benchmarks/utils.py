@@ -0,0 +1,110 @@
+# Copyright 2025 The HuggingFace Inc. team. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Helpers shared by the benchmark scripts to save their results and compare them to a previous run.
+
+The scripts import this module as `benchmarks.utils`, after adding the root of the repository to `sys.path`.
+"""
+
+import argparse
+import json
+import platform
+import sys
+from collections.abc import Callable
+from pathlib import Path
+
+import lerobot
+
+
+def add_output_args(parser: argparse.ArgumentParser, metric: str, higher_is_better: bool, tolerance: float):
+    """Adds the `--output-path`, `--compare-to` and `--tolerance` arguments of a benchmark."""
+    change = "dropped" if higher_is_better else "grew"
+    parser.add_argument("--output-path", type=Path, default=None, help="Optional JSON file for the results.")
+    parser.add_argument(
+        "--compare-to",
+        type=Path,
+        default=None,
+        help=f"JSON results of a previous run. Exits with an error if the {metric} of a configuration {change}.",
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=tolerance,
+        help=f"Relative {metric} {'drop' if higher_is_better else 'increase'} reported as a regression.",
+    )
+
+
+def get_environment() -> dict:
+    return {
+        "lerobot": lerobot.__version__,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+    }
+
+
+def write_results(output_path: Path, results: list[dict], environment: dict | None = None, **metadata):
+    """Writes the results to a JSON file, with the environment of the run and the given metadata."""
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    environment = {**get_environment(), **(environment or {})}
+    with open(output_path, "w") as f:
+        json.dump({"environment": environment, **metadata, "results": results}, f, indent=4)
+    print(f"\nResults written to {output_path}")
+
+
+def get_key(result: dict, key_fields: list[str]) -> tuple:
+    return tuple(result[k] for k in key_fields)
+
+
+def compare(
+    results: list[dict],
+    reference_path: Path,
+    tolerance: float,
+    key_fields: list[str],
+    get_metrics: Callable[[dict], dict[str, float]],
+    higher_is_better: bool,
+) -> list[str]:
+    """Returns the configurations whose metrics got worse by more than `tolerance` compared to a previous run.
+
+    Args:
+        results: Results of the current run.
+        reference_path: JSON file written by `write_results` in a previous run.
+        tolerance: Relative change of a metric reported as a regression.
+        key_fields: Fields of the results identifying a configuration across runs.
+        get_metrics: Returns the compared metrics of a result, by name.
+        higher_is_better: Whether the metrics regress when they drop (e.g. throughput) or when they grow
+            (e.g. latency).
+    """
+    with open(reference_path) as f:
+        reference = {get_key(r, key_fields): r for r in json.load(f)["results"]}
+
+    regressions = []
+    for result in results:
+        key = get_key(result, key_fields)
+        ref = reference.get(key)
+        if ref is None:
+            continue
+        ref_metrics = get_metrics(ref)
+        for name, new in get_metrics(result).items():
+            old = ref_metrics[name]
+            regressed = new < (1 - tolerance) * old if higher_is_better else new > (1 + tolerance) * old
+            if regressed:
+                regressions.append(f"Regression: {key}: {name} {new:.2f} vs {old:.2f}")
+    return regressions
+
+
+def report_failures(failures: list[str]):
+    """Prints the failures of a run, e.g. the regressions returned by `compare`, and exits if there are any."""
+    for failure in failures:
+        print(failure)
+    if failures:
+        sys.exit(1)
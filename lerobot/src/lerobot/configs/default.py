@@ -56,8 +56,22 @@ class EvalConfig:
     batch_size: int = 50
     # `use_async_envs` specifies whether to use asynchronous environments (multiprocessing).
     use_async_envs: bool = False
+    # `auto_reset` refills the environments with new episodes as soon as they are done, instead of waiting for
+    # all the environments of the batch to be done. The policy state is only reset for the refilled environments:
+    # the environments refilled together run as their own sub-batch with their own policy state, so the policy
+    # may be called on several smaller batches per step instead of one.
+    auto_reset: bool = False
+    # `parallel_backend` specifies how the tasks of a multi-task environment (e.g. LIBERO, MetaWorld) are run in
+    # parallel when `env.max_parallel_tasks > 1`: "thread" runs the tasks in threads sharing the policy, while
+    # "process" steps the environments of the tasks in `env.max_parallel_tasks` worker processes, and merges
+    # their observations into a single batch for the policy.
+    parallel_backend: str = "thread"
 
     def __post_init__(self) -> None:
+        if self.parallel_backend not in ("thread", "process"):
+            raise ValueError(
+                f"`parallel_backend` must be 'thread' or 'process', got '{self.parallel_backend}'."
+            )
         if self.batch_size > self.n_episodes:
             raise ValueError(
                 "The eval batch size is greater than the number of eval episodes "
@@ -13,6 +13,7 @@
 # limitations under the License.
 import abc
 import builtins
+import importlib
 import json
 import os
 import tempfile
@@ -36,6 +37,25 @@ from lerobot.utils.utils import auto_select_torch_device, is_amp_available, is_t
 T = TypeVar("T", bound="PreTrainedConfig")
 logger = getLogger(__name__)
 
+# Modules registering the configurations of the policies of LeRobot, by policy type. They are imported when their
+# type is looked up rather than upfront, so that the CLIs only import the policies they use.
+POLICY_CONFIG_MODULES = {
+    "act": "lerobot.policies.act.configuration_act",
+    "diffusion": "lerobot.policies.diffusion.configuration_diffusion",
+    "groot": "lerobot.policies.groot.configuration_groot",
+    "pi0": "lerobot.policies.pi0.configuration_pi0",
+    "pi0_fast": "lerobot.policies.pi0_fast.configuration_pi0_fast",
+    "pi05": "lerobot.policies.pi05.configuration_pi05",
+    "reward_classifier": "lerobot.policies.sac.reward_model.configuration_classifier",
+    "sac": "lerobot.policies.sac.configuration_sac",
+    "sarm": "lerobot.policies.sarm.configuration_sarm",
+    "smolvla": "lerobot.policies.smolvla.configuration_smolvla",
+    "tdmpc": "lerobot.policies.tdmpc.configuration_tdmpc",
+    "vqbet": "lerobot.policies.vqbet.configuration_vqbet",
+    "wall_x": "lerobot.policies.wall_x.configuration_wall_x",
+    "xvla": "lerobot.policies.xvla.configuration_xvla",
+}
+
 
 @dataclass
 class PreTrainedConfig(draccus.ChoiceRegistry, HubMixin, abc.ABC):  # type: ignore[misc,name-defined] #TODO: draccus issue
@@ -93,6 +113,19 @@ class PreTrainedConfig(draccus.ChoiceRegistry, HubMixin, abc.ABC):  # type: igno
             )
             self.use_amp = False
 
+    @classmethod
+    def get_choice_class(cls, name: str) -> Any:
+        if name not in cls._choice_registry and name in POLICY_CONFIG_MODULES:
+            importlib.import_module(POLICY_CONFIG_MODULES[name])
+        return super().get_choice_class(name)
+
+    @classmethod
+    def get_known_choices(cls) -> dict[str, Any]:
+        # Listing the policies (e.g. to build the CLI parser) requires all of them to be registered
+        for module in POLICY_CONFIG_MODULES.values():
+            importlib.import_module(module)
+        return super().get_known_choices()
+
     @property
     def type(self) -> str:
         choice_name = self.get_choice_name(self.__class__)
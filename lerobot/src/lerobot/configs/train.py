@@ -53,13 +53,36 @@ class TrainPipelineConfig(HubMixin):
     # Number of workers for the dataloader.
     num_workers: int = 4
     batch_size: int = 8
+    # Number of batches whose gradients are accumulated before each optimizer step. `steps`, `save_freq`,
+    # `eval_freq` and `log_freq` count optimizer steps, each of which sees
+    # `batch_size * gradient_accumulation_steps` samples per process.
+    gradient_accumulation_steps: int = 1
+    # If set, each batch is split into chunks of `micro_batch_size` samples for the forward and backward passes,
+    # which lowers the activation memory without changing the optimization.
+    micro_batch_size: int | None = None
+    # Fetch and preprocess the next batch on a side CUDA stream while the current training step runs, and keep
+    # the training metrics on the device until they are logged (every `log_freq` steps). In this mode,
+    # `update_s` only measures the time spent on the host to queue the training step.
+    overlap_training_step: bool = False
     steps: int = 100_000
     eval_freq: int = 20_000
+    # Run the evaluations in a separate process while training continues. Snapshots of the policy are saved to
+    # `output_dir/eval/snapshots` and evaluated on `async_eval_device` (defaults to `policy.device`, e.g. set it
+    # to "cpu" or to a spare GPU like "cuda:1"). The results are logged as soon as they are available.
+    async_eval: bool = False
+    async_eval_device: str | None = None
+    # With `async_eval`, only evaluate the latest snapshot when the evaluations fall behind training.
+    skip_stale_evals: bool = True
     log_freq: int = 200
     tolerance_s: float = 1e-4
     save_checkpoint: bool = True
     # Checkpoint is saved every `save_freq` training iterations and after the last training step.
     save_freq: int = 20_000
+    # Write the checkpoints from a background thread while training continues. The policy weights and the
+    # optimizer state are snapshotted to CPU memory first, so training blocks only when more than
+    # `max_pending_checkpoints` checkpoints are still being written.
+    async_checkpointing: bool = False
+    max_pending_checkpoints: int = 1
     use_policy_training_preset: bool = True
     optimizer: OptimizerConfig | None = None
     scheduler: LRSchedulerConfig | None = None
@@ -140,6 +163,26 @@ class TrainPipelineConfig(HubMixin):
                 "'policy.repo_id' argument missing. Please specify it to push the model to the hub."
             )
 
+        if self.gradient_accumulation_steps < 1:
+            raise ValueError(
+                f"'gradient_accumulation_steps' must be at least 1, got {self.gradient_accumulation_steps}."
+            )
+        if self.micro_batch_size is not None and not 0 < self.micro_batch_size <= self.batch_size:
+            raise ValueError(
+                f"'micro_batch_size' must be between 1 and 'batch_size' ({self.batch_size}), "
+                f"got {self.micro_batch_size}."
+            )
+
+        if self.async_eval and self.peft is not None:
+            raise ValueError(
+                "'async_eval' is not supported with PEFT, the snapshots only contain the adapters."
+            )
+
+        if self.max_pending_checkpoints < 1:
+            raise ValueError(
+                f"'max_pending_checkpoints' must be at least 1, got {self.max_pending_checkpoints}."
+            )
+
         if self.use_rabc and not self.rabc_progress_path:
             # Auto-detect from dataset path
             repo_id = self.dataset.repo_id
@@ -16,11 +16,18 @@
 # limitations under the License.
 
 import logging
+import multiprocessing
 import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
 from pathlib import Path
 
-import datasets
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
 import tqdm
 
 from lerobot.datasets.compute_stats import aggregate_stats
@@ -33,9 +40,7 @@ from lerobot.datasets.utils import (
     DEFAULT_VIDEO_FILE_SIZE_IN_MB,
     DEFAULT_VIDEO_PATH,
     get_file_size_in_mb,
-    get_hf_features_from_features,
     get_parquet_file_size_in_mb,
-    to_parquet_with_hf_images,
     update_chunk_file_indices,
     write_info,
     write_stats,
@@ -80,110 +85,128 @@ def validate_all_metadata(all_metadata: list[LeRobotDatasetMetadata]):
     return fps, robot_type, features
 
 
-def update_data_df(df, src_meta, dst_meta):
-    """Updates a data DataFrame with new indices and task mappings for aggregation.
+@dataclass
+class FileLayout:
+    """Assignment of source files to the destination files they are concatenated into.
 
-    Adjusts episode indices, frame indices, and task indices to account for
-    previously aggregated data in the destination dataset.
-
-    Args:
-        df: DataFrame containing the data to be updated.
-        src_meta: Source dataset metadata.
-        dst_meta: Destination dataset metadata.
-
-    Returns:
-        pd.DataFrame: Updated DataFrame with adjusted indices.
+    Source files are taken in order and appended to the current destination file, until appending the next
+    one would reach the size limit and a new destination file is started.
     """
 
-    df["episode_index"] = df["episode_index"] + dst_meta.info["total_episodes"]
-    df["index"] = df["index"] + dst_meta.info["total_frames"]
-
-    src_task_names = src_meta.tasks.index.take(df["task_index"].to_numpy())
-    df["task_index"] = dst_meta.tasks.loc[src_task_names, "task_index"].to_numpy()
-
-    return df
+    max_mb: float
+    chunk_size: int
+    # Destination (chunk_index, file_index) of each source file, keyed by (source index, chunk, file).
+    dst: dict[tuple[int, int, int], tuple[int, int]] = field(default_factory=dict)
+    # Duration of the destination file before each source file, for videos.
+    offset_s: dict[tuple[int, int, int], float] = field(default_factory=dict)
+    # Source files of each destination file, in order.
+    sources: dict[tuple[int, int], list[tuple[int, int, int]]] = field(default_factory=dict)
+    _current: tuple[int, int] = (0, 0)
+    _current_mb: float = 0.0
+    _current_s: float = 0.0
+
+    def add(self, src_key: tuple[int, int, int], size_mb: float, duration_s: float = 0.0) -> None:
+        if self._current in self.sources and self._current_mb + size_mb >= self.max_mb:
+            self._current = update_chunk_file_indices(*self._current, self.chunk_size)
+            self._current_mb = self._current_s = 0.0
+        self.dst[src_key] = self._current
+        self.offset_s[src_key] = self._current_s
+        self.sources.setdefault(self._current, []).append(src_key)
+        self._current_mb += size_mb
+        self._current_s += duration_s
+
+
+def _unique_files(episodes, prefix: str) -> list[tuple[int, int]]:
+    """Returns the sorted (chunk_index, file_index) pairs of the files referenced by the episodes."""
+    return sorted(
+        {
+            (int(chunk), int(file))
+            for chunk, file in zip(
+                episodes[f"{prefix}/chunk_index"], episodes[f"{prefix}/file_index"], strict=True
+            )
+        }
+    )
 
 
-def update_meta_data(
-    df,
-    dst_meta,
-    meta_idx,
-    data_idx,
-    videos_idx,
-):
-    """Updates metadata DataFrame with new chunk, file, and timestamp indices.
-
-    Adjusts all indices and timestamps to account for previously aggregated
-    data and videos in the destination dataset.
+def _write_data_file(dst_path: Path, sources: list[tuple[Path, int, int, np.ndarray]]) -> int:
+    """Streams the row groups of the source data files into `dst_path`, shifting their indices.
 
     Args:
-        df: DataFrame containing the metadata to be updated.
-        dst_meta: Destination dataset metadata.
-        meta_idx: Dictionary containing current metadata chunk and file indices.
-        data_idx: Dictionary containing current data chunk and file indices.
-        videos_idx: Dictionary containing current video indices and timestamps.
+        dst_path: Destination parquet file.
+        sources: (path, frame_offset, episode_offset, task_mapping) of each source file, where
+            `task_mapping[src_task_index]` is the destination task index.
 
     Returns:
-        pd.DataFrame: Updated DataFrame with adjusted indices and timestamps.
+        The number of rows written.
     """
+    dst_path.parent.mkdir(parents=True, exist_ok=True)
+    writer = None
+    num_rows = 0
+    try:
+        for src_path, frame_offset, episode_offset, task_mapping in sources:
+            src_file = pq.ParquetFile(src_path)
+            if writer is None:
+                # The source schema carries the HF features metadata, e.g. to load images as images.
+                writer = pq.ParquetWriter(dst_path, src_file.schema_arrow)
+            for batch in src_file.iter_batches():
+                table = pa.Table.from_batches([batch])
+                updates = {
+                    "index": pc.add(table["index"], frame_offset),
+                    "episode_index": pc.add(table["episode_index"], episode_offset),
+                    "task_index": pa.array(
+                        task_mapping[table["task_index"].to_numpy()],
+                        type=table.schema.field("task_index").type,
+                    ),
+                }
+                for name, column in updates.items():
+                    table = table.set_column(table.schema.get_field_index(name), name, column)
+                writer.write_table(table.cast(writer.schema))
+                num_rows += table.num_rows
+    finally:
+        if writer is not None:
+            writer.close()
+    return num_rows
+
+
+def _write_video_file(dst_path: Path, src_paths: list[Path]) -> None:
+    """Concatenates the source videos into `dst_path` without re-encoding them."""
+    dst_path.parent.mkdir(parents=True, exist_ok=True)
+    if len(src_paths) == 1:
+        shutil.copy(src_paths[0], dst_path)
+    else:
+        concatenate_video_files(src_paths, dst_path)
 
-    df["meta/episodes/chunk_index"] = df["meta/episodes/chunk_index"] + meta_idx["chunk"]
-    df["meta/episodes/file_index"] = df["meta/episodes/file_index"] + meta_idx["file"]
-    df["data/chunk_index"] = df["data/chunk_index"] + data_idx["chunk"]
-    df["data/file_index"] = df["data/file_index"] + data_idx["file"]
-    for key, video_idx in videos_idx.items():
-        # Store original video file indices before updating
-        orig_chunk_col = f"videos/{key}/chunk_index"
-        orig_file_col = f"videos/{key}/file_index"
-        df["_orig_chunk"] = df[orig_chunk_col].copy()
-        df["_orig_file"] = df[orig_file_col].copy()
-
-        # Get mappings for this video key
-        src_to_offset = video_idx.get("src_to_offset", {})
-        src_to_dst = video_idx.get("src_to_dst", {})
-
-        # Apply per-source-file mappings
-        if src_to_dst:
-            # Map each episode to its correct destination file and apply offset
-            for idx in df.index:
-                # Convert to Python int to avoid numpy type mismatch in dict lookup
-                src_key = (int(df.at[idx, "_orig_chunk"]), int(df.at[idx, "_orig_file"]))
-
-                # Get destination chunk/file for this source file
-                dst_chunk, dst_file = src_to_dst.get(src_key, (video_idx["chunk"], video_idx["file"]))
-                df.at[idx, orig_chunk_col] = dst_chunk
-                df.at[idx, orig_file_col] = dst_file
-
-                # Apply timestamp offset
-                offset = src_to_offset.get(src_key, 0)
-                df.at[idx, f"videos/{key}/from_timestamp"] += offset
-                df.at[idx, f"videos/{key}/to_timestamp"] += offset
-        elif src_to_offset:
-            # Fallback: use same destination for all, but apply per-file offsets
-            df[orig_chunk_col] = video_idx["chunk"]
-            df[orig_file_col] = video_idx["file"]
-            for idx in df.index:
-                # Convert to Python int to avoid numpy type mismatch in dict lookup
-                src_key = (int(df.at[idx, "_orig_chunk"]), int(df.at[idx, "_orig_file"]))
-                offset = src_to_offset.get(src_key, 0)
-                df.at[idx, f"videos/{key}/from_timestamp"] += offset
-                df.at[idx, f"videos/{key}/to_timestamp"] += offset
-        else:
-            # Fallback to simple offset (for backward compatibility)
-            df[orig_chunk_col] = video_idx["chunk"]
-            df[orig_file_col] = video_idx["file"]
-            df[f"videos/{key}/from_timestamp"] = (
-                df[f"videos/{key}/from_timestamp"] + video_idx["latest_duration"]
-            )
-            df[f"videos/{key}/to_timestamp"] = df[f"videos/{key}/to_timestamp"] + video_idx["latest_duration"]
-
-        # Clean up temporary columns
-        df = df.drop(columns=["_orig_chunk", "_orig_file"])
-
-    df["dataset_from_index"] = df["dataset_from_index"] + dst_meta.info["total_frames"]
-    df["dataset_to_index"] = df["dataset_to_index"] + dst_meta.info["total_frames"]
-    df["episode_index"] = df["episode_index"] + dst_meta.info["total_episodes"]
 
+def _update_episodes_df(
+    df: pd.DataFrame,
+    src_ix: int,
+    meta_dst: tuple[int, int],
+    frame_offset: int,
+    episode_offset: int,
+    data_layout: FileLayout,
+    video_layouts: dict[str, FileLayout],
+) -> pd.DataFrame:
+    """Points the episodes metadata of a source dataset to the destination files and indices."""
+    df["meta/episodes/chunk_index"], df["meta/episodes/file_index"] = meta_dst
+    src_keys = [
+        (src_ix, int(c), int(f)) for c, f in zip(df["data/chunk_index"], df["data/file_index"], strict=True)
+    ]
+    df["data/chunk_index"] = [data_layout.dst[key][0] for key in src_keys]
+    df["data/file_index"] = [data_layout.dst[key][1] for key in src_keys]
+    for video_key, layout in video_layouts.items():
+        prefix = f"videos/{video_key}"
+        src_keys = [
+            (src_ix, int(c), int(f))
+            for c, f in zip(df[f"{prefix}/chunk_index"], df[f"{prefix}/file_index"], strict=True)
+        ]
+        offsets = np.array([layout.offset_s[key] for key in src_keys])
+        df[f"{prefix}/chunk_index"] = [layout.dst[key][0] for key in src_keys]
+        df[f"{prefix}/file_index"] = [layout.dst[key][1] for key in src_keys]
+        df[f"{prefix}/from_timestamp"] = df[f"{prefix}/from_timestamp"] + offsets
+        df[f"{prefix}/to_timestamp"] = df[f"{prefix}/to_timestamp"] + offsets
+    df["dataset_from_index"] = df["dataset_from_index"] + frame_offset
+    df["dataset_to_index"] = df["dataset_to_index"] + frame_offset
+    df["episode_index"] = df["episode_index"] + episode_offset
     return df
 
 
@@ -195,14 +218,18 @@ def aggregate_datasets(
     data_files_size_in_mb: float | None = None,
     video_files_size_in_mb: float | None = None,
     chunk_size: int | None = None,
+    num_workers: int = 4,
 ):
     """Aggregates multiple LeRobot datasets into a single unified dataset.
 
     This is the main function that orchestrates the aggregation process by:
     1. Loading and validating all source dataset metadata
     2. Creating a new destination dataset with unified tasks
-    3. Aggregating videos, data, and metadata from all source datasets
-    4. Finalizing the aggregated dataset with proper statistics
+    3. Planning the layout of the destination data, video and metadata files from the sizes of the source
+       files, so that every destination file can be written independently
+    4. Writing the data files (streaming the parquet row groups) and the video files (concatenating them
+       without re-encoding) concurrently, and the episodes metadata
+    5. Finalizing the aggregated dataset with proper statistics
 
     Args:
         repo_ids: List of repository IDs for the datasets to aggregate.
@@ -212,8 +239,10 @@ def aggregate_datasets(
         data_files_size_in_mb: Maximum size for data files in MB (defaults to DEFAULT_DATA_FILE_SIZE_IN_MB)
         video_files_size_in_mb: Maximum size for video files in MB (defaults to DEFAULT_VIDEO_FILE_SIZE_IN_MB)
         chunk_size: Maximum number of files per chunk (defaults to DEFAULT_CHUNK_SIZE)
+        num_workers: Number of threads writing data files, and of processes writing video files.
     """
     logging.info("Start aggregate_datasets")
+    start_time = time.perf_counter()
 
     if data_files_size_in_mb is None:
         data_files_size_in_mb = DEFAULT_DATA_FILE_SIZE_IN_MB
@@ -248,314 +277,118 @@ def aggregate_datasets(
     unique_tasks = pd.concat([m.tasks for m in all_metadata]).index.unique()
     dst_meta.tasks = pd.DataFrame({"task_index": range(len(unique_tasks))}, index=unique_tasks)
 
-    meta_idx = {"chunk": 0, "file": 0}
-    data_idx = {"chunk": 0, "file": 0}
-    videos_idx = {
-        key: {"chunk": 0, "file": 0, "latest_duration": 0, "episode_duration": 0} for key in video_keys
-    }
-
-    dst_meta.episodes = {}
-
-    for src_meta in tqdm.tqdm(all_metadata, desc="Copy data and videos"):
-        videos_idx = aggregate_videos(src_meta, dst_meta, videos_idx, video_files_size_in_mb, chunk_size)
-        data_idx = aggregate_data(src_meta, dst_meta, data_idx, data_files_size_in_mb, chunk_size)
-
-        meta_idx = aggregate_metadata(src_meta, dst_meta, meta_idx, data_idx, videos_idx)
-
-        dst_meta.info["total_episodes"] += src_meta.total_episodes
-        dst_meta.info["total_frames"] += src_meta.total_frames
-
-    finalize_aggregation(dst_meta, all_metadata)
-    logging.info("Aggregation complete.")
-
-
-def aggregate_videos(src_meta, dst_meta, videos_idx, video_files_size_in_mb, chunk_size):
-    """Aggregates video chunks from a source dataset into the destination dataset.
-
-    Handles video file concatenation and rotation based on file size limits.
-    Creates new video files when size limits are exceeded.
-
-    Args:
-        src_meta: Source dataset metadata.
-        dst_meta: Destination dataset metadata.
-        videos_idx: Dictionary tracking video chunk and file indices.
-        video_files_size_in_mb: Maximum size for video files in MB (defaults to DEFAULT_VIDEO_FILE_SIZE_IN_MB)
-        chunk_size: Maximum number of files per chunk (defaults to DEFAULT_CHUNK_SIZE)
-
-    Returns:
-        dict: Updated videos_idx with current chunk and file indices.
-    """
-    for key in videos_idx:
-        videos_idx[key]["episode_duration"] = 0
-        # Track offset for each source (chunk, file) pair
-        videos_idx[key]["src_to_offset"] = {}
-        # Track destination (chunk, file) for each source (chunk, file) pair
-        videos_idx[key]["src_to_dst"] = {}
-        # Initialize dst_file_durations if not present
-        # dst_file_durations tracks duration of each destination file
-        if "dst_file_durations" not in videos_idx[key]:
-            videos_idx[key]["dst_file_durations"] = {}
-
-    for key, video_idx in videos_idx.items():
-        unique_chunk_file_pairs = {
-            (chunk, file)
-            for chunk, file in zip(
-                src_meta.episodes[f"videos/{key}/chunk_index"],
-                src_meta.episodes[f"videos/{key}/file_index"],
-                strict=False,
-            )
-        }
-        unique_chunk_file_pairs = sorted(unique_chunk_file_pairs)
-
-        chunk_idx = video_idx["chunk"]
-        file_idx = video_idx["file"]
-        dst_file_durations = video_idx["dst_file_durations"]
-
-        for src_chunk_idx, src_file_idx in unique_chunk_file_pairs:
-            # Convert to Python int to ensure consistent dict keys
-            src_chunk_idx = int(src_chunk_idx)
-            src_file_idx = int(src_file_idx)
-
-            src_path = src_meta.root / DEFAULT_VIDEO_PATH.format(
-                video_key=key,
-                chunk_index=src_chunk_idx,
-                file_index=src_file_idx,
-            )
-
-            dst_path = dst_meta.root / DEFAULT_VIDEO_PATH.format(
-                video_key=key,
-                chunk_index=chunk_idx,
-                file_index=file_idx,
-            )
-
-            src_duration = get_video_duration_in_s(src_path)
-            dst_key = (chunk_idx, file_idx)
-
-            if not dst_path.exists():
-                # New destination file: offset is 0
-                videos_idx[key]["src_to_offset"][(src_chunk_idx, src_file_idx)] = 0
-                videos_idx[key]["src_to_dst"][(src_chunk_idx, src_file_idx)] = dst_key
-                dst_path.parent.mkdir(parents=True, exist_ok=True)
-                shutil.copy(str(src_path), str(dst_path))
-                # Track duration of this destination file
-                dst_file_durations[dst_key] = src_duration
-                videos_idx[key]["episode_duration"] += src_duration
-                continue
-
-            # Check file sizes before appending
-            src_size = get_file_size_in_mb(src_path)
-            dst_size = get_file_size_in_mb(dst_path)
-
-            if dst_size + src_size >= video_files_size_in_mb:
-                # Rotate to a new file - offset is 0
-                chunk_idx, file_idx = update_chunk_file_indices(chunk_idx, file_idx, chunk_size)
-                dst_key = (chunk_idx, file_idx)
-                videos_idx[key]["src_to_offset"][(src_chunk_idx, src_file_idx)] = 0
-                videos_idx[key]["src_to_dst"][(src_chunk_idx, src_file_idx)] = dst_key
-                dst_path = dst_meta.root / DEFAULT_VIDEO_PATH.format(
-                    video_key=key,
-                    chunk_index=chunk_idx,
-                    file_index=file_idx,
-                )
-                dst_path.parent.mkdir(parents=True, exist_ok=True)
-                shutil.copy(str(src_path), str(dst_path))
-                # Track duration of this new destination file
-                dst_file_durations[dst_key] = src_duration
-            else:
-                # Append to existing destination file
-                # Offset is the current duration of this destination file
-                current_dst_duration = dst_file_durations.get(dst_key, 0)
-                videos_idx[key]["src_to_offset"][(src_chunk_idx, src_file_idx)] = current_dst_duration
-                videos_idx[key]["src_to_dst"][(src_chunk_idx, src_file_idx)] = dst_key
-                concatenate_video_files(
-                    [dst_path, src_path],
-                    dst_path,
-                )
-                # Update duration of this destination file
-                dst_file_durations[dst_key] = current_dst_duration + src_duration
-
-            videos_idx[key]["episode_duration"] += src_duration
-
-        videos_idx[key]["chunk"] = chunk_idx
-        videos_idx[key]["file"] = file_idx
-
-    return videos_idx
-
+    frame_offsets = np.cumsum([0] + [m.total_frames for m in all_metadata]).tolist()
+    episode_offsets = np.cumsum([0] + [m.total_episodes for m in all_metadata]).tolist()
 
-def aggregate_data(src_meta, dst_meta, data_idx, data_files_size_in_mb, chunk_size):
-    """Aggregates data chunks from a source dataset into the destination dataset.
-
-    Reads source data files, updates indices to match the aggregated dataset,
-    and writes them to the destination with proper file rotation.
-
-    Args:
-        src_meta: Source dataset metadata.
-        dst_meta: Destination dataset metadata.
-        data_idx: Dictionary tracking data chunk and file indices.
-
-    Returns:
-        dict: Updated data_idx with current chunk and file indices.
-    """
-    unique_chunk_file_ids = {
-        (c, f)
-        for c, f in zip(
-            src_meta.episodes["data/chunk_index"], src_meta.episodes["data/file_index"], strict=False
-        )
+    # Sizes and durations of all the source files, read in parallel as they require opening every file.
+    data_files = {
+        (i, c, f): m.root / DEFAULT_DATA_PATH.format(chunk_index=c, file_index=f)
+        for i, m in enumerate(all_metadata)
+        for c, f in _unique_files(m.episodes, "data")
     }
-
-    unique_chunk_file_ids = sorted(unique_chunk_file_ids)
-    contains_images = len(dst_meta.image_keys) > 0
-
-    # retrieve features schema for proper image typing in parquet
-    hf_features = get_hf_features_from_features(dst_meta.features) if contains_images else None
-
-    for src_chunk_idx, src_file_idx in unique_chunk_file_ids:
-        src_path = src_meta.root / DEFAULT_DATA_PATH.format(
-            chunk_index=src_chunk_idx, file_index=src_file_idx
-        )
-        if contains_images:
-            # Use HuggingFace datasets to read source data to preserve image format
-            src_ds = datasets.Dataset.from_parquet(str(src_path))
-            df = src_ds.to_pandas()
-        else:
-            df = pd.read_parquet(src_path)
-        df = update_data_df(df, src_meta, dst_meta)
-
-        data_idx = append_or_create_parquet_file(
-            df,
-            src_path,
-            data_idx,
-            data_files_size_in_mb,
-            chunk_size,
-            DEFAULT_DATA_PATH,
-            contains_images=contains_images,
-            aggr_root=dst_meta.root,
-            hf_features=hf_features,
-        )
-
-    return data_idx
-
-
-def aggregate_metadata(src_meta, dst_meta, meta_idx, data_idx, videos_idx):
-    """Aggregates metadata from a source dataset into the destination dataset.
-
-    Reads source metadata files, updates all indices and timestamps,
-    and writes them to the destination with proper file rotation.
-
-    Args:
-        src_meta: Source dataset metadata.
-        dst_meta: Destination dataset metadata.
-        meta_idx: Dictionary tracking metadata chunk and file indices.
-        data_idx: Dictionary tracking data chunk and file indices.
-        videos_idx: Dictionary tracking video indices and timestamps.
-
-    Returns:
-        dict: Updated meta_idx with current chunk and file indices.
-    """
-    chunk_file_ids = {
-        (c, f)
-        for c, f in zip(
-            src_meta.episodes["meta/episodes/chunk_index"],
-            src_meta.episodes["meta/episodes/file_index"],
-            strict=False,
-        )
+    video_files = {
+        key: {
+            (i, c, f): m.root / DEFAULT_VIDEO_PATH.format(video_key=key, chunk_index=c, file_index=f)
+            for i, m in enumerate(all_metadata)
+            for c, f in _unique_files(m.episodes, f"videos/{key}")
+        }
+        for key in video_keys
     }
-
-    chunk_file_ids = sorted(chunk_file_ids)
-    for chunk_idx, file_idx in chunk_file_ids:
-        src_path = src_meta.root / DEFAULT_EPISODES_PATH.format(chunk_index=chunk_idx, file_index=file_idx)
-        df = pd.read_parquet(src_path)
-        df = update_meta_data(
-            df,
-            dst_meta,
-            meta_idx,
-            data_idx,
-            videos_idx,
+    all_video_paths = [path for files in video_files.values() for path in files.values()]
+    with ThreadPoolExecutor(max_workers=max(1, num_workers)) as executor:
+        data_sizes = dict(
+            zip(data_files, executor.map(get_parquet_file_size_in_mb, data_files.values()), strict=True)
         )
-
-        meta_idx = append_or_create_parquet_file(
-            df,
-            src_path,
-            meta_idx,
-            DEFAULT_DATA_FILE_SIZE_IN_MB,
-            DEFAULT_CHUNK_SIZE,
-            DEFAULT_EPISODES_PATH,
-            contains_images=False,
-            aggr_root=dst_meta.root,
+        video_durations = dict(
+            zip(all_video_paths, executor.map(get_video_duration_in_s, all_video_paths), strict=True)
         )
 
-    # Increment latest_duration by the total duration added from this source dataset
-    for k in videos_idx:
-        videos_idx[k]["latest_duration"] += videos_idx[k]["episode_duration"]
-
-    return meta_idx
-
-
-def append_or_create_parquet_file(
-    df: pd.DataFrame,
-    src_path: Path,
-    idx: dict[str, int],
-    max_mb: float,
-    chunk_size: int,
-    default_path: str,
-    contains_images: bool = False,
-    aggr_root: Path = None,
-    hf_features: datasets.Features | None = None,
-):
-    """Appends data to an existing parquet file or creates a new one based on size constraints.
-
-    Manages file rotation when size limits are exceeded to prevent individual files
-    from becoming too large. Handles both regular parquet files and those containing images.
-
-    Args:
-        df: DataFrame to write to the parquet file.
-        src_path: Path to the source file (used for size estimation).
-        idx: Dictionary containing current 'chunk' and 'file' indices.
-        max_mb: Maximum allowed file size in MB before rotation.
-        chunk_size: Maximum number of files per chunk before incrementing chunk index.
-        default_path: Format string for generating file paths.
-        contains_images: Whether the data contains images requiring special handling.
-        aggr_root: Root path for the aggregated dataset.
-        hf_features: Optional HuggingFace Features schema for proper image typing.
-
-    Returns:
-        dict: Updated index dictionary with current chunk and file indices.
-    """
-    dst_path = aggr_root / default_path.format(chunk_index=idx["chunk"], file_index=idx["file"])
-
-    if not dst_path.exists():
-        dst_path.parent.mkdir(parents=True, exist_ok=True)
-        if contains_images:
-            to_parquet_with_hf_images(df, dst_path, features=hf_features)
-        else:
+    logging.info("Plan the files layout")
+    data_layout = FileLayout(data_files_size_in_mb, chunk_size)
+    for key, size_mb in data_sizes.items():
+        data_layout.add(key, size_mb)
+    video_layouts = {}
+    for video_key, files in video_files.items():
+        video_layouts[video_key] = FileLayout(video_files_size_in_mb, chunk_size)
+        for key, path in files.items():
+            video_layouts[video_key].add(key, get_file_size_in_mb(path), video_durations[path])
+    meta_layout = FileLayout(DEFAULT_DATA_FILE_SIZE_IN_MB, DEFAULT_CHUNK_SIZE)
+    meta_files = {}
+    for i, m in enumerate(all_metadata):
+        for c, f in _unique_files(m.episodes, "meta/episodes"):
+            meta_files[(i, c, f)] = m.root / DEFAULT_EPISODES_PATH.format(chunk_index=c, file_index=f)
+            meta_layout.add((i, c, f), get_parquet_file_size_in_mb(meta_files[(i, c, f)]))
+
+    task_mappings = [
+        dst_meta.tasks.loc[m.tasks.sort_values("task_index").index, "task_index"].to_numpy()
+        for m in all_metadata
+    ]
+
+    logging.info("Copy data and videos")
+    # The video workers are spawned, forking them while the data threads run pyarrow writes can deadlock.
+    with (
+        ThreadPoolExecutor(max_workers=max(1, num_workers)) as data_executor,
+        ProcessPoolExecutor(
+            max_workers=max(1, num_workers), mp_context=multiprocessing.get_context("spawn")
+        ) as video_executor,
+    ):
+        futures = [
+            data_executor.submit(
+                _write_data_file,
+                dst_meta.root / DEFAULT_DATA_PATH.format(chunk_index=c, file_index=f),
+                [
+                    (data_files[key], frame_offsets[key[0]], episode_offsets[key[0]], task_mappings[key[0]])
+                    for key in sources
+                ],
+            )
+            for (c, f), sources in data_layout.sources.items()
+        ]
+        for video_key, layout in video_layouts.items():
+            futures += [
+                video_executor.submit(
+                    _write_video_file,
+                    dst_meta.root
+                    / DEFAULT_VIDEO_PATH.format(video_key=video_key, chunk_index=c, file_index=f),
+                    [video_files[video_key][key] for key in sources],
+                )
+                for (c, f), sources in layout.sources.items()
+            ]
+
+        # The episodes metadata only depends on the layout, write it while the files are being copied.
+        for (c, f), sources in meta_layout.sources.items():
+            df = pd.concat(
+                [
+                    _update_episodes_df(
+                        pd.read_parquet(meta_files[key]),
+                        key[0],
+                        (c, f),
+                        frame_offsets[key[0]],
+                        episode_offsets[key[0]],
+                        data_layout,
+                        video_layouts,
+                    )
+                    for key in sources
+                ],
+                ignore_index=True,
+            )
+            dst_path = dst_meta.root / DEFAULT_EPISODES_PATH.format(chunk_index=c, file_index=f)
+            dst_path.parent.mkdir(parents=True, exist_ok=True)
             df.to_parquet(dst_path)
-        return idx
 
-    src_size = get_parquet_file_size_in_mb(src_path)
-    dst_size = get_parquet_file_size_in_mb(dst_path)
+        for future in tqdm.tqdm(as_completed(futures), total=len(futures), desc="Copy data and videos"):
+            future.result()
 
-    if dst_size + src_size >= max_mb:
-        idx["chunk"], idx["file"] = update_chunk_file_indices(idx["chunk"], idx["file"], chunk_size)
-        new_path = aggr_root / default_path.format(chunk_index=idx["chunk"], file_index=idx["file"])
-        new_path.parent.mkdir(parents=True, exist_ok=True)
-        final_df = df
-        target_path = new_path
-    else:
-        if contains_images:
-            # Use HuggingFace datasets to read existing data to preserve image format
-            existing_ds = datasets.Dataset.from_parquet(str(dst_path))
-            existing_df = existing_ds.to_pandas()
-        else:
-            existing_df = pd.read_parquet(dst_path)
-        final_df = pd.concat([existing_df, df], ignore_index=True)
-        target_path = dst_path
-
-    if contains_images:
-        to_parquet_with_hf_images(final_df, target_path, features=hf_features)
-    else:
-        final_df.to_parquet(target_path)
+    dst_meta.info["total_episodes"] = episode_offsets[-1]
+    dst_meta.info["total_frames"] = frame_offsets[-1]
+    finalize_aggregation(dst_meta, all_metadata)
 
-    return idx
+    elapsed_s = time.perf_counter() - start_time
+    total_mb = sum(data_sizes.values()) + sum(get_file_size_in_mb(path) for path in all_video_paths)
+    logging.info(
+        f"Aggregation complete: {len(all_metadata)} datasets, {episode_offsets[-1]} episodes and "
+        f"{frame_offsets[-1]} frames ({total_mb:.1f} MB) in {elapsed_s:.1f}s "
+        f"({frame_offsets[-1] / elapsed_s:.0f} frames/s, {total_mb / elapsed_s:.1f} MB/s)."
+    )
 
 
 def finalize_aggregation(aggr_meta, all_metadata):
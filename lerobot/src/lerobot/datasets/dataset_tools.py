@@ -23,10 +23,15 @@ This module provides utilities for:
 - Merging datasets (wrapper around aggregate functionality)
 """
 
+import bisect
 import logging
+import multiprocessing
 import shutil
+import tempfile
 from collections.abc import Callable
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from fractions import Fraction
+from functools import partial
 from pathlib import Path
 
 import datasets
@@ -52,7 +57,7 @@ from lerobot.datasets.utils import (
     write_stats,
     write_tasks,
 )
-from lerobot.datasets.video_utils import encode_video_frames, get_video_info
+from lerobot.datasets.video_utils import concatenate_video_files, encode_video, get_video_info
 from lerobot.utils.constants import HF_LEROBOT_HOME, OBS_IMAGE
 
 
@@ -83,6 +88,7 @@ def delete_episodes(
     episode_indices: list[int],
     output_dir: str | Path | None = None,
     repo_id: str | None = None,
+    num_workers: int = 4,
 ) -> LeRobotDataset:
     """Delete episodes from a LeRobotDataset and create a new dataset.
 
@@ -91,6 +97,7 @@ def delete_episodes(
         episode_indices: List of episode indices to delete.
         output_dir: Directory to save the new dataset. If None, uses default location.
         repo_id: Repository ID for the new dataset. If None, appends "_modified" to original.
+        num_workers: Number of processes filtering the video files in parallel.
     """
     if not episode_indices:
         raise ValueError("No episodes to delete")
@@ -123,7 +130,7 @@ def delete_episodes(
 
     video_metadata = None
     if dataset.meta.video_keys:
-        video_metadata = _copy_and_reindex_videos(dataset, new_meta, episode_mapping)
+        video_metadata = _copy_and_reindex_videos(dataset, new_meta, episode_mapping, num_workers=num_workers)
 
     data_metadata = _copy_and_reindex_data(dataset, new_meta, episode_mapping)
 
@@ -145,6 +152,7 @@ def split_dataset(
     dataset: LeRobotDataset,
     splits: dict[str, float | list[int]],
     output_dir: str | Path | None = None,
+    num_workers: int = 4,
 ) -> dict[str, LeRobotDataset]:
     """Split a LeRobotDataset into multiple smaller datasets.
 
@@ -153,6 +161,7 @@ def split_dataset(
         splits: Either a dict mapping split names to episode indices, or a dict mapping
                 split names to fractions (must sum to <= 1.0).
         output_dir: Base directory for output datasets. If None, uses default location.
+        num_workers: Number of processes filtering the video files in parallel.
 
     Examples:
       Split by specific episodes
@@ -213,7 +222,9 @@ def split_dataset(
 
         video_metadata = None
         if dataset.meta.video_keys:
-            video_metadata = _copy_and_reindex_videos(dataset, new_meta, episode_mapping)
+            video_metadata = _copy_and_reindex_videos(
+                dataset, new_meta, episode_mapping, num_workers=num_workers
+            )
 
         data_metadata = _copy_and_reindex_data(dataset, new_meta, episode_mapping)
 
@@ -671,23 +682,208 @@ def _keep_episodes_from_video_with_av(
     in_container.close()
 
 
+def _video_cut_pieces(ranges: list[tuple[int, int]], boundaries: list[int]) -> list[tuple[str, int, int]]:
+    """Splits frame ranges into pieces that can be stream-copied and pieces that must be re-encoded.
+
+    Args:
+        ranges: Sorted (start, end) frame ranges to keep, end excluded.
+        boundaries: Sorted frame indices at which the video can be cut without decoding, i.e. its keyframes
+            and its number of frames.
+
+    Returns:
+        A list of ("copy" | "encode", start, end) pieces covering the ranges in order. Only the partial GOPs
+        at the edges of the ranges are re-encoded.
+    """
+    merged: list[list[int]] = []
+    for start, end in ranges:
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        elif end > start:
+            merged.append([start, end])
+
+    pieces = []
+    for start, end in merged:
+        # First and last boundaries within the range.
+        first = boundaries[bisect.bisect_left(boundaries, start)] if start <= boundaries[-1] else end
+        last_ix = bisect.bisect_right(boundaries, end) - 1
+        last = boundaries[last_ix] if last_ix >= 0 else start
+        if first >= last:
+            pieces.append(("encode", start, end))
+            continue
+        if start < first:
+            pieces.append(("encode", start, first))
+        pieces.append(("copy", first, last))
+        if last < end:
+            pieces.append(("encode", last, end))
+    return pieces
+
+
+def _keep_episodes_from_video_with_remux(
+    input_path: Path,
+    output_path: Path,
+    episodes_to_keep: list[tuple[float, float]],
+    fps: float,
+    vcodec: str = "libsvtav1",
+    pix_fmt: str = "yuv420p",
+) -> None:
+    """Keep only specified episodes from a video file, copying the packets of the kept frames.
+
+    The kept frames are stream-copied GOP by GOP without decoding. Only the frames of the partial GOPs at
+    the edges of the kept ranges, i.e. when an episode doesn't start (or end) at a keyframe, are decoded and
+    re-encoded. Episodes written by LeRobot start at a keyframe, so their videos are only remuxed. The pieces
+    are then concatenated with `concatenate_video_files`.
+
+    Falls back to `_keep_episodes_from_video_with_av` when the video has B-frames, or when some frames must be
+    re-encoded but `vcodec` doesn't match the codec of the video.
+
+    Args:
+        input_path: Source video file path.
+        output_path: Destination video file path.
+        episodes_to_keep: List of (start_time, end_time) tuples for episodes to keep.
+        fps: Frame rate of the video.
+        vcodec: Video codec used to re-encode the partial GOPs.
+        pix_fmt: Pixel format of the re-encoded frames.
+    """
+    import av
+
+    if not episodes_to_keep:
+        raise ValueError("No episodes to keep")
+
+    def frame_index(time_s: float) -> int:
+        return round(time_s * fps)
+
+    with av.open(str(input_path)) as in_container:
+        if not in_container.streams.video:
+            raise ValueError(
+                f"No video streams found in {input_path}. "
+                "The video file may be corrupted or empty. "
+                "Try re-downloading the dataset or checking the video file."
+            )
+        v_in = in_container.streams.video[0]
+        time_base = v_in.time_base
+        codec_name = v_in.codec_context.codec.canonical_name
+        width, height = v_in.codec_context.width, v_in.codec_context.height
+        # Scan the packets without decoding them to find where the video can be cut.
+        num_frames = 0
+        keyframes = []
+        reordered = False
+        for packet in in_container.demux(v_in):
+            if packet.pts is None:
+                continue
+            idx = frame_index(float(packet.pts * time_base))
+            # B-frames are stored after the frames they reference.
+            reordered = reordered or idx < num_frames - 1
+            num_frames = max(num_frames, idx + 1)
+            if packet.is_keyframe:
+                keyframes.append(idx)
+
+    if reordered:
+        # The decoding timestamps of the copied pieces would start before their first frame and overlap the
+        # previous piece once concatenated.
+        logging.warning(f"{input_path} has B-frames, re-encoding it with {vcodec}.")
+        _keep_episodes_from_video_with_av(input_path, output_path, episodes_to_keep, fps, vcodec, pix_fmt)
+        return
+
+    ranges = sorted((frame_index(start), frame_index(end)) for start, end in episodes_to_keep)
+    pieces = _video_cut_pieces(ranges, sorted(set(keyframes)) + [num_frames])
+    if any(kind == "encode" for kind, _, _ in pieces) and av.Codec(vcodec, "w").canonical_name != codec_name:
+        logging.warning(
+            f"{input_path} is encoded with {codec_name}, re-encoding it with {vcodec} as its episodes "
+            "are not keyframe-aligned."
+        )
+        _keep_episodes_from_video_with_av(input_path, output_path, episodes_to_keep, fps, vcodec, pix_fmt)
+        return
+
+    # Same settings as the videos recorded by LeRobot (see `encode_video_frames`), without B-frames: the
+    # decoding timestamps of the pieces then start at 0 and don't overlap those of the previous piece.
+    encoder_options = {"g": "2", "crf": "30", "bf": "0"}
+    if vcodec == "libsvtav1":
+        encoder_options["preset"] = "12"
+
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with tempfile.TemporaryDirectory(dir=output_path.parent) as tmp_dir:
+        piece_paths = [Path(tmp_dir) / f"piece_{i:06d}.mp4" for i in range(len(pieces))]
+
+        with av.open(str(input_path)) as in_container:
+            v_in = in_container.streams.video[0]
+
+            # Copy the packets of all the "copy" pieces in a single pass over the file.
+            copied = [i for i, (kind, _, _) in enumerate(pieces) if kind == "copy"]
+            if copied:
+                starts = [pieces[i][1] for i in copied]
+                outputs: dict[int, tuple] = {}
+                for packet in in_container.demux(v_in):
+                    if packet.pts is None or packet.dts is None:
+                        continue
+                    idx = frame_index(float(packet.pts * time_base))
+                    j = bisect.bisect_right(starts, idx) - 1
+                    if j < 0 or idx >= pieces[copied[j]][2]:
+                        continue
+                    piece_ix = copied[j]
+                    if piece_ix not in outputs:
+                        out = av.open(str(piece_paths[piece_ix]), mode="w")
+                        v_out = out.add_stream_from_template(template=v_in, opaque=True)
+                        v_out.time_base = time_base
+                        # Timestamps restart at 0 in each piece, the concatenation offsets them.
+                        outputs[piece_ix] = (out, v_out, packet.pts)
+                    out, v_out, offset = outputs[piece_ix]
+                    packet.pts -= offset
+                    packet.dts -= offset
+                    packet.stream = v_out
+                    out.mux(packet)
+                for out, _, _ in outputs.values():
+                    out.close()
+
+            for piece_ix, (kind, start, end) in enumerate(pieces):
+                if kind != "encode":
+                    continue
+                with av.open(str(piece_paths[piece_ix]), mode="w") as out:
+                    v_out = out.add_stream(
+                        vcodec, rate=Fraction(fps).limit_denominator(1000), options=encoder_options
+                    )
+                    v_out.width, v_out.height, v_out.pix_fmt = width, height, pix_fmt
+                    v_out.time_base = Fraction(1, int(fps))
+                    in_container.seek(int(start / fps / time_base), stream=v_in, backward=True)
+                    count = 0
+                    for frame in in_container.decode(v_in):
+                        idx = frame_index(float(frame.pts * frame.time_base))
+                        if idx >= end:
+                            break
+                        if idx < start:
+                            continue
+                        new_frame = frame.reformat(width=width, height=height, format=pix_fmt)
+                        new_frame.pts = count
+                        new_frame.time_base = v_out.time_base
+                        out.mux(v_out.encode(new_frame))
+                        count += 1
+                    out.mux(v_out.encode())
+
+        if len(piece_paths) == 1:
+            shutil.move(piece_paths[0], output_path)
+        else:
+            concatenate_video_files(piece_paths, output_path)
+
+
 def _copy_and_reindex_videos(
     src_dataset: LeRobotDataset,
     dst_meta: LeRobotDatasetMetadata,
     episode_mapping: dict[int, int],
     vcodec: str = "libsvtav1",
     pix_fmt: str = "yuv420p",
+    num_workers: int = 4,
 ) -> dict[int, dict]:
     """Copy and filter video files, only re-encoding files with deleted episodes.
 
     For video files that only contain kept episodes, we copy them directly.
-    For files with mixed kept/deleted episodes, we use PyAV filters to efficiently
-    re-encode only the desired segments.
+    For files with mixed kept/deleted episodes, we stream-copy the kept episodes and only re-encode the
+    partial GOPs at their edges (see `_keep_episodes_from_video_with_remux`).
 
     Args:
         src_dataset: Source dataset to copy from
         dst_meta: Destination metadata object
         episode_mapping: Mapping from old episode indices to new indices
+        num_workers: Number of processes filtering the video files in parallel (0 to filter them in the
+            current process)
 
     Returns:
         dict mapping episode index to its video metadata (chunk_index, file_index, timestamps)
@@ -696,6 +892,8 @@ def _copy_and_reindex_videos(
         src_dataset.meta.episodes = load_episodes(src_dataset.meta.root)
 
     episodes_video_metadata: dict[int, dict] = {new_idx: {} for new_idx in episode_mapping.values()}
+    # Video files to filter, as (src_video_path, dst_video_path, episodes_to_keep_ranges).
+    cut_jobs: list[tuple[Path, Path, list[tuple[float, float]]]] = []
 
     for video_key in src_dataset.meta.video_keys:
         logging.info(f"Processing videos for {video_key}")
@@ -769,18 +967,7 @@ def _copy_and_reindex_videos(
                 )
                 dst_video_path.parent.mkdir(parents=True, exist_ok=True)
 
-                logging.info(
-                    f"Re-encoding {video_key} (chunk {src_chunk_idx}, file {src_file_idx}) "
-                    f"with {len(episodes_to_keep_ranges)} episodes"
-                )
-                _keep_episodes_from_video_with_av(
-                    src_video_path,
-                    dst_video_path,
-                    episodes_to_keep_ranges,
-                    src_dataset.meta.fps,
-                    vcodec,
-                    pix_fmt,
-                )
+                cut_jobs.append((src_video_path, dst_video_path, episodes_to_keep_ranges))
 
                 cumulative_ts = 0.0
                 for old_idx in sorted_keep_episodes:
@@ -798,6 +985,21 @@ def _copy_and_reindex_videos(
 
                     cumulative_ts += ep_duration
 
+    cut = partial(
+        _keep_episodes_from_video_with_remux, fps=src_dataset.meta.fps, vcodec=vcodec, pix_fmt=pix_fmt
+    )
+    if num_workers > 0 and len(cut_jobs) > 1:
+        # Forking after torch and pyarrow started their threads can deadlock the workers.
+        with ProcessPoolExecutor(
+            max_workers=min(num_workers, len(cut_jobs)), mp_context=multiprocessing.get_context("spawn")
+        ) as executor:
+            futures = [executor.submit(cut, *job) for job in cut_jobs]
+            for future in tqdm(as_completed(futures), total=len(futures), desc="Filtering video files"):
+                future.result()
+    else:
+        for job in tqdm(cut_jobs, desc="Filtering video files"):
+            cut(*job)
+
     return episodes_video_metadata
 
 
@@ -1136,61 +1338,29 @@ def _save_episode_images_for_video(
             future.result()  # This will raise any exceptions that occurred
 
 
-def _save_batch_episodes_images(
+def _iter_batch_episodes_images(
     dataset: LeRobotDataset,
-    imgs_dir: Path,
     img_key: str,
     episode_indices: list[int],
-    num_workers: int = 4,
-) -> list[float]:
-    """Save images from multiple episodes to disk for batch video encoding.
+):
+    """Generator that yields the images of multiple episodes, in order, for batch video encoding.
+
+    Images are decoded one at a time and handed to the encoder directly, without saving them to disk.
 
     Args:
         dataset: The LeRobot dataset to extract images from
-        imgs_dir: Directory to save images to
         img_key: The image key (camera) to extract
-        episode_indices: List of episode indices to save
-        num_workers: Number of threads for parallel image saving
+        episode_indices: List of episode indices to extract
 
-    Returns:
-        List of episode durations in seconds
+    Yields:
+        PIL images of the episodes
     """
-    imgs_dir.mkdir(parents=True, exist_ok=True)
-    hf_dataset = dataset.hf_dataset.with_format(None)
-    imgs_dataset = hf_dataset.select_columns(img_key)
-
-    # Define function to save a single image with global frame index
-    # Defined once outside the loop to avoid repeated closure creation
-    def save_single_image(i_item_tuple, base_frame_idx, img_key_param):
-        i, item = i_item_tuple
-        img = item[img_key_param]
-        # Use global frame index for naming
-        img.save(str(imgs_dir / f"frame-{base_frame_idx + i:06d}.png"), quality=100)
-        return i
-
-    episode_durations = []
-    frame_idx = 0
-
+    imgs_dataset = dataset.hf_dataset.with_format(None).select_columns(img_key)
     for ep_idx in episode_indices:
-        # Get episode range
         from_idx = dataset.meta.episodes["dataset_from_index"][ep_idx]
         to_idx = dataset.meta.episodes["dataset_to_index"][ep_idx]
-        episode_length = to_idx - from_idx
-        episode_durations.append(episode_length / dataset.fps)
-
-        # Get episode images
-        episode_dataset = imgs_dataset.select(range(from_idx, to_idx))
-
-        # Save images
-        items = list(enumerate(episode_dataset))
-        with ThreadPoolExecutor(max_workers=num_workers) as executor:
-            futures = [executor.submit(save_single_image, item, frame_idx, img_key) for item in items]
-            for future in as_completed(futures):
-                future.result()
-
-        frame_idx += episode_length
-
-    return episode_durations
+        for item in imgs_dataset.select(range(from_idx, to_idx)):
+            yield item[img_key]
 
 
 def _iter_episode_batches(
@@ -1303,15 +1473,10 @@ def _estimate_frame_size_via_calibration(
         hf_dataset = dataset.hf_dataset.with_format(None)
         sample_indices = range(from_idx, from_idx + num_frames)
 
-        # Save calibration frames
-        for i, idx in enumerate(sample_indices):
-            img = hf_dataset[idx][img_key]
-            img.save(str(calibration_dir / f"frame-{i:06d}.png"), quality=100)
-
         # Encode calibration video
         calibration_video_path = calibration_dir / "calibration.mp4"
-        encode_video_frames(
-            imgs_dir=calibration_dir,
+        encode_video(
+            (hf_dataset[idx][img_key] for idx in sample_indices),
             video_path=calibration_video_path,
             fps=fps,
             vcodec=vcodec,
@@ -1425,7 +1590,7 @@ def convert_image_to_video_dataset(
         crf: Constant rate factor (default: 30)
         fast_decode: Fast decode tuning (default: 0)
         episode_indices: List of episode indices to convert (None = all episodes)
-        num_workers: Number of threads for parallel processing (default: 4)
+        num_workers: Number of threads used by the video encoder (default: 4)
         max_episodes_per_batch: Maximum episodes per video batch to avoid memory issues (None = no limit)
         max_frames_per_batch: Maximum frames per video batch to avoid memory issues (None = no limit)
 
@@ -1481,7 +1646,7 @@ def convert_image_to_video_dataset(
         video_files_size_in_mb=dataset.meta.video_files_size_in_mb,
     )
 
-    # Create temporary directory for image extraction
+    # Create temporary directory for the calibration videos
     temp_dir = output_dir / "temp_images"
     temp_dir.mkdir(parents=True, exist_ok=True)
 
@@ -1550,24 +1715,12 @@ def convert_image_to_video_dataset(
                     f"({batch_episodes[0]}-{batch_episodes[-1]}) = {total_frames_in_batch} frames"
                 )
 
-                # Save images for all episodes in this batch
-                imgs_dir = temp_dir / f"batch_{chunk_idx}_{file_idx}" / img_key
-                episode_durations = _save_batch_episodes_images(
-                    dataset=dataset,
-                    imgs_dir=imgs_dir,
-                    img_key=img_key,
-                    episode_indices=batch_episodes,
-                    num_workers=num_workers,
-                )
-
-                # Encode all batched episodes into single video
+                # Encode all batched episodes into single video, straight from the decoded images
                 video_path = new_meta.root / new_meta.video_path.format(
                     video_key=img_key, chunk_index=chunk_idx, file_index=file_idx
                 )
-                video_path.parent.mkdir(parents=True, exist_ok=True)
-
-                encode_video_frames(
-                    imgs_dir=imgs_dir,
+                encode_video(
+                    _iter_batch_episodes_images(dataset, img_key, batch_episodes),
                     video_path=video_path,
                     fps=fps,
                     vcodec=vcodec,
@@ -1576,10 +1729,9 @@ def convert_image_to_video_dataset(
                     crf=crf,
                     fast_decode=fast_decode,
                     overwrite=True,
+                    num_threads=num_workers,
                 )
-
-                # Clean up temporary images
-                shutil.rmtree(imgs_dir)
+                episode_durations = [episode_lengths[idx] / dataset.fps for idx in batch_episodes]
 
                 # Update metadata for each episode in the batch
                 for ep_idx, duration in zip(batch_episodes, episode_durations, strict=True):
@@ -13,6 +13,7 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+import bisect
 import concurrent.futures
 import contextlib
 import logging
@@ -35,6 +36,7 @@ from huggingface_hub.errors import RevisionNotFoundError
 
 from lerobot.datasets.compute_stats import aggregate_stats, compute_episode_stats
 from lerobot.datasets.image_writer import AsyncImageWriter, write_image
+from lerobot.datasets.sampler import DatasetMixtureSampler
 from lerobot.datasets.utils import (
     DEFAULT_EPISODES_PATH,
     DEFAULT_FEATURES,
@@ -71,6 +73,7 @@ from lerobot.datasets.video_utils import (
     concatenate_video_files,
     decode_video_frames,
     encode_video_frames,
+    get_encoding_threads,
     get_safe_default_codec,
     get_video_duration_in_s,
     get_video_info,
@@ -542,12 +545,17 @@ class LeRobotDatasetMetadata:
 
 
 def _encode_video_worker(
-    video_key: str, episode_index: int, root: Path, fps: int, vcodec: str = "libsvtav1"
+    video_key: str,
+    episode_index: int,
+    root: Path,
+    fps: int,
+    vcodec: str = "libsvtav1",
+    num_threads: int | None = None,
 ) -> Path:
     temp_path = Path(tempfile.mkdtemp(dir=root)) / f"{video_key}_{episode_index:03d}.mp4"
     fpath = DEFAULT_IMAGE_PATH.format(image_key=video_key, episode_index=episode_index, frame_index=0)
     img_dir = (root / fpath).parent
-    encode_video_frames(img_dir, temp_path, fps, vcodec=vcodec, overwrite=True)
+    encode_video_frames(img_dir, temp_path, fps, vcodec=vcodec, overwrite=True, num_threads=num_threads)
     shutil.rmtree(img_dir)
     return temp_path
 
@@ -1226,8 +1234,9 @@ class LeRobotDataset(torch.utils.data.Dataset):
         if has_video_keys and not use_batched_encoding:
             num_cameras = len(self.meta.video_keys)
             if parallel_encoding and num_cameras > 1:
-                # TODO(Steven): Ideally we would like to control the number of threads per encoding such that:
-                # num_cameras * num_threads = (total_cpu -1)
+                # Split the cores between the encoders such that num_cameras * num_threads = (total_cpu - 1),
+                # instead of letting each encoder spawn a thread per core
+                encoding_threads = get_encoding_threads(num_cameras)
                 with concurrent.futures.ProcessPoolExecutor(max_workers=num_cameras) as executor:
                     future_to_key = {
                         executor.submit(
@@ -1237,8 +1246,9 @@ class LeRobotDataset(torch.utils.data.Dataset):
                             self.root,
                             self.fps,
                             self.vcodec,
+                            num_threads,
                         ): video_key
-                        for video_key in self.meta.video_keys
+                        for video_key, num_threads in zip(self.meta.video_keys, encoding_threads, strict=True)
                     }
 
                     results = {}
@@ -1619,6 +1629,10 @@ class MultiLeRobotDataset(torch.utils.data.Dataset):
 
     The underlying `LeRobotDataset`s are effectively concatenated, and this class adopts much of the API
     structure of `LeRobotDataset`.
+
+    `weights` optionally maps repo ids to their sampling weight in the mixture drawn by `make_sampler`, the
+    datasets are otherwise weighted by their number of frames, as when sampling uniformly from the
+    concatenation.
     """
 
     def __init__(
@@ -1631,6 +1645,7 @@ class MultiLeRobotDataset(torch.utils.data.Dataset):
         tolerances_s: dict | None = None,
         download_videos: bool = True,
         video_backend: str | None = None,
+        weights: dict[str, float] | None = None,
     ):
         super().__init__()
         self.repo_ids = repo_ids
@@ -1671,6 +1686,23 @@ class MultiLeRobotDataset(torch.utils.data.Dataset):
                 "other datasets."
             )
             self.disabled_features.update(extra_keys)
+        # Keys to remove from the items of each dataset.
+        self._disabled_keys = [
+            [key for key in self.disabled_features if key in ds.features] for ds in self._datasets
+        ]
+        # Index of the first frame of each dataset, followed by the total number of frames, to route the
+        # indices to their dataset by binary search.
+        self._cumulative_sizes = np.cumsum([0] + [ds.num_frames for ds in self._datasets]).tolist()
+
+        if weights is None:
+            self.dataset_weights = [float(ds.num_frames) for ds in self._datasets]
+        else:
+            unknown = set(weights).difference(repo_ids)
+            if unknown:
+                raise ValueError(f"Weights were provided for unknown repo ids: {sorted(unknown)}")
+            self.dataset_weights = [float(weights.get(repo_id, 0.0)) for repo_id in repo_ids]
+            if any(w < 0 for w in self.dataset_weights) or sum(self.dataset_weights) <= 0:
+                raise ValueError(f"Dataset weights must be non-negative with a positive sum, got {weights}.")
 
         self.image_transforms = image_transforms
         self.delta_timestamps = delta_timestamps
@@ -1738,13 +1770,26 @@ class MultiLeRobotDataset(torch.utils.data.Dataset):
     @property
     def num_frames(self) -> int:
         """Number of samples/frames."""
-        return sum(d.num_frames for d in self._datasets)
+        return self._cumulative_sizes[-1]
+
+    @property
+    def dataset_sizes(self) -> list[int]:
+        """Number of frames of each underlying dataset."""
+        return [ds.num_frames for ds in self._datasets]
 
     @property
     def num_episodes(self) -> int:
         """Number of episodes."""
         return sum(d.num_episodes for d in self._datasets)
 
+    def make_sampler(
+        self, num_samples: int | None = None, generator: torch.Generator | None = None
+    ) -> DatasetMixtureSampler:
+        """Returns a DataLoader sampler drawing the frames of the datasets according to `dataset_weights`."""
+        return DatasetMixtureSampler(
+            self.dataset_sizes, self.dataset_weights, num_samples=num_samples, generator=generator
+        )
+
     @property
     def tolerance_s(self) -> float:
         """Tolerance in seconds used to discard loaded frames when their timestamps
@@ -1757,27 +1802,30 @@ class MultiLeRobotDataset(torch.utils.data.Dataset):
     def __len__(self):
         return self.num_frames
 
+    def _get_from_dataset(self, dataset_idx: int, idx: int) -> dict[str, torch.Tensor]:
+        item = self._datasets[dataset_idx][idx - self._cumulative_sizes[dataset_idx]]
+        item["dataset_index"] = torch.tensor(dataset_idx)
+        for data_key in self._disabled_keys[dataset_idx]:
+            item.pop(data_key, None)
+        return item
+
     def __getitem__(self, idx: int) -> dict[str, torch.Tensor]:
-        if idx >= len(self):
+        if not 0 <= idx < len(self):
             raise IndexError(f"Index {idx} out of bounds.")
         # Determine which dataset to get an item from based on the index.
-        start_idx = 0
-        dataset_idx = 0
-        for dataset in self._datasets:
-            if idx >= start_idx + dataset.num_frames:
-                start_idx += dataset.num_frames
-                dataset_idx += 1
-                continue
-            break
-        else:
-            raise AssertionError("We expect the loop to break out as long as the index is within bounds.")
-        item = self._datasets[dataset_idx][idx - start_idx]
-        item["dataset_index"] = torch.tensor(dataset_idx)
-        for data_key in self.disabled_features:
-            if data_key in item:
-                del item[data_key]
-
-        return item
+        dataset_idx = bisect.bisect_right(self._cumulative_sizes, idx) - 1
+        return self._get_from_dataset(dataset_idx, idx)
+
+    def __getitems__(self, indices: list[int]) -> list[dict[str, torch.Tensor]]:
+        """Returns the items of a batch of indices, routing all the indices to their dataset at once."""
+        indices = np.asarray(indices, dtype=np.int64)
+        if len(indices) > 0 and (indices.min() < 0 or indices.max() >= len(self)):
+            raise IndexError(f"Indices out of bounds for a dataset of {len(self)} frames.")
+        dataset_indices = np.searchsorted(self._cumulative_sizes, indices, side="right") - 1
+        return [
+            self._get_from_dataset(int(dataset_idx), int(idx))
+            for dataset_idx, idx in zip(dataset_indices, indices, strict=True)
+        ]
 
     def __repr__(self):
         return (
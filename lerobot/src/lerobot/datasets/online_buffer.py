@@ -29,6 +29,7 @@ import numpy as np
 import torch
 
 from lerobot.datasets.lerobot_dataset import LeRobotDataset
+from lerobot.utils.utils import BackgroundWorker
 
 
 def _make_memmap_safe(**kwargs) -> np.memmap:
@@ -59,7 +60,8 @@ class OnlineBuffer(torch.utils.data.Dataset):
     The underlying data structure will have data inserted in a circular fashion. Always insert after the
     last index, and when you reach the end, wrap around to the start.
 
-    The data is stored in a numpy memmap.
+    The data is stored in a numpy memmap. Since the `index` of the frames keeps increasing as data is added,
+    the frame with index `i` is always stored at position `i % buffer_capacity`.
     """
 
     NEXT_INDEX_KEY = "_next_index"
@@ -77,6 +79,7 @@ class OnlineBuffer(torch.utils.data.Dataset):
         buffer_capacity: int | None,
         fps: float | None = None,
         delta_timestamps: dict[str, list[float]] | dict[str, np.ndarray] | None = None,
+        async_flush: bool = True,
     ):
         """
         The online buffer can be provided from scratch or you can load an existing online buffer by passing
@@ -96,6 +99,9 @@ class OnlineBuffer(torch.utils.data.Dataset):
                  delta_timestamps logic. You can pass None if you are not using delta_timestamps.
             delta_timestamps: Same as the delta_timestamps concept in LeRobotDataset. This is internally
                 converted to dict[str, np.ndarray] for optimization purposes.
+            async_flush: Whether to write the added data back to the memmap files on a background thread after
+                each `add_data`. Otherwise, the dirty pages are only written back by the OS, which throttles the
+                process adding data once they accumulate (e.g. with large image buffers).
 
         """
         self.set_delta_timestamps(delta_timestamps)
@@ -115,6 +121,9 @@ class OnlineBuffer(torch.utils.data.Dataset):
                 mode="r+" if (Path(write_dir) / k).exists() else "w+",
                 shape=tuple(v["shape"]) if v is not None else None,
             )
+        self._async_flush = async_flush
+        self._flush_worker = BackgroundWorker(thread_name_prefix="online_buffer_flush")
+        self._init_episode_bounds()
 
     @property
     def delta_timestamps(self) -> dict[str, np.ndarray] | None:
@@ -180,7 +189,7 @@ class OnlineBuffer(torch.utils.data.Dataset):
         if not all(len(data[k]) == new_data_length for k in self.data_keys):
             raise ValueError("All data items should have the same length")
 
-        next_index = self._data[OnlineBuffer.NEXT_INDEX_KEY]
+        next_index = int(self._data[OnlineBuffer.NEXT_INDEX_KEY])
 
         # Sanity check to make sure that the new data indices start from 0.
         assert data[OnlineBuffer.EPISODE_INDEX_KEY][0].item() == 0
@@ -197,17 +206,70 @@ class OnlineBuffer(torch.utils.data.Dataset):
         n_surplus = max(0, new_data_length - (self._buffer_capacity - next_index))
         for k in self.data_keys:
             if n_surplus == 0:
-                slc = slice(next_index, next_index + new_data_length)
-                self._data[k][slc] = data[k]
-                self._data[OnlineBuffer.OCCUPANCY_MASK_KEY][slc] = True
+                self._data[k][next_index : next_index + new_data_length] = data[k]
             else:
                 self._data[k][next_index:] = data[k][:-n_surplus]
-                self._data[OnlineBuffer.OCCUPANCY_MASK_KEY][next_index:] = True
                 self._data[k][:n_surplus] = data[k][-n_surplus:]
         if n_surplus == 0:
-            self._data[OnlineBuffer.NEXT_INDEX_KEY] = next_index + new_data_length
+            self._data[OnlineBuffer.OCCUPANCY_MASK_KEY][next_index : next_index + new_data_length] = True
+            self._data[OnlineBuffer.NEXT_INDEX_KEY][...] = next_index + new_data_length
         else:
-            self._data[OnlineBuffer.NEXT_INDEX_KEY] = n_surplus
+            self._data[OnlineBuffer.OCCUPANCY_MASK_KEY][next_index:] = True
+            self._data[OnlineBuffer.NEXT_INDEX_KEY][...] = n_surplus
+
+        self._update_episode_bounds(data[OnlineBuffer.INDEX_KEY], data[OnlineBuffer.EPISODE_INDEX_KEY])
+        if self._async_flush:
+            # A flush writes back all the dirty pages, so while one is running, the data added in the meantime
+            # is left to the flush scheduled by the next call.
+            self._flush_worker.submit(self._flush)
+
+    def flush(self) -> None:
+        """Writes the data of the buffer back to the memmap files, waiting for any background flush first."""
+        self._flush_worker.wait()
+        self._flush()
+
+    def close(self) -> None:
+        self.flush()
+        self._flush_worker.shutdown()
+
+    def _flush(self) -> None:
+        for memmap in self._data.values():
+            memmap.flush()
+
+    def _init_episode_bounds(self) -> None:
+        """Computes the bounds of the episode of each stored frame, e.g. when loading an existing buffer.
+
+        `_episode_from` and `_episode_to` hold, for each position of the buffer, the index of the first frame and
+        the index after the last frame of its episode. The first frames of the oldest episode may have been
+        overwritten since, see `_oldest_index`.
+        """
+        self._episode_from = np.zeros(self._buffer_capacity, dtype=np.int64)
+        self._episode_to = np.zeros(self._buffer_capacity, dtype=np.int64)
+        occupied = np.flatnonzero(self._data[OnlineBuffer.OCCUPANCY_MASK_KEY])
+        if len(occupied) == 0:
+            return
+        indices = np.asarray(self._data[OnlineBuffer.INDEX_KEY][occupied])
+        episodes, inverse = np.unique(
+            self._data[OnlineBuffer.EPISODE_INDEX_KEY][occupied], return_inverse=True
+        )
+        episode_from = np.full(len(episodes), np.iinfo(np.int64).max)
+        episode_to = np.zeros(len(episodes), dtype=np.int64)
+        np.minimum.at(episode_from, inverse, indices)
+        np.maximum.at(episode_to, inverse, indices + 1)
+        self._episode_from[occupied] = episode_from[inverse]
+        self._episode_to[occupied] = episode_to[inverse]
+
+    def _update_episode_bounds(self, indices: np.ndarray, episode_indices: np.ndarray) -> None:
+        """Sets the episode bounds of newly added frames. The frames of an episode are added together."""
+        _, starts, counts = np.unique(episode_indices, return_index=True, return_counts=True)
+        positions = indices % self._buffer_capacity
+        self._episode_from[positions] = np.repeat(indices[starts], counts)
+        self._episode_to[positions] = np.repeat(indices[starts] + counts, counts)
+
+    def _oldest_index(self) -> int:
+        """Returns the index of the oldest frame still in the buffer."""
+        last_index = self._data[OnlineBuffer.INDEX_KEY][self._data[OnlineBuffer.NEXT_INDEX_KEY] - 1]
+        return max(0, int(last_index) + 1 - self.num_frames)
 
     @property
     def data_keys(self) -> list[str]:
@@ -233,68 +295,75 @@ class OnlineBuffer(torch.utils.data.Dataset):
     def __len__(self):
         return self.num_frames
 
-    def _item_to_tensors(self, item: dict) -> dict:
-        item_ = {}
-        for k, v in item.items():
-            if isinstance(v, torch.Tensor):
-                item_[k] = v
-            elif isinstance(v, np.ndarray):
-                item_[k] = torch.from_numpy(v)
-            else:
-                item_[k] = torch.tensor(v)
-        return item_
-
     def __getitem__(self, idx: int) -> dict[str, torch.Tensor]:
-        if idx >= len(self) or idx < -len(self):
-            raise IndexError
+        return self.__getitems__([idx])[0]
 
-        item = {k: v[idx] for k, v in self._data.items() if not k.startswith("_")}
+    def __getitems__(self, indices: list[int]) -> list[dict[str, torch.Tensor]]:
+        """Returns the items at `indices`, reading the frames of the whole batch with one fancy index per key.
 
-        if self.delta_timestamps is None:
-            return self._item_to_tensors(item)
+        This is used by the DataLoader to fetch a batch at once instead of calling `__getitem__` for each item.
+        """
+        idx = np.asarray(indices, dtype=np.int64)
+        if ((idx >= len(self)) | (idx < -len(self))).any():
+            raise IndexError
+        idx %= len(self)
 
-        episode_index = item[OnlineBuffer.EPISODE_INDEX_KEY]
-        current_ts = item[OnlineBuffer.TIMESTAMP_KEY]
-        episode_data_indices = np.where(
-            np.bitwise_and(
-                self._data[OnlineBuffer.EPISODE_INDEX_KEY] == episode_index,
-                self._data[OnlineBuffer.OCCUPANCY_MASK_KEY],
-            )
-        )[0]
-        episode_timestamps = self._data[OnlineBuffer.TIMESTAMP_KEY][episode_data_indices]
+        batch = {k: np.asarray(v[idx]) for k, v in self._data.items() if not k.startswith("_")}
 
-        for data_key in self.delta_timestamps:
-            # Note: The logic in this loop is copied from `load_previous_and_future_frames`.
-            # Get timestamps used as query to retrieve data of previous/future frames.
-            query_ts = current_ts + self.delta_timestamps[data_key]
+        if self.delta_timestamps is not None:
+            for data_key, (positions, is_pad) in self._get_delta_positions(idx, batch).items():
+                batch[data_key] = np.asarray(self._data[data_key][positions])
+                batch[f"{data_key}{OnlineBuffer.IS_PAD_POSTFIX}"] = is_pad
 
-            # Compute distances between each query timestamp and all timestamps of all the frames belonging to
-            # the episode.
-            dist = np.abs(query_ts[:, None] - episode_timestamps[None, :])
-            argmin_ = np.argmin(dist, axis=1)
-            min_ = dist[np.arange(dist.shape[0]), argmin_]
+        tensors = {k: torch.from_numpy(v) for k, v in batch.items()}
+        return [{k: v[i] for k, v in tensors.items()} for i in range(len(idx))]
 
-            is_pad = min_ > self.tolerance_s
+    def _get_delta_positions(
+        self, idx: np.ndarray, batch: dict[str, np.ndarray]
+    ) -> dict[str, tuple[np.ndarray, np.ndarray]]:
+        """Returns the positions of the frames to load for each delta timestamps key, and their padding masks.
+
+        The frames are selected by their offset from the current frame, like `get_delta_indices` does for
+        LeRobotDataset, and clamped to the frames of the episode in the buffer. Frames further than the tolerance
+        from the requested timestamps are padding, which is only expected outside the episode range.
+        """
+        timestamps = self._data[OnlineBuffer.TIMESTAMP_KEY]
+        episode_from = np.maximum(self._episode_from[idx], self._oldest_index())[:, None]
+        episode_to = self._episode_to[idx][:, None]
+        first_ts = timestamps[episode_from % self._buffer_capacity]
+        last_ts = timestamps[(episode_to - 1) % self._buffer_capacity]
+        current_index = batch[OnlineBuffer.INDEX_KEY][:, None]
+        current_ts = batch[OnlineBuffer.TIMESTAMP_KEY][:, None]
+
+        delta_positions = {}
+        for data_key, delta_ts in self.delta_timestamps.items():
+            offsets = np.round(delta_ts * self.fps).astype(np.int64)
+            query_index = np.clip(current_index + offsets, episode_from, episode_to - 1)
+            positions = query_index % self._buffer_capacity
+
+            query_ts = current_ts + delta_ts
+            dist = np.abs(query_ts - timestamps[positions])
+            is_pad = dist > self.tolerance_s
 
             # Check violated query timestamps are all outside the episode range.
-            assert (
-                (query_ts[is_pad] < episode_timestamps[0]) | (episode_timestamps[-1] < query_ts[is_pad])
-            ).all(), (
-                f"One or several timestamps unexpectedly violate the tolerance ({min_} > {self.tolerance_s=}"
+            assert ((query_ts < first_ts) | (last_ts < query_ts))[is_pad].all(), (
+                f"One or several timestamps unexpectedly violate the tolerance ({dist} > {self.tolerance_s=}"
                 ") inside the episode range."
             )
-
-            # Load frames for this data key.
-            item[data_key] = self._data[data_key][episode_data_indices[argmin_]]
-
-            item[f"{data_key}{OnlineBuffer.IS_PAD_POSTFIX}"] = is_pad
-
-        return self._item_to_tensors(item)
+            delta_positions[data_key] = (positions, is_pad)
+        return delta_positions
 
     def get_data_by_key(self, key: str) -> torch.Tensor:
         """Returns all data for a given data key as a Tensor."""
         return torch.from_numpy(self._data[key][self._data[OnlineBuffer.OCCUPANCY_MASK_KEY]])
 
+    def get_sampling_mask(self, drop_n_last_frames: int = 0) -> np.ndarray:
+        """Returns which frames can be sampled, in the order of `__getitem__`, when dropping the last
+        `drop_n_last_frames` frames of each episode."""
+        occupied = self._data[OnlineBuffer.OCCUPANCY_MASK_KEY]
+        indices = self._data[OnlineBuffer.INDEX_KEY][occupied]
+        return indices < self._episode_to[occupied] - drop_n_last_frames
+
 
 def compute_sampler_weights(
     offline_dataset: LeRobotDataset,
@@ -335,15 +404,15 @@ def compute_sampler_weights(
     weights = []
 
     if len(offline_dataset) > 0:
-        offline_data_mask_indices = []
-        for start_index, end_index in zip(
-            offline_dataset.meta.episodes["dataset_from_index"],
-            offline_dataset.meta.episodes["dataset_to_index"],
-            strict=True,
-        ):
-            offline_data_mask_indices.extend(range(start_index, end_index - offline_drop_n_last_frames))
-        offline_data_mask = torch.zeros(len(offline_dataset), dtype=torch.bool)
-        offline_data_mask[torch.tensor(offline_data_mask_indices)] = True
+        # Mark the frames of each episode, without its last frames, with +1/-1 at its bounds
+        starts = np.asarray(offline_dataset.meta.episodes["dataset_from_index"])
+        ends = np.maximum(
+            np.asarray(offline_dataset.meta.episodes["dataset_to_index"]) - offline_drop_n_last_frames, starts
+        )
+        bounds = np.zeros(len(offline_dataset) + 1, dtype=np.int64)
+        np.add.at(bounds, starts, 1)
+        np.add.at(bounds, ends, -1)
+        offline_data_mask = torch.from_numpy(np.cumsum(bounds[:-1]) > 0)
         weights.append(
             torch.full(
                 size=(len(offline_dataset),),
@@ -353,17 +422,7 @@ def compute_sampler_weights(
         )
 
     if online_dataset is not None and len(online_dataset) > 0:
-        online_data_mask_indices = []
-        episode_indices = online_dataset.get_data_by_key("episode_index")
-        for episode_idx in torch.unique(episode_indices):
-            where_episode = torch.where(episode_indices == episode_idx)
-            start_index = where_episode[0][0]
-            end_index = where_episode[0][-1] + 1
-            online_data_mask_indices.extend(
-                range(start_index.item(), end_index.item() - online_drop_n_last_frames)
-            )
-        online_data_mask = torch.zeros(len(online_dataset), dtype=torch.bool)
-        online_data_mask[torch.tensor(online_data_mask_indices)] = True
+        online_data_mask = torch.from_numpy(online_dataset.get_sampling_mask(online_drop_n_last_frames))
         weights.append(
             torch.full(
                 size=(len(online_dataset),),
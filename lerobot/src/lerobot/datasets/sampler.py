@@ -15,8 +15,45 @@
 # limitations under the License.
 from collections.abc import Iterator
 
+import numpy as np
 import torch
 
+_MASK_64 = (1 << 64) - 1
+
+
+def _mix(x: np.ndarray, key: int) -> np.ndarray:
+    """Hashes uint64 values with a round key (splitmix64 finalizer)."""
+    with np.errstate(over="ignore"):
+        x = x ^ np.uint64(key)
+        x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+        return x ^ (x >> np.uint64(31))
+
+
+def _permute(positions: np.ndarray, n: int, seed: int, num_rounds: int = 4) -> np.ndarray:
+    """Maps `positions` in [0, n) through a pseudo-random permutation of [0, n) determined by `seed`.
+
+    The permutation is a Feistel network over the smallest power of 4 covering `n`, restricted to [0, n) by
+    cycle walking, so it is computed element-wise without materializing the n indices.
+    """
+    half_bits = max(1, (max(n - 1, 1).bit_length() + 1) // 2)
+    half_mask = np.uint64((1 << half_bits) - 1)
+    keys = [(seed * 0x9E3779B97F4A7C15 + i * 0xD1B54A32D192ED03) & _MASK_64 for i in range(num_rounds)]
+
+    def feistel(x: np.ndarray) -> np.ndarray:
+        left, right = x >> np.uint64(half_bits), x & half_mask
+        for key in keys:
+            left, right = right, left ^ (_mix(right, key) & half_mask)
+        return (left << np.uint64(half_bits)) | right
+
+    x = feistel(positions.astype(np.uint64))
+    # The Feistel network permutes [0, 4^half_bits), walk the cycles until landing back in [0, n).
+    outside = x >= n
+    while outside.any():
+        x[outside] = feistel(x[outside])
+        outside = x >= n
+    return x.astype(np.int64)
+
 
 class EpisodeAwareSampler:
     def __init__(
@@ -27,9 +64,16 @@ class EpisodeAwareSampler:
         drop_n_first_frames: int = 0,
         drop_n_last_frames: int = 0,
         shuffle: bool = False,
+        seed: int | None = None,
+        num_replicas: int = 1,
+        rank: int = 0,
+        chunk_size: int = 65536,
     ):
         """Sampler that optionally incorporates episode boundary information.
 
+        The frames to use are stored as arrays of episode ranges, and the sampled positions are mapped to
+        frames lazily, chunk by chunk, so that no index is materialized for every frame of the dataset.
+
         Args:
             dataset_from_indices: List of indices containing the start of each episode in the dataset.
             dataset_to_indices: List of indices containing the end of each episode in the dataset.
@@ -37,25 +81,133 @@ class EpisodeAwareSampler:
                                     Assumes that episodes are indexed from 0 to N-1.
             drop_n_first_frames: Number of frames to drop from the start of each episode.
             drop_n_last_frames: Number of frames to drop from the end of each episode.
-            shuffle: Whether to shuffle the indices.
+            shuffle: Whether to shuffle the indices. The order is a pseudo-random permutation determined by
+                the seed and the epoch (see `set_epoch`).
+            seed: Seed of the shuffling. If None, it is drawn from torch's global random number generator.
+            num_replicas: Number of processes the samples are split between. Each process gets every
+                `num_replicas`-th sample of the epoch, the first samples are repeated if needed so that all
+                processes get the same number of samples.
+            rank: Rank of the current process among `num_replicas`.
+            chunk_size: Number of indices computed at once while iterating.
         """
-        indices = []
-        for episode_idx, (start_index, end_index) in enumerate(
-            zip(dataset_from_indices, dataset_to_indices, strict=True)
-        ):
-            if episode_indices_to_use is None or episode_idx in episode_indices_to_use:
-                indices.extend(range(start_index + drop_n_first_frames, end_index - drop_n_last_frames))
-
-        self.indices = indices
+        if not 0 <= rank < num_replicas:
+            raise ValueError(f"Invalid rank {rank} for {num_replicas} replicas.")
+        starts = np.asarray(dataset_from_indices, dtype=np.int64) + drop_n_first_frames
+        ends = np.asarray(dataset_to_indices, dtype=np.int64) - drop_n_last_frames
+        if episode_indices_to_use is not None:
+            keep = np.isin(np.arange(len(starts)), np.asarray(list(episode_indices_to_use), dtype=np.int64))
+            starts, ends = starts[keep], ends[keep]
+        lengths = np.maximum(ends - starts, 0)
+        nonempty = lengths > 0
+        self._episode_starts = starts[nonempty]
+        # Number of frames used before each episode, followed by the total.
+        self._cumulative_lengths = np.concatenate([[0], np.cumsum(lengths[nonempty])])
+        self.num_frames = int(self._cumulative_lengths[-1])
+
         self.shuffle = shuffle
+        self.seed = int(torch.randint(2**62, ()).item()) if seed is None else seed
+        self.num_replicas = num_replicas
+        self.rank = rank
+        self.num_samples = -(-self.num_frames // num_replicas)
+        self.chunk_size = chunk_size
+        self.epoch = 0
+        self.start_index = 0
+
+    def set_epoch(self, epoch: int) -> None:
+        """Sets the epoch of the next iteration, which determines the shuffling order.
+
+        The epoch is otherwise incremented after each complete iteration.
+        """
+        if epoch != self.epoch:
+            self.start_index = 0
+        self.epoch = epoch
+
+    def resume(self, epoch: int, start_index: int) -> None:
+        """Makes the next iteration resume the given epoch from its `start_index`-th sample (of this rank)."""
+        self.epoch = epoch
+        self.start_index = start_index
+
+    def _frames(self, positions: np.ndarray) -> np.ndarray:
+        """Maps positions among the frames to use to their index in the dataset."""
+        episodes = np.searchsorted(self._cumulative_lengths, positions, side="right") - 1
+        return self._episode_starts[episodes] + positions - self._cumulative_lengths[episodes]
+
+    @property
+    def indices(self) -> list[int]:
+        """All the frames to use, in order. Note: this materializes one index per frame."""
+        return self._frames(np.arange(self.num_frames)).tolist()
+
+    def __iter__(self) -> Iterator[int]:
+        epoch, start_index = self.epoch, self.start_index
+        self.start_index = 0
+        if self.num_frames > 0:
+            for chunk_start in range(start_index, self.num_samples, self.chunk_size):
+                chunk_end = min(chunk_start + self.chunk_size, self.num_samples)
+                positions = np.arange(chunk_start, chunk_end, dtype=np.int64) * self.num_replicas + self.rank
+                # Pad with the first samples of the epoch so that all ranks get the same number of samples.
+                positions %= self.num_frames
+                if self.shuffle:
+                    positions = _permute(positions, self.num_frames, self.seed + epoch)
+                yield from self._frames(positions).tolist()
+        self.epoch = epoch + 1
+
+    def __len__(self) -> int:
+        return self.num_samples
+
+
+class DatasetMixtureSampler:
+    def __init__(
+        self,
+        dataset_sizes: list[int],
+        weights: list[float] | None = None,
+        num_samples: int | None = None,
+        generator: torch.Generator | None = None,
+        chunk_size: int = 4096,
+    ):
+        """Sampler drawing frames from concatenated datasets according to per-dataset mixture weights.
+
+        Each sample first draws a dataset with probability proportional to its weight, then a frame uniformly
+        within that dataset. The indices are drawn by chunks, so no index list over all the frames is ever
+        materialized, which keeps mixtures of many large datasets (e.g. a `MultiLeRobotDataset`) cheap.
+
+        Args:
+            dataset_sizes: Number of frames of each dataset, in the order they are concatenated.
+            weights: Sampling weight of each dataset. If None, the datasets are weighted by their size, i.e.
+                the frames are sampled uniformly.
+            num_samples: Number of indices yielded per iteration. Defaults to the total number of frames.
+            generator: Optional random number generator.
+            chunk_size: Number of indices drawn at once.
+        """
+        if weights is None:
+            weights = dataset_sizes
+        if len(weights) != len(dataset_sizes):
+            raise ValueError(f"Got {len(weights)} weights for {len(dataset_sizes)} datasets.")
+        weights = torch.as_tensor(weights, dtype=torch.float64)
+        sizes = torch.as_tensor(dataset_sizes, dtype=torch.int64)
+        # Datasets without frames can't be sampled.
+        weights = torch.where(sizes > 0, weights, 0)
+        if (weights < 0).any() or weights.sum() <= 0:
+            raise ValueError(
+                "The weights must be non-negative and at least one non-empty dataset must be weighted."
+            )
+
+        self.weights = weights / weights.sum()
+        self.sizes = sizes
+        self.offsets = torch.cumsum(sizes, 0) - sizes
+        self.num_samples = int(sizes.sum()) if num_samples is None else num_samples
+        self.generator = generator
+        self.chunk_size = chunk_size
 
     def __iter__(self) -> Iterator[int]:
-        if self.shuffle:
-            for i in torch.randperm(len(self.indices)):
-                yield self.indices[i]
-        else:
-            for i in self.indices:
-                yield i
+        remaining = self.num_samples
+        while remaining > 0:
+            n = min(self.chunk_size, remaining)
+            dataset_indices = torch.multinomial(self.weights, n, replacement=True, generator=self.generator)
+            frames = (
+                torch.rand(n, generator=self.generator, dtype=torch.float64) * self.sizes[dataset_indices]
+            )
+            yield from (self.offsets[dataset_indices] + frames.long()).tolist()
+            remaining -= n
 
     def __len__(self) -> int:
-        return len(self.indices)
+        return self.num_samples
@@ -0,0 +1,232 @@
+#!/usr/bin/env python
+
+# Copyright 2025 The HuggingFace Inc. team. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import contextlib
+import logging
+import os
+import shutil
+import time
+import uuid
+from collections.abc import Iterable
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from threading import RLock
+
+import fsspec
+
+COPY_BUFFER_SIZE = 8 * 1024 * 1024
+TMP_SUFFIX = ".tmp"
+# Eviction frees space down to this fraction of the maximum size, so that the cache directory is only scanned
+# every few downloads once full.
+EVICTION_TARGET = 0.9
+
+
+class StreamingFileCache:
+    """Size-capped local disk cache for the files of a streamed dataset, filled ahead of time on a thread pool.
+
+    Files are downloaded from `remote_root` to `cache_dir / subdir` with the same relative paths, e.g.
+    `videos/observation.images.top/chunk-000/file-000.mp4`. Downloads are written to a temporary file that is
+    atomically renamed once complete, so that several processes (e.g. the ranks of a node, or the workers of a
+    DataLoader) can share the same `cache_dir`: a file is either complete or absent.
+
+    When the files under `cache_dir` exceed `max_size_in_mb`, the least recently used ones are removed. Files
+    are "used" when downloaded or read through `get`, which updates their modification time; the state of the
+    cache is kept on disk, so that it is shared between processes and reused across epochs and runs. Each
+    process keeps a running total of the size of the cache, and only scans `cache_dir` when it exceeds
+    `max_size_in_mb`, then evicts files until the cache is back to `EVICTION_TARGET` of its maximum size.
+
+    Files in use outside of `get`, e.g. the data files read by a dataset, can be protected from eviction with
+    `pin`. Pins are kept by each process: processes sharing `cache_dir` should pin the files they read.
+
+    Args:
+        remote_root: Root of the dataset files, as understood by fsspec (e.g. "hf://datasets/lerobot/pusht").
+        cache_dir: Root directory of the cache, which may be shared by several datasets.
+        subdir: Directory of this dataset within `cache_dir`.
+        max_size_in_mb: Maximum total size of the files in `cache_dir`.
+        num_workers: Number of threads downloading files.
+    """
+
+    def __init__(
+        self,
+        remote_root: str,
+        cache_dir: str | Path,
+        subdir: str | Path,
+        max_size_in_mb: float,
+        num_workers: int = 4,
+    ):
+        self.remote_root = remote_root.rstrip("/")
+        self.cache_dir = Path(cache_dir)
+        self.root = self.cache_dir / subdir
+        self.max_size_in_mb = max_size_in_mb
+        self.num_workers = num_workers
+
+        self._executor = None
+        self._futures: dict[str, Future] = {}
+        self._lock = RLock()
+        self._pinned: set[Path] = set()
+        # Size of the files under `cache_dir`, scanned on first use and updated with the downloads
+        self._size_bytes: int | None = None
+
+        self.downloaded_bytes = 0
+        self.download_s = 0.0
+        self.stall_s = 0.0
+        self.hits = 0
+        self.misses = 0
+
+    def __getstate__(self):
+        # Threads can't be pickled, e.g. when sending the dataset to DataLoader workers
+        state = self.__dict__.copy()
+        state.update(_executor=None, _futures={}, _lock=None, _size_bytes=None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = RLock()
+
+    def local_path(self, relpath: str | Path) -> Path:
+        return self.root / relpath
+
+    def is_cached(self, relpath: str | Path) -> bool:
+        return self.local_path(relpath).is_file()
+
+    def pin(self, relpaths: Iterable[str | Path]) -> None:
+        """Prevents files from being evicted by this process, until they are unpinned."""
+        with self._lock:
+            self._pinned.update(self.local_path(relpath) for relpath in relpaths)
+
+    def unpin(self, relpaths: Iterable[str | Path]) -> None:
+        with self._lock:
+            self._pinned.difference_update(self.local_path(relpath) for relpath in relpaths)
+
+    def prefetch(self, relpaths: Iterable[str | Path]) -> None:
+        """Starts downloading the files that are neither cached nor being downloaded."""
+        for relpath in relpaths:
+            if not self.is_cached(relpath):
+                self._submit(str(relpath))
+
+    def get(self, relpath: str | Path) -> Path:
+        """Returns the local path of a file, waiting for it to be downloaded if needed."""
+        relpath = str(relpath)
+        local_path = self.local_path(relpath)
+        if local_path.is_file():
+            self.hits += 1
+            self._touch(local_path)
+            return local_path
+
+        self.misses += 1
+        start = time.perf_counter()
+        local_path = self._submit(relpath).result()
+        self.stall_s += time.perf_counter() - start
+        return local_path
+
+    def stats(self) -> dict[str, float]:
+        """Returns the download and stall metrics since the cache was created."""
+        downloaded_mb = self.downloaded_bytes / 1024**2
+        return {
+            "downloaded_mb": downloaded_mb,
+            "download_s": self.download_s,
+            "bandwidth_mb_s": downloaded_mb / self.download_s if self.download_s > 0 else 0.0,
+            "stall_s": self.stall_s,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def _submit(self, relpath: str) -> Future:
+        with self._lock:
+            future = self._futures.get(relpath)
+            if future is None:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.num_workers, thread_name_prefix="streaming_cache"
+                    )
+                future = self._executor.submit(self._download, relpath)
+                self._futures[relpath] = future
+                future.add_done_callback(lambda _: self._forget(relpath))
+            return future
+
+    def _forget(self, relpath: str) -> None:
+        with self._lock:
+            self._futures.pop(relpath, None)
+
+    def _download(self, relpath: str) -> Path:
+        local_path = self.local_path(relpath)
+        if local_path.is_file():
+            self._touch(local_path)
+            return local_path
+
+        local_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = local_path.with_name(f".{local_path.name}.{uuid.uuid4().hex}{TMP_SUFFIX}")
+        start = time.perf_counter()
+        try:
+            with fsspec.open(f"{self.remote_root}/{relpath}", "rb") as src, open(tmp_path, "wb") as dst:
+                shutil.copyfileobj(src, dst, COPY_BUFFER_SIZE)
+            num_bytes = tmp_path.stat().st_size
+            os.replace(tmp_path, local_path)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+
+        with self._lock:
+            self.downloaded_bytes += num_bytes
+            self.download_s += time.perf_counter() - start
+            if self._size_bytes is None:
+                self._size_bytes = sum(size for _, size, _ in self._scan())
+            else:
+                self._size_bytes += num_bytes
+            if self._size_bytes > self.max_size_in_mb * 1024**2:
+                self._evict(keep=local_path)
+        return local_path
+
+    @staticmethod
+    def _touch(path: Path) -> None:
+        # The file may have been evicted by another process in the meantime
+        with contextlib.suppress(FileNotFoundError):
+            os.utime(path)
+
+    def _scan(self) -> list[tuple[float, int, Path]]:
+        """Returns the modification time, size and path of the files under `cache_dir`."""
+        files = []
+        for path in self.cache_dir.rglob("*"):
+            if path.suffix == TMP_SUFFIX:
+                continue
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            if path.is_file():
+                files.append((stat.st_mtime, stat.st_size, path))
+        return files
+
+    def _evict(self, keep: Path) -> None:
+        """Removes the least recently used files, except the pinned ones and `keep`, until the cache is back to
+        `EVICTION_TARGET` of `max_size_in_mb`."""
+        # Other processes may have added or removed files since the last scan
+        files = self._scan()
+        total_bytes = sum(size for _, size, _ in files)
+        target_bytes = EVICTION_TARGET * self.max_size_in_mb * 1024**2
+        for _, size, path in sorted(files):
+            if total_bytes <= target_bytes:
+                break
+            if path == keep or path in self._pinned:
+                continue
+            # Files opened by a reader remain readable after being unlinked
+            path.unlink(missing_ok=True)
+            total_bytes -= size
+            logging.debug(f"Evicted {path} from the streaming cache")
+        self._size_bytes = total_bytes
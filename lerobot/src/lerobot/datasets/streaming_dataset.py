@@ -22,18 +22,16 @@ import torch
 from datasets import load_dataset
 
 from lerobot.datasets.lerobot_dataset import CODEBASE_VERSION, LeRobotDatasetMetadata
+from lerobot.datasets.streaming_cache import StreamingFileCache
 from lerobot.datasets.utils import (
     Backtrackable,
-    LookAheadError,
-    LookBackError,
     check_version_compatibility,
-    find_float_index,
     get_delta_indices,
-    is_float_in_list,
     item_to_torch,
     safe_shard,
 )
 from lerobot.datasets.video_utils import (
+    SequentialVideoReader,
     VideoDecoderCache,
     decode_video_frames_torchcodec,
 )
@@ -94,6 +92,11 @@ class StreamingLeRobotDataset(torch.utils.data.IterableDataset):
         seed: int = 42,
         rng: np.random.Generator | None = None,
         shuffle: bool = True,
+        sequential_video_decoding: bool = False,
+        cache_dir: str | Path | None = None,
+        cache_size_in_mb: float = 20_000,
+        prefetch_episodes: int = 2,
+        prefetch_workers: int = 4,
     ):
         """Initialize a StreamingLeRobotDataset.
 
@@ -112,6 +115,19 @@ class StreamingLeRobotDataset(torch.utils.data.IterableDataset):
             seed (int, optional): Reproducibility random seed.
             rng (np.random.Generator | None, optional): Random number generator.
             shuffle (bool, optional): Whether to shuffle the dataset across exhaustions. Defaults to True.
+            sequential_video_decoding (bool, optional): Whether to decode the videos of each shard linearly,
+                keeping a window of decoded frames around the current one, instead of seeking to every queried
+                frame. Frames are streamed in episode order within a shard, so this turns the per-frame seeks
+                into a single linear decode of each episode. Defaults to False.
+            cache_dir (str | Path | None, optional): If specified, the data and video files are downloaded to this
+                local directory ahead of time, `prefetch_episodes` episodes ahead of the ones being streamed, and
+                read from there. The directory can be shared by the ranks of a node, and is reused across epochs
+                and runs. Defaults to None, reading the files remotely on demand.
+            cache_size_in_mb (float, optional): Maximum size of `cache_dir`, after which the least recently used
+                files are removed. The data files are only read from the cache once they all fit in half of it.
+                Defaults to 20GB.
+            prefetch_episodes (int, optional): Number of episodes to download ahead of time. Defaults to 2.
+            prefetch_workers (int, optional): Number of threads downloading files. Defaults to 4.
         """
         super().__init__()
         self.repo_id = repo_id
@@ -125,6 +141,7 @@ class StreamingLeRobotDataset(torch.utils.data.IterableDataset):
         self.seed = seed
         self.rng = rng if rng is not None else np.random.default_rng(seed)
         self.shuffle = shuffle
+        self.sequential_video_decoding = sequential_video_decoding
 
         self.streaming = streaming
         self.buffer_size = buffer_size
@@ -148,6 +165,15 @@ class StreamingLeRobotDataset(torch.utils.data.IterableDataset):
             self._validate_delta_timestamp_keys(delta_timestamps)  # raises ValueError if invalid
             self.delta_timestamps = delta_timestamps
             self.delta_indices = get_delta_indices(self.delta_timestamps, self.fps)
+            self._delta_offsets = {key: np.array(indices) for key, indices in self.delta_indices.items()}
+            # Number of items before and after the current one that are needed to build the non-visual windows
+            offsets = [0] + [
+                i
+                for key, indices in self.delta_indices.items()
+                if key not in self.meta.video_keys
+                for i in indices
+            ]
+            self._delta_window = (max(-min(offsets), 0), max(max(offsets), 0))
 
         self.hf_dataset: datasets.IterableDataset = load_dataset(
             self.repo_id if not self.streaming_from_local else str(self.root),
@@ -159,6 +185,19 @@ class StreamingLeRobotDataset(torch.utils.data.IterableDataset):
 
         self.num_shards = min(self.hf_dataset.num_shards, max_num_shards)
 
+        # Downloading files ahead of time keeps the network latency out of the iteration
+        self.file_cache = None
+        self.prefetch_episodes = prefetch_episodes
+        self._prefetched_episodes = set()
+        if cache_dir is not None:
+            self.file_cache = StreamingFileCache(
+                self.meta.url_root if self.streaming and not self.streaming_from_local else str(self.root),
+                cache_dir,
+                Path(self.repo_id) / self.revision,
+                max_size_in_mb=cache_size_in_mb,
+                num_workers=prefetch_workers,
+            )
+
     @property
     def num_frames(self):
         return self.meta.total_frames
@@ -196,9 +235,20 @@ class StreamingLeRobotDataset(torch.utils.data.IterableDataset):
 
         buffer_indices_generator = self._iter_random_indices(rng, self.buffer_size)
 
+        hf_dataset = self.hf_dataset
+        if self.file_cache is not None:
+            self._prefetched_episodes = set()  # cached files may have been evicted since the last iteration
+            hf_dataset = self._load_cached_hf_dataset() or hf_dataset
+
         idx_to_backtrack_dataset = {
-            idx: self._make_backtrackable_dataset(safe_shard(self.hf_dataset, idx, self.num_shards))
+            idx: self._make_backtrackable_dataset(safe_shard(hf_dataset, idx, self.num_shards))
+            for idx in range(self.num_shards)
+        }
+        # Each shard decodes its own videos, as shards are iterated over in an interleaved fashion
+        idx_to_video_readers = {
+            idx: {key: SequentialVideoReader(self.tolerance_s) for key in self.meta.video_keys}
             for idx in range(self.num_shards)
+            if self.sequential_video_decoding
         }
 
         # This buffer is populated while iterating on the dataset's shards
@@ -211,7 +261,7 @@ class StreamingLeRobotDataset(torch.utils.data.IterableDataset):
             backtrack_dataset = idx_to_backtrack_dataset[shard_key]  # selects which shard to iterate on
 
             try:
-                for frame in self.make_frame(backtrack_dataset):
+                for frame in self.make_frame(backtrack_dataset, idx_to_video_readers.get(shard_key)):
                     if len(frames_buffer) == self.buffer_size:
                         i = next(buffer_indices_generator)  # samples a element from the buffer
                         yield frames_buffer[i]
@@ -224,11 +274,45 @@ class StreamingLeRobotDataset(torch.utils.data.IterableDataset):
                 StopIteration,
             ):  # NOTE: StopIteration inside a generator throws a RuntimeError since python 3.7
                 del idx_to_backtrack_dataset[shard_key]  # Remove exhausted shard, onto another shard
+                idx_to_video_readers.pop(shard_key, None)
 
         # Once shards are all exhausted, shuffle the buffer and yield the remaining frames
         rng.shuffle(frames_buffer)
         yield from frames_buffer
 
+    def _load_cached_hf_dataset(self) -> datasets.IterableDataset | None:
+        """Loads the data files from the cache once they have all been downloaded, e.g. in later epochs.
+
+        The data files are read lazily during the iteration, so they are pinned in the cache. They are only read
+        from the cache if they take at most half of it, leaving room for the videos; otherwise the data keeps
+        being streamed.
+        """
+        data_files = {self.meta.get_data_file_path(ep_idx) for ep_idx in range(self.num_episodes)}
+        self.file_cache.pin(data_files)
+        try:
+            data_size = sum(self.file_cache.local_path(path).stat().st_size for path in data_files)
+        except FileNotFoundError:
+            data_size = None
+        if data_size is None or data_size > self.file_cache.max_size_in_mb * 1024**2 / 2:
+            self.file_cache.unpin(data_files)
+            return None
+        for path in data_files:
+            self.file_cache.get(path)  # marks the files as recently used
+        return load_dataset(
+            str(self.file_cache.root), split="train", streaming=self.streaming, data_files="data/*/*.parquet"
+        )
+
+    def _prefetch(self, ep_idx: int) -> None:
+        """Starts downloading the files of the episodes following `ep_idx`, if not done already."""
+        for ep in range(ep_idx, min(ep_idx + self.prefetch_episodes + 1, self.num_episodes)):
+            if ep in self._prefetched_episodes:
+                continue
+            self._prefetched_episodes.add(ep)
+            self.file_cache.prefetch(
+                [self.meta.get_data_file_path(ep)]
+                + [self.meta.get_video_file_path(ep, key) for key in self.meta.video_keys]
+            )
+
     def _get_window_steps(
         self, delta_timestamps: dict[str, list[float]] | None = None, dynamic_bounds: bool = False
     ) -> tuple[int, int]:
@@ -254,52 +338,12 @@ class StreamingLeRobotDataset(torch.utils.data.IterableDataset):
         lookback, lookahead = self._get_window_steps(self.delta_timestamps)
         return Backtrackable(dataset, history=lookback, lookahead=lookahead)
 
-    def _make_timestamps_from_indices(
-        self, start_ts: float, indices: dict[str, list[int]] | None = None
-    ) -> dict[str, list[float]]:
-        if indices is not None:
-            return {
-                key: (
-                    start_ts + torch.tensor(indices[key]) / self.fps
-                ).tolist()  # NOTE: why not delta_timestamps directly?
-                for key in self.delta_timestamps
-            }
-        else:
-            return dict.fromkeys(self.meta.video_keys, [start_ts])
-
-    def _make_padding_camera_frame(self, camera_key: str):
-        """Variable-shape padding frame for given camera keys, given in (H, W, C)"""
-        return torch.zeros(self.meta.info["features"][camera_key]["shape"]).permute(-1, 0, 1)
-
-    def _get_video_frame_padding_mask(
+    def make_frame(
         self,
-        video_frames: dict[str, torch.Tensor],
-        query_timestamps: dict[str, list[float]],
-        original_timestamps: dict[str, list[float]],
-    ) -> dict[str, torch.BoolTensor]:
-        padding_mask = {}
-
-        for video_key, timestamps in original_timestamps.items():
-            if video_key not in video_frames:
-                continue  # only padding on video keys that are available
-            frames = []
-            mask = []
-            padding_frame = self._make_padding_camera_frame(video_key)
-            for ts in timestamps:
-                if is_float_in_list(ts, query_timestamps[video_key]):
-                    idx = find_float_index(ts, query_timestamps[video_key])
-                    frames.append(video_frames[video_key][idx, :])
-                    mask.append(False)
-                else:
-                    frames.append(padding_frame)
-                    mask.append(True)
-
-            padding_mask[f"{video_key}_is_pad"] = torch.BoolTensor(mask)
-
-        return padding_mask
-
-    def make_frame(self, dataset_iterator: Backtrackable) -> Generator:
-        """Makes a frame starting from a dataset iterator"""
+        dataset_iterator: Backtrackable,
+        video_readers: dict[str, SequentialVideoReader] | None = None,
+    ) -> Generator:
+        """Makes a frame starting from a dataset iterator, decoding videos with `video_readers` if given"""
         item = next(dataset_iterator)
         item = item_to_torch(item)
 
@@ -307,17 +351,8 @@ class StreamingLeRobotDataset(torch.utils.data.IterableDataset):
 
         # Get episode index from the item
         ep_idx = item["episode_index"]
-
-        # "timestamp" restarts from 0 for each episode, whereas we need a global timestep within the single .mp4 file (given by index/fps)
-        current_ts = item["index"] / self.fps
-
-        episode_boundaries_ts = {
-            key: (
-                self.meta.episodes[ep_idx][f"videos/{key}/from_timestamp"],
-                self.meta.episodes[ep_idx][f"videos/{key}/to_timestamp"],
-            )
-            for key in self.meta.video_keys
-        }
+        if self.file_cache is not None:
+            self._prefetch(int(ep_idx))
 
         # Apply delta querying logic if necessary
         if self.delta_indices is not None:
@@ -327,13 +362,9 @@ class StreamingLeRobotDataset(torch.utils.data.IterableDataset):
 
         # Load video frames, when needed
         if len(self.meta.video_keys) > 0:
-            original_timestamps = self._make_timestamps_from_indices(current_ts, self.delta_indices)
-
-            # Some timestamps might not result available considering the episode's boundaries
-            query_timestamps = self._get_query_timestamps(
-                current_ts, self.delta_indices, episode_boundaries_ts
-            )
-            video_frames = self._query_videos(query_timestamps, ep_idx)
+            # Some frames might not be available considering the episode's boundaries, they are padded
+            query_timestamps, padding_mask = self._get_query_timestamps(int(item["index"]), ep_idx)
+            video_frames = self._query_videos(query_timestamps, ep_idx, video_readers)
 
             if self.image_transforms is not None:
                 image_keys = self.meta.camera_keys
@@ -341,13 +372,7 @@ class StreamingLeRobotDataset(torch.utils.data.IterableDataset):
                     video_frames[cam] = self.image_transforms(video_frames[cam])
 
             updates.append(video_frames)
-
-            if self.delta_indices is not None:
-                # We always return the same number of frames. Unavailable frames are padded.
-                padding_mask = self._get_video_frame_padding_mask(
-                    video_frames, query_timestamps, original_timestamps
-                )
-                updates.append(padding_mask)
+            updates.append(padding_mask)
 
         result = item.copy()
         for update in updates:
@@ -358,27 +383,38 @@ class StreamingLeRobotDataset(torch.utils.data.IterableDataset):
         yield result
 
     def _get_query_timestamps(
-        self,
-        current_ts: float,
-        query_indices: dict[str, list[int]] | None = None,
-        episode_boundaries_ts: dict[str, tuple[float, float]] | None = None,
-    ) -> dict[str, list[float]]:
+        self, current_index: int, ep_idx: int
+    ) -> tuple[dict[str, list[float]], dict[str, torch.BoolTensor]]:
+        """Returns the timestamps to decode for each video key, and the padding masks of the delta keys.
+
+        "timestamp" restarts from 0 for each episode, whereas we need a global timestep within the single .mp4
+        file (given by index/fps). Offsets are computed on frame indices, and out-of-episode frames are clamped
+        to the episode's first and last frames.
+        """
         query_timestamps = {}
-        keys_to_timestamps = self._make_timestamps_from_indices(current_ts, query_indices)
+        padding = {}
+        episode = self.meta.episodes[ep_idx]
         for key in self.meta.video_keys:
-            if query_indices is not None and key in query_indices:
-                timestamps = keys_to_timestamps[key]
-                # Clamp out timesteps outside of episode boundaries
-                query_timestamps[key] = torch.clamp(
-                    torch.tensor(timestamps), *episode_boundaries_ts[key]
-                ).tolist()
+            if self.delta_indices is None or key not in self.delta_indices:
+                query_timestamps[key] = [current_index / self.fps]
+                continue
 
-            else:
-                query_timestamps[key] = [current_ts]
+            # The episode ends one frame before its `to_timestamp`, which is the first frame of the next episode
+            first_frame = round(episode[f"videos/{key}/from_timestamp"] * self.fps)
+            last_frame = round(episode[f"videos/{key}/to_timestamp"] * self.fps) - 1
+            frames = current_index + self._delta_offsets[key]
+            query_frames = np.minimum(np.maximum(frames, first_frame), last_frame)
+            query_timestamps[key] = (query_frames / self.fps).tolist()
+            padding[f"{key}_is_pad"] = torch.from_numpy(query_frames != frames)
 
-        return query_timestamps
+        return query_timestamps, padding
 
-    def _query_videos(self, query_timestamps: dict[str, list[float]], ep_idx: int) -> dict:
+    def _query_videos(
+        self,
+        query_timestamps: dict[str, list[float]],
+        ep_idx: int,
+        video_readers: dict[str, SequentialVideoReader] | None = None,
+    ) -> dict:
         """Note: When using data workers (e.g. DataLoader with num_workers>0), do not call this function
         in the main process (e.g. by using a second Dataloader with num_workers=0). It will result in a
         Segmentation Fault. This probably happens because a memory reference to the video loader is created in
@@ -387,123 +423,55 @@ class StreamingLeRobotDataset(torch.utils.data.IterableDataset):
 
         item = {}
         for video_key, query_ts in query_timestamps.items():
-            root = self.meta.url_root if self.streaming and not self.streaming_from_local else self.root
-            video_path = f"{root}/{self.meta.get_video_file_path(ep_idx, video_key)}"
-            frames = decode_video_frames_torchcodec(
-                video_path, query_ts, self.tolerance_s, decoder_cache=self.video_decoder_cache
-            )
+            if self.file_cache is not None:
+                video_path = str(self.file_cache.get(self.meta.get_video_file_path(ep_idx, video_key)))
+            else:
+                root = self.meta.url_root if self.streaming and not self.streaming_from_local else self.root
+                video_path = f"{root}/{self.meta.get_video_file_path(ep_idx, video_key)}"
+            if video_readers is not None:
+                frames = video_readers[video_key].get_frames(video_path, query_ts)
+            else:
+                frames = decode_video_frames_torchcodec(
+                    video_path, query_ts, self.tolerance_s, decoder_cache=self.video_decoder_cache
+                )
 
             item[video_key] = frames.squeeze(0) if len(query_ts) == 1 else frames
 
         return item
 
     def _get_delta_frames(self, dataset_iterator: Backtrackable, current_item: dict):
-        # TODO(fracapuano): Modularize this function, refactor the code
         """Get frames with delta offsets using the backtrackable iterator.
 
+        The window of items around the current one is retrieved once, and the frames of each key are stacked and
+        indexed with the delta offsets. Offsets outside of the current episode, or beyond the buffers of the
+        iterator, are clamped to the closest available frame and padded.
+
         Args:
+            dataset_iterator (Backtrackable): Iterator whose current item is `current_item`.
             current_item (dict): Current item from the iterator.
-            ep_idx (int): Episode index.
 
         Returns:
             tuple: (query_result, padding) - frames at delta offsets and padding info.
         """
-        current_episode_idx = current_item["episode_index"]
-
-        # Prepare results
-        query_result = {}
-        padding = {}
-
-        for key, delta_indices in self.delta_indices.items():
-            if key in self.meta.video_keys:
-                continue  # visual frames are decoded separately
-
-            target_frames = []
-            is_pad = []
-
-            # Create a results dictionary to store frames in processing order, then reconstruct original order for stacking
-            delta_results = {}
-
-            # Separate and sort deltas by difficulty (easier operations first)
-            negative_deltas = sorted([d for d in delta_indices if d < 0], reverse=True)  # [-1, -2, -3, ...]
-            positive_deltas = sorted([d for d in delta_indices if d > 0])  # [1, 2, 3, ...]
-            zero_deltas = [d for d in delta_indices if d == 0]
-
-            # Process zero deltas (current frame)
-            for delta in zero_deltas:
-                delta_results[delta] = (
-                    current_item[key],
-                    False,
-                )
-
-            # Process negative deltas in order of increasing difficulty
-            lookback_failed = False
-
-            last_successful_frame = current_item[key]
+        keys = [key for key in self.delta_indices if key not in self.meta.video_keys]
+        if not keys:
+            return {}, {}  # visual frames are decoded separately
 
-            for delta in negative_deltas:
-                if lookback_failed:
-                    delta_results[delta] = (last_successful_frame, True)
-                    continue
+        back, ahead = self._delta_window
 
-                try:
-                    steps_back = abs(delta)
-                    if dataset_iterator.can_peek_back(steps_back):
-                        past_item = dataset_iterator.peek_back(steps_back)
-                        past_item = item_to_torch(past_item)
+        # Episodes are contiguous, so the items of the current episode form a contiguous range of the window
+        episode_indices, current = dataset_iterator.peek_window_stacked("episode_index", back, ahead)
+        in_episode = np.flatnonzero(episode_indices == int(current_item["episode_index"]))
+        first, last = in_episode[0], in_episode[-1]
 
-                        if past_item["episode_index"] == current_episode_idx:
-                            delta_results[delta] = (past_item[key], False)
-                            last_successful_frame = past_item[key]
-
-                        else:
-                            raise LookBackError("Retrieved frame is from different episode!")
-                    else:
-                        raise LookBackError("Cannot go back further than the history buffer!")
-
-                except LookBackError:
-                    delta_results[delta] = (last_successful_frame, True)
-                    lookback_failed = True  # All subsequent negative deltas will also fail
-
-            # Process positive deltas in order of increasing difficulty
-            lookahead_failed = False
-            last_successful_frame = current_item[key]
-
-            for delta in positive_deltas:
-                if lookahead_failed:
-                    delta_results[delta] = (last_successful_frame, True)
-                    continue
-
-                try:
-                    if dataset_iterator.can_peek_ahead(delta):
-                        future_item = dataset_iterator.peek_ahead(delta)
-                        future_item = item_to_torch(future_item)
-
-                        if future_item["episode_index"] == current_episode_idx:
-                            delta_results[delta] = (future_item[key], False)
-                            last_successful_frame = future_item[key]
-
-                        else:
-                            raise LookAheadError("Retrieved frame is from different episode!")
-                    else:
-                        raise LookAheadError("Cannot go ahead further than the lookahead buffer!")
-
-                except LookAheadError:
-                    delta_results[delta] = (last_successful_frame, True)
-                    lookahead_failed = True  # All subsequent positive deltas will also fail
-
-            # Reconstruct original order for stacking
-            for delta in delta_indices:
-                frame, is_padded = delta_results[delta]
-
-                # add batch dimension for stacking
-                target_frames.append(frame)  # frame.unsqueeze(0))
-                is_pad.append(is_padded)
-
-            # Stack frames and add to results
-            if target_frames:
-                query_result[key] = torch.stack(target_frames)
-                padding[f"{key}_is_pad"] = torch.BoolTensor(is_pad)
+        query_result = {}
+        padding = {}
+        for key in keys:
+            positions = current + self._delta_offsets[key]
+            clamped_positions = np.minimum(np.maximum(positions, first), last)
+            values, _ = dataset_iterator.peek_window_stacked(key, back, ahead)
+            query_result[key] = torch.from_numpy(values[clamped_positions])
+            padding[f"{key}_is_pad"] = torch.from_numpy(clamped_positions != positions)
 
         return query_result, padding
 
@@ -18,7 +18,8 @@ import importlib.resources
 import json
 import logging
 from collections import deque
-from collections.abc import Iterable, Iterator
+from collections.abc import Callable, Iterable, Iterator
+from itertools import chain, islice
 from pathlib import Path
 from pprint import pformat
 from typing import Any, Generic, TypeVar
@@ -914,6 +915,67 @@ def cycle(iterable: Any) -> Iterator[Any]:
             iterator = iter(iterable)
 
 
+class BatchPrefetcher:
+    """Iterator preparing the next batch while the current training step runs.
+
+    Each call to `next` returns the batch prepared by the previous call and starts preparing the following
+    one: it is fetched from `iterator` and passed through `transform` (e.g. the policy preprocessor). On a
+    CUDA `device`, this happens on a side stream, so the host-to-device copies and the preprocessing kernels
+    overlap with the kernels of the training step queued on the current stream. The returned batch is only
+    used by the current stream once its side stream work has completed.
+
+    Args:
+        iterator: The iterator yielding the batches, e.g. `cycle(dataloader)`.
+        transform: Optional callable applied to each batch.
+        device: The device the batches are moved to (by `iterator` or `transform`).
+    """
+
+    def __init__(
+        self,
+        iterator: Iterator[Any],
+        transform: Callable[[Any], Any] | None = None,
+        device: torch.device | str | None = None,
+    ):
+        self.iterator = iterator
+        self.transform = transform
+        device = torch.device(device) if device is not None else None
+        self.stream = torch.cuda.Stream(device) if device is not None and device.type == "cuda" else None
+        self._next_batch = self._prepare()
+
+    def _prepare(self) -> Any:
+        with torch.cuda.stream(self.stream) if self.stream is not None else contextlib.nullcontext():
+            batch = next(self.iterator)
+            if self.transform is not None:
+                batch = self.transform(batch)
+        return batch
+
+    def __iter__(self) -> "BatchPrefetcher":
+        return self
+
+    def __next__(self) -> Any:
+        batch = self._next_batch
+        if self.stream is not None:
+            current_stream = torch.cuda.current_stream(self.stream.device)
+            current_stream.wait_stream(self.stream)
+            # The memory of these tensors was allocated on the side stream.
+            for tensor in _iter_tensors(batch):
+                if tensor.is_cuda:
+                    tensor.record_stream(current_stream)
+        self._next_batch = self._prepare()
+        return batch
+
+
+def _iter_tensors(data: Any) -> Iterator[torch.Tensor]:
+    if isinstance(data, torch.Tensor):
+        yield data
+    elif isinstance(data, dict):
+        for value in data.values():
+            yield from _iter_tensors(value)
+    elif isinstance(data, (list, tuple)):
+        for value in data:
+            yield from _iter_tensors(value)
+
+
 def create_branch(repo_id: str, *, branch: str, repo_type: str | None = None) -> None:
     """Create a branch on an existing Hugging Face repo.
 
@@ -1266,7 +1328,16 @@ class Backtrackable(Generic[T]):
     ```
     """
 
-    __slots__ = ("_source", "_back_buf", "_ahead_buf", "_cursor", "_history", "_lookahead")
+    __slots__ = (
+        "_source",
+        "_back_buf",
+        "_ahead_buf",
+        "_cursor",
+        "_history",
+        "_lookahead",
+        "_num_read",
+        "_columns",
+    )
 
     def __init__(self, iterable: Iterable[T], *, history: int = 1, lookahead: int = 0):
         if history < 1:
@@ -1280,6 +1351,10 @@ class Backtrackable(Generic[T]):
         self._cursor: int = 0
         self._history = history
         self._lookahead = lookahead
+        # Number of items read from the source, i.e. position of the next item to read
+        self._num_read: int = 0
+        # Ring buffers of the values of some keys of the items, see `peek_window_stacked`
+        self._columns: dict[str, np.ndarray] = {}
 
     def __iter__(self) -> "Backtrackable[T]":
         return self
@@ -1291,7 +1366,7 @@ class Backtrackable(Generic[T]):
             return self._back_buf[self._cursor]
 
         # If we have items in the ahead buffer, use them first
-        item = self._ahead_buf.popleft() if self._ahead_buf else next(self._source)
+        item = self._ahead_buf.popleft() if self._ahead_buf else self._read()
 
         # Add current item to back buffer and reset cursor
         self._back_buf.append(item)
@@ -1331,7 +1406,7 @@ class Backtrackable(Generic[T]):
         # Fill ahead buffer if we don't have enough items
         while len(self._ahead_buf) < n:
             try:
-                item = next(self._source)
+                item = self._read()
                 self._ahead_buf.append(item)
 
             except StopIteration as err:
@@ -1339,6 +1414,74 @@ class Backtrackable(Generic[T]):
 
         return self._ahead_buf[n - 1]
 
+    def _read(self) -> T:
+        item = next(self._source)
+        for key, column in self._columns.items():
+            column[self._num_read % len(column)] = item[key]
+        self._num_read += 1
+        return item
+
+    def _window_positions(self, back: int, ahead: int) -> tuple[int, int, int]:
+        """Source positions of the first item, the item after the last one and the current item of a window."""
+        if back < 0 or ahead < 0:
+            raise ValueError("peek_window distances must be >= 0")
+
+        # Items after the current one that are still in the back buffer, after stepping back with `prev`
+        num_stepped_back = -self._cursor
+        ahead = min(ahead, num_stepped_back + self._lookahead)
+        while num_stepped_back + len(self._ahead_buf) < ahead:
+            try:
+                self._ahead_buf.append(self._read())
+            except StopIteration:
+                break
+
+        current = self._num_read - len(self._ahead_buf) - 1 - num_stepped_back
+        oldest = self._num_read - len(self._ahead_buf) - len(self._back_buf)
+        return max(current - back, oldest), min(current + ahead + 1, self._num_read), current
+
+    def peek_window(self, back: int, ahead: int) -> tuple[list[T], int]:
+        """
+        Return, in order, up to `back` items before the current one, the current item and up to `ahead` items
+        after it, along with the position of the current item in the returned list.
+        Fewer items are returned when the history, the lookahead limit or the source don't hold enough of them.
+        """
+        start, stop, current = self._window_positions(back, ahead)
+        oldest = self._num_read - len(self._ahead_buf) - len(self._back_buf)
+        buffered = chain(self._back_buf, self._ahead_buf)
+        return list(islice(buffered, start - oldest, stop - oldest)), current - start
+
+    def peek_window_stacked(self, key: str, back: int, ahead: int) -> tuple[np.ndarray, int]:
+        """
+        Same as `peek_window`, but return the values of `key` of the items in the window stacked in an array.
+        The values are kept in a ring buffer, so that each item is converted once, and a window is retrieved
+        with a single slicing operation instead of one lookup per item.
+        """
+        start, stop, current = self._window_positions(back, ahead)
+        if key not in self._columns:
+            self._add_column(key)
+        column = self._columns[key]
+        first_row = start % len(column)
+        if first_row + stop - start <= len(column):
+            window = column[first_row : first_row + stop - start]
+        else:
+            window = np.concatenate(
+                [column[first_row:], column[: (stop - start) - (len(column) - first_row)]]
+            )
+        return window, current - start
+
+    def _add_column(self, key: str) -> None:
+        oldest = self._num_read - len(self._ahead_buf) - len(self._back_buf)
+        column = None
+        for position, item in enumerate(chain(self._back_buf, self._ahead_buf), start=oldest):
+            # Same dtype as `item_to_torch`, e.g. float32 for lists of floats
+            value = torch.as_tensor(item[key]).numpy()
+            if column is None:
+                column = np.empty((self._history + self._lookahead, *value.shape), dtype=value.dtype)
+            column[position % len(column)] = value
+        if column is None:
+            raise LookBackError("No item has been read yet")
+        self._columns[key] = column
+
     def history(self) -> list[T]:
         """
         Return a copy of the buffered history (most recent last).
@@ -1369,7 +1512,7 @@ class Backtrackable(Generic[T]):
             while len(self._ahead_buf) < steps:
                 if self._lookahead > 0 and len(self._ahead_buf) >= self._lookahead:
                     return False
-                item = next(self._source)
+                item = self._read()
                 self._ahead_buf.append(item)
             return True
         except StopIteration:
@@ -18,12 +18,15 @@
 This script will help you convert any LeRobot dataset already pushed to the hub from codebase version 2.1 to
 3.0. It will:
 
-- Generate per-episodes stats and writes them in `episodes_stats.jsonl`
-- Check consistency between these new stats and the old ones.
-- Remove the deprecated `stats.json`.
+- Plan the layout of the new data and video files, which group the files of consecutive episodes.
+- Write these files in parallel processes, copying the video packets without re-encoding them.
+- Convert the episodes, tasks and stats metadata to parquet.
 - Update codebase_version in `info.json`.
 - Push this new version to the hub on the 'main' branch and tags it with "v3.0".
 
+Every converted file is logged in a journal, so that running the script again after a failure resumes the
+conversion instead of starting over.
+
 Usage:
 
 Convert a dataset from the hub:
@@ -43,8 +46,11 @@ python src/lerobot/datasets/v30/convert_dataset_v21_to_v30.py \
 """
 
 import argparse
+import json
 import logging
+import os
 import shutil
+from concurrent.futures import Executor, ProcessPoolExecutor, as_completed
 from pathlib import Path
 from typing import Any
 
@@ -56,6 +62,7 @@ from datasets import Dataset, Features, Image
 from huggingface_hub import HfApi, snapshot_download
 from requests import HTTPError
 
+from lerobot.datasets.aggregate import FileLayout
 from lerobot.datasets.compute_stats import aggregate_stats
 from lerobot.datasets.lerobot_dataset import CODEBASE_VERSION, LeRobotDataset
 from lerobot.datasets.utils import (
@@ -73,7 +80,6 @@ from lerobot.datasets.utils import (
     get_parquet_file_size_in_mb,
     get_parquet_num_frames,
     load_info,
-    update_chunk_file_indices,
     write_episodes,
     write_info,
     write_stats,
@@ -86,6 +92,10 @@ from lerobot.utils.utils import init_logging
 V21 = "v2.1"
 V30 = "v3.0"
 
+# Written in the converted dataset while converting it, to resume an interrupted conversion
+CONVERSION_PLAN_PATH = "conversion_plan.json"
+CONVERSION_JOURNAL_PATH = "conversion_journal.jsonl"
+
 """
 -------------------------
 OLD
@@ -195,55 +205,69 @@ def concat_data_files(paths_to_cat, new_root, chunk_idx, file_idx, image_keys):
     concatenated_df.to_parquet(path, index=False, schema=schema)
 
 
-def convert_data(root: Path, new_root: Path, data_file_size_in_mb: int):
-    data_dir = root / "data"
-    ep_paths = sorted(data_dir.glob("*/*.parquet"))
+def map_files(fn, paths: list[Path], executor: Executor | None) -> list:
+    if executor is None:
+        return [fn(path) for path in paths]
+    return list(executor.map(fn, paths, chunksize=max(1, len(paths) // 256)))
 
-    image_keys = get_image_keys(root)
 
-    ep_idx = 0
-    chunk_idx = 0
-    file_idx = 0
-    size_in_mb = 0
-    num_frames = 0
-    paths_to_cat = []
-    episodes_metadata = []
+def get_parquet_size_and_num_frames(path: Path) -> tuple[float, int]:
+    return get_parquet_file_size_in_mb(path), get_parquet_num_frames(path)
 
-    logging.info(f"Converting data files from {len(ep_paths)} episodes")
-
-    for ep_path in tqdm.tqdm(ep_paths, desc="convert data files"):
-        ep_size_in_mb = get_parquet_file_size_in_mb(ep_path)
-        ep_num_frames = get_parquet_num_frames(ep_path)
-        ep_metadata = {
-            "episode_index": ep_idx,
-            "data/chunk_index": chunk_idx,
-            "data/file_index": file_idx,
-            "dataset_from_index": num_frames,
-            "dataset_to_index": num_frames + ep_num_frames,
-        }
-        size_in_mb += ep_size_in_mb
-        num_frames += ep_num_frames
-        episodes_metadata.append(ep_metadata)
-        ep_idx += 1
 
-        if size_in_mb < data_file_size_in_mb:
-            paths_to_cat.append(ep_path)
-            continue
+def get_video_size_and_duration(path: Path) -> tuple[float, float]:
+    return get_file_size_in_mb(path), get_video_duration_in_s(path)
+
 
-        if paths_to_cat:
-            concat_data_files(paths_to_cat, new_root, chunk_idx, file_idx, image_keys)
+def plan_files(sizes_in_mb: list[float], file_size_in_mb: int) -> list[tuple[int, int, int, int]]:
+    """Groups consecutive episodes into files of at most `file_size_in_mb`, unless an episode is bigger.
 
-        # Reset for the next file
-        size_in_mb = ep_size_in_mb
-        paths_to_cat = [ep_path]
+    Returns the chunk index, file index, first episode and last episode + 1 of each file.
+    """
+    layout = FileLayout(max_mb=file_size_in_mb, chunk_size=DEFAULT_CHUNK_SIZE)
+    for ep_idx, size_in_mb in enumerate(sizes_in_mb):
+        layout.add((ep_idx, 0, 0), size_in_mb)
+    return [
+        (chunk_idx, file_idx, sources[0][0], sources[-1][0] + 1)
+        for (chunk_idx, file_idx), sources in layout.sources.items()
+    ]
 
-        chunk_idx, file_idx = update_chunk_file_indices(chunk_idx, file_idx, DEFAULT_CHUNK_SIZE)
 
-    # Write remaining data if any
-    if paths_to_cat:
-        concat_data_files(paths_to_cat, new_root, chunk_idx, file_idx, image_keys)
+def plan_data(root: Path, data_file_size_in_mb: int, executor: Executor | None = None):
+    """Plans the data files of the converted dataset.
 
-    return episodes_metadata
+    Returns the metadata of the episodes and a job for each data file, listing the episode files to concatenate.
+    """
+    ep_paths = sorted((root / "data").glob("*/*.parquet"))
+    logging.info(f"Planning data files of {len(ep_paths)} episodes")
+    probes = map_files(get_parquet_size_and_num_frames, ep_paths, executor)
+    sizes_in_mb = [size_in_mb for size_in_mb, _ in probes]
+    ep_num_frames = [num_frames for _, num_frames in probes]
+
+    episodes_metadata = []
+    jobs = []
+    num_frames = 0
+    for chunk_idx, file_idx, ep_from, ep_to in plan_files(sizes_in_mb, data_file_size_in_mb):
+        for ep_idx in range(ep_from, ep_to):
+            episodes_metadata.append(
+                {
+                    "episode_index": ep_idx,
+                    "data/chunk_index": chunk_idx,
+                    "data/file_index": file_idx,
+                    "dataset_from_index": num_frames,
+                    "dataset_to_index": num_frames + ep_num_frames[ep_idx],
+                }
+            )
+            num_frames += ep_num_frames[ep_idx]
+        jobs.append(
+            {
+                "video_key": None,
+                "chunk_index": chunk_idx,
+                "file_index": file_idx,
+                "paths": [str(path.relative_to(root)) for path in ep_paths[ep_from:ep_to]],
+            }
+        )
+    return episodes_metadata, jobs
 
 
 def get_video_keys(root):
@@ -260,19 +284,21 @@ def get_image_keys(root):
     return image_keys
 
 
-def convert_videos(root: Path, new_root: Path, video_file_size_in_mb: int):
-    logging.info(f"Converting videos from {root} to {new_root}")
+def plan_videos(root: Path, video_file_size_in_mb: int, executor: Executor | None = None):
+    """Plans the video files of the converted dataset.
 
-    video_keys = get_video_keys(root)
+    Returns the metadata of the episodes (None without videos) and a job for each video file.
+    """
+    video_keys = sorted(get_video_keys(root))
     if len(video_keys) == 0:
-        return None
-
-    video_keys = sorted(video_keys)
+        return None, []
 
     eps_metadata_per_cam = []
+    jobs = []
     for camera in video_keys:
-        eps_metadata = convert_videos_of_camera(root, new_root, camera, video_file_size_in_mb)
+        eps_metadata, camera_jobs = plan_videos_of_camera(root, camera, video_file_size_in_mb, executor)
         eps_metadata_per_cam.append(eps_metadata)
+        jobs += camera_jobs
 
     num_eps_per_cam = [len(eps_cam_map) for eps_cam_map in eps_metadata_per_cam]
     if len(set(num_eps_per_cam)) != 1:
@@ -281,7 +307,7 @@ def convert_videos(root: Path, new_root: Path, video_file_size_in_mb: int):
     episods_metadata = []
     num_cameras = len(video_keys)
     num_episodes = num_eps_per_cam[0]
-    for ep_idx in tqdm.tqdm(range(num_episodes), desc="convert videos"):
+    for ep_idx in range(num_episodes):
         # Sanity check
         ep_ids = [eps_metadata_per_cam[cam_idx][ep_idx]["episode_index"] for cam_idx in range(num_cameras)]
         ep_ids += [ep_idx]
@@ -293,78 +319,104 @@ def convert_videos(root: Path, new_root: Path, video_file_size_in_mb: int):
             ep_dict.update(eps_metadata_per_cam[cam_idx][ep_idx])
         episods_metadata.append(ep_dict)
 
-    return episods_metadata
+    return episods_metadata, jobs
 
 
-def convert_videos_of_camera(root: Path, new_root: Path, video_key: str, video_file_size_in_mb: int):
+def plan_videos_of_camera(root: Path, video_key: str, video_file_size_in_mb: int, executor: Executor | None):
     # Access old paths to mp4
     videos_dir = root / "videos"
     ep_paths = sorted(videos_dir.glob(f"*/{video_key}/*.mp4"))
+    logging.info(f"Planning videos of {video_key} from {len(ep_paths)} episodes")
+    probes = map_files(get_video_size_and_duration, ep_paths, executor)
+    sizes_in_mb = [size_in_mb for size_in_mb, _ in probes]
+    durations_in_s = [duration_in_s for _, duration_in_s in probes]
 
-    ep_idx = 0
-    chunk_idx = 0
-    file_idx = 0
-    size_in_mb = 0
-    duration_in_s = 0.0
-    paths_to_cat = []
     episodes_metadata = []
-
-    for ep_path in tqdm.tqdm(ep_paths, desc=f"convert videos of {video_key}"):
-        ep_size_in_mb = get_file_size_in_mb(ep_path)
-        ep_duration_in_s = get_video_duration_in_s(ep_path)
-
-        # Check if adding this episode would exceed the limit
-        if size_in_mb + ep_size_in_mb >= video_file_size_in_mb and len(paths_to_cat) > 0:
-            # Size limit would be exceeded, save current accumulation WITHOUT this episode
-            concatenate_video_files(
-                paths_to_cat,
-                new_root
-                / DEFAULT_VIDEO_PATH.format(video_key=video_key, chunk_index=chunk_idx, file_index=file_idx),
+    jobs = []
+    for chunk_idx, file_idx, ep_from, ep_to in plan_files(sizes_in_mb, video_file_size_in_mb):
+        duration_in_s = 0.0
+        for ep_idx in range(ep_from, ep_to):
+            episodes_metadata.append(
+                {
+                    "episode_index": ep_idx,
+                    f"videos/{video_key}/chunk_index": chunk_idx,
+                    f"videos/{video_key}/file_index": file_idx,
+                    f"videos/{video_key}/from_timestamp": duration_in_s,
+                    f"videos/{video_key}/to_timestamp": duration_in_s + durations_in_s[ep_idx],
+                }
             )
+            duration_in_s += durations_in_s[ep_idx]
+        jobs.append(
+            {
+                "video_key": video_key,
+                "chunk_index": chunk_idx,
+                "file_index": file_idx,
+                "paths": [str(path.relative_to(root)) for path in ep_paths[ep_from:ep_to]],
+            }
+        )
+    return episodes_metadata, jobs
 
-            # Update episodes metadata for the file we just saved
-            for i, _ in enumerate(paths_to_cat):
-                past_ep_idx = ep_idx - len(paths_to_cat) + i
-                episodes_metadata[past_ep_idx][f"videos/{video_key}/chunk_index"] = chunk_idx
-                episodes_metadata[past_ep_idx][f"videos/{video_key}/file_index"] = file_idx
-
-            # Move to next file and start fresh with current episode
-            chunk_idx, file_idx = update_chunk_file_indices(chunk_idx, file_idx, DEFAULT_CHUNK_SIZE)
-            size_in_mb = 0
-            duration_in_s = 0.0
-            paths_to_cat = []
-
-        # Add current episode metadata
-        ep_metadata = {
-            "episode_index": ep_idx,
-            f"videos/{video_key}/chunk_index": chunk_idx,  # Will be updated when file is saved
-            f"videos/{video_key}/file_index": file_idx,  # Will be updated when file is saved
-            f"videos/{video_key}/from_timestamp": duration_in_s,
-            f"videos/{video_key}/to_timestamp": duration_in_s + ep_duration_in_s,
-        }
-        episodes_metadata.append(ep_metadata)
-
-        # Add current episode to accumulation
-        paths_to_cat.append(ep_path)
-        size_in_mb += ep_size_in_mb
-        duration_in_s += ep_duration_in_s
-        ep_idx += 1
-
-    # Write remaining videos if any
-    if paths_to_cat:
-        concatenate_video_files(
-            paths_to_cat,
-            new_root
-            / DEFAULT_VIDEO_PATH.format(video_key=video_key, chunk_index=chunk_idx, file_index=file_idx),
+
+def run_job(job: dict, root: Path, new_root: Path, image_keys: list[str]) -> dict:
+    """Writes a file of the converted dataset by concatenating the episode files of `job`.
+
+    Videos are concatenated by copying their packets, without re-encoding them.
+    """
+    paths = [root / path for path in job["paths"]]
+    if job["video_key"] is None:
+        concat_data_files(paths, new_root, job["chunk_index"], job["file_index"], image_keys)
+    else:
+        output_path = new_root / DEFAULT_VIDEO_PATH.format(
+            video_key=job["video_key"], chunk_index=job["chunk_index"], file_index=job["file_index"]
         )
+        concatenate_video_files(paths, output_path)
+    return job
+
+
+def get_job_id(job: dict) -> tuple:
+    return job["video_key"], job["chunk_index"], job["file_index"]
+
+
+def load_journal(new_root: Path, plan: dict) -> set[tuple]:
+    """Returns the jobs completed by a previous conversion with the same plan, or an empty set otherwise."""
+    plan_path = new_root / CONVERSION_PLAN_PATH
+    if not plan_path.exists():
+        return set()
+    with open(plan_path) as f:
+        if json.load(f) != plan:
+            return set()
+    journal_path = new_root / CONVERSION_JOURNAL_PATH
+    if not journal_path.exists():
+        return set()
+    # A job interrupted while being logged leaves an incomplete last line, which is ignored
+    with open(journal_path) as f:
+        lines = f.read().splitlines()
+    done = set()
+    for line in lines:
+        try:
+            done.add(get_job_id(json.loads(line)))
+        except json.JSONDecodeError:
+            continue
+    return done
 
-        # Update episodes metadata for the final file
-        for i, _ in enumerate(paths_to_cat):
-            past_ep_idx = ep_idx - len(paths_to_cat) + i
-            episodes_metadata[past_ep_idx][f"videos/{video_key}/chunk_index"] = chunk_idx
-            episodes_metadata[past_ep_idx][f"videos/{video_key}/file_index"] = file_idx
 
-    return episodes_metadata
+def run_jobs(
+    root: Path, new_root: Path, jobs: list[dict], done: set[tuple], executor: Executor | None
+) -> None:
+    """Runs the jobs not done yet and logs each completed job in the journal, to resume from there on failure."""
+    todo = [job for job in jobs if get_job_id(job) not in done]
+    logging.info(f"Converting {len(todo)} files ({len(jobs) - len(todo)} already converted)")
+    image_keys = get_image_keys(root)
+
+    with open(new_root / CONVERSION_JOURNAL_PATH, "a") as journal:
+        if executor is None:
+            completed = (run_job(job, root, new_root, image_keys) for job in todo)
+        else:
+            futures = [executor.submit(run_job, job, root, new_root, image_keys) for job in todo]
+            completed = (future.result() for future in as_completed(futures))
+        for job in tqdm.tqdm(completed, total=len(todo), desc="convert data and video files"):
+            journal.write(json.dumps(job) + "\n")
+            journal.flush()
 
 
 def generate_episode_metadata_dict(
@@ -452,11 +504,14 @@ def convert_dataset(
     root: str | Path | None = None,
     push_to_hub: bool = True,
     force_conversion: bool = False,
+    num_workers: int | None = None,
 ):
     if data_file_size_in_mb is None:
         data_file_size_in_mb = DEFAULT_DATA_FILE_SIZE_IN_MB
     if video_file_size_in_mb is None:
         video_file_size_in_mb = DEFAULT_VIDEO_FILE_SIZE_IN_MB
+    if num_workers is None:
+        num_workers = os.cpu_count()
 
     # First check if the dataset already has a v3.0 version
     if root is None and not force_conversion:
@@ -470,11 +525,6 @@ def convert_dataset(
     # Set root based on whether local dataset path is provided
     use_local_dataset = False
     root = HF_LEROBOT_HOME / repo_id if root is None else Path(root) / repo_id
-    if root.exists():
-        validate_local_dataset_version(root)
-        use_local_dataset = True
-        print(f"Using local dataset at {root}")
-
     old_root = root.parent / f"{root.name}_old"
     new_root = root.parent / f"{root.name}_v30"
 
@@ -483,8 +533,10 @@ def convert_dataset(
         shutil.rmtree(str(root))
         shutil.move(str(old_root), str(root))
 
-    if new_root.is_dir():
-        shutil.rmtree(new_root)
+    if root.exists():
+        validate_local_dataset_version(root)
+        use_local_dataset = True
+        print(f"Using local dataset at {root}")
 
     if not use_local_dataset:
         snapshot_download(
@@ -494,12 +546,37 @@ def convert_dataset(
             local_dir=root,
         )
 
-    convert_info(root, new_root, data_file_size_in_mb, video_file_size_in_mb)
-    convert_tasks(root, new_root)
-    episodes_metadata = convert_data(root, new_root, data_file_size_in_mb)
-    episodes_videos_metadata = convert_videos(root, new_root, video_file_size_in_mb)
+    executor = ProcessPoolExecutor(num_workers) if num_workers > 0 else None
+    try:
+        # Plan the layout of the converted files up front, so that they can be written in parallel
+        episodes_metadata, data_jobs = plan_data(root, data_file_size_in_mb, executor)
+        episodes_videos_metadata, video_jobs = plan_videos(root, video_file_size_in_mb, executor)
+        plan = {
+            "data_file_size_in_mb": data_file_size_in_mb,
+            "video_file_size_in_mb": video_file_size_in_mb,
+            "jobs": data_jobs + video_jobs,
+        }
+
+        # Resume a previous conversion with the same plan, or start over
+        done = load_journal(new_root, plan)
+        if len(done) > 0:
+            print(f"Resuming the conversion in {new_root}")
+        elif new_root.is_dir():
+            shutil.rmtree(new_root)
+        new_root.mkdir(parents=True, exist_ok=True)
+        with open(new_root / CONVERSION_PLAN_PATH, "w") as f:
+            json.dump(plan, f)
+
+        convert_info(root, new_root, data_file_size_in_mb, video_file_size_in_mb)
+        convert_tasks(root, new_root)
+        run_jobs(root, new_root, plan["jobs"], done, executor)
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
     convert_episodes_metadata(root, new_root, episodes_metadata, episodes_videos_metadata)
 
+    (new_root / CONVERSION_PLAN_PATH).unlink()
+    (new_root / CONVERSION_JOURNAL_PATH).unlink()
     shutil.move(str(root), str(old_root))
     shutil.move(str(new_root), str(root))
 
@@ -566,6 +643,12 @@ if __name__ == "__main__":
         action="store_true",
         help="Force conversion even if the dataset already has a v3.0 version.",
     )
+    parser.add_argument(
+        "--num-workers",
+        type=int,
+        default=None,
+        help="Processes writing the converted files. Defaults to the number of CPUs, 0 converts in the main process.",
+    )
 
     args = parser.parse_args()
     convert_dataset(**vars(args))
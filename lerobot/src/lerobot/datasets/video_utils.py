@@ -15,10 +15,14 @@
 # limitations under the License.
 import glob
 import importlib
+import itertools
 import logging
+import os
 import shutil
 import tempfile
 import warnings
+from collections import deque
+from collections.abc import Iterable
 from dataclasses import dataclass, field
 from pathlib import Path
 from threading import Lock
@@ -26,6 +30,7 @@ from typing import Any, ClassVar
 
 import av
 import fsspec
+import numpy as np
 import pyarrow as pa
 import torch
 import torchvision
@@ -300,6 +305,97 @@ def decode_video_frames_torchcodec(
     return closest_frames
 
 
+class SequentialVideoReader:
+    """Serves frames of a video that is read in increasing timestamp order, e.g. episode by episode.
+
+    `decode_video_frames_torchcodec` seeks to every queried frame, i.e. decodes from the preceding key frame
+    up to that frame, even when consecutive queries ask for neighboring frames. This reader instead decodes
+    the video linearly, `chunk_size` frames at a time, and keeps the decoded frames in a window from the
+    earliest frame of the last query onwards. Queries are expected to move forward (as when iterating over the
+    frames of an episode, with a fixed set of delta timestamps): a query starting before the window, or far
+    after it, restarts the window with a single seek.
+
+    Each reader owns its decoders, so readers iterating over different parts of the same file don't seek each
+    other's decoder back and forth.
+    """
+
+    def __init__(self, tolerance_s: float, chunk_size: int = 16):
+        self.tolerance_s = tolerance_s
+        self.chunk_size = chunk_size
+        self.decoder_cache = VideoDecoderCache()
+        self._video_path = None
+        self._start = 0  # index of the first frame of the window
+        self._frames = deque()
+        self._pts = deque()
+
+    def _reset(self, video_path: str, start: int):
+        if video_path != self._video_path:
+            self.decoder_cache.clear()
+            self._video_path = video_path
+        self._start = start
+        self._frames.clear()
+        self._pts.clear()
+
+    def get_frames(self, video_path: Path | str, timestamps: list[float]) -> torch.Tensor:
+        """Returns the (len(timestamps), C, H, W) float32 frames in [0, 1] at the given timestamps."""
+        video_path = str(video_path)
+        if video_path != self._video_path:
+            self._reset(video_path, 0)
+        decoder = self.decoder_cache.get_decoder(video_path)
+        metadata = decoder.metadata
+        num_frames = metadata.num_frames if metadata.num_frames is not None else float("inf")
+        indices = [round(ts * metadata.average_fps) for ts in timestamps]
+        first, last = min(indices), max(indices)
+
+        end = self._start + len(self._frames)
+        if first < self._start or first > end + self.chunk_size:
+            self._reset(video_path, first)
+            end = first
+        while end <= last:
+            stop = min(max(last + 1, end + self.chunk_size), num_frames)
+            if stop <= end:
+                raise FrameTimestampError(f"Frame {last} is beyond the end of the video {video_path}.")
+            frames_batch = decoder.get_frames_in_range(start=end, stop=stop)
+            self._frames.extend(frames_batch.data)
+            self._pts.extend(frames_batch.pts_seconds.tolist())
+            end = stop
+
+        # Frames before the query won't be queried again
+        while self._start < first:
+            self._frames.popleft()
+            self._pts.popleft()
+            self._start += 1
+
+        loaded_ts = torch.tensor([self._pts[idx - self._start] for idx in indices])
+        dist = (loaded_ts - torch.tensor(timestamps)).abs()
+        is_within_tol = dist < self.tolerance_s
+        assert is_within_tol.all(), (
+            f"One or several query timestamps unexpectedly violate the tolerance ({dist[~is_within_tol]} > "
+            f"{self.tolerance_s=}).\nqueried timestamps: {timestamps}\nloaded timestamps: {loaded_ts}"
+            f"\nvideo: {video_path}"
+        )
+
+        frames = torch.stack([self._frames[idx - self._start] for idx in indices])
+        return (frames / 255.0).type(torch.float32)
+
+
+def get_encoding_threads(num_encoders: int, num_cpus: int | None = None, reserved_cpus: int = 1) -> list[int]:
+    """Splits the available CPU cores between encoders running concurrently, e.g. one process per camera.
+
+    `reserved_cpus` cores are left for the main process (e.g. recording), and the remaining ones are split
+    as evenly as possible, so that `sum(threads) == num_cpus - reserved_cpus`. Each encoder gets at least one
+    thread.
+    """
+    if num_cpus is None:
+        try:
+            num_cpus = len(os.sched_getaffinity(0))
+        except AttributeError:  # not available on macOS and Windows
+            num_cpus = os.cpu_count() or 1
+    budget = max(num_cpus - reserved_cpus, num_encoders)
+    threads, remainder = divmod(budget, num_encoders)
+    return [threads + (i < remainder) for i in range(num_encoders)]
+
+
 def encode_video_frames(
     imgs_dir: Path | str,
     video_path: Path | str,
@@ -312,21 +408,80 @@ def encode_video_frames(
     log_level: int | None = av.logging.ERROR,
     overwrite: bool = False,
     preset: int | None = None,
+    num_threads: int | None = None,
+    tiles: tuple[int, int] | None = None,
 ) -> None:
-    """More info on ffmpeg arguments tuning on `benchmark/video/README.md`"""
+    """Encodes the `frame-XXXXXX.png` images of `imgs_dir` into a video, see `encode_video`."""
+    imgs_dir = Path(imgs_dir)
+
+    # Get input frames
+    template = "frame-" + ("[0-9]" * 6) + ".png"
+    input_list = sorted(
+        glob.glob(str(imgs_dir / template)), key=lambda x: int(x.split("-")[-1].split(".")[0])
+    )
+    if len(input_list) == 0:
+        raise FileNotFoundError(f"No images found in {imgs_dir}.")
+
+    def read_frames():
+        for input_data in input_list:
+            with Image.open(input_data) as input_image:
+                yield np.asarray(input_image.convert("RGB"))
+
+    encode_video(
+        read_frames(),
+        video_path,
+        fps,
+        vcodec=vcodec,
+        pix_fmt=pix_fmt,
+        g=g,
+        crf=crf,
+        fast_decode=fast_decode,
+        log_level=log_level,
+        overwrite=overwrite,
+        preset=preset,
+        num_threads=num_threads,
+        tiles=tiles,
+    )
+
+
+def encode_video(
+    frames: np.ndarray | Iterable[np.ndarray | Image.Image],
+    video_path: Path | str,
+    fps: int,
+    vcodec: str = "libsvtav1",
+    pix_fmt: str = "yuv420p",
+    g: int | None = 2,
+    crf: int | None = 30,
+    fast_decode: int = 0,
+    log_level: int | None = av.logging.ERROR,
+    overwrite: bool = False,
+    preset: int | None = None,
+    num_threads: int | None = None,
+    tiles: tuple[int, int] | None = None,
+) -> None:
+    """Encodes RGB frames held in memory into a video.
+
+    More info on ffmpeg arguments tuning on `benchmark/video/README.md`
+
+    Args:
+        frames: uint8 frames of shape (height, width, 3), either stacked in an array of shape
+            (num_frames, height, width, 3) or yielded one at a time (e.g. while they are being decoded).
+            PIL images are accepted as well.
+        num_threads: Number of threads used by the encoder. Defaults to the encoder's own choice, which is
+            usually all the cores: set it when several videos are encoded at once (see `get_encoding_threads`).
+        tiles: (log2 of the number of tile columns, log2 of the number of tile rows), only supported by
+            libsvtav1. More tiles allow more parallelism, at the cost of a slightly lower compression.
+    """
     # Check encoder availability
     if vcodec not in ["h264", "hevc", "libsvtav1"]:
         raise ValueError(f"Unsupported video codec: {vcodec}. Supported codecs are: h264, hevc, libsvtav1.")
 
     video_path = Path(video_path)
-    imgs_dir = Path(imgs_dir)
 
     if video_path.exists() and not overwrite:
         logging.warning(f"Video file already exists: {video_path}. Skipping encoding.")
         return
 
-    video_path.parent.mkdir(parents=True, exist_ok=True)
-
     # Encoders/pixel formats incompatibility check
     if (vcodec == "libsvtav1" or vcodec == "hevc") and pix_fmt == "yuv444p":
         logging.warning(
@@ -334,20 +489,20 @@ def encode_video_frames(
         )
         pix_fmt = "yuv420p"
 
-    # Get input frames
-    template = "frame-" + ("[0-9]" * 6) + ".png"
-    input_list = sorted(
-        glob.glob(str(imgs_dir / template)), key=lambda x: int(x.split("-")[-1].split(".")[0])
-    )
-
     # Define video output frame size (assuming all input frames are the same size)
-    if len(input_list) == 0:
-        raise FileNotFoundError(f"No images found in {imgs_dir}.")
-    with Image.open(input_list[0]) as dummy_image:
-        width, height = dummy_image.size
+    frames = iter(frames)
+    first_frame = next(frames, None)
+    if first_frame is None:
+        raise ValueError(f"No frames to encode in {video_path}.")
+    frames = itertools.chain([first_frame], frames)
+    height, width = np.asarray(first_frame).shape[:2]
+
+    video_path.parent.mkdir(parents=True, exist_ok=True)
 
     # Define video codec options
     video_options = {}
+    # Options of the underlying encoder library, passed as "key=value:key=value"
+    codec_params = []
 
     if g is not None:
         video_options["g"] = str(g)
@@ -356,13 +511,33 @@ def encode_video_frames(
         video_options["crf"] = str(crf)
 
     if fast_decode:
-        key = "svtav1-params" if vcodec == "libsvtav1" else "tune"
-        value = f"fast-decode={fast_decode}" if vcodec == "libsvtav1" else "fastdecode"
-        video_options[key] = value
+        if vcodec == "libsvtav1":
+            codec_params.append(f"fast-decode={fast_decode}")
+        else:
+            video_options["tune"] = "fastdecode"
 
     if vcodec == "libsvtav1":
         video_options["preset"] = str(preset) if preset is not None else "12"
 
+    if num_threads is not None:
+        if vcodec == "libsvtav1":
+            # SVT-AV1 ignores the generic "threads" option
+            codec_params.append(f"lp={num_threads}")
+        elif vcodec == "hevc":
+            codec_params.append(f"pools={num_threads}")
+        else:
+            video_options["threads"] = str(num_threads)
+
+    if tiles is not None:
+        if vcodec == "libsvtav1":
+            codec_params += [f"tile-columns={tiles[0]}", f"tile-rows={tiles[1]}"]
+        else:
+            logging.warning(f"Tiles are not supported for codec {vcodec}, ignoring them.")
+
+    if codec_params:
+        key = "svtav1-params" if vcodec == "libsvtav1" else "x265-params"
+        video_options[key] = ":".join(codec_params)
+
     # Set logging level
     if log_level is not None:
         # "While less efficient, it is generally preferable to modify logging with Python's logging"
@@ -376,13 +551,15 @@ def encode_video_frames(
         output_stream.height = height
 
         # Loop through input frames and encode them
-        for input_data in input_list:
-            with Image.open(input_data) as input_image:
-                input_image = input_image.convert("RGB")
-                input_frame = av.VideoFrame.from_image(input_image)
-                packet = output_stream.encode(input_frame)
-                if packet:
-                    output.mux(packet)
+        for frame in frames:
+            if isinstance(frame, Image.Image):
+                frame = frame.convert("RGB")
+            # Wraps the array without copying it, the encoder converts it to `pix_fmt` before encoding
+            frame = np.ascontiguousarray(frame, dtype=np.uint8)
+            input_frame = av.VideoFrame.from_numpy_buffer(frame, format="rgb24")
+            packet = output_stream.encode(input_frame)
+            if packet:
+                output.mux(packet)
 
         # Flush the encoder
         packet = output_stream.encode()
@@ -12,18 +12,42 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from .act.configuration_act import ACTConfig as ACTConfig
-from .diffusion.configuration_diffusion import DiffusionConfig as DiffusionConfig
-from .groot.configuration_groot import GrootConfig as GrootConfig
-from .pi0.configuration_pi0 import PI0Config as PI0Config
-from .pi0_fast.configuration_pi0_fast import PI0FastConfig as PI0FastConfig
-from .pi05.configuration_pi05 import PI05Config as PI05Config
-from .smolvla.configuration_smolvla import SmolVLAConfig as SmolVLAConfig
-from .smolvla.processor_smolvla import SmolVLANewLineProcessor
-from .tdmpc.configuration_tdmpc import TDMPCConfig as TDMPCConfig
-from .vqbet.configuration_vqbet import VQBeTConfig as VQBeTConfig
-from .wall_x.configuration_wall_x import WallXConfig as WallXConfig
-from .xvla.configuration_xvla import XVLAConfig as XVLAConfig
+from typing import TYPE_CHECKING
+
+from lerobot.utils.import_utils import make_lazy_getattr
+
+# The configurations are imported on first access, so that importing a single policy (or a script that doesn't
+# use any, like lerobot-teleoperate) doesn't import every policy and their dependencies.
+_CONFIG_MODULES = {
+    "ACTConfig": ".act.configuration_act",
+    "DiffusionConfig": ".diffusion.configuration_diffusion",
+    "GrootConfig": ".groot.configuration_groot",
+    "PI0Config": ".pi0.configuration_pi0",
+    "PI0FastConfig": ".pi0_fast.configuration_pi0_fast",
+    "PI05Config": ".pi05.configuration_pi05",
+    "SARMConfig": ".sarm.configuration_sarm",
+    "SmolVLAConfig": ".smolvla.configuration_smolvla",
+    "TDMPCConfig": ".tdmpc.configuration_tdmpc",
+    "VQBeTConfig": ".vqbet.configuration_vqbet",
+    "WallXConfig": ".wall_x.configuration_wall_x",
+    "XVLAConfig": ".xvla.configuration_xvla",
+}
+
+__getattr__ = make_lazy_getattr(__name__, _CONFIG_MODULES)
+
+if TYPE_CHECKING:
+    from .act.configuration_act import ACTConfig
+    from .diffusion.configuration_diffusion import DiffusionConfig
+    from .groot.configuration_groot import GrootConfig
+    from .pi0.configuration_pi0 import PI0Config
+    from .pi0_fast.configuration_pi0_fast import PI0FastConfig
+    from .pi05.configuration_pi05 import PI05Config
+    from .sarm.configuration_sarm import SARMConfig
+    from .smolvla.configuration_smolvla import SmolVLAConfig
+    from .tdmpc.configuration_tdmpc import TDMPCConfig
+    from .vqbet.configuration_vqbet import VQBeTConfig
+    from .wall_x.configuration_wall_x import WallXConfig
+    from .xvla.configuration_xvla import XVLAConfig
 
 __all__ = [
     "ACTConfig",
@@ -63,9 +63,6 @@ class ACTPolicy(PreTrainedPolicy):
 
         self.model = ACT(config)
 
-        if config.temporal_ensemble_coeff is not None:
-            self.temporal_ensembler = ACTTemporalEnsembler(config.temporal_ensemble_coeff, config.chunk_size)
-
         self.reset()
 
     def get_optim_params(self) -> dict:
@@ -92,7 +89,11 @@ class ACTPolicy(PreTrainedPolicy):
     def reset(self):
         """This should be called whenever the environment is reset."""
         if self.config.temporal_ensemble_coeff is not None:
-            self.temporal_ensembler.reset()
+            # A new ensembler rather than an in-place reset, so that the previous state can be kept aside (see
+            # `PerEnvResetPolicy` in lerobot_eval.py).
+            self.temporal_ensembler = ACTTemporalEnsembler(
+                self.config.temporal_ensemble_coeff, self.config.chunk_size
+            )
         else:
             self._action_queue = deque([], maxlen=self.config.n_action_steps)
 
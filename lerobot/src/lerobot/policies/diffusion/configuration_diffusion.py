@@ -84,7 +84,8 @@ class DiffusionConfig(PreTrainedConfig):
         use_film_scale_modulation: FiLM (https://huggingface.co/papers/1709.07871) is used for the Unet conditioning.
             Bias modulation is used be default, while this parameter indicates whether to also use scale
             modulation.
-        noise_scheduler_type: Name of the noise scheduler to use. Supported options: ["DDPM", "DDIM"].
+        noise_scheduler_type: Name of the noise scheduler to use. Supported options: ["DDPM", "DDIM",
+            "DPMSolver++", "UniPC"].
         num_train_timesteps: Number of diffusion steps for the forward diffusion schedule.
         beta_schedule: Name of the diffusion beta schedule as per DDPMScheduler from Hugging Face diffusers.
         beta_start: Beta value for the first forward-diffusion step.
@@ -93,11 +94,21 @@ class DiffusionConfig(PreTrainedConfig):
             or "sample". These have equivalent outcomes from a latent variable modeling perspective, but
             "epsilon" has been shown to work better in many deep neural network settings.
         clip_sample: Whether to clip the sample to [-`clip_sample_range`, +`clip_sample_range`] for each
-            denoising step at inference time. WARNING: you will need to make sure your action-space is
-            normalized to fit within this range.
+            denoising step at inference time ("DPMSolver++" and "UniPC" threshold their prediction of the
+            clean sample instead). WARNING: you will need to make sure your action-space is normalized to fit
+            within this range.
         clip_sample_range: The magnitude of the clipping range as described above.
         num_inference_steps: Number of reverse diffusion steps to use at inference time (steps are evenly
             spaced). If not provided, this defaults to be the same as `num_train_timesteps`.
+        inference_noise_scheduler_type: Name of the noise scheduler used for the reverse diffusion process
+            at inference time. If not provided, `noise_scheduler_type` is used. Few-step solvers such as
+            "DPMSolver++" or "UniPC" can sample from a policy trained with "DDPM" in ~10 steps.
+        denoise_loop_backend: How the denoising loop is run at inference time. "eager" runs it in Python,
+            "compile" runs the U-Net through `torch.compile`, and "cuda_graph" captures the whole loop as a
+            CUDA graph with static input buffers and replays it (falls back to "eager" on other devices).
+        cache_image_features: Whether `select_action` keeps the encoded features of the observations in its
+            queue so that each frame goes through the vision backbone only once, instead of re-encoding the
+            whole `n_obs_steps` window every time a chunk is generated.
         do_mask_loss_for_padding: Whether to mask the loss when there are copy-padded actions. See
             `LeRobotDataset` and `load_previous_and_future_frames` for more information. Note, this defaults
             to False as the original Diffusion Policy implementation does the same.
@@ -147,6 +158,9 @@ class DiffusionConfig(PreTrainedConfig):
 
     # Inference
     num_inference_steps: int | None = None
+    inference_noise_scheduler_type: str | None = None
+    denoise_loop_backend: str = "eager"
+    cache_image_features: bool = False
 
     # Loss computation
     do_mask_loss_for_padding: bool = False
@@ -173,12 +187,26 @@ class DiffusionConfig(PreTrainedConfig):
             raise ValueError(
                 f"`prediction_type` must be one of {supported_prediction_types}. Got {self.prediction_type}."
             )
-        supported_noise_schedulers = ["DDPM", "DDIM"]
+        supported_noise_schedulers = ["DDPM", "DDIM", "DPMSolver++", "UniPC"]
         if self.noise_scheduler_type not in supported_noise_schedulers:
             raise ValueError(
                 f"`noise_scheduler_type` must be one of {supported_noise_schedulers}. "
                 f"Got {self.noise_scheduler_type}."
             )
+        if (
+            self.inference_noise_scheduler_type is not None
+            and self.inference_noise_scheduler_type not in supported_noise_schedulers
+        ):
+            raise ValueError(
+                f"`inference_noise_scheduler_type` must be one of {supported_noise_schedulers}. "
+                f"Got {self.inference_noise_scheduler_type}."
+            )
+        supported_denoise_loop_backends = ["eager", "compile", "cuda_graph"]
+        if self.denoise_loop_backend not in supported_denoise_loop_backends:
+            raise ValueError(
+                f"`denoise_loop_backend` must be one of {supported_denoise_loop_backends}. "
+                f"Got {self.denoise_loop_backend}."
+            )
 
         # Check that the horizon size and U-Net downsampling is compatible.
         # U-Net downsamples by 2 with each stage.
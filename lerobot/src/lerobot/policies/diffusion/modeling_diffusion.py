@@ -20,6 +20,8 @@ TODO(alexander-soare):
   - Remove reliance on diffusers for DDPMScheduler and LR scheduler.
 """
 
+import inspect
+import logging
 import math
 from collections import deque
 from collections.abc import Callable
@@ -31,6 +33,9 @@ import torch.nn.functional as F  # noqa: N812
 import torchvision
 from diffusers.schedulers.scheduling_ddim import DDIMScheduler
 from diffusers.schedulers.scheduling_ddpm import DDPMScheduler
+from diffusers.schedulers.scheduling_dpmsolver_multistep import DPMSolverMultistepScheduler
+from diffusers.schedulers.scheduling_unipc_multistep import UniPCMultistepScheduler
+from diffusers.schedulers.scheduling_utils import SchedulerMixin
 from torch import Tensor, nn
 
 from lerobot.policies.diffusion.configuration_diffusion import DiffusionConfig
@@ -41,7 +46,7 @@ from lerobot.policies.utils import (
     get_output_shape,
     populate_queues,
 )
-from lerobot.utils.constants import ACTION, OBS_ENV_STATE, OBS_IMAGES, OBS_STATE
+from lerobot.utils.constants import ACTION, OBS_ENV_STATE, OBS_IMAGE_FEATURES, OBS_IMAGES, OBS_STATE
 
 
 class DiffusionPolicy(PreTrainedPolicy):
@@ -87,14 +92,38 @@ class DiffusionPolicy(PreTrainedPolicy):
         }
         if self.config.image_features:
             self._queues[OBS_IMAGES] = deque(maxlen=self.config.n_obs_steps)
+            if self.config.cache_image_features:
+                # Per-frame image features, aligned with the image queue and filled lazily (see
+                # `_encode_new_images`).
+                self._queues[OBS_IMAGE_FEATURES] = deque(maxlen=self.config.n_obs_steps)
         if self.config.env_state_feature:
             self._queues[OBS_ENV_STATE] = deque(maxlen=self.config.n_obs_steps)
 
+    def _encode_new_images(self) -> None:
+        """Encode the queued frames which don't have cached features yet.
+
+        Each frame is encoded at most once while it stays in the `n_obs_steps` window, and frames which
+        leave the window before the next chunk is generated are never encoded.
+        """
+        images = self._queues[OBS_IMAGES]
+        features = self._queues[OBS_IMAGE_FEATURES]
+        missing = [i for i, feat in enumerate(features) if feat is None]
+        if not missing:
+            return
+        new_features = self.diffusion.encode_images(torch.stack([images[i] for i in missing], dim=1))
+        for j, i in enumerate(missing):
+            features[i] = new_features[:, j]
+
     @torch.no_grad()
     def predict_action_chunk(self, batch: dict[str, Tensor], noise: Tensor | None = None) -> Tensor:
         """Predict a chunk of actions given environment observations."""
+        keys = [k for k in batch if k in self._queues]
+        if OBS_IMAGE_FEATURES in self._queues:
+            # Condition on the cached image features instead of re-encoding the raw images.
+            self._encode_new_images()
+            keys = [k for k in keys if k not in (OBS_IMAGES, OBS_IMAGE_FEATURES)] + [OBS_IMAGE_FEATURES]
         # stack n latest observations from the queue
-        batch = {k: torch.stack(list(self._queues[k]), dim=1) for k in batch if k in self._queues}
+        batch = {k: torch.stack(list(self._queues[k]), dim=1) for k in keys}
         actions = self.diffusion.generate_actions(batch, noise=noise)
 
         return actions
@@ -128,6 +157,9 @@ class DiffusionPolicy(PreTrainedPolicy):
         if self.config.image_features:
             batch = dict(batch)  # shallow copy so that adding a key doesn't modify the original
             batch[OBS_IMAGES] = torch.stack([batch[key] for key in self.config.image_features], dim=-4)
+            if self.config.cache_image_features:
+                # Placeholder, the features of this frame are computed when the next chunk is generated.
+                batch[OBS_IMAGE_FEATURES] = None
         # NOTE: It's important that this happens after stacking the images into a single key.
         self._queues = populate_queues(self._queues, batch)
 
@@ -148,17 +180,85 @@ class DiffusionPolicy(PreTrainedPolicy):
         return loss, None
 
 
-def _make_noise_scheduler(name: str, **kwargs: dict) -> DDPMScheduler | DDIMScheduler:
+NOISE_SCHEDULERS = {
+    "DDPM": DDPMScheduler,
+    "DDIM": DDIMScheduler,
+    "DPMSolver++": DPMSolverMultistepScheduler,
+    "UniPC": UniPCMultistepScheduler,
+}
+
+
+def _make_noise_scheduler(name: str, **kwargs: dict) -> SchedulerMixin:
     """
-    Factory for noise scheduler instances of the requested type. All kwargs are passed
-    to the scheduler.
+    Factory for noise scheduler instances of the requested type. The kwargs which the scheduler accepts are
+    passed to it. The multistep solvers don't support `clip_sample`, so they use their dynamic thresholding of
+    the predicted clean sample instead: it is clamped to [-s, s] and divided by s, where s is a per-sample
+    quantile of its magnitude clamped to [1, `clip_sample_range`]. This only matches clipping for
+    `clip_sample_range == 1` (the default); larger ranges rescale the sample instead of clipping it.
     """
-    if name == "DDPM":
-        return DDPMScheduler(**kwargs)
-    elif name == "DDIM":
-        return DDIMScheduler(**kwargs)
-    else:
+    if name not in NOISE_SCHEDULERS:
         raise ValueError(f"Unsupported noise scheduler type {name}")
+    scheduler_cls = NOISE_SCHEDULERS[name]
+    accepted_kwargs = inspect.signature(scheduler_cls.__init__).parameters
+    if "clip_sample" not in accepted_kwargs and "thresholding" in accepted_kwargs:
+        kwargs = {
+            **kwargs,
+            "thresholding": kwargs.get("clip_sample", False),
+            "sample_max_value": kwargs.get("clip_sample_range", 1.0),
+        }
+    return scheduler_cls(**{k: v for k, v in kwargs.items() if k in accepted_kwargs})
+
+
+class _CUDAGraphDenoiser:
+    """The denoising loop of `DiffusionModel`, captured once as a CUDA graph and replayed.
+
+    The noise and the global conditioning are copied into static input buffers before each replay, so the
+    whole loop (U-Net calls and scheduler steps) runs without any Python overhead nor allocation.
+    """
+
+    def __init__(self, model: "DiffusionModel", sample: Tensor, global_cond: Tensor | None):
+        self.model = model
+        self.key = self._make_key(model, sample, global_cond)
+        self.static_sample = sample.clone()
+        self.static_global_cond = global_cond.clone() if global_cond is not None else None
+        model.inference_noise_scheduler.set_timesteps(model.num_inference_steps)
+        self.timestep_batches = [
+            torch.full(sample.shape[:1], t, dtype=torch.long, device=sample.device)
+            for t in model.inference_noise_scheduler.timesteps
+        ]
+
+        # Warm up on a side stream before capturing, as recommended by the PyTorch docs.
+        side_stream = torch.cuda.Stream()
+        side_stream.wait_stream(torch.cuda.current_stream())
+        with torch.cuda.stream(side_stream):
+            for _ in range(2):
+                self._denoise()
+        torch.cuda.current_stream().wait_stream(side_stream)
+
+        self.graph = torch.cuda.CUDAGraph()
+        with torch.cuda.graph(self.graph):
+            self.static_output = self._denoise()
+
+    def _denoise(self) -> Tensor:
+        return self.model.denoise(
+            self.static_sample, self.static_global_cond, timestep_batches=self.timestep_batches
+        )
+
+    @staticmethod
+    def _make_key(model: "DiffusionModel", sample: Tensor, global_cond: Tensor | None) -> tuple:
+        cond_key = None if global_cond is None else (global_cond.shape, global_cond.dtype, global_cond.device)
+        return (model.num_inference_steps, sample.shape, sample.dtype, sample.device, cond_key)
+
+    def matches(self, sample: Tensor, global_cond: Tensor | None) -> bool:
+        """Whether the captured graph can be replayed for these inputs and the current number of steps."""
+        return self._make_key(self.model, sample, global_cond) == self.key
+
+    def __call__(self, sample: Tensor, global_cond: Tensor | None) -> Tensor:
+        self.static_sample.copy_(sample)
+        if global_cond is not None:
+            self.static_global_cond.copy_(global_cond)
+        self.graph.replay()
+        return self.static_output.clone()
 
 
 class DiffusionModel(nn.Module):
@@ -182,15 +282,25 @@ class DiffusionModel(nn.Module):
 
         self.unet = DiffusionConditionalUnet1d(config, global_cond_dim=global_cond_dim * config.n_obs_steps)
 
-        self.noise_scheduler = _make_noise_scheduler(
-            config.noise_scheduler_type,
-            num_train_timesteps=config.num_train_timesteps,
-            beta_start=config.beta_start,
-            beta_end=config.beta_end,
-            beta_schedule=config.beta_schedule,
-            clip_sample=config.clip_sample,
-            clip_sample_range=config.clip_sample_range,
-            prediction_type=config.prediction_type,
+        scheduler_kwargs = {
+            "num_train_timesteps": config.num_train_timesteps,
+            "beta_start": config.beta_start,
+            "beta_end": config.beta_end,
+            "beta_schedule": config.beta_schedule,
+            "clip_sample": config.clip_sample,
+            "clip_sample_range": config.clip_sample_range,
+            "prediction_type": config.prediction_type,
+        }
+        self.noise_scheduler = _make_noise_scheduler(config.noise_scheduler_type, **scheduler_kwargs)
+        # The reverse process can use a different (e.g. few-step) scheduler than the one used for training.
+        if config.inference_noise_scheduler_type in (None, config.noise_scheduler_type):
+            self.inference_noise_scheduler = self.noise_scheduler
+        else:
+            self.inference_noise_scheduler = _make_noise_scheduler(
+                config.inference_noise_scheduler_type, **scheduler_kwargs
+            )
+        self._step_accepts_generator = (
+            "generator" in inspect.signature(self.inference_noise_scheduler.step).parameters
         )
 
         if config.num_inference_steps is None:
@@ -198,6 +308,10 @@ class DiffusionModel(nn.Module):
         else:
             self.num_inference_steps = config.num_inference_steps
 
+        # Lazily built by `conditional_sample` depending on `config.denoise_loop_backend`.
+        self._compiled_unet_forward = None
+        self._cuda_graph_denoiser = None
+
     # ========= inference  ============
     def conditional_sample(
         self,
@@ -221,51 +335,95 @@ class DiffusionModel(nn.Module):
             )
         )
 
-        self.noise_scheduler.set_timesteps(self.num_inference_steps)
+        if self.config.denoise_loop_backend == "cuda_graph" and generator is None:
+            if sample.device.type == "cuda":
+                return self._cuda_graph_denoise(sample, global_cond)
+            logging.warning("`denoise_loop_backend='cuda_graph'` requires a CUDA device, running eagerly.")
 
-        for t in self.noise_scheduler.timesteps:
-            # Predict model output.
-            model_output = self.unet(
-                sample,
-                torch.full(sample.shape[:1], t, dtype=torch.long, device=sample.device),
-                global_cond=global_cond,
+        return self.denoise(sample, global_cond, generator=generator)
+
+    def denoise(
+        self,
+        sample: Tensor,
+        global_cond: Tensor | None = None,
+        generator: torch.Generator | None = None,
+        timestep_batches: list[Tensor] | None = None,
+    ) -> Tensor:
+        """Run the reverse diffusion process starting from the noisy `sample`.
+
+        Args:
+            sample: (B, horizon, action_dim) initial noise.
+            global_cond: (B, global_cond_dim) conditioning vector.
+            generator: Optional random generator used by stochastic schedulers.
+            timestep_batches: Optional preallocated (B,) timestep tensors, one per inference step.
+        """
+        scheduler = self.inference_noise_scheduler
+        scheduler.set_timesteps(self.num_inference_steps)
+        step_kwargs = {"generator": generator} if self._step_accepts_generator else {}
+
+        unet_forward = self.unet
+        if self.config.denoise_loop_backend == "compile":
+            if self._compiled_unet_forward is None:
+                self._compiled_unet_forward = torch.compile(self.unet.forward, dynamic=False)
+            unet_forward = self._compiled_unet_forward
+
+        for i, t in enumerate(scheduler.timesteps):
+            timestep = (
+                timestep_batches[i]
+                if timestep_batches is not None
+                else torch.full(sample.shape[:1], t, dtype=torch.long, device=sample.device)
             )
+            # Predict model output.
+            model_output = unet_forward(sample, timestep, global_cond=global_cond)
             # Compute previous image: x_t -> x_t-1
-            sample = self.noise_scheduler.step(model_output, t, sample, generator=generator).prev_sample
+            sample = scheduler.step(model_output, t, sample, **step_kwargs).prev_sample
 
         return sample
 
+    def _cuda_graph_denoise(self, sample: Tensor, global_cond: Tensor | None) -> Tensor:
+        """Run the denoising loop as a CUDA graph, (re)capturing it when the input shapes change."""
+        if self._cuda_graph_denoiser is None or not self._cuda_graph_denoiser.matches(sample, global_cond):
+            self._cuda_graph_denoiser = _CUDAGraphDenoiser(self, sample, global_cond)
+        return self._cuda_graph_denoiser(sample, global_cond)
+
+    def encode_images(self, images: Tensor) -> Tensor:
+        """Encode images of shape (B, S, N, C, H, W) into per-step features of shape (B, S, N * feature_dim).
+
+        The features of the N cameras are concatenated along the feature dimension.
+        """
+        batch_size, n_steps = images.shape[:2]
+        if self.config.use_separate_rgb_encoder_per_camera:
+            # Combine batch and sequence dims while rearranging to make the camera index dimension first.
+            images_per_camera = einops.rearrange(images, "b s n ... -> n (b s) ...")
+            img_features_list = torch.cat(
+                [
+                    encoder(cam_images)
+                    for encoder, cam_images in zip(self.rgb_encoder, images_per_camera, strict=True)
+                ]
+            )
+            # Separate batch and sequence dims back out. The camera index dim gets absorbed into the
+            # feature dim (effectively concatenating the camera features).
+            return einops.rearrange(img_features_list, "(n b s) ... -> b s (n ...)", b=batch_size, s=n_steps)
+
+        # Combine batch, sequence, and "which camera" dims before passing to shared encoder.
+        img_features = self.rgb_encoder(einops.rearrange(images, "b s n ... -> (b s n) ..."))
+        # Separate batch dim and sequence dim back out. The camera index dim gets absorbed into the
+        # feature dim (effectively concatenating the camera features).
+        return einops.rearrange(img_features, "(b s n) ... -> b s (n ...)", b=batch_size, s=n_steps)
+
     def _prepare_global_conditioning(self, batch: dict[str, Tensor]) -> Tensor:
-        """Encode image features and concatenate them all together along with the state vector."""
-        batch_size, n_obs_steps = batch[OBS_STATE].shape[:2]
+        """Encode image features and concatenate them all together along with the state vector.
+
+        If `batch` already holds the encoded image features under "observation.image_features", they are
+        used as is and the images are not encoded again.
+        """
         global_cond_feats = [batch[OBS_STATE]]
         # Extract image features.
         if self.config.image_features:
-            if self.config.use_separate_rgb_encoder_per_camera:
-                # Combine batch and sequence dims while rearranging to make the camera index dimension first.
-                images_per_camera = einops.rearrange(batch[OBS_IMAGES], "b s n ... -> n (b s) ...")
-                img_features_list = torch.cat(
-                    [
-                        encoder(images)
-                        for encoder, images in zip(self.rgb_encoder, images_per_camera, strict=True)
-                    ]
-                )
-                # Separate batch and sequence dims back out. The camera index dim gets absorbed into the
-                # feature dim (effectively concatenating the camera features).
-                img_features = einops.rearrange(
-                    img_features_list, "(n b s) ... -> b s (n ...)", b=batch_size, s=n_obs_steps
-                )
+            if OBS_IMAGE_FEATURES in batch:
+                global_cond_feats.append(batch[OBS_IMAGE_FEATURES])
             else:
-                # Combine batch, sequence, and "which camera" dims before passing to shared encoder.
-                img_features = self.rgb_encoder(
-                    einops.rearrange(batch[OBS_IMAGES], "b s n ... -> (b s n) ...")
-                )
-                # Separate batch dim and sequence dim back out. The camera index dim gets absorbed into the
-                # feature dim (effectively concatenating the camera features).
-                img_features = einops.rearrange(
-                    img_features, "(b s n) ... -> b s (n ...)", b=batch_size, s=n_obs_steps
-                )
-            global_cond_feats.append(img_features)
+                global_cond_feats.append(self.encode_images(batch[OBS_IMAGES]))
 
         if self.config.env_state_feature:
             global_cond_feats.append(batch[OBS_ENV_STATE])
@@ -280,6 +438,7 @@ class DiffusionModel(nn.Module):
             "observation.state": (B, n_obs_steps, state_dim)
 
             "observation.images": (B, n_obs_steps, num_cameras, C, H, W)
+                OR "observation.image_features": (B, n_obs_steps, num_cameras * feature_dim)
                 AND/OR
             "observation.environment_state": (B, n_obs_steps, environment_dim)
         }
@@ -14,8 +14,22 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from .configuration_groot import GrootConfig
-from .modeling_groot import GrootPolicy
-from .processor_groot import make_groot_pre_post_processors
+from typing import TYPE_CHECKING
+
+from lerobot.utils.import_utils import make_lazy_getattr
+
+__getattr__ = make_lazy_getattr(
+    __name__,
+    {
+        "GrootConfig": ".configuration_groot",
+        "GrootPolicy": ".modeling_groot",
+        "make_groot_pre_post_processors": ".processor_groot",
+    },
+)
+
+if TYPE_CHECKING:
+    from .configuration_groot import GrootConfig
+    from .modeling_groot import GrootPolicy
+    from .processor_groot import make_groot_pre_post_processors
 
 __all__ = ["GrootConfig", "GrootPolicy", "make_groot_pre_post_processors"]
@@ -14,8 +14,22 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from .configuration_pi0 import PI0Config
-from .modeling_pi0 import PI0Policy
-from .processor_pi0 import make_pi0_pre_post_processors
+from typing import TYPE_CHECKING
+
+from lerobot.utils.import_utils import make_lazy_getattr
+
+__getattr__ = make_lazy_getattr(
+    __name__,
+    {
+        "PI0Config": ".configuration_pi0",
+        "PI0Policy": ".modeling_pi0",
+        "make_pi0_pre_post_processors": ".processor_pi0",
+    },
+)
+
+if TYPE_CHECKING:
+    from .configuration_pi0 import PI0Config
+    from .modeling_pi0 import PI0Policy
+    from .processor_pi0 import make_pi0_pre_post_processors
 
 __all__ = ["PI0Config", "PI0Policy", "make_pi0_pre_post_processors"]
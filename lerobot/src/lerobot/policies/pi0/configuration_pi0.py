@@ -49,6 +49,9 @@ class PI0Config(PreTrainedConfig):
     time_sampling_offset: float = 0.001
     min_period: float = 4e-3
     max_period: float = 4.0
+    # At inference, drop the padding shared by the language tokens of the batch and reuse their embeddings
+    # across calls while the tokenized task is unchanged (see `LanguageEmbeddingCache`)
+    cache_language_embeddings: bool = False
 
     # Real-Time Chunking (RTC) configuration
     rtc_config: RTCConfig | None = None
@@ -74,6 +77,9 @@ class PI0Config(PreTrainedConfig):
     gradient_checkpointing: bool = False  # Enable gradient checkpointing for memory optimization
     compile_model: bool = False  # Whether to use torch.compile for model optimization
     compile_mode: str = "max-autotune"  # Torch compile mode
+    # Compile the denoising step with static shapes (replayed as a CUDA graph on GPU). Ignored with compile_model
+    compile_denoise_step: bool = False
+    attention_implementation: str = "eager"  # Attention used at inference: "eager" or "sdpa"
     device: str | None = None  # Device to use for the model (None = auto-detect)
 
     # Finetuning settings
@@ -114,6 +120,9 @@ class PI0Config(PreTrainedConfig):
         if self.dtype not in ["bfloat16", "float32"]:
             raise ValueError(f"Invalid dtype: {self.dtype}")
 
+        if self.attention_implementation not in ["eager", "sdpa"]:
+            raise ValueError(f"Invalid attention_implementation: {self.attention_implementation}")
+
     def validate_features(self) -> None:
         """Validate and set up input/output features."""
         for i in range(self.empty_cameras):
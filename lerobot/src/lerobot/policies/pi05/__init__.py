@@ -14,8 +14,22 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from .configuration_pi05 import PI05Config
-from .modeling_pi05 import PI05Policy
-from .processor_pi05 import make_pi05_pre_post_processors
+from typing import TYPE_CHECKING
+
+from lerobot.utils.import_utils import make_lazy_getattr
+
+__getattr__ = make_lazy_getattr(
+    __name__,
+    {
+        "PI05Config": ".configuration_pi05",
+        "PI05Policy": ".modeling_pi05",
+        "make_pi05_pre_post_processors": ".processor_pi05",
+    },
+)
+
+if TYPE_CHECKING:
+    from .configuration_pi05 import PI05Config
+    from .modeling_pi05 import PI05Policy
+    from .processor_pi05 import make_pi05_pre_post_processors
 
 __all__ = ["PI05Config", "PI05Policy", "make_pi05_pre_post_processors"]
@@ -44,6 +44,7 @@ from lerobot.configs.policies import PreTrainedConfig
 from lerobot.policies.pi05.configuration_pi05 import DEFAULT_IMAGE_SIZE, PI05Config
 from lerobot.policies.pretrained import PreTrainedPolicy, T
 from lerobot.policies.rtc.modeling_rtc import RTCProcessor
+from lerobot.policies.utils import LanguageEmbeddingCache
 from lerobot.utils.constants import (
     ACTION,
     OBS_LANGUAGE_ATTENTION_MASK,
@@ -538,6 +539,7 @@ class PI05Pytorch(nn.Module):  # see openpi `PI0Pytorch`
         super().__init__()
         self.config = config
         self.rtc_processor = rtc_processor
+        self.language_cache = LanguageEmbeddingCache()
 
         paligemma_config = get_gemma_config(config.paligemma_variant)
         action_expert_config = get_gemma_config(config.action_expert_variant)
@@ -565,6 +567,7 @@ class PI05Pytorch(nn.Module):  # see openpi `PI0Pytorch`
 
         # Initialize gradient checkpointing flag
         self.gradient_checkpointing_enabled = False
+        self._compiled_denoise_step = None
 
         # Compile model if requested
         if config.compile_model:
@@ -572,6 +575,12 @@ class PI05Pytorch(nn.Module):  # see openpi `PI0Pytorch`
             self.sample_actions = torch.compile(self.sample_actions, mode=config.compile_mode)
             # Also compile the main forward pass used during training
             self.forward = torch.compile(self.forward, mode=config.compile_mode)
+        elif config.compile_denoise_step:
+            # Every denoising step has the same shapes, so it can be compiled once with static shapes.
+            # "reduce-overhead" replays it as a CUDA graph on GPU.
+            self._compiled_denoise_step = torch.compile(
+                self.denoise_step, mode="reduce-overhead", dynamic=False
+            )
 
         msg = """An incorrect transformer version is used, please create an issue on https://github.com/huggingface/lerobot/issues"""
 
@@ -658,7 +667,10 @@ class PI05Pytorch(nn.Module):  # see openpi `PI0Pytorch`
             lang_emb_dim = lang_emb.shape[-1]
             return lang_emb * math.sqrt(lang_emb_dim)
 
-        lang_emb = self._apply_checkpoint(lang_embed_func, tokens)
+        if self.config.cache_language_embeddings and not self.training:
+            lang_emb, masks = self.language_cache.get(tokens, masks, lang_embed_func)
+        else:
+            lang_emb = self._apply_checkpoint(lang_embed_func, tokens)
         embs.append(lang_emb)
         pad_masks.append(masks)
 
@@ -677,8 +689,6 @@ class PI05Pytorch(nn.Module):  # see openpi `PI0Pytorch`
     def embed_suffix(self, noisy_actions, timestep):
         """Embed noisy_actions, timestep to prepare for Expert Gemma processing."""
         embs = []
-        pad_masks = []
-        att_masks = []
 
         # Embed timestep using sine-cosine positional encoding
         time_emb = create_sinusoidal_pos_embedding(
@@ -707,20 +717,24 @@ class PI05Pytorch(nn.Module):  # see openpi `PI0Pytorch`
         adarms_cond = time_emb
 
         embs.append(action_time_emb)
-        bsize, action_time_dim = action_time_emb.shape[:2]
-        action_time_mask = torch.ones(bsize, action_time_dim, dtype=torch.bool, device=timestep.device)
-        pad_masks.append(action_time_mask)
-
-        # Set attention masks so that image, language and state inputs do not attend to action tokens
-        att_masks += [1] + ([0] * (self.config.chunk_size - 1))
-
         embs = torch.cat(embs, dim=1)
-        pad_masks = torch.cat(pad_masks, dim=1)
-        att_masks = torch.tensor(att_masks, dtype=embs.dtype, device=embs.device)
-        att_masks = att_masks[None, :].expand(bsize, len(att_masks))
+        pad_masks, att_masks = self.make_suffix_masks(embs.shape[0], embs.device)
+        att_masks = att_masks.to(dtype=embs.dtype)
 
         return embs, pad_masks, att_masks, adarms_cond
 
+    def make_suffix_masks(self, bsize, device) -> tuple[torch.Tensor, torch.Tensor]:
+        """Padding and attention masks of the suffix: `chunk_size` action tokens."""
+        suffix_len = self.config.chunk_size
+        pad_masks = torch.ones(bsize, suffix_len, dtype=torch.bool, device=device)
+
+        # Set attention masks so that image, language and state inputs do not attend to action tokens
+        att_masks = [1] + ([0] * (self.config.chunk_size - 1))
+        att_masks = torch.tensor(att_masks, dtype=torch.bool, device=device)
+        att_masks = att_masks[None, :].expand(bsize, suffix_len)
+
+        return pad_masks, att_masks
+
     def forward(self, images, img_masks, tokens, masks, actions, noise=None, time=None) -> Tensor:
         """Do a full training forward pass and compute the loss."""
         if noise is None:
@@ -808,7 +822,12 @@ class PI05Pytorch(nn.Module):  # see openpi `PI0Pytorch`
         prefix_position_ids = torch.cumsum(prefix_pad_masks, dim=1) - 1
 
         prefix_att_2d_masks_4d = self._prepare_attention_masks_4d(prefix_att_2d_masks)
-        self.paligemma_with_expert.paligemma.language_model.config._attn_implementation = "eager"  # noqa: SLF001
+        self.paligemma_with_expert.paligemma.language_model.config._attn_implementation = (  # noqa: SLF001
+            self.config.attention_implementation
+        )
+        self.paligemma_with_expert.gemma_expert.model.config._attn_implementation = (  # noqa: SLF001
+            self.config.attention_implementation
+        )
 
         _, past_key_values = self.paligemma_with_expert.forward(
             attention_mask=prefix_att_2d_masks_4d,
@@ -818,19 +837,28 @@ class PI05Pytorch(nn.Module):  # see openpi `PI0Pytorch`
             use_cache=True,
         )
 
+        # The suffix attention mask, its position ids and the timesteps are the same for every step, so they
+        # are built once per chunk instead of once per step.
+        suffix_attention = self.prepare_suffix_attention(prefix_pad_masks)
         dt = -1.0 / num_steps
+        timesteps = (1.0 + dt * torch.arange(num_steps, dtype=torch.float64)).to(torch.float32).to(device)
+
+        # RTC differentiates through the denoising step, which the CUDA graphs don't support.
+        use_compiled_step = self._compiled_denoise_step is not None and not self._rtc_enabled()
+        denoise_step = self._compiled_denoise_step if use_compiled_step else self.denoise_step
 
         x_t = noise
         for step in range(num_steps):
             time = 1.0 + step * dt
-            time_tensor = torch.tensor(time, dtype=torch.float32, device=device).expand(bsize)
+            time_tensor = timesteps[step].expand(bsize)
 
             def denoise_step_partial_call(input_x_t, current_timestep=time_tensor):
-                return self.denoise_step(
+                return denoise_step(
                     prefix_pad_masks=prefix_pad_masks,
                     past_key_values=past_key_values,
                     x_t=input_x_t,
                     timestep=current_timestep,
+                    suffix_attention=suffix_attention,
                 )
 
             if self._rtc_enabled():
@@ -849,6 +877,10 @@ class PI05Pytorch(nn.Module):  # see openpi `PI0Pytorch`
             else:
                 v_t = denoise_step_partial_call(x_t)
 
+            if use_compiled_step:
+                # The output buffer of the CUDA graph is overwritten by the next replay.
+                v_t = v_t.clone()
+
             x_t = x_t + dt * v_t
 
             if self.rtc_processor is not None and self.rtc_processor.is_debug_enabled():
@@ -856,19 +888,11 @@ class PI05Pytorch(nn.Module):  # see openpi `PI0Pytorch`
 
         return x_t
 
-    def denoise_step(
-        self,
-        prefix_pad_masks,
-        past_key_values,
-        x_t,
-        timestep,
-    ):
-        """Apply one denoising step of the noise `x_t` at a given timestep."""
-        suffix_embs, suffix_pad_masks, suffix_att_masks, adarms_cond = self.embed_suffix(x_t, timestep)
-
+    def prepare_suffix_attention(self, prefix_pad_masks) -> tuple[torch.Tensor, torch.Tensor]:
+        """Build the 4D attention mask and the position ids of the suffix tokens attending to the prefix."""
+        batch_size, prefix_len = prefix_pad_masks.shape
+        suffix_pad_masks, suffix_att_masks = self.make_suffix_masks(batch_size, prefix_pad_masks.device)
         suffix_len = suffix_pad_masks.shape[1]
-        batch_size = prefix_pad_masks.shape[0]
-        prefix_len = prefix_pad_masks.shape[1]
 
         prefix_pad_2d_masks = prefix_pad_masks[:, None, :].expand(batch_size, suffix_len, prefix_len)
         suffix_att_2d_masks = make_att_2d_masks(suffix_pad_masks, suffix_att_masks)
@@ -877,8 +901,24 @@ class PI05Pytorch(nn.Module):  # see openpi `PI0Pytorch`
         prefix_offsets = torch.sum(prefix_pad_masks, dim=-1)[:, None]
         position_ids = prefix_offsets + torch.cumsum(suffix_pad_masks, dim=1) - 1
 
-        full_att_2d_masks_4d = self._prepare_attention_masks_4d(full_att_2d_masks)
-        self.paligemma_with_expert.gemma_expert.model.config._attn_implementation = "eager"  # noqa: SLF001
+        return self._prepare_attention_masks_4d(full_att_2d_masks), position_ids
+
+    def denoise_step(
+        self,
+        prefix_pad_masks,
+        past_key_values,
+        x_t,
+        timestep,
+        suffix_attention=None,
+    ):
+        """Apply one denoising step of the noise `x_t` at a given timestep.
+
+        `suffix_attention` is the output of `prepare_suffix_attention`, built here if not provided.
+        """
+        suffix_embs, _, _, adarms_cond = self.embed_suffix(x_t, timestep)
+        if suffix_attention is None:
+            suffix_attention = self.prepare_suffix_attention(prefix_pad_masks)
+        full_att_2d_masks_4d, position_ids = suffix_attention
 
         outputs_embeds, _ = self.paligemma_with_expert.forward(
             attention_mask=full_att_2d_masks_4d,
@@ -1111,6 +1151,7 @@ class PI05Policy(PreTrainedPolicy):
         self._queues = {
             ACTION: deque(maxlen=self.config.n_action_steps),
         }
+        self.model.language_cache.clear()
 
     def init_rtc_processor(self):
         """Initialize RTC processor if RTC is enabled in config."""
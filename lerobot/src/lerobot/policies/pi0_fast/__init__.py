@@ -14,8 +14,22 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from .configuration_pi0_fast import PI0FastConfig
-from .modeling_pi0_fast import PI0FastPolicy
-from .processor_pi0_fast import make_pi0_fast_pre_post_processors
+from typing import TYPE_CHECKING
+
+from lerobot.utils.import_utils import make_lazy_getattr
+
+__getattr__ = make_lazy_getattr(
+    __name__,
+    {
+        "PI0FastConfig": ".configuration_pi0_fast",
+        "PI0FastPolicy": ".modeling_pi0_fast",
+        "make_pi0_fast_pre_post_processors": ".processor_pi0_fast",
+    },
+)
+
+if TYPE_CHECKING:
+    from .configuration_pi0_fast import PI0FastConfig
+    from .modeling_pi0_fast import PI0FastPolicy
+    from .processor_pi0_fast import make_pi0_fast_pre_post_processors
 
 __all__ = ["PI0FastConfig", "PI0FastPolicy", "make_pi0_fast_pre_post_processors"]
@@ -35,6 +35,13 @@ Usage:
         --reward-model-path pepijn223/sarm_single_uni4 \\
         --stride 5
 
+    # Larger inference batches with more decoding workers (an interrupted run resumes automatically)
+    python src/lerobot/policies/sarm/compute_rabc_weights.py \\
+        --dataset-repo-id lerobot/aloha_sim_insertion_human \\
+        --reward-model-path pepijn223/sarm_single_uni4 \\
+        --batch-size 64 \\
+        --num-workers 8
+
     # Visualize predictions only (no RA-BC computation)
     python src/lerobot/policies/sarm/compute_rabc_weights.py \\
         --dataset-repo-id lerobot/aloha_sim_insertion_human \\
@@ -43,10 +50,14 @@ Usage:
         --num-visualizations 5
 
 The output is saved to the dataset's local cache directory as 'sarm_progress.parquet'.
+While running, progress of completed episodes is written to 'sarm_progress.parts/' so that
+an interrupted run resumes where it stopped.
 """
 
 import argparse
 import logging
+import os
+import shutil
 from pathlib import Path
 
 import matplotlib.gridspec as gridspec
@@ -426,20 +437,115 @@ def visualize_sarm_predictions(
     logging.info(f"Visualizations saved to: {output_dir.absolute()}")
 
 
-def generate_all_frame_indices(ep_start: int, ep_end: int, frame_gap: int = 30) -> list[int]:
-    """Generate all frame indices, ordered by offset for cache-friendly access.
+class SARMQueryDataset(torch.utils.data.Dataset):
+    """Flat view over the query frames of many episodes.
 
-    Orders frames as: [0, 30, 60...], [1, 31, 61...], ..., [29, 59, 89...]
-    This groups frames that share similar temporal windows together.
+    Wrapping the queries in a map-style dataset lets a DataLoader prefetch and decode
+    frames with several workers across episode boundaries, so windows from many episodes
+    can be packed into one inference batch.
     """
-    num_frames = ep_end - ep_start
-    indices = []
-    for offset in range(frame_gap):
-        for frame_rel in range(offset, num_frames, frame_gap):
-            indices.append(ep_start + frame_rel)
+
+    def __init__(
+        self,
+        dataset: LeRobotDataset,
+        query_indices: np.ndarray,
+        episode_indices: np.ndarray,
+        image_key: str,
+        state_key: str,
+    ):
+        self.dataset = dataset
+        self.query_indices = query_indices
+        self.episode_indices = episode_indices
+        self.image_key = image_key
+        self.state_key = state_key
+
+    def __len__(self) -> int:
+        return len(self.query_indices)
+
+    def __getitem__(self, idx: int) -> dict:
+        query_idx = int(self.query_indices[idx])
+        sample = self.dataset[query_idx]
+        item = {
+            self.image_key: sample[self.image_key],
+            "task": sample.get("task", "perform the task"),
+            "index": query_idx,
+            "episode_index": int(self.episode_indices[idx]),
+        }
+        if self.state_key in sample:
+            item[self.state_key] = sample[self.state_key]
+        return item
+
+
+def get_episode_query_indices(ep_start: int, ep_end: int, stride: int = 1) -> np.ndarray:
+    """Return the frames of an episode to run SARM on.
+
+    With stride > 1, only every stride-th frame is queried; the last frame is always included
+    so that interpolation covers the end of the episode.
+    """
+    indices = np.arange(ep_start, ep_end, stride, dtype=np.int64)
+    if indices.size == 0 or indices[-1] != ep_end - 1:
+        indices = np.append(indices, ep_end - 1)
     return indices
 
 
+def split_batch_by_task(batch: dict) -> list[dict]:
+    """Split a collated batch into contiguous runs sharing the same task.
+
+    The SARM preprocessor encodes a single text embedding per call, so windows packed from
+    episodes with different tasks are sent through it in task-homogeneous chunks.
+    """
+    tasks = batch["task"]
+    runs = []
+    run_start = 0
+    for i in range(1, len(tasks) + 1):
+        if i == len(tasks) or tasks[i] != tasks[run_start]:
+            runs.append((run_start, i))
+            run_start = i
+    if len(runs) == 1:
+        return [batch]
+
+    chunks = []
+    for start, end in runs:
+        chunk = {}
+        for key, value in batch.items():
+            chunk[key] = value[start:end]
+        chunks.append(chunk)
+    return chunks
+
+
+def read_progress_parts(parts_dir: Path, run_metadata: dict[bytes, bytes]) -> pa.Table | None:
+    """Read the progress already written by a previous (interrupted) run.
+
+    Parts written with a different reward model, head mode or stride are stale and discarded.
+    """
+    part_files = sorted(parts_dir.glob("part-*.parquet")) if parts_dir.exists() else []
+    if not part_files:
+        return None
+
+    tables = []
+    for part_file in part_files:
+        table = pq.read_table(part_file)
+        part_metadata = table.schema.metadata or {}
+        if any(part_metadata.get(key) != value for key, value in run_metadata.items()):
+            logging.warning(f"Discarding progress parts in {parts_dir} computed with different settings")
+            shutil.rmtree(parts_dir)
+            return None
+        tables.append(table.replace_schema_metadata(None))
+    return pa.concat_tables(tables)
+
+
+def write_progress_part(parts_dir: Path, part_idx: int, rows: list[dict], run_metadata: dict) -> None:
+    """Atomically write the progress rows of completed episodes as a new parquet part."""
+    table_data = {key: np.concatenate([row[key] for row in rows]) for key in rows[0]}
+    table = pa.table(table_data).replace_schema_metadata(run_metadata)
+
+    parts_dir.mkdir(parents=True, exist_ok=True)
+    part_path = parts_dir / f"part-{part_idx:06d}.parquet"
+    tmp_path = part_path.with_suffix(".tmp")
+    pq.write_table(table, tmp_path)
+    os.replace(tmp_path, part_path)
+
+
 def interpolate_progress(
     computed_indices: np.ndarray,
     computed_values: np.ndarray,
@@ -460,6 +566,30 @@ def interpolate_progress(
     return out.astype(np.float32)
 
 
+def _episode_progress_rows(
+    ep_pending: dict, episode_idx: int, ep_start: int, ep_end: int, heads: list[str]
+) -> dict[str, np.ndarray]:
+    """Build the output columns of one episode, interpolating frames skipped by the stride."""
+    computed_indices = np.asarray(ep_pending["indices"])
+    order = np.argsort(computed_indices)
+    computed_indices = computed_indices[order]
+    all_frame_indices = np.arange(ep_start, ep_end, dtype=np.int64)
+
+    rows = {
+        "index": all_frame_indices,
+        "episode_index": np.full(len(all_frame_indices), episode_idx, dtype=np.int64),
+        "frame_index": all_frame_indices - ep_start,
+    }
+    for head in heads:
+        computed_values = np.asarray(ep_pending[head], dtype=np.float32)[order]
+        if len(computed_indices) == len(all_frame_indices):
+            progress = computed_values
+        else:
+            progress = interpolate_progress(computed_indices, computed_values, all_frame_indices)
+        rows[f"progress_{head}"] = progress.astype(np.float32)
+    return rows
+
+
 def compute_sarm_progress(
     dataset_repo_id: str,
     reward_model_path: str,
@@ -469,10 +599,19 @@ def compute_sarm_progress(
     num_visualizations: int = 5,
     output_dir: str = "./sarm_viz",
     stride: int = 1,
+    batch_size: int = 32,
+    num_workers: int = 4,
+    flush_every: int = 10,
+    resume: bool = True,
 ):
     """
     Compute SARM progress predictions for all frames in a dataset.
 
+    Query windows from all episodes are prefetched by a DataLoader and packed into batches for
+    inference. Progress of completed episodes is flushed to parquet parts next to the output
+    file, so an interrupted run resumes from the last flushed episode. The episodes whose
+    frames failed to be processed aren't flushed, so that they are retried by the next run.
+
     Args:
         dataset_repo_id: HuggingFace dataset repo ID or local path
         reward_model_path: Path to pretrained SARM model
@@ -482,6 +621,10 @@ def compute_sarm_progress(
         num_visualizations: Number of episodes to visualize (0 to skip)
         output_dir: Directory to save visualizations
         stride: Compute progress every N frames, interpolate the rest (default: 1 = every frame)
+        batch_size: Number of query windows per inference batch
+        num_workers: Number of DataLoader workers decoding frames
+        flush_every: Number of completed episodes buffered before writing a parquet part
+        resume: Reuse progress parts left by a previous interrupted run
     """
     dataset, reward_model, preprocess = load_sarm_resources(dataset_repo_id, reward_model_path, device)
 
@@ -494,183 +637,148 @@ def compute_sarm_progress(
 
     image_key = reward_model.config.image_key
     state_key = reward_model.config.state_key
-    frame_gap = reward_model.config.frame_gap
     num_episodes = dataset.num_episodes
     total_frames = dataset.num_frames
     logging.info(f"Processing {total_frames} frames across {num_episodes} episodes")
 
     # Determine which heads to compute
     dual_mode = reward_model.config.uses_dual_heads
-    compute_sparse = head_mode in ("sparse", "both") or not dual_mode
-    compute_dense = head_mode in ("dense", "both") and dual_mode
+    heads = []
+    if head_mode in ("sparse", "both") or not dual_mode:
+        heads.append("sparse")
+    if head_mode in ("dense", "both") and dual_mode:
+        heads.append("dense")
+
+    center_idx = reward_model.config.n_obs_steps // 2  # Center of bidirectional window
 
-    # Storage arrays
-    all_indices = []
-    all_episode_indices = []
-    all_frame_indices = []
-    all_progress_sparse = [] if compute_sparse else None
-    all_progress_dense = [] if compute_dense else None
+    # Determine output path and the directory holding incremental parts
+    output_path = Path(dataset.root) / "sarm_progress.parquet" if output_path is None else Path(output_path)
+    parts_dir = output_path.with_name(f"{output_path.stem}.parts")
+    run_metadata = {
+        b"reward_model_path": reward_model_path.encode(),
+        b"head_mode": head_mode.encode(),
+        b"stride": str(stride).encode(),
+    }
+
+    if not resume and parts_dir.exists():
+        shutil.rmtree(parts_dir)
+    done_table = read_progress_parts(parts_dir, run_metadata) if resume else None
+    done_episodes = set()
+    num_parts = 0
+    if done_table is not None:
+        done_episodes = set(np.unique(done_table["episode_index"].to_numpy()).tolist())
+        num_parts = len(list(parts_dir.glob("part-*.parquet")))
+        logging.info(f"Resuming: {len(done_episodes)}/{num_episodes} episodes already computed")
 
     if stride > 1:
         logging.info(f"Using stride={stride}: computing every {stride} frames, interpolating the rest")
 
-    # Process all episodes
-    for episode_idx in tqdm(range(num_episodes), desc="Episodes"):
+    # Plan the query frames of every remaining episode up front
+    episode_bounds = {}
+    query_indices = []
+    query_episodes = []
+    for episode_idx in range(num_episodes):
+        if episode_idx in done_episodes:
+            continue
         ep = dataset.meta.episodes[episode_idx]
-        ep_start = ep["dataset_from_index"]
-        ep_end = ep["dataset_to_index"]
-
-        # Get task description
-        task = dataset[ep_start].get("task", "perform the task")
-
-        # Generate frames to compute (with stride applied)
-        all_ep_indices = generate_all_frame_indices(ep_start, ep_end, frame_gap)
-        if stride > 1:
-            # Only compute every stride-th frame (relative to episode start)
-            compute_indices = [idx for idx in all_ep_indices if (idx - ep_start) % stride == 0]
-            # Always include last frame for better interpolation at episode end
-            last_frame = ep_end - 1
-            if last_frame not in compute_indices:
-                compute_indices.append(last_frame)
-            compute_indices = sorted(set(compute_indices))
-        else:
-            compute_indices = all_ep_indices
-
-        center_idx = reward_model.config.n_obs_steps // 2  # Center of bidirectional window
-
-        # Dictionary to collect results
-        frame_results = {}
-
-        for query_idx in tqdm(compute_indices, desc=f"  Ep {episode_idx}", leave=False):
-            try:
-                sample = dataset[query_idx]
-
-                batch = {
-                    image_key: sample[image_key],
-                    "task": task,
-                    "index": query_idx,
-                    "episode_index": episode_idx,
-                }
-                if state_key in sample:
-                    batch[state_key] = sample[state_key]
-
-                with torch.no_grad():
-                    processed = preprocess(batch)
-                    video_features = processed["video_features"].to(device)
-                    text_features = processed["text_features"].to(device)
-                    state_features = processed.get("state_features")
-                    if state_features is not None:
-                        state_features = state_features.to(device)
-                    lengths = processed.get("lengths")
-
-                    sparse_val = np.nan
-                    dense_val = np.nan
-
-                    # Compute sparse prediction for center frame
-                    if compute_sparse:
-                        sparse_progress = reward_model.calculate_rewards(
-                            text_embeddings=text_features,
-                            video_embeddings=video_features,
-                            state_features=state_features,
-                            lengths=lengths,
-                            return_all_frames=True,
-                            head_mode="sparse",
-                        )
-                        sparse_val = float(
-                            sparse_progress[0, center_idx]
-                            if sparse_progress.ndim == 2
-                            else sparse_progress[center_idx]
-                        )
-
-                    # Compute dense prediction for center frame
-                    if compute_dense:
-                        dense_progress = reward_model.calculate_rewards(
-                            text_embeddings=text_features,
-                            video_embeddings=video_features,
-                            state_features=state_features,
-                            lengths=lengths,
-                            return_all_frames=True,
-                            head_mode="dense",
-                        )
-                        dense_val = float(
-                            dense_progress[0, center_idx]
-                            if dense_progress.ndim == 2
-                            else dense_progress[center_idx]
-                        )
-
-                    frame_results[query_idx] = (sparse_val, dense_val)
-
-            except Exception as e:
-                logging.warning(f"Failed to process frame {query_idx}: {e}")
-
-        # Interpolate to get values for all frames
-        computed_indices = np.array(sorted(frame_results.keys()))
-        computed_sparse = (
-            np.array([frame_results[i][0] for i in computed_indices]) if compute_sparse else None
+        ep_start, ep_end = ep["dataset_from_index"], ep["dataset_to_index"]
+        ep_queries = get_episode_query_indices(ep_start, ep_end, stride)
+        episode_bounds[episode_idx] = (ep_start, ep_end)
+        query_indices.append(ep_queries)
+        query_episodes.append(np.full(len(ep_queries), episode_idx, dtype=np.int64))
+
+    if query_indices:
+        query_dataset = SARMQueryDataset(
+            dataset,
+            np.concatenate(query_indices),
+            np.concatenate(query_episodes),
+            image_key,
+            state_key,
+        )
+        dataloader = torch.utils.data.DataLoader(
+            query_dataset,
+            batch_size=batch_size,
+            shuffle=False,
+            num_workers=num_workers,
+            pin_memory=torch.device(device).type == "cuda",
+            prefetch_factor=2 if num_workers > 0 else None,
         )
-        computed_dense = np.array([frame_results[i][1] for i in computed_indices]) if compute_dense else None
-
-        # All frame indices for this episode
-        all_frame_idx_array = np.arange(ep_start, ep_end)
 
-        if stride > 1 and len(computed_indices) > 1:
-            # Interpolate progress values
-            if compute_sparse:
-                interp_sparse = interpolate_progress(computed_indices, computed_sparse, all_frame_idx_array)
-            if compute_dense:
-                interp_dense = interpolate_progress(computed_indices, computed_dense, all_frame_idx_array)
-        else:
-            # No interpolation needed
-            interp_sparse = computed_sparse if compute_sparse else None
-            interp_dense = computed_dense if compute_dense else None
+        # Per-episode results collected until all of its queries have been answered
+        pending = {
+            ep_idx: {"remaining": len(queries), "indices": [], **{head: [] for head in heads}}
+            for ep_idx, queries in zip(episode_bounds, query_indices, strict=True)
+        }
+        completed_rows = []
+        failed_episodes = set()
+
+        for batch in tqdm(dataloader, desc="Batches"):
+            for chunk in split_batch_by_task(batch):
+                chunk_indices = chunk["index"].numpy()
+                chunk_progress = {head: np.full(len(chunk_indices), np.nan) for head in heads}
+                try:
+                    with torch.no_grad():
+                        processed = preprocess(chunk)
+                        state_features = processed.get("state_features")
+                        for head in heads:
+                            chunk_progress[head] = reward_model.calculate_rewards(
+                                text_embeddings=processed["text_features"],
+                                video_embeddings=processed["video_features"],
+                                state_features=state_features,
+                                lengths=processed.get("lengths"),
+                                head_mode=head,
+                                frame_index=center_idx,
+                            )
+                except Exception as e:
+                    logging.warning(f"Failed to process frames {chunk_indices.tolist()}: {e}")
+                    failed_episodes.update(chunk["episode_index"].tolist())
+
+                for i, (query_idx, episode_idx) in enumerate(
+                    zip(chunk_indices.tolist(), chunk["episode_index"].tolist(), strict=True)
+                ):
+                    ep_pending = pending[episode_idx]
+                    ep_pending["indices"].append(query_idx)
+                    for head in heads:
+                        ep_pending[head].append(float(chunk_progress[head][i]))
+                    ep_pending["remaining"] -= 1
+
+                    if ep_pending["remaining"] == 0:
+                        ep_pending = pending.pop(episode_idx)
+                        if episode_idx in failed_episodes:
+                            continue
+                        ep_start, ep_end = episode_bounds[episode_idx]
+                        completed_rows.append(
+                            _episode_progress_rows(ep_pending, episode_idx, ep_start, ep_end, heads)
+                        )
 
-        # Store results for all frames
-        for i, frame_idx in enumerate(all_frame_idx_array):
-            local_idx = frame_idx - ep_start
-            all_indices.append(frame_idx)
-            all_episode_indices.append(episode_idx)
-            all_frame_indices.append(local_idx)
-            if compute_sparse:
-                if stride > 1 and len(computed_indices) > 1:
-                    all_progress_sparse.append(float(interp_sparse[i]))
-                elif frame_idx in frame_results:
-                    all_progress_sparse.append(frame_results[frame_idx][0])
-                else:
-                    all_progress_sparse.append(np.nan)
-            if compute_dense:
-                if stride > 1 and len(computed_indices) > 1:
-                    all_progress_dense.append(float(interp_dense[i]))
-                elif frame_idx in frame_results:
-                    all_progress_dense.append(frame_results[frame_idx][1])
-                else:
-                    all_progress_dense.append(np.nan)
+            if len(completed_rows) >= flush_every:
+                write_progress_part(parts_dir, num_parts, completed_rows, run_metadata)
+                num_parts += 1
+                completed_rows = []
+
+        if completed_rows:
+            write_progress_part(parts_dir, num_parts, completed_rows, run_metadata)
+        if failed_episodes:
+            raise RuntimeError(
+                f"Failed to compute the progress of episodes {sorted(failed_episodes)}. The progress of the "
+                f"other episodes is kept in {parts_dir}, run again to retry the failed ones."
+            )
 
-    # Create output table
-    table_data = {
-        "index": np.array(all_indices, dtype=np.int64),
-        "episode_index": np.array(all_episode_indices, dtype=np.int64),
-        "frame_index": np.array(all_frame_indices, dtype=np.int64),
-    }
-    if compute_sparse:
-        table_data["progress_sparse"] = np.array(all_progress_sparse, dtype=np.float32)
-    if compute_dense:
-        table_data["progress_dense"] = np.array(all_progress_dense, dtype=np.float32)
-
-    # Sort by index
-    df = pa.table(table_data).to_pandas()
-    df = df.sort_values("index").reset_index(drop=True)
+    # Merge all parts into the final output table, sorted by index
+    final_table = read_progress_parts(parts_dir, run_metadata)
+    if final_table is None:
+        raise ValueError(f"No progress was computed: the dataset {dataset_repo_id} has no frames.")
+    df = final_table.to_pandas().sort_values("index").reset_index(drop=True)
     final_table = pa.Table.from_pandas(df, preserve_index=False)
 
     # Add metadata with reward model path
     metadata = {b"reward_model_path": reward_model_path.encode()}
     final_table = final_table.replace_schema_metadata(metadata)
 
-    # Determine output path
-    output_path = Path(dataset.root) / "sarm_progress.parquet" if output_path is None else Path(output_path)
-
     # Save
     output_path.parent.mkdir(parents=True, exist_ok=True)
     pq.write_table(final_table, output_path)
+    shutil.rmtree(parts_dir)
     logging.info(f"Saved {len(final_table)} frame progress values to {output_path}")
 
     # Print statistics
@@ -785,6 +893,29 @@ Examples:
         default=1,
         help="Compute progress every N frames, interpolate the rest (default: 1 = every frame)",
     )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=32,
+        help="Number of query windows per inference batch (default: 32)",
+    )
+    parser.add_argument(
+        "--num-workers",
+        type=int,
+        default=4,
+        help="Number of DataLoader workers prefetching frames (default: 4)",
+    )
+    parser.add_argument(
+        "--flush-every",
+        type=int,
+        default=10,
+        help="Write progress to disk every N completed episodes (default: 10)",
+    )
+    parser.add_argument(
+        "--no-resume",
+        action="store_true",
+        help="Ignore progress left by a previous interrupted run and start from scratch",
+    )
 
     args = parser.parse_args()
 
@@ -833,6 +964,10 @@ Examples:
         num_visualizations=args.num_visualizations,
         output_dir=args.output_dir,
         stride=args.stride,
+        batch_size=args.batch_size,
+        num_workers=args.num_workers,
+        flush_every=args.flush_every,
+        resume=not args.no_resume,
     )
 
     print(f"\nSARM progress values saved to: {output_path}")
@@ -67,6 +67,12 @@ class SmolVLAConfig(PreTrainedConfig):
 
     # Attention utils
     use_cache: bool = True
+    # At inference, drop the padding shared by the language tokens of the batch and reuse their embeddings
+    # across calls while the tokenized task is unchanged (see `LanguageEmbeddingCache`)
+    cache_language_embeddings: bool = False
+    # Compile the denoising step with static shapes (replayed as a CUDA graph on GPU)
+    compile_denoise_step: bool = False
+    attention_implementation: str = "eager"  # "eager" or "sdpa"
 
     # Finetuning settings
     freeze_vision_encoder: bool = True
@@ -115,6 +121,10 @@ class SmolVLAConfig(PreTrainedConfig):
                 f"The chunk size is the upper bound for the number of action steps per model invocation. Got "
                 f"{self.n_action_steps} for `n_action_steps` and {self.chunk_size} for `chunk_size`."
             )
+        if self.attention_implementation not in ["eager", "sdpa"]:
+            raise ValueError(
+                f"`attention_implementation` must be 'eager' or 'sdpa'. Got {self.attention_implementation}."
+            )
         if self.use_delta_joint_actions_aloha:
             raise NotImplementedError(
                 "`use_delta_joint_actions_aloha` is used by smolvla for aloha real models. It is not ported yet in LeRobot."
@@ -66,6 +66,7 @@ from lerobot.policies.rtc.modeling_rtc import RTCProcessor
 from lerobot.policies.smolvla.configuration_smolvla import SmolVLAConfig
 from lerobot.policies.smolvla.smolvlm_with_expert import SmolVLMWithExpertModel
 from lerobot.policies.utils import (
+    LanguageEmbeddingCache,
     populate_queues,
 )
 from lerobot.utils.constants import ACTION, OBS_LANGUAGE_ATTENTION_MASK, OBS_LANGUAGE_TOKENS, OBS_STATE
@@ -251,6 +252,7 @@ class SmolVLAPolicy(PreTrainedPolicy):
         self._queues = {
             ACTION: deque(maxlen=self.config.n_action_steps),
         }
+        self.model.language_cache.clear()
 
     def init_rtc_processor(self):
         """Initialize RTC processor if RTC is enabled in config."""
@@ -567,6 +569,7 @@ class VLAFlowMatching(nn.Module):
             self_attn_every_n_layers=self.config.self_attn_every_n_layers,
             expert_width_multiplier=self.config.expert_width_multiplier,
             device=self.config.device if self.config.device is not None else "auto",
+            attention_implementation=self.config.attention_implementation,
         )
         self.state_proj = nn.Linear(
             self.config.max_state_dim, self.vlm_with_expert.config.text_config.hidden_size
@@ -592,6 +595,14 @@ class VLAFlowMatching(nn.Module):
         self.image_end_token = torch.tensor([self.fake_image_token], dtype=torch.long)
         self.prefix_length = self.config.prefix_length
         self.rtc_processor = rtc_processor
+        self.language_cache = LanguageEmbeddingCache()
+        self._compiled_denoise_step = None
+        if self.config.compile_denoise_step:
+            # Every denoising step has the same shapes, so it can be compiled once with static shapes.
+            # "reduce-overhead" replays it as a CUDA graph on GPU.
+            self._compiled_denoise_step = torch.compile(
+                self.denoise_step, mode="reduce-overhead", dynamic=False
+            )
 
     def _rtc_enabled(self):
         return self.config.rtc_config is not None and self.config.rtc_config.enabled
@@ -672,10 +683,17 @@ class VLAFlowMatching(nn.Module):
                 embs.append(image_end_token)
                 pad_masks.append(image_end_mask)
                 att_masks += [0] * (image_end_mask.shape[1])
-        lang_emb = self.vlm_with_expert.embed_language_tokens(lang_tokens)
-        # Normalize language embeddings
-        lang_emb_dim = lang_emb.shape[-1]
-        lang_emb = lang_emb * math.sqrt(lang_emb_dim)
+
+        def lang_embed_func(lang_tokens):
+            lang_emb = self.vlm_with_expert.embed_language_tokens(lang_tokens)
+            # Normalize language embeddings
+            lang_emb_dim = lang_emb.shape[-1]
+            return lang_emb * math.sqrt(lang_emb_dim)
+
+        if self.config.cache_language_embeddings and not self.training:
+            lang_emb, lang_masks = self.language_cache.get(lang_tokens, lang_masks, lang_embed_func)
+        else:
+            lang_emb = lang_embed_func(lang_tokens)
 
         embs.append(lang_emb)
         pad_masks.append(lang_masks)
@@ -713,8 +731,6 @@ class VLAFlowMatching(nn.Module):
     def embed_suffix(self, noisy_actions, timestep):
         """Embed state, noisy_actions, timestep to prepare for Expert Gemma processing."""
         embs = []
-        pad_masks = []
-        att_masks = []
 
         # Fuse timestep + action information using an MLP
         action_emb = self.action_in_proj(noisy_actions)
@@ -740,18 +756,18 @@ class VLAFlowMatching(nn.Module):
 
         # Add to input tokens
         embs.append(action_time_emb)
+        embs = torch.cat(embs, dim=1)
+        pad_masks, att_masks = self.make_suffix_masks(bsize, device)
+        att_masks = att_masks.to(dtype=embs.dtype)
+        return embs, pad_masks, att_masks
 
-        bsize, action_time_dim = action_time_emb.shape[:2]
-        action_time_mask = torch.ones(bsize, action_time_dim, dtype=torch.bool, device=device)
-        pad_masks.append(action_time_mask)
+    def make_suffix_masks(self, bsize, device) -> tuple[torch.Tensor, torch.Tensor]:
+        """Padding and attention masks of the suffix: `chunk_size` action tokens."""
+        pad_masks = torch.ones(bsize, self.config.chunk_size, dtype=torch.bool, device=device)
 
         # Set attention masks so that image, language and state inputs do not attend to action tokens
-        att_masks += [1] * self.config.chunk_size
-        embs = torch.cat(embs, dim=1)
-        pad_masks = torch.cat(pad_masks, dim=1)
-        att_masks = torch.tensor(att_masks, dtype=embs.dtype, device=embs.device)
-        att_masks = att_masks[None, :].expand(bsize, len(att_masks))
-        return embs, pad_masks, att_masks
+        att_masks = torch.ones(bsize, self.config.chunk_size, dtype=torch.bool, device=device)
+        return pad_masks, att_masks
 
     def forward(
         self, images, img_masks, lang_tokens, lang_masks, state, actions, noise=None, time=None
@@ -824,19 +840,29 @@ class VLAFlowMatching(nn.Module):
             fill_kv_cache=True,
         )
         num_steps = self.config.num_steps
+
+        # The suffix attention mask, its position ids and the timesteps are the same for every step, so they
+        # are built once per chunk instead of once per step.
+        suffix_attention = self.prepare_suffix_attention(prefix_pad_masks)
         dt = -1.0 / num_steps
+        timesteps = (1.0 + dt * torch.arange(num_steps, dtype=torch.float64)).to(torch.float32).to(device)
+
+        # RTC differentiates through the denoising step, which the CUDA graphs don't support.
+        use_compiled_step = self._compiled_denoise_step is not None and not self._rtc_enabled()
+        denoise_step = self._compiled_denoise_step if use_compiled_step else self.denoise_step
 
         x_t = noise
         for step in range(num_steps):
             time = 1.0 + step * dt
-            time_tensor = torch.tensor(time, dtype=torch.float32, device=device).expand(bsize)
+            time_tensor = timesteps[step].expand(bsize)
 
             def denoise_step_partial_call(input_x_t, current_timestep=time_tensor):
-                return self.denoise_step(
+                return denoise_step(
                     x_t=input_x_t,
                     prefix_pad_masks=prefix_pad_masks,
                     past_key_values=past_key_values,
                     timestep=current_timestep,
+                    suffix_attention=suffix_attention,
                 )
 
             if self._rtc_enabled():
@@ -855,6 +881,10 @@ class VLAFlowMatching(nn.Module):
             else:
                 v_t = denoise_step_partial_call(x_t)
 
+            if use_compiled_step:
+                # The output buffer of the CUDA graph is overwritten by the next replay.
+                v_t = v_t.clone()
+
             x_t = x_t + dt * v_t
 
             if self.rtc_processor is not None and self.rtc_processor.is_debug_enabled():
@@ -862,19 +892,11 @@ class VLAFlowMatching(nn.Module):
 
         return x_t
 
-    def denoise_step(
-        self,
-        prefix_pad_masks,
-        past_key_values,
-        x_t,
-        timestep,
-    ):
-        """Apply one denoising step of the noise `x_t` at a given timestep."""
-        suffix_embs, suffix_pad_masks, suffix_att_masks = self.embed_suffix(x_t, timestep)
-
+    def prepare_suffix_attention(self, prefix_pad_masks) -> tuple[torch.Tensor, torch.Tensor]:
+        """Build the 2D attention mask and the position ids of the suffix tokens attending to the prefix."""
+        batch_size, prefix_len = prefix_pad_masks.shape
+        suffix_pad_masks, suffix_att_masks = self.make_suffix_masks(batch_size, prefix_pad_masks.device)
         suffix_len = suffix_pad_masks.shape[1]
-        batch_size = prefix_pad_masks.shape[0]
-        prefix_len = prefix_pad_masks.shape[1]
         prefix_pad_2d_masks = prefix_pad_masks[:, None, :].expand(batch_size, suffix_len, prefix_len)
 
         suffix_att_2d_masks = make_att_2d_masks(suffix_pad_masks, suffix_att_masks)
@@ -882,6 +904,24 @@ class VLAFlowMatching(nn.Module):
         full_att_2d_masks = torch.cat([prefix_pad_2d_masks, suffix_att_2d_masks], dim=2)
         prefix_offsets = torch.sum(prefix_pad_masks, dim=-1)[:, None]
         position_ids = prefix_offsets + torch.cumsum(suffix_pad_masks, dim=1) - 1
+        return full_att_2d_masks, position_ids
+
+    def denoise_step(
+        self,
+        prefix_pad_masks,
+        past_key_values,
+        x_t,
+        timestep,
+        suffix_attention=None,
+    ):
+        """Apply one denoising step of the noise `x_t` at a given timestep.
+
+        `suffix_attention` is the output of `prepare_suffix_attention`, built here if not provided.
+        """
+        suffix_embs, _, _ = self.embed_suffix(x_t, timestep)
+        if suffix_attention is None:
+            suffix_attention = self.prepare_suffix_attention(prefix_pad_masks)
+        full_att_2d_masks, position_ids = suffix_attention
 
         outputs_embeds, _ = self.vlm_with_expert.forward(
             attention_mask=full_att_2d_masks,
@@ -16,6 +16,7 @@
 
 import logging
 from collections import deque
+from collections.abc import Callable
 
 import numpy as np
 import torch
@@ -48,6 +49,56 @@ def populate_queues(
     return queues
 
 
+class LanguageEmbeddingCache:
+    """Keeps the language embeddings of a VLA prefix (PI0, PI05, SmolVLA) across inference calls.
+
+    The language instruction usually stays the same for a whole episode, while the prefix is re-embedded for
+    every action chunk. The embeddings are keyed on the language tokens and attention mask, and the trailing
+    padding shared by the whole batch is dropped: padded tokens are masked out of the attention and don't
+    shift the position ids, so the predicted actions are unchanged but the prefix attended by every denoising
+    step gets shorter.
+
+    Note: only the embeddings are reused, not the keys/values of the language tokens. The prefix attention
+    is bidirectional, so these keys/values depend on the images of the current observation.
+    """
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        """Forget the cached embeddings, e.g. when the environment is reset."""
+        self._lang_tokens = None
+        self._lang_masks = None
+        self._embeddings = None
+
+    def _matches(self, lang_tokens: torch.Tensor, lang_masks: torch.Tensor) -> bool:
+        return (
+            self._embeddings is not None
+            and self._lang_tokens.shape == lang_tokens.shape
+            and self._lang_tokens.device == lang_tokens.device
+            and torch.equal(self._lang_tokens, lang_tokens)
+            and torch.equal(self._lang_masks, lang_masks)
+        )
+
+    def get(
+        self,
+        lang_tokens: torch.Tensor,
+        lang_masks: torch.Tensor,
+        embed_fn: Callable[[torch.Tensor], torch.Tensor],
+    ) -> tuple[torch.Tensor, torch.Tensor]:
+        """Return the (B, L, D) language embeddings and their (B, L) mask, calling `embed_fn` on a miss.
+
+        L is the number of tokens up to the last one that is valid for at least one element of the batch.
+        """
+        if not self._matches(lang_tokens, lang_masks):
+            valid_positions = lang_masks.any(dim=0).nonzero()
+            num_tokens = int(valid_positions[-1]) + 1 if len(valid_positions) > 0 else lang_masks.shape[1]
+            self._lang_tokens = lang_tokens.clone()
+            self._lang_masks = lang_masks.clone()
+            self._embeddings = (embed_fn(lang_tokens[:, :num_tokens]), lang_masks[:, :num_tokens])
+        return self._embeddings
+
+
 def get_device_from_parameters(module: nn.Module) -> torch.device:
     """Get a module's device by checking one of its parameters.
 
@@ -88,6 +88,9 @@ class VQBeTConfig(PreTrainedConfig):
         bet_softmax_temperature: Sampling temperature of code for rollout with VQ-BeT
         sequentially_select: Whether select code of primary / secondary as sequentially (pick primary code,
             and then select secodnary code), or at the same time.
+        cache_image_features: Whether `select_action` keeps the encoded features of the observations in its
+            queue so that each frame goes through the vision backbone only once, instead of re-encoding the
+            whole `n_obs_steps` window every time a chunk is generated.
     """
 
     # Inputs / output structure.
@@ -129,6 +132,8 @@ class VQBeTConfig(PreTrainedConfig):
     secondary_code_loss_weight: float = 0.5
     bet_softmax_temperature: float = 0.1
     sequentially_select: bool = False
+    # Inference
+    cache_image_features: bool = False
 
     # Training presets
     optimizer_lr: float = 1e-4
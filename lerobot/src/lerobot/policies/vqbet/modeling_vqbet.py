@@ -31,7 +31,7 @@ from lerobot.policies.pretrained import PreTrainedPolicy
 from lerobot.policies.utils import get_device_from_parameters, get_output_shape, populate_queues
 from lerobot.policies.vqbet.configuration_vqbet import VQBeTConfig
 from lerobot.policies.vqbet.vqbet_utils import GPT, ResidualVQ
-from lerobot.utils.constants import ACTION, OBS_IMAGES, OBS_STATE
+from lerobot.utils.constants import ACTION, OBS_IMAGE_FEATURES, OBS_IMAGES, OBS_STATE
 
 # ruff: noqa: N806
 
@@ -114,10 +114,34 @@ class VQBeTPolicy(PreTrainedPolicy):
             OBS_STATE: deque(maxlen=self.config.n_obs_steps),
             ACTION: deque(maxlen=self.config.action_chunk_size),
         }
+        if self.config.cache_image_features:
+            # Per-frame image features, aligned with the image queue and filled lazily (see
+            # `_encode_new_images`).
+            self._queues[OBS_IMAGE_FEATURES] = deque(maxlen=self.config.n_obs_steps)
+
+    def _encode_new_images(self) -> None:
+        """Encode the queued frames which don't have cached features yet.
+
+        Each frame is encoded at most once while it stays in the `n_obs_steps` window, and frames which
+        leave the window before the next chunk is generated are never encoded.
+        """
+        images = self._queues[OBS_IMAGES]
+        features = self._queues[OBS_IMAGE_FEATURES]
+        missing = [i for i, feat in enumerate(features) if feat is None]
+        if not missing:
+            return
+        new_features = self.vqbet.encode_images(torch.stack([images[i] for i in missing], dim=1))
+        for j, i in enumerate(missing):
+            features[i] = new_features[:, j]
 
     @torch.no_grad()
     def predict_action_chunk(self, batch: dict[str, Tensor]) -> Tensor:
-        batch = {k: torch.stack(list(self._queues[k]), dim=1) for k in batch if k in self._queues}
+        keys = [k for k in batch if k in self._queues]
+        if OBS_IMAGE_FEATURES in self._queues:
+            # Condition on the cached image features instead of re-encoding the raw images.
+            self._encode_new_images()
+            keys = [k for k in keys if k not in (OBS_IMAGES, OBS_IMAGE_FEATURES)] + [OBS_IMAGE_FEATURES]
+        batch = {k: torch.stack(list(self._queues[k]), dim=1) for k in keys}
         actions = self.vqbet(batch, rollout=True)[:, : self.config.action_chunk_size]
         return actions
 
@@ -135,6 +159,9 @@ class VQBeTPolicy(PreTrainedPolicy):
         batch = dict(batch)  # shallow copy so that adding a key doesn't modify the original
         # NOTE: It's important that this happens after stacking the images into a single key.
         batch[OBS_IMAGES] = torch.stack([batch[key] for key in self.config.image_features], dim=-4)
+        if self.config.cache_image_features:
+            # Placeholder, the features of this frame are computed when the next chunk is generated.
+            batch[OBS_IMAGE_FEATURES] = None
         # NOTE: for offline evaluation, we have action in the batch, so we need to pop it out
         if ACTION in batch:
             batch.pop(ACTION)
@@ -339,18 +366,28 @@ class VQBeTModel(nn.Module):
             torch.row_stack([torch.arange(i, i + self.config.action_chunk_size) for i in range(num_tokens)]),
         )
 
+    def encode_images(self, images: Tensor) -> Tensor:
+        """Encode images of shape (B, S, N, C, H, W) into features of shape (B, S, N, feature_dim)."""
+        batch_size, n_steps = images.shape[:2]
+        # Extract image feature (first combine batch and sequence dims).
+        img_features = self.rgb_encoder(einops.rearrange(images, "b s n ... -> (b s n) ..."))
+        # Separate batch and sequence dims.
+        return einops.rearrange(
+            img_features, "(b s n) ... -> b s n ...", b=batch_size, s=n_steps, n=self.num_images
+        )
+
     def forward(self, batch: dict[str, Tensor], rollout: bool) -> tuple[dict, dict]:
         # Input validation.
-        assert set(batch).issuperset({OBS_STATE, OBS_IMAGES})
+        assert OBS_STATE in batch
+        assert OBS_IMAGES in batch or OBS_IMAGE_FEATURES in batch
         batch_size, n_obs_steps = batch[OBS_STATE].shape[:2]
         assert n_obs_steps == self.config.n_obs_steps
 
-        # Extract image feature (first combine batch and sequence dims).
-        img_features = self.rgb_encoder(einops.rearrange(batch[OBS_IMAGES], "b s n ... -> (b s n) ..."))
-        # Separate batch and sequence dims.
-        img_features = einops.rearrange(
-            img_features, "(b s n) ... -> b s n ...", b=batch_size, s=n_obs_steps, n=self.num_images
-        )
+        # Use the image features cached during rollout if available, otherwise encode the images.
+        if OBS_IMAGE_FEATURES in batch:
+            img_features = batch[OBS_IMAGE_FEATURES]
+        else:
+            img_features = self.encode_images(batch[OBS_IMAGES])
 
         # Arrange prior and current observation step tokens as shown in the class docstring.
         # First project features to token dimension.
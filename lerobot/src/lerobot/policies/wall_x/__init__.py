@@ -14,6 +14,22 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from .configuration_wall_x import WallXConfig
+from typing import TYPE_CHECKING
+
+from lerobot.utils.import_utils import make_lazy_getattr
+
+__getattr__ = make_lazy_getattr(
+    __name__,
+    {
+        "WallXConfig": ".configuration_wall_x",
+        "WallXPolicy": ".modeling_wall_x",
+        "make_wall_x_pre_post_processors": ".processor_wall_x",
+    },
+)
+
+if TYPE_CHECKING:
+    from .configuration_wall_x import WallXConfig
+    from .modeling_wall_x import WallXPolicy
+    from .processor_wall_x import make_wall_x_pre_post_processors
 
 __all__ = ["WallXConfig", "WallXPolicy", "make_wall_x_pre_post_processors"]
@@ -1,6 +1,26 @@
-# register the processor steps
-from lerobot.policies.xvla.processor_xvla import (
-    XVLAAddDomainIdProcessorStep,
-    XVLAImageNetNormalizeProcessorStep,
-    XVLAImageToFloatProcessorStep,
+from typing import TYPE_CHECKING
+
+from lerobot.utils.import_utils import make_lazy_getattr
+
+# The processor steps are registered by `make_pre_post_processors` when loading a pretrained XVLA
+__getattr__ = make_lazy_getattr(
+    __name__,
+    {
+        "XVLAAddDomainIdProcessorStep": ".processor_xvla",
+        "XVLAImageNetNormalizeProcessorStep": ".processor_xvla",
+        "XVLAImageToFloatProcessorStep": ".processor_xvla",
+    },
 )
+
+if TYPE_CHECKING:
+    from .processor_xvla import (
+        XVLAAddDomainIdProcessorStep,
+        XVLAImageNetNormalizeProcessorStep,
+        XVLAImageToFloatProcessorStep,
+    )
+
+__all__ = [
+    "XVLAAddDomainIdProcessorStep",
+    "XVLAImageNetNormalizeProcessorStep",
+    "XVLAImageToFloatProcessorStep",
+]
@@ -27,13 +27,9 @@ from lerobot.optim.optimizers import XVLAAdamWConfig
 from lerobot.optim.schedulers import CosineDecayWithWarmupSchedulerConfig
 from lerobot.utils.constants import OBS_IMAGES
 
-# Conditional import for type checking and lazy loading
-from lerobot.utils.import_utils import _transformers_available
-
-if TYPE_CHECKING or _transformers_available:
+# transformers is only imported when the Florence2 config is built, not when the policy types are registered
+if TYPE_CHECKING:
     from .configuration_florence2 import Florence2Config
-else:
-    Florence2Config = None
 
 
 @PreTrainedConfig.register_subclass("xvla")
@@ -133,6 +129,8 @@ class XVLAConfig(PreTrainedConfig):
         Build (and cache) the Florence2 transformer config that should back the VLM.
         """
         if self._florence_config_obj is None:
+            from .configuration_florence2 import Florence2Config
+
             config_dict = dict(self.florence_config)
             if "vision_config" not in config_dict or config_dict["vision_config"] is None:
                 raise ValueError("vision_config is required")
@@ -22,7 +22,6 @@ from typing import Any, Protocol, TypeVar, runtime_checkable
 
 import numpy as np
 import torch
-import torchvision.transforms.functional as F  # noqa: N812
 
 from lerobot.configs.types import PipelineFeatureType, PolicyFeature
 from lerobot.teleoperators.teleoperator import Teleoperator
@@ -202,6 +201,9 @@ class ImageCropResizeProcessorStep(ObservationProcessorStep):
 
         new_observation = dict(observation)
 
+        # torchvision is only imported when images are cropped or resized, as it is slow to import
+        import torchvision.transforms.functional as F  # noqa: N812
+
         # Process all image keys in the observation
         for key in observation:
             if "image" not in key:
@@ -41,14 +41,22 @@ from lerobot.utils.import_utils import _transformers_available
 from .core import EnvTransition, RobotObservation, TransitionKey
 from .pipeline import ActionProcessorStep, ObservationProcessorStep, ProcessorStepRegistry
 
-# Conditional import for type checking and lazy loading
-if TYPE_CHECKING or _transformers_available:
+# Importing transformers takes seconds, so its auto classes are only imported when a tokenizer is created
+if TYPE_CHECKING:
     from transformers import AutoProcessor, AutoTokenizer
 else:
     AutoProcessor = None
     AutoTokenizer = None
 
 
+def _import_transformers() -> None:
+    global AutoProcessor, AutoTokenizer
+    if AutoProcessor is None:
+        from transformers import AutoProcessor
+    if AutoTokenizer is None:
+        from transformers import AutoTokenizer
+
+
 @dataclass
 @ProcessorStepRegistry.register(name="tokenizer_processor")
 class TokenizerProcessorStep(ObservationProcessorStep):
@@ -99,6 +107,7 @@ class TokenizerProcessorStep(ObservationProcessorStep):
                 "The 'transformers' library is not installed. "
                 "Please install it with `pip install 'lerobot[transformers-dep]'` to use TokenizerProcessorStep."
             )
+        _import_transformers()
 
         if self.tokenizer is not None:
             # Use provided tokenizer object directly
@@ -323,6 +332,7 @@ class ActionTokenizerProcessorStep(ActionProcessorStep):
                 "The 'transformers' library is not installed. "
                 "Please install it with `pip install 'lerobot[transformers-dep]'` to use ActionTokenizerProcessorStep."
             )
+        _import_transformers()
 
         if self.action_tokenizer_input_object is not None:
             self.action_tokenizer = self.action_tokenizer_input_object
@@ -112,12 +112,14 @@ from lerobot.utils.utils import init_logging
 class DeleteEpisodesConfig:
     type: str = "delete_episodes"
     episode_indices: list[int] | None = None
+    num_workers: int = 4
 
 
 @dataclass
 class SplitConfig:
     type: str = "split"
     splits: dict[str, float | list[int]] | None = None
+    num_workers: int = 4
 
 
 @dataclass
@@ -198,6 +200,7 @@ def handle_delete_episodes(cfg: EditDatasetConfig) -> None:
         episode_indices=cfg.operation.episode_indices,
         output_dir=output_dir,
         repo_id=output_repo_id,
+        num_workers=cfg.operation.num_workers,
     )
 
     logging.info(f"Dataset saved to {output_dir}")
@@ -220,7 +223,9 @@ def handle_split(cfg: EditDatasetConfig) -> None:
     dataset = LeRobotDataset(cfg.repo_id, root=cfg.root)
 
     logging.info(f"Splitting dataset {cfg.repo_id} with splits: {cfg.operation.splits}")
-    split_datasets = split_dataset(dataset, splits=cfg.operation.splits)
+    split_datasets = split_dataset(
+        dataset, splits=cfg.operation.splits, num_workers=cfg.operation.num_workers
+    )
 
     for split_name, split_ds in split_datasets.items():
         split_repo_id = f"{cfg.repo_id}_{split_name}"
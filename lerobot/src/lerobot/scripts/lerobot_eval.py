@@ -49,17 +49,21 @@ You can learn about the CLI options for this script in the `EvalPipelineConfig`
 import concurrent.futures as cf
 import json
 import logging
+import multiprocessing as mp
+import queue
+import shutil
 import threading
 import time
+import traceback
 from collections import defaultdict
 from collections.abc import Callable
 from contextlib import nullcontext
 from copy import deepcopy
-from dataclasses import asdict
+from dataclasses import asdict, dataclass
 from functools import partial
 from pathlib import Path
 from pprint import pformat
-from typing import Any, TypedDict
+from typing import Any, Protocol, TypedDict, runtime_checkable
 
 import einops
 import gymnasium as gym
@@ -71,6 +75,7 @@ from tqdm import trange
 
 from lerobot.configs import parser
 from lerobot.configs.eval import EvalPipelineConfig
+from lerobot.configs.train import TrainPipelineConfig
 from lerobot.envs.factory import make_env, make_env_pre_post_processors
 from lerobot.envs.utils import (
     add_envs_task,
@@ -85,6 +90,7 @@ from lerobot.utils.constants import ACTION, DONE, OBS_STR, REWARD
 from lerobot.utils.import_utils import register_third_party_plugins
 from lerobot.utils.io_utils import write_video
 from lerobot.utils.random_utils import set_seed
+from lerobot.utils.train_utils import get_step_identifier
 from lerobot.utils.utils import (
     get_safe_torch_device,
     init_logging,
@@ -92,6 +98,110 @@ from lerobot.utils.utils import (
 )
 
 
+def _get_successes(info: dict, num_envs: int) -> np.ndarray:
+    """Returns the (num_envs,) success flags of the environments which finished on the last step."""
+    # VectorEnv stores is_success in `info["final_info"]["is_success"]`. "final_info" isn't available if none
+    # of the envs finished.
+    if "final_info" not in info:
+        return np.zeros(num_envs, dtype=bool)
+    final_info = info["final_info"]
+    if not isinstance(final_info, dict):
+        raise RuntimeError(
+            "Unsupported `final_info` format: expected dict (Gymnasium >= 1.0). "
+            "You're likely using an older version of gymnasium (< 1.0). Please upgrade."
+        )
+    return np.asarray(final_info["is_success"], dtype=bool)
+
+
+@runtime_checkable
+class EnvResettablePolicy(Protocol):
+    """A policy run on a batch of environments, whose state can be reset for some of the environments only."""
+
+    def eval(self): ...
+
+    def reset(self) -> None: ...
+
+    def reset_envs(self, env_ids: np.ndarray) -> None: ...
+
+    def select_action(self, observation: dict[str, Any]) -> Tensor: ...
+
+
+def _select_envs(observation: dict[str, Any], env_ids: np.ndarray) -> dict[str, Any]:
+    selected = {}
+    for key, value in observation.items():
+        if isinstance(value, Tensor):
+            selected[key] = value[torch.as_tensor(env_ids, device=value.device)]
+        elif isinstance(value, list):
+            selected[key] = [value[i] for i in env_ids]
+        else:
+            selected[key] = value
+    return selected
+
+
+@dataclass
+class _EnvGroup:
+    env_ids: np.ndarray | None  # None for all the environments of the batch
+    active: np.ndarray | None
+    state: dict[str, Any]
+
+
+class PerEnvResetPolicy:
+    """Runs a policy on a batch of environments whose episodes don't all start on the same step.
+
+    Policies keep state for their whole batch (e.g. queues of observations or action chunks), which `reset`
+    clears for all the environments. `reset_envs` instead starts a new state for some environments only: the
+    environments reset together form a group, run as its own sub-batch with its own policy state, which is
+    swapped in and out of the instance attributes of the policy around each `select_action`. The other
+    environments keep their state, so every episode goes through the same policy states as if the episodes of
+    the batch had all started together.
+
+    The policy's `reset` must assign new objects for its state rather than clearing them in place. An
+    environment reset again stays in its previous group, whose actions for it are ignored, until all the
+    environments of that group are reset.
+    """
+
+    def __init__(self, policy: PreTrainedPolicy):
+        self.policy = policy
+        self._groups = [_EnvGroup(None, None, dict(vars(policy)))]
+        self._num_envs: int | None = None
+
+    def eval(self):
+        self.policy.eval()
+        return self
+
+    def reset(self) -> None:
+        self.policy.reset()
+        self._groups = [_EnvGroup(None, None, dict(vars(self.policy)))]
+
+    def reset_envs(self, env_ids: np.ndarray) -> None:
+        if self._num_envs is None:
+            raise RuntimeError("`select_action` must be called before resetting some of the environments.")
+        env_ids = np.sort(np.asarray(env_ids))
+        for group in self._groups:
+            if group.env_ids is None:
+                group.env_ids = np.arange(self._num_envs)
+                group.active = np.ones(self._num_envs, dtype=bool)
+            group.active &= ~np.isin(group.env_ids, env_ids)
+        self._groups = [group for group in self._groups if group.active.any()]
+        self.policy.reset()
+        self._groups.append(_EnvGroup(env_ids, np.ones(len(env_ids), dtype=bool), dict(vars(self.policy))))
+
+    def select_action(self, observation: dict[str, Any]) -> Tensor:
+        self._num_envs = len(next(v for v in observation.values() if isinstance(v, Tensor)))
+        action = None
+        for group in self._groups:
+            vars(self.policy).update(group.state)
+            if group.env_ids is None:
+                action = self.policy.select_action(observation)
+            else:
+                group_action = self.policy.select_action(_select_envs(observation, group.env_ids))
+                if action is None:
+                    action = group_action.new_zeros((self._num_envs, *group_action.shape[1:]))
+                action[group.env_ids[group.active]] = group_action[group.active]
+            group.state = dict(vars(self.policy))
+        return action
+
+
 def rollout(
     env: gym.vector.VectorEnv,
     policy: PreTrainedPolicy,
@@ -149,8 +259,9 @@ def rollout(
     all_dones = []
 
     step = 0
-    # Keep track of which environments are done.
+    # Keep track of which environments are done, and of those which succeeded so far.
     done = np.array([False] * env.num_envs)
+    ever_succeeded = np.zeros(env.num_envs, dtype=bool)
     max_steps = env.call("_max_episode_steps")[0]
     progbar = trange(
         max_steps,
@@ -163,7 +274,8 @@ def rollout(
         # Numpy array to tensor and changing dictionary keys to LeRobot policy format.
         observation = preprocess_observation(observation)
         if return_observations:
-            all_observations.append(deepcopy(observation))
+            # `preprocess_observation` returns new tensors, only the dict is modified by the steps below.
+            all_observations.append(dict(observation))
 
         # Infer "task" from attributes of environments.
         # TODO: works with SyncVectorEnv but not AsyncVectorEnv
@@ -190,18 +302,7 @@ def rollout(
         if render_callback is not None:
             render_callback(env)
 
-        # VectorEnv stores is_success in `info["final_info"][env_index]["is_success"]`. "final_info" isn't
-        # available if none of the envs finished.
-        if "final_info" in info:
-            final_info = info["final_info"]
-            if not isinstance(final_info, dict):
-                raise RuntimeError(
-                    "Unsupported `final_info` format: expected dict (Gymnasium >= 1.0). "
-                    "You're likely using an older version of gymnasium (< 1.0). Please upgrade."
-                )
-            successes = final_info["is_success"].tolist()
-        else:
-            successes = [False] * env.num_envs
+        successes = _get_successes(info, env.num_envs)
 
         # Keep track of which environments are done so far.
         # Mark the episode as done if we reach the maximum step limit.
@@ -214,19 +315,17 @@ def rollout(
         all_actions.append(torch.from_numpy(action_numpy))
         all_rewards.append(torch.from_numpy(reward))
         all_dones.append(torch.from_numpy(done))
-        all_successes.append(torch.tensor(successes))
+        all_successes.append(torch.from_numpy(successes))
 
         step += 1
-        running_success_rate = (
-            einops.reduce(torch.stack(all_successes, dim=1), "b n -> b", "any").numpy().mean()
-        )
-        progbar.set_postfix({"running_success_rate": f"{running_success_rate.item() * 100:.1f}%"})
+        ever_succeeded |= successes
+        progbar.set_postfix({"running_success_rate": f"{ever_succeeded.mean() * 100:.1f}%"})
         progbar.update()
 
     # Track the final observation.
     if return_observations:
         observation = preprocess_observation(observation)
-        all_observations.append(deepcopy(observation))
+        all_observations.append(observation)
 
     # Stack the sequence along the first dimension so that we have (batch, sequence, *) tensors.
     ret = {
@@ -247,6 +346,154 @@ def rollout(
     return ret
 
 
+def autoreset_rollout(
+    env: gym.vector.VectorEnv,
+    policy: PreTrainedPolicy,
+    env_preprocessor: PolicyProcessorPipeline[dict[str, Any], dict[str, Any]],
+    env_postprocessor: PolicyProcessorPipeline[dict[str, Any], dict[str, Any]],
+    preprocessor: PolicyProcessorPipeline[dict[str, Any], dict[str, Any]],
+    postprocessor: PolicyProcessorPipeline[PolicyAction, PolicyAction],
+    n_episodes: int,
+    start_seed: int | None = None,
+    render_callback: Callable[[gym.vector.VectorEnv, np.ndarray], None] | None = None,
+    episode_end_callback: Callable[[int, int], None] | None = None,
+) -> dict:
+    """Run `n_episodes` episodes through a batch of environments, refilling environments as they finish.
+
+    Unlike `rollout`, the batch isn't run until its last environment is done: as soon as an environment
+    finishes its episode, it is reset with the next episode (seeded with `start_seed + episode_index`) until
+    `n_episodes` episodes have been started. Environments left without an episode keep being stepped until
+    the last episodes are done, but their results are ignored.
+
+    The policy state is only reset for the refilled environments (see `PerEnvResetPolicy`), so the episodes
+    run as they would with `rollout`.
+
+    Args:
+        env: The batch of environments.
+        policy: The policy. Must be a PyTorch nn module.
+        n_episodes: The number of episodes to run.
+        start_seed: The seed of the first episode, subsequent episodes use the following seeds. If not
+            provided, the environments are not manually seeded.
+        render_callback: Optional rendering callback called with the environments and the (num_envs,) array of
+            the episode index run by each environment (-1 for none), after the environments are reset and
+            after every step.
+        episode_end_callback: Optional callback called with the environment index and the episode index when
+            an episode is done, before the environment is refilled.
+    Returns:
+        A dictionary of (n_episodes,) arrays indexed by episode: "sum_reward", "max_reward", "success" and
+        "length" (in steps), as well as the total number of vectorized "env_steps".
+    """
+    assert isinstance(policy, nn.Module), "Policy must be a PyTorch nn module."
+    base_policy = policy
+    if not isinstance(policy, EnvResettablePolicy):
+        policy = PerEnvResetPolicy(policy)
+
+    num_envs = env.num_envs
+    max_steps = env.call("_max_episode_steps")[0]
+    check_env_attributes_and_types(env)
+
+    def seeds_for(episodes: np.ndarray) -> list[int | None]:
+        return [None if start_seed is None or ep < 0 else start_seed + int(ep) for ep in episodes]
+
+    sum_rewards = np.zeros(n_episodes, dtype=np.float64)
+    max_rewards = np.full(n_episodes, -np.inf, dtype=np.float64)
+    successes = np.zeros(n_episodes, dtype=bool)
+    lengths = np.zeros(n_episodes, dtype=np.int64)
+
+    # Episode index run by each environment, -1 once there are no more episodes to run.
+    env_episodes = np.arange(num_envs)
+    env_episodes[env_episodes >= n_episodes] = -1
+    next_episode = min(num_envs, n_episodes)
+    env_steps = np.zeros(num_envs, dtype=np.int64)
+
+    policy.reset()
+    observation, info = env.reset(seed=seeds_for(env_episodes))
+    if render_callback is not None:
+        render_callback(env, env_episodes)
+
+    n_done = 0
+    n_succeeded = 0
+    n_vector_steps = 0
+    progbar = trange(
+        n_episodes,
+        desc=f"Running {n_episodes} episodes with at most {max_steps} steps",
+        disable=inside_slurm(),  # we dont want progress bar when we use slurm, since it clutters the logs
+        leave=False,
+    )
+    while n_done < n_episodes:
+        # Numpy array to tensor and changing dictionary keys to LeRobot policy format.
+        observation = preprocess_observation(observation)
+        # Infer "task" from attributes of environments.
+        observation = add_envs_task(env, observation)
+        # Apply environment-specific preprocessing (e.g., LiberoProcessorStep for LIBERO)
+        observation = env_preprocessor(observation)
+
+        observation = preprocessor(observation)
+        with torch.inference_mode():
+            action = policy.select_action(observation)
+        action = postprocessor(action)
+
+        action_transition = env_postprocessor({ACTION: action})
+        action_numpy: np.ndarray = action_transition[ACTION].to("cpu").numpy()
+        assert action_numpy.ndim == 2, "Action dimensions should be (batch, action_dim)"
+
+        observation, reward, terminated, truncated, info = env.step(action_numpy)
+        n_vector_steps += 1
+        env_steps += 1
+        if render_callback is not None:
+            render_callback(env, env_episodes)
+
+        active = env_episodes >= 0
+        episodes = env_episodes[active]
+        sum_rewards[episodes] += reward[active]
+        max_rewards[episodes] = np.maximum(max_rewards[episodes], reward[active])
+        successes[episodes] |= _get_successes(info, num_envs)[active]
+
+        done = (terminated | truncated | (env_steps >= max_steps)) & active
+        if not done.any():
+            continue
+
+        done_envs = np.flatnonzero(done)
+        for env_ix in done_envs:
+            episode = int(env_episodes[env_ix])
+            lengths[episode] = env_steps[env_ix]
+            if episode_end_callback is not None:
+                episode_end_callback(int(env_ix), episode)
+        n_done += len(done_envs)
+        n_succeeded += int(successes[env_episodes[done_envs]].sum())
+        progbar.update(len(done_envs))
+        progbar.set_postfix({"running_success_rate": f"{n_succeeded / n_done * 100:.1f}%"})
+
+        # Refill the finished environments with the next episodes, in order of environment index so that
+        # episodes are assigned deterministically.
+        env_episodes[done_envs] = -1
+        refilled = done_envs[: n_episodes - next_episode]
+        if len(refilled) > 0:
+            env_episodes[refilled] = np.arange(next_episode, next_episode + len(refilled))
+            next_episode += len(refilled)
+            env_steps[refilled] = 0
+            reset_mask = np.zeros(num_envs, dtype=bool)
+            reset_mask[refilled] = True
+            observation, _ = env.reset(
+                seed=seeds_for(np.where(reset_mask, env_episodes, -1)), options={"reset_mask": reset_mask}
+            )
+            policy.reset_envs(refilled)
+            if render_callback is not None:
+                render_callback(env, env_episodes)
+
+    progbar.close()
+    if hasattr(base_policy, "use_original_modules"):
+        base_policy.use_original_modules()
+
+    return {
+        "sum_reward": sum_rewards,
+        "max_reward": max_rewards,
+        "success": successes,
+        "length": lengths,
+        "env_steps": n_vector_steps,
+    }
+
+
 def eval_policy(
     env: gym.vector.VectorEnv,
     policy: PreTrainedPolicy,
@@ -259,6 +506,7 @@ def eval_policy(
     videos_dir: Path | None = None,
     return_episode_data: bool = False,
     start_seed: int | None = None,
+    auto_reset: bool = False,
 ) -> dict:
     """
     Args:
@@ -271,13 +519,16 @@ def eval_policy(
             the "episodes" key of the returned dictionary.
         start_seed: The first seed to use for the first individual rollout. For all subsequent rollouts the
             seed is incremented by 1. If not provided, the environments are not manually seeded.
+        auto_reset: Whether to refill the environments with new episodes as soon as they are done (see
+            `autoreset_rollout`), instead of running the batches of episodes until all their environments are
+            done. Not supported with `return_episode_data`.
     Returns:
         Dictionary with metrics and data regarding the rollouts.
     """
     if max_episodes_rendered > 0 and not videos_dir:
         raise ValueError("If max_episodes_rendered > 0, videos_dir must be provided.")
 
-    if not isinstance(policy, PreTrainedPolicy):
+    if not isinstance(policy, (PreTrainedPolicy, EnvResettablePolicy)):
         exc = ValueError(
             f"Policy of type 'PreTrainedPolicy' is expected, but type '{type(policy)}' was provided."
         )
@@ -322,98 +573,150 @@ def eval_policy(
     if return_episode_data:
         episode_data: dict | None = None
 
-    # we dont want progress bar when we use slurm, since it clutters the logs
-    progbar = trange(n_batches, desc="Stepping through eval batches", disable=inside_slurm())
-    for batch_ix in progbar:
-        # Cache frames for rendering videos. Each item will be (b, h, w, c), and the list indexes the rollout
-        # step.
-        if max_episodes_rendered > 0:
-            ep_frames: list[np.ndarray] = []
+    if auto_reset:
+        if return_episode_data:
+            raise ValueError("`return_episode_data` is not supported with `auto_reset`.")
 
-        if start_seed is None:
-            seeds = None
-        else:
-            seeds = range(
-                start_seed + (batch_ix * env.num_envs), start_seed + ((batch_ix + 1) * env.num_envs)
+        # Frames of the episodes being rendered, indexed by episode.
+        episode_frames: dict[int, list[np.ndarray]] = defaultdict(list)
+
+        def render_episode_frames(env: gym.vector.VectorEnv, env_episodes: np.ndarray):
+            to_render = [i for i, ep in enumerate(env_episodes) if 0 <= ep < max_episodes_rendered]
+            if not to_render:
+                return
+            if isinstance(env, gym.vector.SyncVectorEnv):
+                frames = {i: env.envs[i].render() for i in to_render}
+            else:
+                # Here we must render all frames and discard any we don't need.
+                frames = dict(enumerate(env.call("render")))
+            for i in to_render:
+                episode_frames[int(env_episodes[i])].append(frames[i])
+
+        def write_episode_video(env_ix: int, episode: int):
+            frames = episode_frames.pop(episode, None)
+            if not frames:
+                return
+            videos_dir.mkdir(parents=True, exist_ok=True)
+            video_path = videos_dir / f"eval_episode_{episode}.mp4"
+            video_paths.append(str(video_path))
+            thread = threading.Thread(
+                target=write_video,
+                args=(str(video_path), np.stack(frames), env.unwrapped.metadata["render_fps"]),
             )
-        rollout_data = rollout(
+            thread.start()
+            threads.append(thread)
+
+        results = autoreset_rollout(
             env=env,
             policy=policy,
             env_preprocessor=env_preprocessor,
             env_postprocessor=env_postprocessor,
             preprocessor=preprocessor,
             postprocessor=postprocessor,
-            seeds=list(seeds) if seeds else None,
-            return_observations=return_episode_data,
-            render_callback=render_frame if max_episodes_rendered > 0 else None,
+            n_episodes=n_episodes,
+            start_seed=start_seed,
+            render_callback=render_episode_frames if max_episodes_rendered > 0 else None,
+            episode_end_callback=write_episode_video if max_episodes_rendered > 0 else None,
         )
-
-        # Figure out where in each rollout sequence the first done condition was encountered (results after
-        # this won't be included).
-        n_steps = rollout_data["done"].shape[1]
-        # Note: this relies on a property of argmax: that it returns the first occurrence as a tiebreaker.
-        done_indices = torch.argmax(rollout_data["done"].to(int), dim=1)
-
-        # Make a mask with shape (batch, n_steps) to mask out rollout data after the first done
-        # (batch-element-wise). Note the `done_indices + 1` to make sure to keep the data from the done step.
-        mask = (torch.arange(n_steps) <= einops.repeat(done_indices + 1, "b -> b s", s=n_steps)).int()
-        # Extend metrics.
-        batch_sum_rewards = einops.reduce((rollout_data["reward"] * mask), "b n -> b", "sum")
-        sum_rewards.extend(batch_sum_rewards.tolist())
-        batch_max_rewards = einops.reduce((rollout_data["reward"] * mask), "b n -> b", "max")
-        max_rewards.extend(batch_max_rewards.tolist())
-        batch_successes = einops.reduce((rollout_data["success"] * mask), "b n -> b", "any")
-        all_successes.extend(batch_successes.tolist())
-        if seeds:
-            all_seeds.extend(seeds)
-        else:
-            all_seeds.append(None)
-
-        # FIXME: episode_data is either None or it doesn't exist
-        if return_episode_data:
-            this_episode_data = _compile_episode_data(
-                rollout_data,
-                done_indices,
-                start_episode_index=batch_ix * env.num_envs,
-                start_data_index=(0 if episode_data is None else (episode_data["index"][-1].item() + 1)),
-                fps=env.unwrapped.metadata["render_fps"],
-            )
-            if episode_data is None:
-                episode_data = this_episode_data
+        sum_rewards = results["sum_reward"].tolist()
+        max_rewards = results["max_reward"].tolist()
+        all_successes = results["success"].tolist()
+        all_seeds = [None if start_seed is None else start_seed + i for i in range(n_episodes)]
+    else:
+        # we dont want progress bar when we use slurm, since it clutters the logs
+        progbar = trange(n_batches, desc="Stepping through eval batches", disable=inside_slurm())
+        for batch_ix in progbar:
+            # Cache frames for rendering videos. Each item will be (b, h, w, c), and the list indexes the rollout
+            # step.
+            if max_episodes_rendered > 0:
+                ep_frames: list[np.ndarray] = []
+
+            if start_seed is None:
+                seeds = None
             else:
-                # Some sanity checks to make sure we are correctly compiling the data.
-                assert episode_data["episode_index"][-1] + 1 == this_episode_data["episode_index"][0]
-                assert episode_data["index"][-1] + 1 == this_episode_data["index"][0]
-                # Concatenate the episode data.
-                episode_data = {k: torch.cat([episode_data[k], this_episode_data[k]]) for k in episode_data}
-
-        # Maybe render video for visualization.
-        if max_episodes_rendered > 0 and len(ep_frames) > 0:
-            batch_stacked_frames = np.stack(ep_frames, axis=1)  # (b, t, *)
-            for stacked_frames, done_index in zip(
-                batch_stacked_frames, done_indices.flatten().tolist(), strict=False
-            ):
-                if n_episodes_rendered >= max_episodes_rendered:
-                    break
-
-                videos_dir.mkdir(parents=True, exist_ok=True)
-                video_path = videos_dir / f"eval_episode_{n_episodes_rendered}.mp4"
-                video_paths.append(str(video_path))
-                thread = threading.Thread(
-                    target=write_video,
-                    args=(
-                        str(video_path),
-                        stacked_frames[: done_index + 1],  # + 1 to capture the last observation
-                        env.unwrapped.metadata["render_fps"],
-                    ),
+                seeds = range(
+                    start_seed + (batch_ix * env.num_envs), start_seed + ((batch_ix + 1) * env.num_envs)
                 )
-                thread.start()
-                threads.append(thread)
-                n_episodes_rendered += 1
+            rollout_data = rollout(
+                env=env,
+                policy=policy,
+                env_preprocessor=env_preprocessor,
+                env_postprocessor=env_postprocessor,
+                preprocessor=preprocessor,
+                postprocessor=postprocessor,
+                seeds=list(seeds) if seeds else None,
+                return_observations=return_episode_data,
+                render_callback=render_frame if max_episodes_rendered > 0 else None,
+            )
 
-        progbar.set_postfix(
-            {"running_success_rate": f"{np.mean(all_successes[:n_episodes]).item() * 100:.1f}%"}
-        )
+            # Figure out where in each rollout sequence the first done condition was encountered (results after
+            # this won't be included).
+            n_steps = rollout_data["done"].shape[1]
+            # Note: this relies on a property of argmax: that it returns the first occurrence as a tiebreaker.
+            done_indices = torch.argmax(rollout_data["done"].to(int), dim=1)
+
+            # Make a mask with shape (batch, n_steps) to mask out rollout data after the first done
+            # (batch-element-wise). Note the `done_indices + 1` to make sure to keep the data from the done step.
+            mask = (torch.arange(n_steps) <= einops.repeat(done_indices + 1, "b -> b s", s=n_steps)).int()
+            # Extend metrics.
+            batch_sum_rewards = einops.reduce((rollout_data["reward"] * mask), "b n -> b", "sum")
+            sum_rewards.extend(batch_sum_rewards.tolist())
+            batch_max_rewards = einops.reduce((rollout_data["reward"] * mask), "b n -> b", "max")
+            max_rewards.extend(batch_max_rewards.tolist())
+            batch_successes = einops.reduce((rollout_data["success"] * mask), "b n -> b", "any")
+            all_successes.extend(batch_successes.tolist())
+            if seeds:
+                all_seeds.extend(seeds)
+            else:
+                all_seeds.append(None)
+
+            # FIXME: episode_data is either None or it doesn't exist
+            if return_episode_data:
+                this_episode_data = _compile_episode_data(
+                    rollout_data,
+                    done_indices,
+                    start_episode_index=batch_ix * env.num_envs,
+                    start_data_index=(0 if episode_data is None else (episode_data["index"][-1].item() + 1)),
+                    fps=env.unwrapped.metadata["render_fps"],
+                )
+                if episode_data is None:
+                    episode_data = this_episode_data
+                else:
+                    # Some sanity checks to make sure we are correctly compiling the data.
+                    assert episode_data["episode_index"][-1] + 1 == this_episode_data["episode_index"][0]
+                    assert episode_data["index"][-1] + 1 == this_episode_data["index"][0]
+                    # Concatenate the episode data.
+                    episode_data = {
+                        k: torch.cat([episode_data[k], this_episode_data[k]]) for k in episode_data
+                    }
+
+            # Maybe render video for visualization.
+            if max_episodes_rendered > 0 and len(ep_frames) > 0:
+                batch_stacked_frames = np.stack(ep_frames, axis=1)  # (b, t, *)
+                for stacked_frames, done_index in zip(
+                    batch_stacked_frames, done_indices.flatten().tolist(), strict=False
+                ):
+                    if n_episodes_rendered >= max_episodes_rendered:
+                        break
+
+                    videos_dir.mkdir(parents=True, exist_ok=True)
+                    video_path = videos_dir / f"eval_episode_{n_episodes_rendered}.mp4"
+                    video_paths.append(str(video_path))
+                    thread = threading.Thread(
+                        target=write_video,
+                        args=(
+                            str(video_path),
+                            stacked_frames[: done_index + 1],  # + 1 to capture the last observation
+                            env.unwrapped.metadata["render_fps"],
+                        ),
+                    )
+                    thread.start()
+                    threads.append(thread)
+                    n_episodes_rendered += 1
+
+            progbar.set_postfix(
+                {"running_success_rate": f"{np.mean(all_successes[:n_episodes]).item() * 100:.1f}%"}
+            )
 
     # Wait till all video rendering threads are done.
     for thread in threads:
@@ -561,6 +864,8 @@ def eval_main(cfg: EvalPipelineConfig):
             videos_dir=Path(cfg.output_dir) / "videos",
             start_seed=cfg.seed,
             max_parallel_tasks=cfg.env.max_parallel_tasks,
+            auto_reset=cfg.eval.auto_reset,
+            parallel_backend=cfg.eval.parallel_backend,
         )
         print("Overall Aggregated Metrics:")
         print(info["overall"])
@@ -603,6 +908,7 @@ def eval_one(
     videos_dir: Path | None,
     return_episode_data: bool,
     start_seed: int | None,
+    auto_reset: bool = False,
 ) -> TaskMetrics:
     """Evaluates one task_id of one suite using the provided vec env."""
 
@@ -620,6 +926,7 @@ def eval_one(
         videos_dir=task_videos_dir,
         return_episode_data=return_episode_data,
         start_seed=start_seed,
+        auto_reset=auto_reset,
     )
 
     per_episode = task_result["per_episode"]
@@ -646,6 +953,7 @@ def run_one(
     videos_dir: Path | None,
     return_episode_data: bool,
     start_seed: int | None,
+    auto_reset: bool = False,
 ):
     """
     Run eval_one for a single (task_group, task_id, env).
@@ -670,6 +978,7 @@ def run_one(
         videos_dir=task_videos_dir,
         return_episode_data=return_episode_data,
         start_seed=start_seed,
+        auto_reset=auto_reset,
     )
     # ensure we always provide video_paths key to simplify accumulation
     if max_episodes_rendered > 0:
@@ -691,14 +1000,19 @@ def eval_policy_all(
     return_episode_data: bool = False,
     start_seed: int | None = None,
     max_parallel_tasks: int = 1,
+    auto_reset: bool = False,
+    parallel_backend: str = "thread",
 ) -> dict:
     """
     Evaluate a nested `envs` dict: {task_group: {task_id: vec_env}}.
-    This implementation flattens tasks, runs them sequentially or via ThreadPoolExecutor,
-    accumulates per-group and overall statistics, and returns the same aggregate metrics
-    schema as the single-env evaluator (avg_sum_reward / avg_max_reward / pc_success / timings)
-    plus per-task infos.
+    This implementation flattens tasks, runs them sequentially, via ThreadPoolExecutor or via env worker
+    processes (`parallel_backend="process"`, see `eval_tasks_in_processes`), accumulates per-group and overall
+    statistics, and returns the same aggregate metrics schema as the single-env evaluator
+    (avg_sum_reward / avg_max_reward / pc_success / timings) plus per-task infos.
     """
+    if parallel_backend not in ("thread", "process"):
+        raise ValueError(f"Unknown parallel backend '{parallel_backend}', expected 'thread' or 'process'.")
+
     start_t = time.time()
 
     # Flatten envs into list of (task_group, task_id, env)
@@ -746,9 +1060,28 @@ def eval_policy_all(
         videos_dir=videos_dir,
         return_episode_data=return_episode_data,
         start_seed=start_seed,
+        auto_reset=auto_reset,
     )
 
-    if max_parallel_tasks <= 1:
+    if parallel_backend == "process" and max_parallel_tasks > 1:
+        # process path: the envs are stepped by worker processes, the policy is run on the main thread
+        for tg, tid, metrics in eval_tasks_in_processes(
+            tasks,
+            policy=policy,
+            env_preprocessor=env_preprocessor,
+            env_postprocessor=env_postprocessor,
+            preprocessor=preprocessor,
+            postprocessor=postprocessor,
+            num_workers=max_parallel_tasks,
+            n_episodes=n_episodes,
+            max_episodes_rendered=max_episodes_rendered,
+            videos_dir=videos_dir,
+            start_seed=start_seed,
+            auto_reset=auto_reset,
+        ):
+            _accumulate_to(tg, metrics)
+            per_task_infos.append({"task_group": tg, "task_id": tid, "metrics": metrics})
+    elif max_parallel_tasks <= 1:
         # sequential path (single accumulator path on the main thread)
         # NOTE: keeping a single-threaded accumulator avoids concurrent list appends or locks
         for task_group, task_id, env in tasks:
@@ -803,6 +1136,385 @@ def eval_policy_all(
     }
 
 
+def _identity(x):
+    return x
+
+
+class _PolicyClient(nn.Module):
+    """Stands for the policy in an env worker process of `eval_tasks_in_processes`: the observations are sent
+    to the policy server on the main process and the actions are received back.
+
+    The rollout helpers only call `reset`, `reset_envs` and `select_action`. Resets of the whole batch wait for
+    the other workers, while the resets of some environments (refilled by `autoreset_rollout`) are forwarded
+    as "replan" requests which don't wait.
+    """
+
+    def __init__(self, worker_id: int, requests: mp.Queue, responses: mp.Queue):
+        super().__init__()
+        self.worker_id = worker_id
+        self.requests = requests
+        self.responses = responses
+
+    def reset(self):
+        self.requests.put((self.worker_id, "reset", None))
+        self.responses.get()
+
+    def reset_envs(self, env_ids: np.ndarray) -> None:
+        self.requests.put((self.worker_id, "replan", np.asarray(env_ids)))
+
+    def select_action(self, observation: dict[str, Any]) -> Tensor:
+        self.requests.put((self.worker_id, "obs", observation))
+        return self.responses.get()
+
+
+def _env_worker(
+    worker_id: int,
+    tasks: list[tuple[str, int, bytes, str]],
+    requests: mp.Queue,
+    responses: mp.Queue,
+    run_kwargs: dict,
+) -> None:
+    """Evaluates `tasks` one after the other with a `_PolicyClient`. Each task is given as its group, its id,
+    the cloudpickled functions creating its environments and the autoreset mode of its vector env."""
+    import cloudpickle
+
+    # The worker only steps the environments and converts the observations, leave the cores to the others.
+    torch.set_num_threads(1)
+    try:
+        client = _PolicyClient(worker_id, requests, responses)
+        for task_group, task_id, env_fns, autoreset_mode in tasks:
+            env = gym.vector.SyncVectorEnv(cloudpickle.loads(env_fns), autoreset_mode=autoreset_mode)
+            try:
+                result = run_one(
+                    task_group,
+                    task_id,
+                    env,
+                    policy=client,
+                    env_preprocessor=_identity,
+                    env_postprocessor=_identity,
+                    preprocessor=_identity,
+                    postprocessor=_identity,
+                    return_episode_data=False,
+                    **run_kwargs,
+                )
+            finally:
+                env.close()
+            requests.put((worker_id, "result", result))
+        requests.put((worker_id, "done", None))
+    except Exception:
+        requests.put((worker_id, "error", traceback.format_exc()))
+
+
+def _merge_observations(observations: list[dict[str, Any]]) -> dict[str, Any]:
+    merged = {}
+    for key, value in observations[0].items():
+        if isinstance(value, Tensor):
+            merged[key] = torch.cat([obs[key] for obs in observations])
+        elif isinstance(value, list):
+            merged[key] = [item for obs in observations for item in obs[key]]
+        else:
+            merged[key] = value
+    return merged
+
+
+def eval_tasks_in_processes(
+    tasks: list[tuple[str, int, gym.vector.VectorEnv]],
+    *,
+    policy,
+    env_preprocessor: PolicyProcessorPipeline[dict[str, Any], dict[str, Any]],
+    env_postprocessor: PolicyProcessorPipeline[dict[str, Any], dict[str, Any]],
+    preprocessor: PolicyProcessorPipeline[dict[str, Any], dict[str, Any]],
+    postprocessor: PolicyProcessorPipeline[PolicyAction, PolicyAction],
+    num_workers: int,
+    n_episodes: int,
+    max_episodes_rendered: int = 0,
+    videos_dir: Path | None = None,
+    start_seed: int | None = None,
+    auto_reset: bool = False,
+    poll_interval_s: float = 1.0,
+):
+    """Evaluates `tasks` with env worker processes feeding a batched policy server on the current thread.
+
+    The tasks are spread over `num_workers` spawned processes, each recreating the environments of its tasks
+    (from the `env_fns` of their vector envs) in a `SyncVectorEnv` and running the usual rollouts. The
+    observations are sent over shared memory to this process, which merges the observations of all the
+    workers into a single batch for the preprocessors and the policy, and sends each worker its slice of the
+    actions back. The environments are thus stepped in parallel on the CPU cores, while the policy runs one
+    large batch at a time.
+
+    The policy keeps state for its whole batch (e.g. action chunks), so the rows of the merged batch must stay
+    the same between two policy resets. The workers are therefore synchronized on their rollout boundaries:
+    the policy is reset once all the workers asked for a reset, and the workers which are done with their
+    rollout (or with all their tasks) are padded with their last observation until then. In `auto_reset`
+    mode, the environments refilled by a worker are reset right away, for their rows of the merged batch only
+    (see `PerEnvResetPolicy`).
+
+    Yields (task_group, task_id, task_metrics) in order of completion.
+    """
+    import cloudpickle
+
+    ctx = torch.multiprocessing.get_context("spawn")
+    requests = ctx.Queue()
+    num_workers = min(num_workers, len(tasks))
+    responses = [ctx.Queue() for _ in range(num_workers)]
+    run_kwargs = {
+        "n_episodes": n_episodes,
+        "max_episodes_rendered": max_episodes_rendered,
+        "videos_dir": videos_dir,
+        "start_seed": start_seed,
+        "auto_reset": auto_reset,
+    }
+    workers = []
+    for worker_id in range(num_workers):
+        worker_tasks = [
+            (task_group, task_id, cloudpickle.dumps(env.env_fns), env.metadata.get("autoreset_mode"))
+            for task_group, task_id, env in tasks[worker_id::num_workers]
+        ]
+        worker = ctx.Process(
+            target=_env_worker,
+            args=(worker_id, worker_tasks, requests, responses[worker_id], run_kwargs),
+            daemon=True,
+        )
+        worker.start()
+        workers.append(worker)
+
+    env_policy = PerEnvResetPolicy(policy)
+
+    def infer(observations: list[dict[str, Any]]) -> list[Tensor]:
+        observation = env_preprocessor(_merge_observations(observations))
+        observation = preprocessor(observation)
+        with torch.inference_mode():
+            action = env_policy.select_action(observation)
+        action = env_postprocessor({ACTION: postprocessor(action)})[ACTION].to("cpu")
+        return list(action.split([len(obs["task"]) for obs in observations]))
+
+    policy.eval()
+    members: list[int] = []  # workers in the merged batch since the last policy reset
+    waiting: set[int] = set()  # workers waiting for the next policy reset
+    finished: set[int] = set()
+    pending: dict[int, dict[str, Any]] = {}  # observations waiting for the next policy step
+    num_envs: dict[int, int] = {}  # rows of each worker in the merged batch
+    last_observations: dict[int, dict[str, Any]] = {}
+    try:
+        while len(finished) < num_workers:
+            try:
+                worker_id, kind, payload = requests.get(timeout=poll_interval_s)
+            except queue.Empty:
+                dead = [i for i, w in enumerate(workers) if i not in finished and not w.is_alive()]
+                if dead:
+                    raise RuntimeError(f"Env worker(s) {dead} exited unexpectedly.") from None
+                continue
+
+            if kind == "error":
+                raise RuntimeError(f"Env worker {worker_id} failed:\n{payload}")
+            elif kind == "result":
+                yield payload
+            elif kind == "done":
+                finished.add(worker_id)
+            elif kind == "reset":
+                waiting.add(worker_id)
+            elif kind == "replan":
+                offset = sum(num_envs[i] for i in members[: members.index(worker_id)])
+                env_policy.reset_envs(offset + payload)
+            elif kind == "obs":
+                pending[worker_id] = payload
+                num_envs[worker_id] = len(payload["task"])
+                last_observations[worker_id] = payload
+
+            stepping = [i for i in members if i not in waiting and i not in finished]
+            if stepping and all(i in pending for i in stepping):
+                actions = infer([pending.get(i, last_observations[i]) for i in members])
+                for i, action in zip(members, actions, strict=True):
+                    if i in pending:
+                        responses[i].put(action)
+                pending.clear()
+
+            active = [i for i in range(num_workers) if i not in finished]
+            if active and waiting.issuperset(active):
+                env_policy.reset()
+                members = active
+                waiting.clear()
+                last_observations.clear()
+                for i in members:
+                    responses[i].put(None)
+    finally:
+        for worker in workers:
+            if worker.is_alive():
+                worker.terminate()
+            worker.join()
+
+
+def _latest_request(requests: queue.Queue, request: tuple[int, Path], skipped: Callable) -> tuple[int, Path]:
+    """Returns the most recent of `request` and the requests waiting in `requests`, passing the others to
+    `skipped`. The `None` sentinel is put back so that the worker stops after this evaluation."""
+    stop = False
+    while True:
+        try:
+            newer = requests.get_nowait()
+        except queue.Empty:
+            break
+        if newer is None:
+            stop = True
+            break
+        skipped(request)
+        request = newer
+    if stop:
+        requests.put(None)
+    return request
+
+
+def _async_eval_worker(
+    cfg: TrainPipelineConfig,
+    device: str,
+    skip_stale: bool,
+    requests: queue.Queue,
+    results: queue.Queue,
+) -> None:
+    init_logging()
+    if cfg.seed is not None:
+        set_seed(cfg.seed)
+    torch.backends.cudnn.benchmark = True
+    torch.backends.cuda.matmul.allow_tf32 = True
+
+    policy_cfg = deepcopy(cfg.policy)
+    policy_cfg.device = device
+    envs = make_env(cfg.env, n_envs=cfg.eval.batch_size, use_async_envs=cfg.eval.use_async_envs)
+    env_preprocessor, env_postprocessor = make_env_pre_post_processors(env_cfg=cfg.env, policy_cfg=policy_cfg)
+
+    def skip(request: tuple[int, Path]) -> None:
+        step, snapshot_dir = request
+        logging.info(f"Skipping the evaluation of step {step}, a newer snapshot is available")
+        shutil.rmtree(snapshot_dir, ignore_errors=True)
+        results.put({"step": step, "status": "skipped"})
+
+    while (request := requests.get()) is not None:
+        if skip_stale:
+            request = _latest_request(requests, request, skip)
+        step, snapshot_dir = request
+        try:
+            policy_cfg.pretrained_path = snapshot_dir
+            policy = make_policy(cfg=policy_cfg, env_cfg=cfg.env, rename_map=cfg.rename_map)
+            policy.eval()
+            preprocessor, postprocessor = make_pre_post_processors(
+                policy_cfg=policy_cfg,
+                pretrained_path=snapshot_dir,
+                preprocessor_overrides={
+                    "device_processor": {"device": str(policy.config.device)},
+                    "rename_observations_processor": {"rename_map": cfg.rename_map},
+                },
+            )
+            device_type = policy.config.device.split(":")[0]
+            amp_context = torch.autocast(device_type=device_type) if policy_cfg.use_amp else nullcontext()
+            with torch.no_grad(), amp_context:
+                eval_info = eval_policy_all(
+                    envs=envs,
+                    policy=policy,
+                    env_preprocessor=env_preprocessor,
+                    env_postprocessor=env_postprocessor,
+                    preprocessor=preprocessor,
+                    postprocessor=postprocessor,
+                    n_episodes=cfg.eval.n_episodes,
+                    videos_dir=cfg.output_dir / "eval" / f"videos_step_{snapshot_dir.name}",
+                    max_episodes_rendered=4,
+                    start_seed=cfg.seed,
+                    max_parallel_tasks=cfg.env.max_parallel_tasks,
+                    auto_reset=cfg.eval.auto_reset,
+                    # This process is daemonic and can't start the env workers of the "process" backend.
+                    parallel_backend="thread",
+                )
+            results.put({"step": step, "status": "done", "eval_info": eval_info})
+        except Exception as e:
+            logging.exception(f"Evaluation of step {step} failed")
+            results.put({"step": step, "status": "failed", "error": repr(e)})
+        finally:
+            shutil.rmtree(snapshot_dir, ignore_errors=True)
+
+    close_envs(envs)
+
+
+class AsyncEvaluator:
+    """Evaluates the policy in a separate process while training continues.
+
+    `submit` saves a snapshot of the policy and its processors to `output_dir/eval/snapshots/<step>` and
+    queues it. The worker process owns the evaluation environments, loads each snapshot on `device` (the CPU
+    or a spare GPU) and runs `eval_policy_all` on it. Finished evaluations are collected with `poll`, without
+    blocking the training loop.
+
+    When `skip_stale` is True and the worker falls behind, only the most recent of the waiting snapshots is
+    evaluated and the older ones are reported as skipped.
+    """
+
+    def __init__(self, cfg: TrainPipelineConfig, device: str | None = None, skip_stale: bool = True):
+        self.snapshots_dir = cfg.output_dir / "eval" / "snapshots"
+        self._total_steps = cfg.steps
+        self._num_pending = 0
+        # CUDA can't be re-initialized in forked processes.
+        ctx = mp.get_context("spawn")
+        self._requests = ctx.Queue()
+        self._results = ctx.Queue()
+        self._process = ctx.Process(
+            target=_async_eval_worker,
+            args=(cfg, device or cfg.policy.device, skip_stale, self._requests, self._results),
+            daemon=True,
+        )
+        self._process.start()
+
+    @property
+    def num_pending(self) -> int:
+        return self._num_pending
+
+    def submit(
+        self,
+        step: int,
+        policy: PreTrainedPolicy,
+        preprocessor: PolicyProcessorPipeline | None = None,
+        postprocessor: PolicyProcessorPipeline | None = None,
+    ) -> Path:
+        """Snapshots the policy and queues its evaluation, returning the snapshot directory."""
+        snapshot_dir = self.snapshots_dir / get_step_identifier(step, self._total_steps)
+        policy.save_pretrained(snapshot_dir)
+        if preprocessor is not None:
+            preprocessor.save_pretrained(snapshot_dir)
+        if postprocessor is not None:
+            postprocessor.save_pretrained(snapshot_dir)
+        self._requests.put((step, snapshot_dir))
+        self._num_pending += 1
+        return snapshot_dir
+
+    def poll(self, block: bool = False) -> list[dict]:
+        """Returns the results of the evaluations finished since the last call.
+
+        Each result is a dict with the evaluated `step` and a `status` ("done", "skipped" or "failed"). Done
+        evaluations also contain the `eval_info` returned by `eval_policy_all`.
+
+        Args:
+            block: Wait until all the submitted evaluations have finished.
+        """
+        results = []
+        while self._num_pending > 0:
+            try:
+                result = self._results.get(block=block, timeout=1.0 if block else None)
+            except queue.Empty:
+                # The worker only exits once it is closed, after sending the results of every evaluation.
+                if not self._process.is_alive():
+                    raise RuntimeError(
+                        f"The evaluation worker exited with code {self._process.exitcode}."
+                    ) from None
+                if not block:
+                    break
+                continue
+            self._num_pending -= 1
+            results.append(result)
+        return results
+
+    def close(self) -> list[dict]:
+        """Waits for the submitted evaluations, stops the worker and returns the remaining results."""
+        self._requests.put(None)
+        results = self.poll(block=True)
+        self._process.join()
+        return results
+
+
 def main():
     init_logging()
     register_third_party_plugins()
@@ -129,13 +129,14 @@ from lerobot.utils.control_utils import (
     sanity_check_dataset_robot_compatibility,
 )
 from lerobot.utils.import_utils import register_third_party_plugins
+from lerobot.utils.loop_profiler import ControlLoopProfiler
 from lerobot.utils.robot_utils import precise_sleep
 from lerobot.utils.utils import (
     get_safe_torch_device,
     init_logging,
     log_say,
 )
-from lerobot.utils.visualization_utils import init_rerun, log_rerun_data
+from lerobot.utils.visualization_utils import RerunLogger, init_rerun
 
 
 @dataclass
@@ -201,10 +202,20 @@ class RecordConfig:
     display_port: int | None = None
     # Whether to  display compressed images in Rerun
     display_compressed_images: bool = False
+    # Maximum frequency at which camera images are displayed in Rerun, independently of the recording fps.
+    # Images are logged on a background thread and skipped while it is busy. None displays every frame.
+    display_image_fps: float | None = 10
     # Use vocal synthesis to read events.
     play_sounds: bool = True
     # Resume recording on an existing dataset.
     resume: bool = False
+    # Time each stage of the recording loop (robot observation, policy, send_action, add_frame...) and log
+    # their latency percentiles and the number of iterations over the time budget at the end of the recording.
+    # Per-iteration timings are also logged to Rerun when `display_data` is set.
+    profile_loop: bool = False
+    # Optional JSON file where the latency statistics and histograms of the recording loop are written.
+    # Implies `profile_loop`.
+    profile_path: Path | None = None
 
     def __post_init__(self):
         # HACK: We parse again the cli args here to get the pretrained path if there was one.
@@ -278,6 +289,8 @@ def record_loop(
     single_task: str | None = None,
     display_data: bool = False,
     display_compressed_images: bool = False,
+    profiler: ControlLoopProfiler | None = None,
+    rerun_logger: RerunLogger | None = None,
 ):
     if dataset is not None and dataset.fps != fps:
         raise ValueError(f"The dataset fps should be equal to requested fps ({dataset.fps} != {fps}).")
@@ -313,6 +326,14 @@ def record_loop(
         preprocessor.reset()
         postprocessor.reset()
 
+    # Disabled profilers only return no-op context managers
+    if profiler is None:
+        profiler = ControlLoopProfiler(fps, enabled=False)
+
+    owns_rerun_logger = display_data and rerun_logger is None
+    if owns_rerun_logger:
+        rerun_logger = RerunLogger(compress_images=display_compressed_images)
+
     timestamp = 0
     start_episode_t = time.perf_counter()
     while timestamp < control_time_s:
@@ -322,81 +343,97 @@ def record_loop(
             events["exit_early"] = False
             break
 
-        # Get robot observation
-        obs = robot.get_observation()
-
-        # Applies a pipeline to the raw robot observation, default is IdentityProcessor
-        obs_processed = robot_observation_processor(obs)
-
-        if policy is not None or dataset is not None:
-            observation_frame = build_dataset_frame(dataset.features, obs_processed, prefix=OBS_STR)
-
-        # Get action from either policy or teleop
-        if policy is not None and preprocessor is not None and postprocessor is not None:
-            action_values = predict_action(
-                observation=observation_frame,
-                policy=policy,
-                device=get_safe_torch_device(policy.config.device),
-                preprocessor=preprocessor,
-                postprocessor=postprocessor,
-                use_amp=policy.config.use_amp,
-                task=single_task,
-                robot_type=robot.robot_type,
-            )
-
-            act_processed_policy: RobotAction = make_robot_action(action_values, dataset.features)
-
-        elif policy is None and isinstance(teleop, Teleoperator):
-            act = teleop.get_action()
-
-            # Applies a pipeline to the raw teleop action, default is IdentityProcessor
-            act_processed_teleop = teleop_action_processor((act, obs))
-
-        elif policy is None and isinstance(teleop, list):
-            arm_action = teleop_arm.get_action()
-            arm_action = {f"arm_{k}": v for k, v in arm_action.items()}
-            keyboard_action = teleop_keyboard.get_action()
-            base_action = robot._from_keyboard_to_base_action(keyboard_action)
-            act = {**arm_action, **base_action} if len(base_action) > 0 else arm_action
-            act_processed_teleop = teleop_action_processor((act, obs))
-        else:
-            logging.info(
-                "No policy or teleoperator provided, skipping action generation."
-                "This is likely to happen when resetting the environment without a teleop device."
-                "The robot won't be at its rest position at the start of the next episode."
-            )
-            continue
-
-        # Applies a pipeline to the action, default is IdentityProcessor
-        if policy is not None and act_processed_policy is not None:
-            action_values = act_processed_policy
-            robot_action_to_send = robot_action_processor((act_processed_policy, obs))
-        else:
-            action_values = act_processed_teleop
-            robot_action_to_send = robot_action_processor((act_processed_teleop, obs))
-
-        # Send action to robot
-        # Action can eventually be clipped using `max_relative_target`,
-        # so action actually sent is saved in the dataset. action = postprocessor.process(action)
-        # TODO(steven, pepijn, adil): we should use a pipeline step to clip the action, so the sent action is the action that we input to the robot.
-        _sent_action = robot.send_action(robot_action_to_send)
-
-        # Write to dataset
-        if dataset is not None:
-            action_frame = build_dataset_frame(dataset.features, action_values, prefix=ACTION)
-            frame = {**observation_frame, **action_frame, "task": single_task}
-            dataset.add_frame(frame)
-
-        if display_data:
-            log_rerun_data(
-                observation=obs_processed, action=action_values, compress_images=display_compressed_images
-            )
+        profiler.start_loop()
+
+        try:
+            # Get robot observation
+            with profiler.stage("robot_observation"):
+                obs = robot.get_observation()
+
+            # Applies a pipeline to the raw robot observation, default is IdentityProcessor
+            with profiler.stage("observation_processor"):
+                obs_processed = robot_observation_processor(obs)
+
+                if policy is not None or dataset is not None:
+                    observation_frame = build_dataset_frame(dataset.features, obs_processed, prefix=OBS_STR)
+
+            # Get action from either policy or teleop
+            if policy is not None and preprocessor is not None and postprocessor is not None:
+                with profiler.stage("policy"):
+                    action_values = predict_action(
+                        observation=observation_frame,
+                        policy=policy,
+                        device=get_safe_torch_device(policy.config.device),
+                        preprocessor=preprocessor,
+                        postprocessor=postprocessor,
+                        use_amp=policy.config.use_amp,
+                        task=single_task,
+                        robot_type=robot.robot_type,
+                    )
 
+                    act_processed_policy: RobotAction = make_robot_action(action_values, dataset.features)
+
+            elif policy is None and isinstance(teleop, Teleoperator):
+                with profiler.stage("teleop_action"):
+                    act = teleop.get_action()
+
+                # Applies a pipeline to the raw teleop action, default is IdentityProcessor
+                with profiler.stage("teleop_processor"):
+                    act_processed_teleop = teleop_action_processor((act, obs))
+
+            elif policy is None and isinstance(teleop, list):
+                with profiler.stage("teleop_action"):
+                    arm_action = teleop_arm.get_action()
+                    arm_action = {f"arm_{k}": v for k, v in arm_action.items()}
+                    keyboard_action = teleop_keyboard.get_action()
+                    base_action = robot._from_keyboard_to_base_action(keyboard_action)
+                    act = {**arm_action, **base_action} if len(base_action) > 0 else arm_action
+                with profiler.stage("teleop_processor"):
+                    act_processed_teleop = teleop_action_processor((act, obs))
+            else:
+                logging.info(
+                    "No policy or teleoperator provided, skipping action generation."
+                    "This is likely to happen when resetting the environment without a teleop device."
+                    "The robot won't be at its rest position at the start of the next episode."
+                )
+                continue
+
+            # Applies a pipeline to the action, default is IdentityProcessor
+            with profiler.stage("action_processor"):
+                if policy is not None and act_processed_policy is not None:
+                    action_values = act_processed_policy
+                    robot_action_to_send = robot_action_processor((act_processed_policy, obs))
+                else:
+                    action_values = act_processed_teleop
+                    robot_action_to_send = robot_action_processor((act_processed_teleop, obs))
+
+            # Send action to robot
+            # Action can eventually be clipped using `max_relative_target`,
+            # so action actually sent is saved in the dataset. action = postprocessor.process(action)
+            # TODO(steven, pepijn, adil): we should use a pipeline step to clip the action, so the sent action is the action that we input to the robot.
+            with profiler.stage("send_action"):
+                _sent_action = robot.send_action(robot_action_to_send)
+
+            # Write to dataset
+            if dataset is not None:
+                with profiler.stage("dataset_add_frame"):
+                    action_frame = build_dataset_frame(dataset.features, action_values, prefix=ACTION)
+                    frame = {**observation_frame, **action_frame, "task": single_task}
+                    dataset.add_frame(frame)
+
+            if display_data:
+                with profiler.stage("rerun_logging"):
+                    rerun_logger.log(observation=obs_processed, action=action_values)
+        finally:
+            profiler.end_loop()
         dt_s = time.perf_counter() - start_loop_t
         precise_sleep(max(1 / fps - dt_s, 0.0))
 
         timestamp = time.perf_counter() - start_episode_t
 
+    if owns_rerun_logger:
+        rerun_logger.close()
+
 
 @parser.wrap()
 def record(cfg: RecordConfig) -> LeRobotDataset:
@@ -432,6 +469,11 @@ def record(cfg: RecordConfig) -> LeRobotDataset:
 
     dataset = None
     listener = None
+    rerun_logger = (
+        RerunLogger(compress_images=display_compressed_images, image_fps=cfg.display_image_fps)
+        if cfg.display_data
+        else None
+    )
 
     try:
         if cfg.resume:
@@ -484,6 +526,12 @@ def record(cfg: RecordConfig) -> LeRobotDataset:
             teleop.connect()
 
         listener, events = init_keyboard_listener()
+        # Only the recording loops are profiled, not the resets
+        profiler = ControlLoopProfiler(
+            cfg.dataset.fps,
+            enabled=cfg.profile_loop or cfg.profile_path is not None,
+            log_to_rerun=cfg.display_data,
+        )
 
         with VideoEncodingManager(dataset):
             recorded_episodes = 0
@@ -505,6 +553,8 @@ def record(cfg: RecordConfig) -> LeRobotDataset:
                     single_task=cfg.dataset.single_task,
                     display_data=cfg.display_data,
                     display_compressed_images=display_compressed_images,
+                    profiler=profiler,
+                    rerun_logger=rerun_logger,
                 )
 
                 # Execute a few seconds without recording to give time to manually reset the environment
@@ -529,6 +579,8 @@ def record(cfg: RecordConfig) -> LeRobotDataset:
                         control_time_s=cfg.dataset.reset_time_s,
                         single_task=cfg.dataset.single_task,
                         display_data=cfg.display_data,
+                        display_compressed_images=display_compressed_images,
+                        rerun_logger=rerun_logger,
                     )
 
                 if events["rerecord_episode"]:
@@ -540,9 +592,16 @@ def record(cfg: RecordConfig) -> LeRobotDataset:
 
                 dataset.save_episode()
                 recorded_episodes += 1
+
+        profiler.log_summary()
+        if cfg.profile_path is not None:
+            profiler.save(cfg.profile_path)
     finally:
         log_say("Stop recording", cfg.play_sounds, blocking=True)
 
+        if rerun_logger is not None:
+            rerun_logger.close()
+
         if dataset:
             dataset.finalize()
 
@@ -54,6 +54,7 @@ lerobot-teleoperate \
 import logging
 import time
 from dataclasses import asdict, dataclass
+from pathlib import Path
 from pprint import pformat
 
 import rerun as rr
@@ -93,9 +94,10 @@ from lerobot.teleoperators import (  # noqa: F401
     so_leader,
 )
 from lerobot.utils.import_utils import register_third_party_plugins
+from lerobot.utils.loop_profiler import ControlLoopProfiler
 from lerobot.utils.robot_utils import precise_sleep
 from lerobot.utils.utils import init_logging, move_cursor_up
-from lerobot.utils.visualization_utils import init_rerun, log_rerun_data
+from lerobot.utils.visualization_utils import RerunLogger, init_rerun
 
 
 @dataclass
@@ -114,6 +116,15 @@ class TeleoperateConfig:
     display_port: int | None = None
     # Whether to  display compressed images in Rerun
     display_compressed_images: bool = False
+    # Maximum frequency at which camera images are displayed in Rerun, independently of `fps`.
+    # Images are logged on a background thread and skipped while it is busy. None displays every frame.
+    display_image_fps: float | None = 10
+    # Time each stage of the teleoperation loop (robot observation, teleop action, send_action...) and log their
+    # latency percentiles and the number of iterations over the time budget at the end.
+    # Per-iteration timings are also logged to Rerun when `display_data` is set.
+    profile_loop: bool = False
+    # Optional JSON file where the latency statistics and histograms of the loop are written. Implies `profile_loop`.
+    profile_path: Path | None = None
 
 
 def teleop_loop(
@@ -126,6 +137,8 @@ def teleop_loop(
     display_data: bool = False,
     duration: float | None = None,
     display_compressed_images: bool = False,
+    profiler: ControlLoopProfiler | None = None,
+    rerun_logger: RerunLogger | None = None,
 ):
     """
     This function continuously reads actions from a teleoperation device, processes them through optional
@@ -142,49 +155,65 @@ def teleop_loop(
         teleop_action_processor: An optional pipeline to process raw actions from the teleoperator.
         robot_action_processor: An optional pipeline to process actions before they are sent to the robot.
         robot_observation_processor: An optional pipeline to process raw observations from the robot.
+        profiler: An optional profiler timing each stage of the loop.
+        rerun_logger: An optional logger displaying the data in Rerun. One logging every image is created when
+            `display_data` is set and it is not provided.
     """
 
     display_len = max(len(key) for key in robot.action_features)
     start = time.perf_counter()
+    # Disabled profilers only return no-op context managers
+    if profiler is None:
+        profiler = ControlLoopProfiler(fps, enabled=False)
+
+    owns_rerun_logger = display_data and rerun_logger is None
+    if owns_rerun_logger:
+        rerun_logger = RerunLogger(compress_images=display_compressed_images)
 
     while True:
         loop_start = time.perf_counter()
-
-        # Get robot observation
-        # Not really needed for now other than for visualization
-        # teleop_action_processor can take None as an observation
-        # given that it is the identity processor as default
-        obs = robot.get_observation()
-
-        # Get teleop action
-        raw_action = teleop.get_action()
-
-        # Process teleop action through pipeline
-        teleop_action = teleop_action_processor((raw_action, obs))
-
-        # Process action for robot through pipeline
-        robot_action_to_send = robot_action_processor((teleop_action, obs))
-
-        # Send processed action to robot (robot_action_processor.to_output should return RobotAction)
-        _ = robot.send_action(robot_action_to_send)
-
-        if display_data:
-            # Process robot observation through pipeline
-            obs_transition = robot_observation_processor(obs)
-
-            log_rerun_data(
-                observation=obs_transition,
-                action=teleop_action,
-                compress_images=display_compressed_images,
-            )
-
-            print("\n" + "-" * (display_len + 10))
-            print(f"{'NAME':<{display_len}} | {'NORM':>7}")
-            # Display the final robot action that was sent
-            for motor, value in robot_action_to_send.items():
-                print(f"{motor:<{display_len}} | {value:>7.2f}")
-            move_cursor_up(len(robot_action_to_send) + 3)
-
+        profiler.start_loop()
+
+        try:
+            # Get robot observation
+            # Not really needed for now other than for visualization
+            # teleop_action_processor can take None as an observation
+            # given that it is the identity processor as default
+            with profiler.stage("robot_observation"):
+                obs = robot.get_observation()
+
+            # Get teleop action
+            with profiler.stage("teleop_action"):
+                raw_action = teleop.get_action()
+
+            # Process teleop action through pipeline
+            with profiler.stage("teleop_processor"):
+                teleop_action = teleop_action_processor((raw_action, obs))
+
+            # Process action for robot through pipeline
+            with profiler.stage("action_processor"):
+                robot_action_to_send = robot_action_processor((teleop_action, obs))
+
+            # Send processed action to robot (robot_action_processor.to_output should return RobotAction)
+            with profiler.stage("send_action"):
+                _ = robot.send_action(robot_action_to_send)
+
+            if display_data:
+                # Process robot observation through pipeline
+                with profiler.stage("observation_processor"):
+                    obs_transition = robot_observation_processor(obs)
+
+                with profiler.stage("rerun_logging"):
+                    rerun_logger.log(observation=obs_transition, action=teleop_action)
+
+                print("\n" + "-" * (display_len + 10))
+                print(f"{'NAME':<{display_len}} | {'NORM':>7}")
+                # Display the final robot action that was sent
+                for motor, value in robot_action_to_send.items():
+                    print(f"{motor:<{display_len}} | {value:>7.2f}")
+                move_cursor_up(len(robot_action_to_send) + 3)
+        finally:
+            profiler.end_loop()
         dt_s = time.perf_counter() - loop_start
         precise_sleep(max(1 / fps - dt_s, 0.0))
         loop_s = time.perf_counter() - loop_start
@@ -192,6 +221,8 @@ def teleop_loop(
         move_cursor_up(1)
 
         if duration is not None and time.perf_counter() - start >= duration:
+            if owns_rerun_logger:
+                rerun_logger.close()
             return
 
 
@@ -213,6 +244,14 @@ def teleoperate(cfg: TeleoperateConfig):
 
     teleop.connect()
     robot.connect()
+    profiler = ControlLoopProfiler(
+        cfg.fps, enabled=cfg.profile_loop or cfg.profile_path is not None, log_to_rerun=cfg.display_data
+    )
+    rerun_logger = (
+        RerunLogger(compress_images=display_compressed_images, image_fps=cfg.display_image_fps)
+        if cfg.display_data
+        else None
+    )
 
     try:
         teleop_loop(
@@ -225,10 +264,17 @@ def teleoperate(cfg: TeleoperateConfig):
             robot_action_processor=robot_action_processor,
             robot_observation_processor=robot_observation_processor,
             display_compressed_images=display_compressed_images,
+            profiler=profiler,
+            rerun_logger=rerun_logger,
         )
     except KeyboardInterrupt:
         pass
     finally:
+        profiler.log_summary()
+        if cfg.profile_path is not None:
+            profiler.save(cfg.profile_path)
+        if rerun_logger is not None:
+            rerun_logger.close()
         if cfg.display_data:
             rr.rerun_shutdown()
         teleop.disconnect()
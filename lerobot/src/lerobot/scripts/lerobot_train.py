@@ -29,18 +29,19 @@ from lerobot.configs import parser
 from lerobot.configs.train import TrainPipelineConfig
 from lerobot.datasets.factory import make_dataset
 from lerobot.datasets.sampler import EpisodeAwareSampler
-from lerobot.datasets.utils import cycle
+from lerobot.datasets.utils import BatchPrefetcher, cycle
 from lerobot.envs.factory import make_env, make_env_pre_post_processors
 from lerobot.envs.utils import close_envs
 from lerobot.optim.factory import make_optimizer_and_scheduler
 from lerobot.policies.factory import make_policy, make_pre_post_processors
 from lerobot.policies.pretrained import PreTrainedPolicy
 from lerobot.rl.wandb_utils import WandBLogger
-from lerobot.scripts.lerobot_eval import eval_policy_all
+from lerobot.scripts.lerobot_eval import AsyncEvaluator, eval_policy_all
 from lerobot.utils.import_utils import register_third_party_plugins
 from lerobot.utils.logging_utils import AverageMeter, MetricsTracker
 from lerobot.utils.random_utils import set_seed
 from lerobot.utils.train_utils import (
+    AsyncCheckpointWriter,
     get_step_checkpoint_dir,
     get_step_identifier,
     load_training_state,
@@ -54,8 +55,25 @@ from lerobot.utils.utils import (
 )
 
 
+def _get_batch_size(batch: dict[str, Any]) -> int:
+    for value in batch.values():
+        if isinstance(value, torch.Tensor) and value.ndim > 0:
+            return value.shape[0]
+    raise ValueError("Could not infer the batch size, the batch doesn't contain any batched tensor.")
+
+
+def _slice_batch(batch: dict[str, Any], start: int, end: int) -> dict[str, Any]:
+    """Returns the samples `start:end` of a batch, leaving the entries that aren't batched untouched."""
+    batch_size = _get_batch_size(batch)
+    micro_batch = {}
+    for key, value in batch.items():
+        is_tensor_batch = isinstance(value, torch.Tensor) and value.ndim > 0 and len(value) == batch_size
+        is_list_batch = isinstance(value, (list, tuple)) and len(value) == batch_size
+        micro_batch[key] = value[start:end] if is_tensor_batch or is_list_batch else value
+    return micro_batch
+
+
 def update_policy(
-    train_metrics: MetricsTracker,
     policy: PreTrainedPolicy,
     batch: Any,
     optimizer: Optimizer,
@@ -64,15 +82,20 @@ def update_policy(
     lr_scheduler=None,
     lock=None,
     rabc_weights_provider=None,
-) -> tuple[MetricsTracker, dict]:
+    micro_batch_size: int | None = None,
+) -> tuple[torch.Tensor, torch.Tensor | None, dict, float]:
     """
     Performs a single training step to update the policy's weights.
 
     This function executes the forward and backward passes, clips gradients, and steps the optimizer and
     learning rate scheduler. Accelerator handles mixed-precision training automatically.
 
+    With gradient accumulation (`accelerator.gradient_accumulation_steps > 1`), the gradients of the batch
+    are accumulated and the optimizer, learning rate scheduler and `policy.update()` are only stepped on
+    every `gradient_accumulation_steps`-th call. The metrics are recorded once per optimizer step by
+    `train_step`.
+
     Args:
-        train_metrics: A MetricsTracker instance to record training statistics.
         policy: The policy model to be trained.
         batch: A batch of training data.
         optimizer: The optimizer used to update the policy's parameters.
@@ -81,11 +104,15 @@ def update_policy(
         lr_scheduler: An optional learning rate scheduler.
         lock: An optional lock for thread-safe optimizer updates.
         rabc_weights_provider: Optional RABCWeights instance for sample weighting.
+        micro_batch_size: If set, the batch is split into chunks of this size for the forward and backward
+            passes. The gradients are the same as for the whole batch.
 
     Returns:
         A tuple containing:
-        - The updated MetricsTracker with new statistics for this step.
+        - The loss of the batch, as a detached device tensor.
+        - The gradient norm, as a detached device tensor, or None if the optimizer wasn't stepped.
         - A dictionary of outputs from the policy's forward pass, for logging purposes.
+        - The duration of the update, in seconds.
     """
     start_time = time.perf_counter()
     policy.train()
@@ -96,58 +123,247 @@ def update_policy(
     if rabc_weights_provider is not None:
         rabc_batch_weights, rabc_batch_stats = rabc_weights_provider.compute_batch_weights(batch)
 
-    # Let accelerator handle mixed precision
-    with accelerator.autocast():
-        # Use per-sample loss when RA-BC is enabled for proper weighting
-        if rabc_batch_weights is not None:
-            # Get per-sample losses
-            per_sample_loss, output_dict = policy.forward(batch, reduction="none")
-
-            # Apply RA-BC weights: L_RA-BC = Σ(w_i * l_i) / (Σw_i + ε)
-            # rabc_batch_weights is already normalized to sum to batch_size
-            epsilon = 1e-6
-            loss = (per_sample_loss * rabc_batch_weights).sum() / (rabc_batch_weights.sum() + epsilon)
+    batch_size = _get_batch_size(batch)
+    micro_batch_size = micro_batch_size or batch_size
+    loss = 0.0
+    output_dict = {}
+    # Outside of the optimizer steps (`accelerator.sync_gradients` is False), accelerate skips the gradient
+    # synchronization across processes as well as `optimizer.step` and `optimizer.zero_grad`.
+    with accelerator.accumulate(policy):
+        for start in range(0, batch_size, micro_batch_size):
+            end = min(start + micro_batch_size, batch_size)
+            micro_batch = _slice_batch(batch, start, end) if micro_batch_size < batch_size else batch
+            # Gradients are only synchronized across processes after the last micro-batch.
+            sync_context = accelerator.no_sync(policy) if end < batch_size else nullcontext()
+            with sync_context:
+                # Let accelerator handle mixed precision
+                with accelerator.autocast():
+                    # Use per-sample loss when RA-BC is enabled for proper weighting
+                    if rabc_batch_weights is not None:
+                        # Get per-sample losses
+                        per_sample_loss, micro_output_dict = policy.forward(micro_batch, reduction="none")
+
+                        # Apply RA-BC weights: L_RA-BC = Σ(w_i * l_i) / (Σw_i + ε)
+                        # rabc_batch_weights is already normalized to sum to batch_size, the sum over the
+                        # micro-batches gives the loss of the whole batch. Like with multiple processes, the
+                        # weights are normalized per batch when accumulating gradients over several batches.
+                        epsilon = 1e-6
+                        micro_loss = (per_sample_loss * rabc_batch_weights[start:end]).sum() / (
+                            rabc_batch_weights.sum() + epsilon
+                        )
+                    else:
+                        micro_loss, micro_output_dict = policy.forward(micro_batch)
+                        micro_loss = micro_loss * ((end - start) / batch_size)
+
+                    # TODO(rcadene): policy.unnormalize_outputs(out_dict)
+
+                # Use accelerator's backward method (which divides the loss by the accumulation steps)
+                accelerator.backward(micro_loss)
+
+            loss = loss + micro_loss.detach()
+            for key, value in (micro_output_dict or {}).items():
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    output_dict[key] = output_dict.get(key, 0.0) + value * (end - start) / batch_size
+                else:
+                    output_dict[key] = value
+
+        if rabc_batch_stats is not None:
             # Log raw mean weight (before normalization) - this is the meaningful metric
             output_dict["rabc_mean_weight"] = rabc_batch_stats["raw_mean_weight"]
             output_dict["rabc_num_zero_weight"] = rabc_batch_stats["num_zero_weight"]
             output_dict["rabc_num_full_weight"] = rabc_batch_stats["num_full_weight"]
-        else:
-            loss, output_dict = policy.forward(batch)
 
-        # TODO(rcadene): policy.unnormalize_outputs(out_dict)
+        # Clip gradients if specified, once they have been accumulated
+        grad_norm = None
+        if accelerator.sync_gradients:
+            if grad_clip_norm > 0:
+                grad_norm = accelerator.clip_grad_norm_(policy.parameters(), grad_clip_norm)
+            else:
+                grad_norm = torch.nn.utils.clip_grad_norm_(
+                    policy.parameters(), float("inf"), error_if_nonfinite=False
+                )
 
-    # Use accelerator's backward method
-    accelerator.backward(loss)
+        # Optimizer step
+        with lock if lock is not None else nullcontext():
+            optimizer.step()
 
-    # Clip gradients if specified
-    if grad_clip_norm > 0:
-        grad_norm = accelerator.clip_grad_norm_(policy.parameters(), grad_clip_norm)
-    else:
-        grad_norm = torch.nn.utils.clip_grad_norm_(
-            policy.parameters(), float("inf"), error_if_nonfinite=False
-        )
+        optimizer.zero_grad()
+
+    if accelerator.sync_gradients:
+        # Step through pytorch scheduler at every optimizer step instead of epoch
+        if lr_scheduler is not None:
+            lr_scheduler.step()
+
+        # Update internal buffers if policy has update method
+        if has_method(accelerator.unwrap_model(policy, keep_fp32_wrapper=True), "update"):
+            accelerator.unwrap_model(policy, keep_fp32_wrapper=True).update()
+
+    if grad_norm is not None:
+        grad_norm = grad_norm.detach()
+    return loss, grad_norm, output_dict, time.perf_counter() - start_time
+
+
+def train_step(
+    train_metrics: MetricsTracker,
+    policy: PreTrainedPolicy,
+    dl_iter,
+    optimizer: Optimizer,
+    grad_clip_norm: float,
+    accelerator: Accelerator,
+    preprocessor=None,
+    lr_scheduler=None,
+    rabc_weights_provider=None,
+    sync_metrics: bool = True,
+    micro_batch_size: int | None = None,
+) -> tuple[MetricsTracker, dict]:
+    """
+    Performs a single optimizer step, accumulating the gradients of `accelerator.gradient_accumulation_steps`
+    batches with `update_policy`.
 
-    # Optimizer step
-    with lock if lock is not None else nullcontext():
-        optimizer.step()
+    The metrics are recorded once per optimizer step: the loss is averaged over the batches, and the time
+    spent loading (and preprocessing) and updating on the batches is summed in `dataloading_s` and
+    `update_s`.
 
-    optimizer.zero_grad()
+    Args:
+        train_metrics: A MetricsTracker instance to record training statistics.
+        policy: The policy model to be trained.
+        dl_iter: An iterator over the training batches.
+        optimizer: The optimizer used to update the policy's parameters.
+        grad_clip_norm: The maximum norm for gradient clipping.
+        accelerator: The Accelerator instance, holding the number of gradient accumulation steps.
+        preprocessor: An optional processor applied to each batch. None if the batches are already
+            preprocessed, e.g. by a `BatchPrefetcher`.
+        lr_scheduler: An optional learning rate scheduler.
+        rabc_weights_provider: Optional RABCWeights instance for sample weighting.
+        sync_metrics: If False, the loss and gradient norm are recorded as device tensors, which avoids a
+            device synchronization until the metrics are read.
+        micro_batch_size: See `update_policy`.
 
-    # Step through pytorch scheduler at every batch instead of epoch
-    if lr_scheduler is not None:
-        lr_scheduler.step()
+    Returns:
+        A tuple containing:
+        - The updated MetricsTracker with new statistics for this step.
+        - A dictionary of outputs from the policy's forward pass on the last batch, for logging purposes.
+    """
+    num_batches = accelerator.gradient_accumulation_steps
+    loss = 0.0
+    dataloading_s = update_s = 0.0
+    # The optimizer is stepped by the last of the `gradient_accumulation_steps` updates.
+    for _ in range(num_batches):
+        start_time = time.perf_counter()
+        batch = next(dl_iter)
+        if preprocessor is not None:
+            batch = preprocessor(batch)
+        dataloading_s += time.perf_counter() - start_time
 
-    # Update internal buffers if policy has update method
-    if has_method(accelerator.unwrap_model(policy, keep_fp32_wrapper=True), "update"):
-        accelerator.unwrap_model(policy, keep_fp32_wrapper=True).update()
+        batch_loss, grad_norm, output_dict, batch_update_s = update_policy(
+            policy,
+            batch,
+            optimizer,
+            grad_clip_norm,
+            accelerator=accelerator,
+            lr_scheduler=lr_scheduler,
+            rabc_weights_provider=rabc_weights_provider,
+            micro_batch_size=micro_batch_size,
+        )
+        loss = loss + batch_loss
+        update_s += batch_update_s
+    loss = loss / num_batches
 
-    train_metrics.loss = loss.item()
-    train_metrics.grad_norm = grad_norm.item()
+    train_metrics.loss = loss.item() if sync_metrics else loss
+    if grad_norm is not None:
+        train_metrics.grad_norm = grad_norm.item() if sync_metrics else grad_norm
     train_metrics.lr = optimizer.param_groups[0]["lr"]
-    train_metrics.update_s = time.perf_counter() - start_time
+    train_metrics.update_s = update_s
+    train_metrics.dataloading_s = dataloading_s
     return train_metrics, output_dict
 
 
+def make_accelerator(gradient_accumulation_steps: int = 1, cpu: bool = False) -> Accelerator:
+    """Creates the Accelerator used for training.
+
+    It automatically detects if running in distributed mode or single-process mode.
+    """
+    from accelerate.utils import DistributedDataParallelKwargs
+
+    # We set step_scheduler_with_optimizer=False to prevent accelerate from adjusting the lr_scheduler steps based on the num_processes
+    # We set find_unused_parameters=True to handle models with conditional computation
+    ddp_kwargs = DistributedDataParallelKwargs(find_unused_parameters=True)
+    accelerator = Accelerator(step_scheduler_with_optimizer=False, kwargs_handlers=[ddp_kwargs], cpu=cpu)
+    set_gradient_accumulation_steps(accelerator, gradient_accumulation_steps)
+    return accelerator
+
+
+def set_gradient_accumulation_steps(accelerator: Accelerator, gradient_accumulation_steps: int) -> None:
+    accelerator.gradient_accumulation_steps = gradient_accumulation_steps
+    # Optimizer steps are counted in batches, they shouldn't be shifted by the end of the dataloader epochs.
+    accelerator.gradient_state.plugin_kwargs["sync_with_dataloader"] = False
+
+
+def log_eval_info(
+    eval_info: dict,
+    step: int,
+    cfg: TrainPipelineConfig,
+    dataset,
+    accelerator: Accelerator,
+    wandb_logger: WandBLogger | None,
+    wandb_step: int | None = None,
+) -> None:
+    """Logs the results of `eval_policy_all` for the policy at `step`.
+
+    `wandb_step` is the WandB step to log at if it differs from `step`, as WandB steps can't go backward.
+    """
+    # overall metrics (suite-agnostic)
+    aggregated = eval_info["overall"]
+
+    # optional: per-suite logging
+    for suite, suite_info in eval_info.items():
+        logging.info("Suite %s aggregated: %s", suite, suite_info)
+
+    # meters/tracker
+    eval_metrics = {
+        "avg_sum_reward": AverageMeter("∑rwrd", ":.3f"),
+        "pc_success": AverageMeter("success", ":.1f"),
+        "eval_s": AverageMeter("eval_s", ":.3f"),
+    }
+    eval_tracker = MetricsTracker(
+        cfg.batch_size,
+        dataset.num_frames,
+        dataset.num_episodes,
+        eval_metrics,
+        initial_step=step,
+        accelerator=accelerator,
+    )
+    eval_tracker.eval_s = aggregated.pop("eval_s")
+    eval_tracker.avg_sum_reward = aggregated.pop("avg_sum_reward")
+    eval_tracker.pc_success = aggregated.pop("pc_success")
+    if wandb_logger:
+        wandb_log_dict = {**eval_tracker.to_dict(), **eval_info}
+        if wandb_step is None:
+            wandb_logger.log_dict(wandb_log_dict, step, mode="eval")
+        else:
+            # The evaluated step is logged along the metrics under `eval/steps`.
+            wandb_logger.log_dict(wandb_log_dict, mode="eval", custom_step_key="steps")
+        wandb_logger.log_video(
+            eval_info["overall"]["video_paths"][0], step if wandb_step is None else wandb_step, mode="eval"
+        )
+
+
+def log_async_eval_result(
+    result: dict,
+    step: int,
+    cfg: TrainPipelineConfig,
+    dataset,
+    accelerator: Accelerator,
+    wandb_logger: WandBLogger | None,
+) -> None:
+    """Logs a result returned by `AsyncEvaluator.poll` while training is at `step`."""
+    if result["status"] == "done":
+        logging.info(f"Eval policy at step {result['step']} (finished at step {step})")
+        log_eval_info(result["eval_info"], result["step"], cfg, dataset, accelerator, wandb_logger, step)
+    elif result["status"] == "failed":
+        logging.warning(f"Eval policy at step {result['step']} failed: {result['error']}")
+
+
 @parser.wrap()
 def train(cfg: TrainPipelineConfig, accelerator: Accelerator | None = None):
     """
@@ -168,21 +384,12 @@ def train(cfg: TrainPipelineConfig, accelerator: Accelerator | None = None):
     cfg.validate()
 
     # Create Accelerator if not provided
-    # It will automatically detect if running in distributed mode or single-process mode
-    # We set step_scheduler_with_optimizer=False to prevent accelerate from adjusting the lr_scheduler steps based on the num_processes
-    # We set find_unused_parameters=True to handle models with conditional computation
     if accelerator is None:
-        from accelerate.utils import DistributedDataParallelKwargs
-
-        ddp_kwargs = DistributedDataParallelKwargs(find_unused_parameters=True)
         # Accelerate auto-detects the device based on the available hardware and ignores the policy.device setting.
         # Force the device to be CPU when policy.device is set to CPU.
-        force_cpu = cfg.policy.device == "cpu"
-        accelerator = Accelerator(
-            step_scheduler_with_optimizer=False,
-            kwargs_handlers=[ddp_kwargs],
-            cpu=force_cpu,
-        )
+        accelerator = make_accelerator(cfg.gradient_accumulation_steps, cpu=cfg.policy.device == "cpu")
+    else:
+        set_gradient_accumulation_steps(accelerator, cfg.gradient_accumulation_steps)
 
     init_logging(accelerator=accelerator)
 
@@ -225,9 +432,16 @@ def train(cfg: TrainPipelineConfig, accelerator: Accelerator | None = None):
     # On real-world data, no need to create an environment as evaluations are done outside train.py,
     # using the eval.py instead, with gym_dora environment and dora-rs.
     eval_env = None
+    async_evaluator = None
     if cfg.eval_freq > 0 and cfg.env is not None and is_main_process:
-        logging.info("Creating env")
-        eval_env = make_env(cfg.env, n_envs=cfg.eval.batch_size, use_async_envs=cfg.eval.use_async_envs)
+        if cfg.async_eval:
+            logging.info("Starting the evaluation worker")
+            async_evaluator = AsyncEvaluator(
+                cfg, device=cfg.async_eval_device, skip_stale=cfg.skip_stale_evals
+            )
+        else:
+            logging.info("Creating env")
+            eval_env = make_env(cfg.env, n_envs=cfg.eval.batch_size, use_async_envs=cfg.eval.use_async_envs)
 
     if is_main_process:
         logging.info("Creating policy")
@@ -331,8 +545,11 @@ def train(cfg: TrainPipelineConfig, accelerator: Accelerator | None = None):
         logging.info(f"{dataset.num_frames=} ({format_big_number(dataset.num_frames)})")
         logging.info(f"{dataset.num_episodes=}")
         num_processes = accelerator.num_processes
-        effective_bs = cfg.batch_size * num_processes
-        logging.info(f"Effective batch size: {cfg.batch_size} x {num_processes} = {effective_bs}")
+        effective_bs = cfg.batch_size * cfg.gradient_accumulation_steps * num_processes
+        logging.info(
+            f"Effective batch size: {cfg.batch_size} x {cfg.gradient_accumulation_steps} x {num_processes} "
+            f"= {effective_bs}"
+        )
         logging.info(f"{num_learnable_params=} ({format_big_number(num_learnable_params)})")
         logging.info(f"{num_total_params=} ({format_big_number(num_total_params)})")
 
@@ -345,6 +562,7 @@ def train(cfg: TrainPipelineConfig, accelerator: Accelerator | None = None):
             episode_indices_to_use=dataset.episodes,
             drop_n_last_frames=cfg.policy.drop_n_last_frames,
             shuffle=True,
+            seed=cfg.seed,
         )
     else:
         shuffle = True
@@ -366,6 +584,12 @@ def train(cfg: TrainPipelineConfig, accelerator: Accelerator | None = None):
     policy, optimizer, dataloader, lr_scheduler = accelerator.prepare(
         policy, optimizer, dataloader, lr_scheduler
     )
+    if cfg.resume and sampler is not None and len(dataloader) > 0:
+        # Resume the shuffling order where the checkpointed run stopped, the batches are split between the
+        # processes so that each of them consumed `step * gradient_accumulation_steps` batches.
+        epoch, batch_ix = divmod(step * cfg.gradient_accumulation_steps, len(dataloader))
+        sampler.resume(epoch, batch_ix * cfg.batch_size * accelerator.num_processes)
+        dataloader.set_epoch(epoch)
     dl_iter = cycle(dataloader)
 
     policy.train()
@@ -379,7 +603,7 @@ def train(cfg: TrainPipelineConfig, accelerator: Accelerator | None = None):
     }
 
     # Use effective batch size for proper epoch calculation in distributed training
-    effective_batch_size = cfg.batch_size * accelerator.num_processes
+    effective_batch_size = cfg.batch_size * cfg.gradient_accumulation_steps * accelerator.num_processes
     train_tracker = MetricsTracker(
         effective_batch_size,
         dataset.num_frames,
@@ -389,26 +613,33 @@ def train(cfg: TrainPipelineConfig, accelerator: Accelerator | None = None):
         accelerator=accelerator,
     )
 
+    # PEFT policies only save their adapter weights, which `save_checkpoint` handles.
+    checkpoint_writer = None
+    if cfg.save_checkpoint and cfg.async_checkpointing and cfg.peft is None and is_main_process:
+        checkpoint_writer = AsyncCheckpointWriter(max_pending=cfg.max_pending_checkpoints)
+
     if is_main_process:
         logging.info(
             f"Start offline training on a fixed dataset, with effective batch size: {effective_batch_size}"
         )
 
-    for _ in range(step, cfg.steps):
-        start_time = time.perf_counter()
-        batch = next(dl_iter)
-        batch = preprocessor(batch)
-        train_tracker.dataloading_s = time.perf_counter() - start_time
+    if cfg.overlap_training_step:
+        dl_iter = BatchPrefetcher(dl_iter, transform=preprocessor, device=accelerator.device)
 
-        train_tracker, output_dict = update_policy(
+    for _ in range(step, cfg.steps):
+        train_tracker, output_dict = train_step(
             train_tracker,
             policy,
-            batch,
+            dl_iter,
             optimizer,
             cfg.optimizer.grad_clip_norm,
             accelerator=accelerator,
+            # The prefetcher already preprocessed the batches
+            preprocessor=None if cfg.overlap_training_step else preprocessor,
             lr_scheduler=lr_scheduler,
             rabc_weights_provider=rabc_weights,
+            sync_metrics=not cfg.overlap_training_step,
+            micro_batch_size=cfg.micro_batch_size,
         )
 
         # Note: eval and checkpoint happens *after* the `step`th training update has completed, so we
@@ -442,74 +673,79 @@ def train(cfg: TrainPipelineConfig, accelerator: Accelerator | None = None):
             if is_main_process:
                 logging.info(f"Checkpoint policy after step {step}")
                 checkpoint_dir = get_step_checkpoint_dir(cfg.output_dir, cfg.steps, step)
-                save_checkpoint(
-                    checkpoint_dir=checkpoint_dir,
-                    step=step,
-                    cfg=cfg,
-                    policy=accelerator.unwrap_model(policy),
-                    optimizer=optimizer,
-                    scheduler=lr_scheduler,
-                    preprocessor=preprocessor,
-                    postprocessor=postprocessor,
-                )
-                update_last_checkpoint(checkpoint_dir)
-                if wandb_logger:
-                    wandb_logger.log_policy(checkpoint_dir)
+                if checkpoint_writer is not None:
+                    checkpoint_writer.save(
+                        checkpoint_dir=checkpoint_dir,
+                        step=step,
+                        cfg=cfg,
+                        policy=accelerator.unwrap_model(policy),
+                        optimizer=optimizer,
+                        scheduler=lr_scheduler,
+                        preprocessor=preprocessor,
+                        postprocessor=postprocessor,
+                        on_complete=wandb_logger.log_policy if wandb_logger else None,
+                    )
+                else:
+                    save_checkpoint(
+                        checkpoint_dir=checkpoint_dir,
+                        step=step,
+                        cfg=cfg,
+                        policy=accelerator.unwrap_model(policy),
+                        optimizer=optimizer,
+                        scheduler=lr_scheduler,
+                        preprocessor=preprocessor,
+                        postprocessor=postprocessor,
+                    )
+                    update_last_checkpoint(checkpoint_dir)
+                    if wandb_logger:
+                        wandb_logger.log_policy(checkpoint_dir)
 
             accelerator.wait_for_everyone()
 
         if cfg.env and is_eval_step:
             if is_main_process:
-                step_id = get_step_identifier(step, cfg.steps)
-                logging.info(f"Eval policy at step {step}")
-                with torch.no_grad(), accelerator.autocast():
-                    eval_info = eval_policy_all(
-                        envs=eval_env,  # dict[suite][task_id] -> vec_env
-                        policy=accelerator.unwrap_model(policy),
-                        env_preprocessor=env_preprocessor,
-                        env_postprocessor=env_postprocessor,
-                        preprocessor=preprocessor,
-                        postprocessor=postprocessor,
-                        n_episodes=cfg.eval.n_episodes,
-                        videos_dir=cfg.output_dir / "eval" / f"videos_step_{step_id}",
-                        max_episodes_rendered=4,
-                        start_seed=cfg.seed,
-                        max_parallel_tasks=cfg.env.max_parallel_tasks,
+                if async_evaluator is not None:
+                    logging.info(f"Queue eval policy at step {step}")
+                    async_evaluator.submit(
+                        step, accelerator.unwrap_model(policy), preprocessor, postprocessor
                     )
-                # overall metrics (suite-agnostic)
-                aggregated = eval_info["overall"]
-
-                # optional: per-suite logging
-                for suite, suite_info in eval_info.items():
-                    logging.info("Suite %s aggregated: %s", suite, suite_info)
-
-                # meters/tracker
-                eval_metrics = {
-                    "avg_sum_reward": AverageMeter("∑rwrd", ":.3f"),
-                    "pc_success": AverageMeter("success", ":.1f"),
-                    "eval_s": AverageMeter("eval_s", ":.3f"),
-                }
-                eval_tracker = MetricsTracker(
-                    cfg.batch_size,
-                    dataset.num_frames,
-                    dataset.num_episodes,
-                    eval_metrics,
-                    initial_step=step,
-                    accelerator=accelerator,
-                )
-                eval_tracker.eval_s = aggregated.pop("eval_s")
-                eval_tracker.avg_sum_reward = aggregated.pop("avg_sum_reward")
-                eval_tracker.pc_success = aggregated.pop("pc_success")
-                if wandb_logger:
-                    wandb_log_dict = {**eval_tracker.to_dict(), **eval_info}
-                    wandb_logger.log_dict(wandb_log_dict, step, mode="eval")
-                    wandb_logger.log_video(eval_info["overall"]["video_paths"][0], step, mode="eval")
+                else:
+                    step_id = get_step_identifier(step, cfg.steps)
+                    logging.info(f"Eval policy at step {step}")
+                    with torch.no_grad(), accelerator.autocast():
+                        eval_info = eval_policy_all(
+                            envs=eval_env,  # dict[suite][task_id] -> vec_env
+                            policy=accelerator.unwrap_model(policy),
+                            env_preprocessor=env_preprocessor,
+                            env_postprocessor=env_postprocessor,
+                            preprocessor=preprocessor,
+                            postprocessor=postprocessor,
+                            n_episodes=cfg.eval.n_episodes,
+                            videos_dir=cfg.output_dir / "eval" / f"videos_step_{step_id}",
+                            max_episodes_rendered=4,
+                            start_seed=cfg.seed,
+                            max_parallel_tasks=cfg.env.max_parallel_tasks,
+                            auto_reset=cfg.eval.auto_reset,
+                            parallel_backend=cfg.eval.parallel_backend,
+                        )
+                    log_eval_info(eval_info, step, cfg, dataset, accelerator, wandb_logger)
 
             accelerator.wait_for_everyone()
 
+        if async_evaluator is not None:
+            for result in async_evaluator.poll():
+                log_async_eval_result(result, step, cfg, dataset, accelerator, wandb_logger)
+
     if eval_env:
         close_envs(eval_env)
 
+    if async_evaluator is not None:
+        for result in async_evaluator.close():
+            log_async_eval_result(result, step, cfg, dataset, accelerator, wandb_logger)
+
+    if checkpoint_writer is not None:
+        checkpoint_writer.close()
+
     if is_main_process:
         logging.info("End of training")
 
@@ -16,6 +16,7 @@
 import importlib
 import importlib.metadata
 import logging
+from collections.abc import Callable
 from typing import Any
 
 from draccus.choice_types import ChoiceRegistry
@@ -69,6 +70,27 @@ def is_package_available(
         return package_exists
 
 
+def make_lazy_getattr(package: str, attributes: dict[str, str]) -> Callable[[str], Any]:
+    """
+    Returns a module-level `__getattr__` (PEP 562) importing the attributes re-exported by a package on first access.
+
+    This keeps `import package` cheap when its submodules depend on heavy libraries (e.g. transformers), while
+    `from package import Name` keeps working.
+
+    Args:
+        package: The `__name__` of the package.
+        attributes: Maps each attribute name to the submodule defining it, relative to `package` (e.g.
+            {"ACTConfig": ".act.configuration_act"}).
+    """
+
+    def getattr_(name: str) -> Any:
+        if name not in attributes:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}")
+        return getattr(importlib.import_module(attributes[name], package), name)
+
+    return getattr_
+
+
 _transformers_available = is_package_available("transformers")
 _peft_available = is_package_available("peft")
 _scipy_available = is_package_available("scipy")
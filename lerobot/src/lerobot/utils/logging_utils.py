@@ -16,6 +16,8 @@
 from collections.abc import Callable
 from typing import Any
 
+import torch
+
 from lerobot.utils.utils import format_big_number
 
 
@@ -23,6 +25,10 @@ class AverageMeter:
     """
     Computes and stores the average and current value
     Adapted from https://github.com/pytorch/examples/blob/main/imagenet/main.py
+
+    Values can be given as (scalar) tensors, in which case they are accumulated on their device and only
+    copied to the host when `val`, `sum` or `avg` is read. This avoids a device synchronization at every
+    training step when the metrics are only logged every few steps.
     """
 
     def __init__(self, name: str, fmt: str = ":f"):
@@ -31,20 +37,36 @@ class AverageMeter:
         self.reset()
 
     def reset(self) -> None:
-        self.val = 0.0
-        self.avg = 0.0
-        self.sum = 0.0
+        self._val = 0.0
+        self._sum = 0.0
         self.count = 0.0
 
-    def update(self, val: float, n: int = 1) -> None:
-        self.val = val
-        self.sum += val * n
+    def update(self, val: float | torch.Tensor, n: int = 1) -> None:
+        if isinstance(val, torch.Tensor):
+            val = val.detach()
+        self._val = val
+        self._sum = self._sum + val * n
         self.count += n
-        self.avg = self.sum / self.count
+
+    @property
+    def val(self) -> float:
+        if isinstance(self._val, torch.Tensor):
+            self._val = self._val.item()
+        return self._val
+
+    @property
+    def sum(self) -> float:
+        if isinstance(self._sum, torch.Tensor):
+            self._sum = self._sum.item()
+        return self._sum
+
+    @property
+    def avg(self) -> float:
+        return self.sum / self.count if self.count else 0.0
 
     def __str__(self):
         fmtstr = "{name}:{avg" + self.fmt + "}"
-        return fmtstr.format(**self.__dict__)
+        return fmtstr.format(name=self.name, avg=self.avg)
 
 
 class MetricsTracker:
@@ -61,7 +83,7 @@ class MetricsTracker:
     # update metrics derived from step (samples, episodes, epochs) at each training step
     train_metrics.step()
 
-    # update various metrics
+    # update various metrics (tensors are only synced when the metrics are read)
     loss = policy.forward(batch)
     train_metrics.loss = loss
 
@@ -98,6 +120,7 @@ class MetricsTracker:
         accelerator: Callable | None = None,
     ):
         self.__dict__.update(dict.fromkeys(self.__keys__))
+        # Number of samples seen at each step, summed over the processes and the gradient accumulation steps.
         self._batch_size = batch_size
         self._num_frames = num_frames
         self._avg_samples_per_ep = num_frames / num_episodes
@@ -132,7 +155,7 @@ class MetricsTracker:
         Updates metrics that depend on 'step' for one step.
         """
         self.steps += 1
-        self.samples += self._batch_size * (self.accelerator.num_processes if self.accelerator else 1)
+        self.samples += self._batch_size
         self.episodes = self.samples / self._avg_samples_per_ep
         self.epochs = self.samples / self._num_frames
 
@@ -0,0 +1,155 @@
+#!/usr/bin/env python
+
+# Copyright 2025 The HuggingFace Inc. team. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import json
+import logging
+import time
+from contextlib import nullcontext
+from pathlib import Path
+
+import numpy as np
+
+from lerobot.utils.utils import TimerManager
+
+LOOP_STAGE = "loop"
+# Histogram bins, as fractions of the time budget of an iteration. The last bin also counts longer durations.
+HISTOGRAM_BINS = np.linspace(0, 2, 21)
+
+
+class ControlLoopProfiler:
+    """
+    Measures where the time budget of a control loop running at `fps` goes.
+
+    Every iteration is timed as a whole, without the final sleep, under the "loop" stage. Its steps (reading the
+    robot, running the policy, sending the action, writing the frame...) are timed separately with `stage`. An
+    iteration longer than the budget `1 / fps` is counted as an overrun.
+
+    When disabled, `stage` returns a no-op context manager, so that loops can always be instrumented.
+
+    Example
+    --------
+    ```python
+    profiler = ControlLoopProfiler(fps=30)
+    for _ in range(100):
+        profiler.start_loop()
+        with profiler.stage("robot_observation"):
+            obs = robot.get_observation()
+        with profiler.stage("send_action"):
+            robot.send_action(action)
+        dt_s = profiler.end_loop()
+        precise_sleep(max(1 / 30 - dt_s, 0.0))
+    profiler.log_summary()
+    ```
+    """
+
+    def __init__(self, fps: float, enabled: bool = True, log_to_rerun: bool = False):
+        self.fps = fps
+        self.budget_s = 1 / fps
+        self.enabled = enabled
+        self.log_to_rerun = log_to_rerun
+        self.loop_timer = TimerManager(LOOP_STAGE, log=False)
+        self.timers: dict[str, TimerManager] = {}
+        self.num_overruns = 0
+        self._counts: dict[str, int] = {}
+
+    def stage(self, name: str) -> TimerManager | nullcontext:
+        """Returns a context manager timing a stage of the current iteration."""
+        if not self.enabled:
+            return nullcontext()
+        timer = self.timers.get(name)
+        if timer is None:
+            timer = self.timers[name] = TimerManager(name, log=False)
+        return timer
+
+    def start_loop(self) -> None:
+        if self.enabled:
+            self._counts = {name: timer.count for name, timer in self.timers.items()}
+            self.loop_timer.start()
+
+    def end_loop(self) -> float:
+        """Ends the current iteration, before sleeping until the next one, and returns its duration."""
+        if not self.enabled:
+            return 0.0
+        loop_s = self.loop_timer.stop()
+        if loop_s > self.budget_s:
+            self.num_overruns += 1
+        if self.log_to_rerun:
+            self._log_iteration_to_rerun()
+        return loop_s
+
+    def reset(self) -> None:
+        self.loop_timer.reset()
+        self.timers.clear()
+        self.num_overruns = 0
+
+    def summary(self) -> dict:
+        """Returns the latency statistics and histograms of the loop and its stages, in milliseconds."""
+        budget_ms = self.budget_s * 1000
+        edges_ms = HISTOGRAM_BINS * budget_ms
+        stages = {}
+        for name, timer in {LOOP_STAGE: self.loop_timer, **self.timers}.items():
+            if timer.count == 0:
+                continue
+            durations_ms = np.asarray(timer.history) * 1000
+            counts, _ = np.histogram(np.minimum(durations_ms, edges_ms[-1]), bins=edges_ms)
+            stages[name] = {
+                "count": timer.count,
+                "mean_ms": float(durations_ms.mean()),
+                "p50_ms": float(np.percentile(durations_ms, 50)),
+                "p99_ms": float(np.percentile(durations_ms, 99)),
+                "max_ms": float(durations_ms.max()),
+                "total_s": timer.total,
+                "histogram": {"edges_ms": edges_ms.tolist(), "counts": counts.tolist()},
+            }
+        return {
+            "fps": self.fps,
+            "budget_ms": budget_ms,
+            "num_loops": self.loop_timer.count,
+            "num_overruns": self.num_overruns,
+            "stages": stages,
+        }
+
+    def format_summary(self) -> str:
+        summary = self.summary()
+        lines = [
+            f"Control loop at {summary['fps']} fps ({summary['budget_ms']:.1f} ms budget): "
+            f"{summary['num_overruns']}/{summary['num_loops']} overruns",
+            f"{'stage':<24} {'count':>7} {'mean ms':>8} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8}",
+        ]
+        for name, stats in summary["stages"].items():
+            lines.append(
+                f"{name:<24} {stats['count']:>7} {stats['mean_ms']:>8.2f} {stats['p50_ms']:>8.2f} "
+                f"{stats['p99_ms']:>8.2f} {stats['max_ms']:>8.2f}"
+            )
+        return "\n".join(lines)
+
+    def log_summary(self) -> None:
+        if self.enabled and self.loop_timer.count > 0:
+            logging.info("\n" + self.format_summary())
+
+    def save(self, path: str | Path) -> None:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w") as f:
+            json.dump({"timestamp": time.time(), **self.summary()}, f, indent=4)
+
+    def _log_iteration_to_rerun(self) -> None:
+        import rerun as rr
+
+        rr.log(f"control_loop/{LOOP_STAGE}_ms", rr.Scalars(self.loop_timer.last * 1000))
+        for name, timer in self.timers.items():
+            # Stages that did not run during this iteration (e.g. the policy while teleoperating) are skipped
+            if timer.count > self._counts.get(name, 0):
+                rr.log(f"control_loop/{name}_ms", rr.Scalars(timer.last * 1000))
@@ -13,13 +13,21 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+import os
+from collections import deque
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
 
+import torch
+from huggingface_hub.constants import SAFETENSORS_SINGLE_FILE
+from safetensors.torch import _remove_duplicate_names, save_file
+from torch import Tensor
 from torch.optim import Optimizer
 from torch.optim.lr_scheduler import LRScheduler
 
 from lerobot.configs.train import TrainPipelineConfig
-from lerobot.datasets.utils import load_json, write_json
+from lerobot.datasets.utils import flatten_dict, load_json, write_json
 from lerobot.optim.optimizers import load_optimizer_state, save_optimizer_state
 from lerobot.optim.schedulers import load_scheduler_state, save_scheduler_state
 from lerobot.policies.pretrained import PreTrainedPolicy
@@ -27,6 +35,8 @@ from lerobot.processor import PolicyProcessorPipeline
 from lerobot.utils.constants import (
     CHECKPOINTS_DIR,
     LAST_CHECKPOINT_LINK,
+    OPTIMIZER_PARAM_GROUPS,
+    OPTIMIZER_STATE,
     PRETRAINED_MODEL_DIR,
     TRAINING_STATE_DIR,
     TRAINING_STEP,
@@ -56,10 +66,14 @@ def load_training_step(save_dir: Path) -> int:
 
 def update_last_checkpoint(checkpoint_dir: Path) -> Path:
     last_checkpoint_dir = checkpoint_dir.parent / LAST_CHECKPOINT_LINK
-    if last_checkpoint_dir.is_symlink():
-        last_checkpoint_dir.unlink()
     relative_target = checkpoint_dir.relative_to(checkpoint_dir.parent)
-    last_checkpoint_dir.symlink_to(relative_target)
+    # Swap the link with a rename so that it always points to a complete checkpoint, even if the process
+    # is killed in the middle of the update.
+    tmp_link = last_checkpoint_dir.with_name(f"{LAST_CHECKPOINT_LINK}.tmp")
+    if tmp_link.is_symlink():
+        tmp_link.unlink()
+    tmp_link.symlink_to(relative_target)
+    os.replace(tmp_link, last_checkpoint_dir)
 
 
 def save_checkpoint(
@@ -137,6 +151,182 @@ def save_training_state(
         save_scheduler_state(scheduler, save_dir)
 
 
+def _fsync(path: Path) -> None:
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        # Directories can't be opened on some platforms (e.g. Windows).
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _write_safetensors(tensors: dict[str, Tensor], path: Path, metadata: dict[str, str] | None) -> None:
+    """Writes `tensors` to a temporary file which is renamed to `path` once complete."""
+    tmp_path = path.with_name(f"{path.name}.tmp")
+    save_file(tensors, tmp_path, metadata=metadata)
+    os.replace(tmp_path, path)
+
+
+class AsyncCheckpointWriter:
+    """Saves training checkpoints without blocking the training loop.
+
+    `save` writes the same directory structure as `save_checkpoint`, but only the small files (configs,
+    processors, scheduler, rng, step and optimizer param groups) are written before it returns. The policy
+    weights and the optimizer state are copied to CPU buffers (pinned when the tensors live on a CUDA device),
+    and a background thread writes them to the safetensors files while training continues. The
+    `last` checkpoint link is only updated once every file of the checkpoint has been flushed to disk, so a
+    crash during a save never leaves it pointing to a partial checkpoint.
+
+    At most `max_pending` checkpoints are in flight at any time: `save` blocks until an older save completes
+    when the limit is reached. This bounds the host memory used by the snapshots, which are reused across
+    saves.
+
+    Note: PEFT policies only save their adapter weights through `save_pretrained`, use `save_checkpoint` for
+    those.
+    """
+
+    def __init__(self, max_pending: int = 1):
+        if max_pending < 1:
+            raise ValueError(f"`max_pending` must be at least 1, got {max_pending}.")
+        self.max_pending = max_pending
+        # A single worker keeps the checkpoints ordered, so that `last` always ends up on the latest one.
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="checkpoint_writer")
+        self._pending: deque[Future] = deque()
+        self._free_buffers: list[dict[str, Tensor]] = []
+
+    @property
+    def num_pending(self) -> int:
+        return sum(not future.done() for future in self._pending)
+
+    def save(
+        self,
+        checkpoint_dir: Path,
+        step: int,
+        cfg: TrainPipelineConfig,
+        policy: PreTrainedPolicy,
+        optimizer: Optimizer | dict[str, Optimizer],
+        scheduler: LRScheduler | None = None,
+        preprocessor: PolicyProcessorPipeline | None = None,
+        postprocessor: PolicyProcessorPipeline | None = None,
+        on_complete: Callable[[Path], None] | None = None,
+    ) -> Future:
+        """Starts saving a checkpoint, see `save_checkpoint` for the directory structure.
+
+        Args:
+            on_complete: Called by the writer thread with `checkpoint_dir` once the checkpoint is on disk and
+                the `last` link has been updated (e.g. to upload it to WandB).
+
+        Returns:
+            Future: resolved once the checkpoint has been written.
+        """
+        while len(self._pending) >= self.max_pending:
+            self._pending.popleft().result()
+
+        buffers = self._free_buffers.pop() if self._free_buffers else {}
+        files = {}
+
+        pretrained_dir = checkpoint_dir / PRETRAINED_MODEL_DIR
+        pretrained_dir.mkdir(parents=True, exist_ok=True)
+        policy.config.save_pretrained(pretrained_dir)
+        cfg.save_pretrained(pretrained_dir)
+        if preprocessor is not None:
+            preprocessor.save_pretrained(pretrained_dir)
+        if postprocessor is not None:
+            postprocessor.save_pretrained(pretrained_dir)
+        model_to_save = policy.module if hasattr(policy, "module") else policy
+        files[pretrained_dir / SAFETENSORS_SINGLE_FILE] = self._snapshot_model(model_to_save, buffers)
+
+        save_dir = checkpoint_dir / TRAINING_STATE_DIR
+        save_dir.mkdir(parents=True, exist_ok=True)
+        save_training_step(step, save_dir)
+        save_rng_state(save_dir)
+        if scheduler is not None:
+            save_scheduler_state(scheduler, save_dir)
+        optimizers = optimizer if isinstance(optimizer, dict) else {"": optimizer}
+        for name, opt in optimizers.items():
+            optimizer_dir = save_dir / name if name else save_dir
+            optimizer_dir.mkdir(parents=True, exist_ok=True)
+            state = opt.state_dict()
+            write_json(state.pop("param_groups"), optimizer_dir / OPTIMIZER_PARAM_GROUPS)
+            flat_state = self._snapshot(flatten_dict(state), buffers, prefix=f"optimizer/{name}/")
+            files[optimizer_dir / OPTIMIZER_STATE] = (flat_state, None)
+
+        # The copies to pinned memory are asynchronous, the writer waits on this event before reading them.
+        copy_done = None
+        if torch.cuda.is_available() and torch.cuda.is_initialized():
+            copy_done = torch.cuda.Event()
+            copy_done.record()
+
+        future = self._executor.submit(self._write, checkpoint_dir, files, copy_done, buffers, on_complete)
+        self._pending.append(future)
+        return future
+
+    def wait(self) -> None:
+        """Blocks until all the pending checkpoints are written, raising the first error encountered."""
+        while self._pending:
+            self._pending.popleft().result()
+
+    def close(self) -> None:
+        self.wait()
+        self._executor.shutdown()
+
+    @classmethod
+    def _snapshot_model(
+        cls, model: torch.nn.Module, buffers: dict[str, Tensor]
+    ) -> tuple[dict[str, Tensor], dict[str, str] | None]:
+        # Shared tensors are stored once, like `safetensors.torch.save_model` does.
+        state_dict = model.state_dict()
+        metadata = None
+        for kept_name, to_remove_group in _remove_duplicate_names(state_dict).items():
+            for to_remove in to_remove_group:
+                if metadata is None:
+                    metadata = {}
+                metadata[to_remove] = kept_name
+                del state_dict[to_remove]
+        return cls._snapshot(state_dict, buffers, prefix="model/"), metadata
+
+    @staticmethod
+    def _snapshot(tensors: dict[str, Tensor], buffers: dict[str, Tensor], prefix: str) -> dict[str, Tensor]:
+        snapshot = {}
+        for key, tensor in tensors.items():
+            tensor = tensor.detach()
+            buffer = buffers.get(prefix + key)
+            if buffer is None or buffer.shape != tensor.shape or buffer.dtype != tensor.dtype:
+                buffer = torch.empty(tensor.shape, dtype=tensor.dtype, pin_memory=tensor.is_cuda)
+                buffers[prefix + key] = buffer
+            buffer.copy_(tensor, non_blocking=tensor.is_cuda)
+            snapshot[key] = buffer
+        return snapshot
+
+    def _write(
+        self,
+        checkpoint_dir: Path,
+        files: dict[Path, tuple[dict[str, Tensor], dict[str, str] | None]],
+        copy_done: torch.cuda.Event | None,
+        buffers: dict[str, Tensor],
+        on_complete: Callable[[Path], None] | None,
+    ) -> None:
+        if copy_done is not None:
+            copy_done.synchronize()
+        for path, (tensors, metadata) in files.items():
+            _write_safetensors(tensors, path, metadata)
+        self._free_buffers.append(buffers)
+        # Also flush the small files written by `save` and the directory entries.
+        for path in sorted(checkpoint_dir.rglob("*"), reverse=True):
+            _fsync(path)
+        _fsync(checkpoint_dir)
+
+        update_last_checkpoint(checkpoint_dir)
+        _fsync(checkpoint_dir.parent)
+        if on_complete is not None:
+            on_complete(checkpoint_dir)
+
+
 def load_training_state(
     checkpoint_dir: Path, optimizer: Optimizer, scheduler: LRScheduler | None
 ) -> tuple[int, Optimizer, LRScheduler | None]:
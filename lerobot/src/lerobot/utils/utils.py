@@ -20,15 +20,19 @@ import select
 import subprocess
 import sys
 import time
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
 from copy import copy, deepcopy
 from datetime import datetime
 from pathlib import Path
 from statistics import mean
+from typing import TYPE_CHECKING
 
 import numpy as np
 import torch
-from accelerate import Accelerator
-from datasets.utils.logging import disable_progress_bar, enable_progress_bar
+
+if TYPE_CHECKING:
+    from accelerate import Accelerator
 
 
 def inside_slurm():
@@ -132,7 +136,7 @@ def init_logging(
     display_pid: bool = False,
     console_level: str = "INFO",
     file_level: str = "DEBUG",
-    accelerator: Accelerator | None = None,
+    accelerator: "Accelerator | None" = None,
 ):
     """Initialize logging configuration for LeRobot.
 
@@ -297,12 +301,60 @@ class SuppressProgressBars:
     """
 
     def __enter__(self):
+        from datasets.utils.logging import disable_progress_bar
+
         disable_progress_bar()
 
     def __exit__(self, exc_type, exc_val, exc_tb):
+        from datasets.utils.logging import enable_progress_bar
+
         enable_progress_bar()
 
 
+class BackgroundWorker:
+    """
+    Runs calls on a background thread, skipping the calls submitted while the previous one is still running.
+
+    This suits work whose latest call supersedes the pending ones, e.g. flushing a file or logging the latest
+    camera frames, so that the caller never waits for the thread. The errors raised by a call are re-raised
+    by the next `submit` or `wait`. The thread is started by the first call, and a pickled copy of the worker
+    (e.g. sent to a DataLoader worker) starts its own.
+    """
+
+    def __init__(self, thread_name_prefix: str):
+        self.thread_name_prefix = thread_name_prefix
+        self._executor: ThreadPoolExecutor | None = None
+        self._future: Future | None = None
+
+    def __getstate__(self):
+        return {"thread_name_prefix": self.thread_name_prefix, "_executor": None, "_future": None}
+
+    def submit(self, fn: Callable, *args) -> bool:
+        """Calls `fn(*args)` on the background thread, unless the previous call is still running.
+
+        Returns:
+            bool: Whether the call was submitted.
+        """
+        if self._future is not None and not self._future.done():
+            return False
+        self.wait()
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=self.thread_name_prefix)
+        self._future = self._executor.submit(fn, *args)
+        return True
+
+    def wait(self) -> None:
+        """Waits for the last call to complete, and re-raises its error if it failed."""
+        future, self._future = self._future, None
+        if future is not None:
+            future.result()
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+
 class TimerManager:
     """
     Lightweight utility to measure elapsed time.
@@ -0,0 +1,63 @@
+#!/usr/bin/env python
+
+# Copyright 2025 The HuggingFace Inc. team. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import subprocess
+import sys
+
+import pytest
+
+from lerobot.configs.policies import POLICY_CONFIG_MODULES, PreTrainedConfig
+
+
+def _imported_modules(code: str) -> set[str]:
+    """Runs `code` in a new interpreter and returns the modules it imported."""
+    script = f"import json, sys\n{code}\nprint(json.dumps(list(sys.modules)))"
+    result = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True)
+    return set(json.loads(result.stdout.splitlines()[-1]))
+
+
+def test_known_choices_include_all_policies():
+    choices = PreTrainedConfig.get_known_choices()
+    assert set(POLICY_CONFIG_MODULES) <= set(choices)
+    for policy_type, module in POLICY_CONFIG_MODULES.items():
+        assert choices[policy_type].__module__ == module
+
+
+def test_get_choice_class_imports_only_requested_policy():
+    modules = _imported_modules(
+        "from lerobot.configs.policies import PreTrainedConfig\n"
+        "assert PreTrainedConfig.get_choice_class('act').__name__ == 'ACTConfig'"
+    )
+    assert POLICY_CONFIG_MODULES["act"] in modules
+    assert not {module for module in POLICY_CONFIG_MODULES.values() if module in modules} - {
+        POLICY_CONFIG_MODULES["act"]
+    }
+    assert "transformers" not in modules
+
+
+def test_policies_package_is_lazy():
+    modules = _imported_modules("import lerobot.policies\nfrom lerobot.policies.pi0 import PI0Config")
+    assert "lerobot.policies.pi0.configuration_pi0" in modules
+    assert "lerobot.policies.pi0.modeling_pi0" not in modules
+    assert "lerobot.policies.act.configuration_act" not in modules
+
+
+@pytest.mark.parametrize("script", ["lerobot_teleoperate", "lerobot_find_port"])
+def test_cli_startup_imports(script):
+    modules = _imported_modules(f"import lerobot.scripts.{script}")
+    assert not {"transformers", "torchvision", "diffusers"} & modules
+    assert not any(module.startswith("lerobot.policies") for module in modules)
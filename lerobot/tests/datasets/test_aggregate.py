@@ -19,7 +19,7 @@ from unittest.mock import patch
 import datasets
 import torch
 
-from lerobot.datasets.aggregate import aggregate_datasets
+from lerobot.datasets.aggregate import FileLayout, aggregate_datasets
 from lerobot.datasets.lerobot_dataset import LeRobotDataset
 from tests.fixtures.constants import DUMMY_REPO_ID
 
@@ -525,3 +525,19 @@ def test_aggregate_image_datasets(tmp_path, lerobot_dataset_factory):
         assert img.shape[0] == 3, f"Image {image_key} should have 3 channels"
 
     assert_dataset_iteration_works(aggr_ds)
+
+
+def test_file_layout():
+    """Source files are appended to the current destination file until it would reach the size limit."""
+    layout = FileLayout(max_mb=10, chunk_size=2)
+    for src_key, size_mb in [((0, 0, 0), 4), ((0, 0, 1), 4), ((1, 0, 0), 4), ((1, 0, 1), 12), ((2, 0, 0), 1)]:
+        layout.add(src_key, size_mb, duration_s=size_mb / 2)
+
+    assert layout.sources == {
+        (0, 0): [(0, 0, 0), (0, 0, 1)],
+        (0, 1): [(1, 0, 0)],
+        (1, 0): [(1, 0, 1)],
+        (1, 1): [(2, 0, 0)],
+    }
+    assert layout.dst[(1, 0, 1)] == (1, 0)
+    assert layout.offset_s == {(0, 0, 0): 0, (0, 0, 1): 2, (1, 0, 0): 0, (1, 0, 1): 0, (2, 0, 0): 0}
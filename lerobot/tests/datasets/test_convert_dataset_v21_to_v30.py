@@ -0,0 +1,217 @@
+#!/usr/bin/env python
+
+# Copyright 2025 The HuggingFace Inc. team. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import json
+
+import jsonlines
+import numpy as np
+import pandas as pd
+import pytest
+
+from lerobot.datasets.compute_stats import compute_episode_stats
+from lerobot.datasets.lerobot_dataset import LeRobotDataset
+from lerobot.datasets.utils import (
+    DEFAULT_CHUNK_SIZE,
+    DEFAULT_FEATURES,
+    LEGACY_EPISODES_PATH,
+    LEGACY_EPISODES_STATS_PATH,
+    LEGACY_TASKS_PATH,
+    get_parquet_file_size_in_mb,
+    serialize_dict,
+    write_info,
+)
+from lerobot.datasets.v30 import convert_dataset_v21_to_v30 as convert
+from lerobot.datasets.v30.convert_dataset_v21_to_v30 import (
+    CONVERSION_JOURNAL_PATH,
+    CONVERSION_PLAN_PATH,
+    convert_dataset,
+    load_journal,
+    plan_data,
+    plan_files,
+    plan_videos,
+)
+from tests.fixtures.constants import DUMMY_REPO_ID
+
+EPISODE_LENGTHS = [20, 20, 20, 20, 20]
+LEGACY_DATA_PATH = "data/chunk-{episode_chunk:03d}/episode_{episode_index:06d}.parquet"
+
+
+def make_v21_dataset(root, episode_lengths=EPISODE_LENGTHS):
+    """Writes a v2.1 dataset without videos, with one data file per episode."""
+    features = {
+        "observation.state": {"dtype": "float32", "shape": (2,), "names": None},
+        "action": {"dtype": "float32", "shape": (2,), "names": None},
+        **DEFAULT_FEATURES,
+    }
+    rng = np.random.default_rng(0)
+    tasks = ["pick", "place"]
+    episodes, episodes_stats = [], []
+    index = 0
+    for ep_idx, length in enumerate(episode_lengths):
+        ep_data = {
+            "observation.state": rng.random((length, 2), dtype=np.float32),
+            "action": rng.random((length, 2), dtype=np.float32),
+            "timestamp": np.arange(length, dtype=np.float32) / 10,
+            "frame_index": np.arange(length),
+            "episode_index": np.full(length, ep_idx),
+            "index": np.arange(index, index + length),
+            "task_index": np.full(length, ep_idx % 2),
+        }
+        index += length
+        path = root / LEGACY_DATA_PATH.format(episode_chunk=0, episode_index=ep_idx)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        pd.DataFrame(
+            {key: list(value) if value.ndim > 1 else value for key, value in ep_data.items()}
+        ).to_parquet(path, index=False)
+        episodes.append({"episode_index": ep_idx, "tasks": [tasks[ep_idx % 2]], "length": length})
+        stats = compute_episode_stats(ep_data, features)
+        episodes_stats.append({"episode_index": ep_idx, "stats": serialize_dict(stats)})
+
+    info = {
+        "codebase_version": "v2.1",
+        "robot_type": None,
+        "total_episodes": len(episode_lengths),
+        "total_frames": index,
+        "total_tasks": len(tasks),
+        "total_videos": 0,
+        "total_chunks": 1,
+        "chunks_size": DEFAULT_CHUNK_SIZE,
+        "fps": 10,
+        "splits": {"train": f"0:{len(episode_lengths)}"},
+        "data_path": LEGACY_DATA_PATH,
+        "video_path": None,
+        "features": features,
+    }
+    write_info(info, root)
+    for path, items in [
+        (LEGACY_EPISODES_PATH, episodes),
+        (LEGACY_EPISODES_STATS_PATH, episodes_stats),
+        (LEGACY_TASKS_PATH, [{"task_index": i, "task": task} for i, task in enumerate(tasks)]),
+    ]:
+        with jsonlines.open(root / path, "w") as writer:
+            writer.write_all(items)
+
+
+def test_plan_files():
+    """Consecutive episodes share a file until the next one would reach the size limit."""
+    assert plan_files([4, 4, 4, 12, 1], file_size_in_mb=10) == [
+        (0, 0, 0, 2),
+        (0, 1, 2, 3),
+        (0, 2, 3, 4),
+        (0, 3, 4, 5),
+    ]
+    assert plan_files([], file_size_in_mb=10) == []
+
+
+def test_plan_data_rotates_files_at_size_limit(tmp_path):
+    root = tmp_path / "v21"
+    make_v21_dataset(root)
+    ep_sizes_in_mb = [
+        get_parquet_file_size_in_mb(path) for path in sorted((root / "data").glob("*/*.parquet"))
+    ]
+
+    # Room for two episodes per file
+    episodes_metadata, jobs = plan_data(root, data_file_size_in_mb=2.5 * max(ep_sizes_in_mb))
+
+    assert [(job["chunk_index"], job["file_index"]) for job in jobs] == [(0, 0), (0, 1), (0, 2)]
+    assert [len(job["paths"]) for job in jobs] == [2, 2, 1]
+    # Each episode points to the file which holds its frames, and its frames follow the previous episode
+    for job in jobs:
+        for path in job["paths"]:
+            ep_idx = int(path.split("_")[-1].removesuffix(".parquet"))
+            ep = episodes_metadata[ep_idx]
+            assert (ep["data/chunk_index"], ep["data/file_index"]) == (job["chunk_index"], job["file_index"])
+    ends = np.cumsum(EPISODE_LENGTHS)
+    assert [ep["dataset_from_index"] for ep in episodes_metadata] == [0, *ends[:-1]]
+    assert [ep["dataset_to_index"] for ep in episodes_metadata] == list(ends)
+
+
+def test_plan_videos_without_videos(tmp_path):
+    root = tmp_path / "v21"
+    make_v21_dataset(root)
+    assert plan_videos(root, video_file_size_in_mb=1) == (None, [])
+
+
+def test_load_journal(tmp_path):
+    plan = {"data_file_size_in_mb": 1, "video_file_size_in_mb": 1, "jobs": []}
+    assert load_journal(tmp_path, plan) == set()
+
+    (tmp_path / CONVERSION_PLAN_PATH).write_text(json.dumps(plan))
+    job = {"video_key": None, "chunk_index": 0, "file_index": 1, "paths": []}
+    # The last job was interrupted while being logged
+    (tmp_path / CONVERSION_JOURNAL_PATH).write_text(json.dumps(job) + "\n" + '{"video_key": nu')
+    assert load_journal(tmp_path, plan) == {(None, 0, 1)}
+
+    # The journal of another plan is ignored
+    assert load_journal(tmp_path, {**plan, "data_file_size_in_mb": 2}) == set()
+
+
+def test_convert_dataset_resumes_after_interruption(tmp_path, monkeypatch):
+    root = tmp_path / DUMMY_REPO_ID
+    make_v21_dataset(root)
+    original = pd.concat(
+        [pd.read_parquet(path) for path in sorted((root / "data").glob("*/*.parquet"))], ignore_index=True
+    )
+    ep_sizes_in_mb = [
+        get_parquet_file_size_in_mb(path) for path in sorted((root / "data").glob("*/*.parquet"))
+    ]
+    kwargs = {
+        "repo_id": DUMMY_REPO_ID,
+        "root": tmp_path,
+        "push_to_hub": False,
+        "num_workers": 0,
+        "data_file_size_in_mb": 2.5 * max(ep_sizes_in_mb),
+    }
+
+    run_job = convert.run_job
+    jobs_run = []
+
+    def interrupted_run_job(job, *args):
+        if len(jobs_run) == 2:
+            raise KeyboardInterrupt
+        jobs_run.append(job["file_index"])
+        return run_job(job, *args)
+
+    monkeypatch.setattr(convert, "run_job", interrupted_run_job)
+    with pytest.raises(KeyboardInterrupt):
+        convert_dataset(**kwargs)
+    new_root = tmp_path / f"{DUMMY_REPO_ID}_v30"
+    assert load_journal(new_root, json.loads((new_root / CONVERSION_PLAN_PATH).read_text())) == {
+        (None, 0, 0),
+        (None, 0, 1),
+    }
+
+    jobs_run.clear()
+    monkeypatch.setattr(
+        convert, "run_job", lambda job, *args: jobs_run.append(job["file_index"]) or run_job(job, *args)
+    )
+    convert_dataset(**kwargs)
+    assert jobs_run == [2]
+
+    dataset = LeRobotDataset(DUMMY_REPO_ID, root=root)
+    assert dataset.meta.info["codebase_version"] == "v3.0"
+    assert dataset.num_episodes == len(EPISODE_LENGTHS)
+    assert sorted(str(path.relative_to(root)) for path in (root / "data").glob("*/*.parquet")) == [
+        f"data/chunk-000/file-{i:03d}.parquet" for i in range(3)
+    ]
+    assert not (root / CONVERSION_JOURNAL_PATH).exists()
+    for ep_idx, length in enumerate(EPISODE_LENGTHS):
+        ep = dataset.meta.episodes[ep_idx]
+        assert ep["length"] == length
+        assert ep["data/file_index"] == ep_idx // 2
+    for idx in [0, 39, 40, len(original) - 1]:
+        item = dataset[idx]
+        np.testing.assert_allclose(item["action"].numpy(), original["action"][idx])
+        assert item["episode_index"] == original["episode_index"][idx]
@@ -17,6 +17,7 @@
 
 from unittest.mock import patch
 
+import av
 import numpy as np
 import pytest
 import torch
@@ -1152,3 +1153,112 @@ def test_convert_image_to_video_dataset_subset_episodes(tmp_path):
 
         if output_dir.exists():
             shutil.rmtree(output_dir)
+
+
+@pytest.fixture
+def video_dataset(tmp_path, empty_lerobot_dataset_factory):
+    """Create a sample dataset with a video feature."""
+    features = {
+        "action": {"dtype": "float32", "shape": (2,), "names": None},
+        "observation.images.top": {"dtype": "video", "shape": (32, 48, 3), "names": None},
+        "observation.images.side": {"dtype": "video", "shape": (32, 48, 3), "names": None},
+    }
+    dataset = empty_lerobot_dataset_factory(
+        root=tmp_path / "video_dataset", features=features, use_videos=True
+    )
+    for ep_idx in range(4):
+        for frame_idx in range(6):
+            image = np.zeros((32, 48, 3), dtype=np.uint8)
+            image[: 4 * (frame_idx + 1), : 10 * (ep_idx + 1)] = 255
+            dataset.add_frame(
+                {
+                    "action": np.full(2, ep_idx, dtype=np.float32),
+                    "observation.images.top": image,
+                    "observation.images.side": 255 - image,
+                    "task": "task",
+                }
+            )
+        dataset.save_episode()
+    dataset.finalize()
+    return dataset
+
+
+@pytest.mark.parametrize("num_workers", [0, 2])
+def test_delete_episodes_stream_copies_videos(video_dataset, tmp_path, num_workers):
+    output_dir = tmp_path / "filtered"
+
+    with (
+        patch("lerobot.datasets.lerobot_dataset.get_safe_version") as mock_get_safe_version,
+        patch("lerobot.datasets.lerobot_dataset.snapshot_download") as mock_snapshot_download,
+        patch(
+            "lerobot.datasets.dataset_tools._keep_episodes_from_video_with_av",
+            side_effect=AssertionError("episodes recorded by LeRobot shouldn't be re-encoded"),
+        ),
+    ):
+        mock_get_safe_version.return_value = "v3.0"
+        mock_snapshot_download.return_value = str(output_dir)
+
+        new_dataset = delete_episodes(
+            video_dataset, episode_indices=[1], output_dir=output_dir, num_workers=num_workers
+        )
+
+    assert new_dataset.meta.total_frames == 18
+
+    def decode(dataset, video_key):
+        video_path = dataset.root / dataset.meta.get_video_file_path(0, video_key)
+        with av.open(str(video_path)) as container:
+            return np.stack([frame.to_ndarray(format="rgb24") for frame in container.decode(video=0)])
+
+    # The kept frames are copied without being decoded and re-encoded.
+    for video_key in video_dataset.meta.video_keys:
+        old_frames = decode(video_dataset, video_key)
+        kept_frames = np.concatenate([old_frames[0:6], old_frames[12:24]])
+        np.testing.assert_array_equal(decode(new_dataset, video_key), kept_frames)
+
+
+def test_video_cut_pieces():
+    from lerobot.datasets.dataset_tools import _video_cut_pieces
+
+    boundaries = [0, 4, 8, 12, 16]
+    # Ranges starting and ending on keyframes are copied, adjacent ranges are merged.
+    assert _video_cut_pieces([(0, 4), (4, 8), (12, 16)], boundaries) == [("copy", 0, 8), ("copy", 12, 16)]
+    # Only the partial GOPs at the edges are re-encoded.
+    assert _video_cut_pieces([(2, 13)], boundaries) == [("encode", 2, 4), ("copy", 4, 12), ("encode", 12, 13)]
+    assert _video_cut_pieces([(5, 7)], boundaries) == [("encode", 5, 7)]
+
+
+@pytest.mark.parametrize("b_frames", [0, 2])
+def test_keep_episodes_from_video_with_remux_reencodes_partial_gops(tmp_path, b_frames):
+    from lerobot.datasets import dataset_tools
+    from lerobot.datasets.dataset_tools import _keep_episodes_from_video_with_remux
+
+    # A keyframe every 5 frames, each frame with its own gray level
+    fps, num_frames = 10, 20
+    levels = np.arange(num_frames) * 12
+    input_path = tmp_path / "input.mp4"
+    with av.open(str(input_path), mode="w") as out:
+        options = {"g": "5", "keyint_min": "5", "sc_threshold": "0", "bf": str(b_frames)}
+        stream = out.add_stream("libx264", rate=fps, options=options)
+        stream.width, stream.height, stream.pix_fmt = 64, 48, "yuv420p"
+        for level in levels:
+            frame = av.VideoFrame.from_ndarray(np.full((48, 64, 3), level, dtype=np.uint8), format="rgb24")
+            out.mux(stream.encode(frame))
+        out.mux(stream.encode())
+
+    output_path = tmp_path / "output.mp4"
+    with patch(
+        "lerobot.datasets.dataset_tools._keep_episodes_from_video_with_av",
+        wraps=dataset_tools._keep_episodes_from_video_with_av,
+    ) as reencode:
+        # Frames 3-4 and 10-11 are in partial GOPs, frames 5-9 and 15-19 are copied
+        _keep_episodes_from_video_with_remux(
+            input_path, output_path, [(0.3, 1.2), (1.5, 2.0)], fps=fps, vcodec="libx264"
+        )
+    # Only videos with B-frames are entirely re-encoded
+    assert reencode.called == (b_frames > 0)
+
+    with av.open(str(output_path)) as container:
+        decoded = np.stack([f.to_ndarray(format="rgb24") for f in container.decode(video=0)])
+    kept_levels = np.concatenate([levels[3:12], levels[15:20]])
+    assert len(decoded) == len(kept_levels)
+    np.testing.assert_allclose(decoded.mean(axis=(1, 2, 3)), kept_levels, atol=3)
@@ -14,13 +14,21 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import numpy as np
 import pytest
 import torch
 from datasets import Dataset
 from huggingface_hub import DatasetCard
 
 from lerobot.datasets.push_dataset_to_hub.utils import calculate_episode_data_index
-from lerobot.datasets.utils import combine_feature_dicts, create_lerobot_dataset_card, hf_transform_to_torch
+from lerobot.datasets.utils import (
+    Backtrackable,
+    BatchPrefetcher,
+    combine_feature_dicts,
+    create_lerobot_dataset_card,
+    cycle,
+    hf_transform_to_torch,
+)
 from lerobot.utils.constants import ACTION, OBS_IMAGES
 
 
@@ -131,3 +139,51 @@ def test_non_dict_passthrough_last_wins():
     out = combine_feature_dicts(g1, g2)
     # For non-dict entries the last one wins
     assert out["misc"] == 456
+
+
+def test_batch_prefetcher():
+    batches = [{"index": torch.tensor([i])} for i in range(3)]
+    calls = []
+
+    def transform(batch):
+        calls.append(int(batch["index"]))
+        return {"index": batch["index"] * 10}
+
+    prefetcher = BatchPrefetcher(cycle(batches), transform=transform, device="cpu")
+    # The first batch is prepared ahead of time.
+    assert calls == [0]
+    assert [int(next(prefetcher)["index"]) for _ in range(4)] == [0, 10, 20, 0]
+    assert calls == [0, 1, 2, 0, 1]
+
+
+def test_backtrackable_peek_window():
+    iterator = Backtrackable(range(10), history=3, lookahead=2)
+    next(iterator)
+    assert iterator.peek_window(back=2, ahead=2) == ([0, 1, 2], 0)
+
+    for _ in range(3):
+        next(iterator)
+    # Limited by the history and lookahead sizes
+    assert iterator.peek_window(back=5, ahead=5) == ([1, 2, 3, 4, 5], 2)
+
+    iterator.prev()
+    assert iterator.peek_window(back=1, ahead=3) == ([1, 2, 3, 4, 5], 1)
+
+    for _ in iterator:
+        pass
+    # Limited by the end of the source
+    assert iterator.peek_window(back=2, ahead=2) == ([7, 8, 9], 2)
+
+
+def test_backtrackable_peek_window_stacked():
+    items = [{"index": i, "action": [float(i), -float(i)]} for i in range(20)]
+    iterator = Backtrackable(items, history=4, lookahead=3)
+    for i in range(len(items)):
+        next(iterator)
+        window, current = iterator.peek_window_stacked("action", back=3, ahead=2)
+        expected_window, expected_current = iterator.peek_window(back=3, ahead=2)
+
+        assert current == expected_current
+        assert window.dtype == np.float32
+        np.testing.assert_array_equal(window, [item["action"] for item in expected_window])
+        assert window[current].tolist() == [float(i), -float(i)]
@@ -45,6 +45,7 @@ from lerobot.datasets.utils import (
     hf_transform_to_torch,
     hw_to_dataset_features,
 )
+from lerobot.datasets.video_utils import encode_video, get_encoding_threads
 from lerobot.envs.factory import make_env_config
 from lerobot.policies.factory import make_policy_config
 from lerobot.robots import make_robot_from_config
@@ -532,6 +533,36 @@ def test_multidataset_frames():
             assert torch.equal(sub_dataset_item[k], dataset_item[k])
 
 
+def test_multidataset_index_routing(tmp_path, lerobot_dataset_factory):
+    repo_ids = ["dummy/repo_a", "dummy/repo_b", "dummy/repo_c"]
+    sub_datasets = [
+        lerobot_dataset_factory(
+            root=tmp_path / repo_id, repo_id=repo_id, total_episodes=2, total_frames=n, use_videos=False
+        )
+        for repo_id, n in zip(repo_ids, [10, 20, 5], strict=True)
+    ]
+    dataset = MultiLeRobotDataset(repo_ids, root=tmp_path, weights={"dummy/repo_a": 1.0})
+    assert len(dataset) == 35
+    assert dataset.dataset_sizes == [10, 20, 5]
+    assert dataset.dataset_weights == [1.0, 0.0, 0.0]
+    sampler = dataset.make_sampler(num_samples=100, generator=torch.Generator().manual_seed(0))
+    assert len(sampler) == 100
+    assert all(0 <= idx < 10 for idx in sampler)
+
+    indices = [0, 9, 10, 29, 30, 34]
+    expected = [(0, 0), (0, 9), (1, 0), (1, 19), (2, 0), (2, 4)]
+    items = dataset.__getitems__(indices)
+    for idx, item, (dataset_index, frame_index) in zip(indices, items, expected, strict=True):
+        assert item["dataset_index"] == dataset_index
+        assert item["index"] == sub_datasets[dataset_index][frame_index]["index"]
+        assert dataset[idx]["index"] == item["index"]
+
+    with pytest.raises(IndexError):
+        dataset[35]
+    with pytest.raises(IndexError):
+        dataset.__getitems__([3, 35])
+
+
 @pytest.mark.parametrize(
     "repo_id",
     [
@@ -1431,6 +1462,31 @@ def test_encode_video_worker_default_vcodec(tmp_path):
     assert captured_kwargs["vcodec"] == "libsvtav1"
 
 
+@pytest.mark.parametrize("vcodec", sorted(VALID_VIDEO_CODECS))
+def test_encode_video_from_memory(tmp_path, vcodec):
+    import av
+
+    frames = np.zeros((10, 64, 96, 3), dtype=np.uint8)
+    frames[:, :, :48] = 255
+    encode_video(frames, tmp_path / "video.mp4", fps=10, vcodec=vcodec, num_threads=1, tiles=(0, 0))
+    # Iterators of frames, e.g. non-contiguous views, are accepted as well
+    encode_video(iter(frames[:, :, ::-1]), tmp_path / "mirrored.mp4", fps=10, vcodec=vcodec)
+
+    for name, left, right in [("video.mp4", 255, 0), ("mirrored.mp4", 0, 255)]:
+        with av.open(str(tmp_path / name)) as container:
+            decoded = np.stack([f.to_ndarray(format="rgb24") for f in container.decode(video=0)])
+        assert decoded.shape == frames.shape
+        np.testing.assert_allclose(decoded[:, :, :40].mean(), left, atol=2)
+        np.testing.assert_allclose(decoded[:, :, 56:].mean(), right, atol=2)
+
+
+def test_get_encoding_threads():
+    assert get_encoding_threads(3, num_cpus=8) == [3, 2, 2]
+    assert get_encoding_threads(2, num_cpus=8, reserved_cpus=0) == [4, 4]
+    # Each encoder gets at least one thread
+    assert get_encoding_threads(4, num_cpus=2) == [1, 1, 1, 1]
+
+
 def test_lerobot_dataset_vcodec_validation():
     """Test that LeRobotDataset validates the vcodec parameter."""
     # Test that invalid vcodec raises ValueError
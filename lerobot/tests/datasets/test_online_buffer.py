@@ -13,7 +13,9 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.d
+import pickle
 from copy import deepcopy
+from unittest.mock import patch
 from uuid import uuid4
 
 import numpy as np
@@ -208,6 +210,101 @@ def test_delta_timestamps_outside_tolerance_outside_episode_range():
     )
 
 
+def make_wrapped_buffer(
+    write_dir: str | None = None, delta_timestamps: dict[str, list[float]] | None = None
+) -> tuple[OnlineBuffer, dict[str, np.ndarray]]:
+    """Makes a buffer where the oldest episode was partially overwritten, and returns all the data added."""
+    buffer, _ = make_new_buffer(write_dir, delta_timestamps)
+    new_data = make_spoof_data_frames(n_episodes=3, n_frames_per_episode=30)
+    buffer.add_data(new_data)
+    more_new_data = make_spoof_data_frames(n_episodes=2, n_frames_per_episode=30)
+    buffer.add_data(more_new_data)
+    all_data = {k: np.concatenate([new_data[k], more_new_data[k]]) for k in new_data}
+    return buffer, all_data
+
+
+def test_getitems_with_wraparound():
+    """Checks the batched `__getitems__` against the expected windows, including the partially overwritten
+    oldest episode and the episode wrapping around the end of the buffer."""
+    delta_timestamps = {data_key: [-0.5, -0.1, 0, 0.1, 0.5]}
+    buffer, all_data = make_wrapped_buffer(delta_timestamps=delta_timestamps)
+    oldest_index = len(all_data[OnlineBuffer.INDEX_KEY]) - buffer_capacity
+    offsets = np.round(np.array(delta_timestamps[data_key]) * fps).astype(int)
+
+    indices = list(range(len(buffer)))
+    items = buffer.__getitems__(indices)
+    assert len(items) == len(indices)
+    for i, item in zip(indices, items, strict=True):
+        index = item[OnlineBuffer.INDEX_KEY].item()
+        assert index % buffer_capacity == i
+        episode = all_data[OnlineBuffer.EPISODE_INDEX_KEY][index]
+        episode_indices = np.flatnonzero(all_data[OnlineBuffer.EPISODE_INDEX_KEY] == episode)
+        episode_from, episode_to = max(episode_indices[0], oldest_index), episode_indices[-1] + 1
+        query = index + offsets
+        expected_pad = (query < episode_from) | (query >= episode_to)
+        expected = all_data[data_key][np.clip(query, episode_from, episode_to - 1)]
+        assert np.array_equal(item[data_key].numpy(), expected)
+        assert np.array_equal(item[f"{data_key}{OnlineBuffer.IS_PAD_POSTFIX}"].numpy(), expected_pad)
+
+        single_item = buffer[i]
+        assert single_item.keys() == item.keys()
+        assert all(torch.equal(single_item[k], item[k]) for k in item)
+
+
+def test_getitems_index_error():
+    buffer, _ = make_new_buffer()
+    buffer.add_data(make_spoof_data_frames(n_episodes=1, n_frames_per_episode=10))
+    with pytest.raises(IndexError):
+        buffer.__getitems__([0, 10])
+
+
+@pytest.mark.parametrize("async_flush", [True, False])
+def test_reload_after_wraparound(async_flush: bool):
+    """Checks that a reloaded buffer continues from where the previous one stopped."""
+    write_dir = f"/tmp/online_buffer_{uuid4().hex}"
+    buffer, _ = make_wrapped_buffer(write_dir, delta_timestamps={data_key: [-0.5, 0, 0.5]})
+    buffer._async_flush = async_flush
+    buffer.close()
+    reloaded_buffer, _ = make_new_buffer(write_dir, delta_timestamps={data_key: [-0.5, 0, 0.5]})
+
+    assert len(reloaded_buffer) == len(buffer)
+    assert reloaded_buffer._data[OnlineBuffer.NEXT_INDEX_KEY] == buffer._data[OnlineBuffer.NEXT_INDEX_KEY]
+    indices = list(range(len(buffer)))
+    for item, reloaded_item in zip(
+        buffer.__getitems__(indices), reloaded_buffer.__getitems__(indices), strict=True
+    ):
+        assert all(torch.equal(item[k], reloaded_item[k]) for k in item)
+
+    # New data continues from the last episode.
+    reloaded_buffer.add_data(make_spoof_data_frames(n_episodes=1, n_frames_per_episode=10))
+    assert reloaded_buffer.get_data_by_key(OnlineBuffer.EPISODE_INDEX_KEY).max() == 5
+    reloaded_buffer.close()
+
+
+def test_background_flush_errors_and_pickling():
+    """Checks that a failed background flush is raised by `flush`, and that the buffer can be pickled."""
+    buffer, _ = make_new_buffer()
+    with patch.object(buffer, "_flush", side_effect=OSError("disk full")):
+        buffer.add_data(make_spoof_data_frames(n_episodes=1, n_frames_per_episode=10))
+        with pytest.raises(OSError, match="disk full"):
+            buffer.flush()
+
+    # e.g. when sent to DataLoader workers, which start their own flush thread
+    copy = pickle.loads(pickle.dumps(buffer))
+    copy.add_data(make_spoof_data_frames(n_episodes=1, n_frames_per_episode=10))
+    copy.close()
+    buffer.close()
+
+
+@pytest.mark.parametrize("drop_n_last_frames", [0, 1, 5])
+def test_get_sampling_mask(drop_n_last_frames: int):
+    buffer, all_data = make_wrapped_buffer()
+    indices = buffer.get_data_by_key(OnlineBuffer.INDEX_KEY).numpy()
+    frame_indices = all_data[OnlineBuffer.FRAME_INDEX_KEY][indices]
+    expected_mask = frame_indices < 30 - drop_n_last_frames
+    assert np.array_equal(buffer.get_sampling_mask(drop_n_last_frames), expected_mask)
+
+
 # Arbitrarily set small dataset sizes, making sure to have uneven sizes.
 @pytest.mark.parametrize("offline_dataset_size", [1, 6])
 @pytest.mark.parametrize("online_dataset_size", [0, 4])
@@ -13,10 +13,12 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+import pytest
+import torch
 from datasets import Dataset
 
 from lerobot.datasets.push_dataset_to_hub.utils import calculate_episode_data_index
-from lerobot.datasets.sampler import EpisodeAwareSampler
+from lerobot.datasets.sampler import DatasetMixtureSampler, EpisodeAwareSampler
 from lerobot.datasets.utils import (
     hf_transform_to_torch,
 )
@@ -90,3 +92,63 @@ def test_shuffle():
     assert sampler.indices == [0, 1, 2, 3, 4, 5]
     assert len(sampler) == 6
     assert set(sampler) == {0, 1, 2, 3, 4, 5}
+
+
+def test_dataset_mixture_sampler():
+    sampler = DatasetMixtureSampler(
+        [10, 20, 0, 5], weights=[1, 0, 1, 3], num_samples=10_000, generator=torch.Generator().manual_seed(0)
+    )
+    indices = torch.tensor(list(sampler))
+    assert len(sampler) == len(indices) == 10_000
+    # Datasets with no weight or no frames are never sampled.
+    assert ((indices < 10) | (indices >= 30)).all()
+    assert indices.max() < 35
+    assert (indices < 10).float().mean() == pytest.approx(0.25, abs=0.02)
+    # Frames are sampled uniformly within a dataset.
+    assert len(indices[indices < 10].unique()) == 10
+
+
+def test_dataset_mixture_sampler_defaults_to_uniform_frames():
+    sampler = DatasetMixtureSampler([10, 30], chunk_size=7, generator=torch.Generator().manual_seed(0))
+    indices = list(sampler)
+    assert len(indices) == len(sampler) == 40
+    assert all(0 <= i < 40 for i in indices)
+
+    with pytest.raises(ValueError):
+        DatasetMixtureSampler([10, 0], weights=[0, 1])
+
+
+def test_shuffle_is_a_seeded_permutation():
+    from_indices, to_indices = [0, 7, 20], [7, 20, 33]
+    sampler = EpisodeAwareSampler(from_indices, to_indices, drop_n_first_frames=1, shuffle=True, seed=0)
+    first_epoch = list(sampler)
+    second_epoch = list(sampler)
+    assert sorted(first_epoch) == sorted(second_epoch) == sampler.indices
+    assert first_epoch != second_epoch
+
+    other = EpisodeAwareSampler(from_indices, to_indices, drop_n_first_frames=1, shuffle=True, seed=0)
+    other.set_epoch(1)
+    assert list(other) == second_epoch
+
+
+def test_distributed_shards():
+    from_indices, to_indices = [0, 4], [4, 11]
+    shards = [
+        list(EpisodeAwareSampler(from_indices, to_indices, shuffle=True, seed=0, num_replicas=3, rank=rank))
+        for rank in range(3)
+    ]
+    assert all(len(shard) == 4 for shard in shards)
+    samples = [i for shard in shards for i in shard]
+    # The 11 frames are split between the ranks, one of them being repeated to even out the shards.
+    assert set(samples) == set(range(11))
+    assert len(samples) == 12
+
+
+def test_resume_mid_epoch():
+    sampler = EpisodeAwareSampler([0, 10], [10, 25], shuffle=True, seed=0, chunk_size=4)
+    full_epochs = list(sampler) + list(sampler)
+
+    resumed = EpisodeAwareSampler([0, 10], [10, 25], shuffle=True, seed=0, chunk_size=4)
+    resumed.resume(epoch=0, start_index=9)
+    resumed.set_epoch(0)
+    assert list(resumed) + list(resumed) == full_epochs[9:]
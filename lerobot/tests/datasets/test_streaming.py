@@ -13,12 +13,15 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+from types import SimpleNamespace
+
 import numpy as np
 import pytest
 import torch
 
 from lerobot.datasets.streaming_dataset import StreamingLeRobotDataset
 from lerobot.datasets.utils import safe_shard
+from lerobot.datasets.video_utils import SequentialVideoReader
 from lerobot.utils.constants import ACTION
 from tests.fixtures.constants import DUMMY_REPO_ID
 
@@ -390,3 +393,143 @@ def test_frames_with_delta_consistency_with_shards(
         assert all(t[1] for t in key_checks), (
             f"Checking {list(filter(lambda t: not t[1], key_checks))[0][0]} left and right were found different (i: {i}, frame_idx: {frame_idx})"
         )
+
+
+def test_sequential_video_decoding_matches_seeking(tmp_path, lerobot_dataset_factory):
+    camera_key = "phone"
+    delta_timestamps = {camera_key: [-0.2, -0.1, 0, 0.1], "state": [-0.1, 0]}
+    local_path = tmp_path / "test"
+    repo_id = f"{DUMMY_REPO_ID}-sequential"
+    lerobot_dataset_factory(
+        root=local_path,
+        repo_id=repo_id,
+        total_episodes=6,
+        total_frames=120,
+        data_files_size_in_mb=0.001,
+        chunks_size=1,
+    )
+
+    def make_streaming_ds(sequential_video_decoding):
+        return StreamingLeRobotDataset(
+            repo_id=repo_id,
+            root=local_path,
+            buffer_size=10,
+            shuffle=False,
+            delta_timestamps=delta_timestamps,
+            max_num_shards=4,
+            sequential_video_decoding=sequential_video_decoding,
+        )
+
+    seeking_frames = list(make_streaming_ds(False))
+    sequential_frames = list(make_streaming_ds(True))
+
+    assert len(sequential_frames) == len(seeking_frames) == 120
+    for sequential_frame, seeking_frame in zip(sequential_frames, seeking_frames, strict=True):
+        assert sequential_frame["index"] == seeking_frame["index"]
+        torch.testing.assert_close(sequential_frame[camera_key], seeking_frame[camera_key])
+        torch.testing.assert_close(
+            sequential_frame[f"{camera_key}_is_pad"], seeking_frame[f"{camera_key}_is_pad"]
+        )
+
+
+def test_sequential_video_reader_decodes_linearly():
+    fps = 10
+
+    class FakeDecoder:
+        metadata = SimpleNamespace(average_fps=fps, num_frames=100)
+        ranges = []
+
+        def get_frames_in_range(self, start, stop):
+            self.ranges.append((start, stop))
+            frames = torch.arange(start, stop, dtype=torch.uint8)[:, None, None, None].expand(-1, 3, 2, 2)
+            return SimpleNamespace(data=frames, pts_seconds=torch.arange(start, stop) / fps)
+
+    decoder = FakeDecoder()
+    reader = SequentialVideoReader(tolerance_s=1e-4, chunk_size=4)
+    reader.decoder_cache.get_decoder = lambda video_path: decoder
+
+    for frame_index in range(2, 30):
+        timestamps = [max(frame_index - 2, 0) / fps, frame_index / fps, (frame_index + 1) / fps]
+        frames = reader.get_frames("video.mp4", timestamps)
+        expected = torch.tensor([max(frame_index - 2, 0), frame_index, frame_index + 1]) / 255.0
+        torch.testing.assert_close(frames[:, 0, 0, 0], expected)
+        # The window only keeps the frames from the earliest queried one
+        assert len(reader._frames) <= 2 + 1 + 4
+
+    # Each frame has been decoded once, following the video order
+    assert decoder.ranges[0][0] == 0
+    assert all(prev[1] == nxt[0] for prev, nxt in zip(decoder.ranges, decoder.ranges[1:], strict=False))
+
+    # Going back restarts the window from the queried frame
+    reader.get_frames("video.mp4", [5 / fps])
+    assert decoder.ranges[-1] == (5, 9)
+
+
+def test_streaming_with_file_cache(tmp_path, lerobot_dataset_factory):
+    local_path = tmp_path / "test"
+    repo_id = f"{DUMMY_REPO_ID}-cached"
+    lerobot_dataset_factory(root=local_path, repo_id=repo_id, total_episodes=4, total_frames=80)
+
+    streaming_ds = StreamingLeRobotDataset(
+        repo_id=repo_id,
+        root=local_path,
+        buffer_size=10,
+        shuffle=False,
+        cache_dir=tmp_path / "cache",
+        prefetch_episodes=1,
+    )
+    reference_ds = StreamingLeRobotDataset(repo_id=repo_id, root=local_path, buffer_size=10, shuffle=False)
+
+    first_epoch = list(streaming_ds)
+    meta = streaming_ds.meta
+    for ep_idx in range(meta.total_episodes):
+        assert streaming_ds.file_cache.is_cached(meta.get_data_file_path(ep_idx))
+        for key in meta.video_keys:
+            assert streaming_ds.file_cache.is_cached(meta.get_video_file_path(ep_idx, key))
+    # The data files are read from the cache once they have all been downloaded
+    assert streaming_ds._load_cached_hf_dataset() is not None
+    second_epoch = list(streaming_ds)
+
+    for frames in [first_epoch, second_epoch]:
+        for frame, reference_frame in zip(frames, reference_ds, strict=True):
+            assert frame["index"] == reference_frame["index"]
+            for key in streaming_ds.meta.camera_keys:
+                torch.testing.assert_close(frame[key], reference_frame[key])
+
+    streaming_ds.file_cache.close()
+
+
+def test_streaming_with_small_file_cache(tmp_path, lerobot_dataset_factory):
+    """The cache only fits the data file and one video file: the video files evict each other while
+    iterating, but the data file read from the cache is pinned."""
+    local_path = tmp_path / "test"
+    repo_id = f"{DUMMY_REPO_ID}-small-cache"
+    lerobot_dataset_factory(root=local_path, repo_id=repo_id, total_episodes=4, total_frames=80)
+    streaming_ds = StreamingLeRobotDataset(
+        repo_id=repo_id,
+        root=local_path,
+        buffer_size=10,
+        shuffle=False,
+        cache_dir=tmp_path / "cache",
+        prefetch_episodes=1,
+    )
+    meta = streaming_ds.meta
+    data_size = (local_path / meta.get_data_file_path(0)).stat().st_size
+    video_sizes = [(local_path / meta.get_video_file_path(0, key)).stat().st_size for key in meta.video_keys]
+    cache_size = data_size + max(video_sizes) * 1.2
+    streaming_ds.file_cache.max_size_in_mb = cache_size / 1024**2
+    reference_ds = StreamingLeRobotDataset(repo_id=repo_id, root=local_path, buffer_size=10, shuffle=False)
+    streaming_ds.file_cache.get(meta.get_data_file_path(0))
+
+    for _ in range(2):
+        for frame, reference_frame in zip(streaming_ds, reference_ds, strict=True):
+            assert frame["index"] == reference_frame["index"]
+            for key in streaming_ds.meta.camera_keys:
+                torch.testing.assert_close(frame[key], reference_frame[key])
+        assert streaming_ds.file_cache.is_cached(meta.get_data_file_path(0))
+    assert streaming_ds.file_cache.stats()["downloaded_mb"] > 2 * cache_size / 1024**2
+    streaming_ds.file_cache.close()
+
+    # Data files which don't fit in half of the cache keep being streamed
+    streaming_ds.file_cache.max_size_in_mb = 1.5 * data_size / 1024**2
+    assert streaming_ds._load_cached_hf_dataset() is None
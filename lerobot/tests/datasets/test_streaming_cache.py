@@ -0,0 +1,118 @@
+#!/usr/bin/env python
+
+# Copyright 2025 The HuggingFace Inc. team. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import os
+import pickle
+
+from lerobot.datasets.streaming_cache import StreamingFileCache
+
+
+def make_remote(tmp_path, num_files, size=1024):
+    remote = tmp_path / "remote"
+    for i in range(num_files):
+        path = remote / "videos" / f"file-{i:03d}.mp4"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(bytes([i]) * size)
+    return remote
+
+
+def test_get_downloads_once(tmp_path):
+    remote = make_remote(tmp_path, num_files=2)
+    cache = StreamingFileCache(str(remote), tmp_path / "cache", "repo", max_size_in_mb=1)
+
+    local_path = cache.get("videos/file-001.mp4")
+    assert local_path == tmp_path / "cache" / "repo" / "videos" / "file-001.mp4"
+    assert local_path.read_bytes() == (remote / "videos" / "file-001.mp4").read_bytes()
+    assert cache.get("videos/file-001.mp4") == local_path
+
+    stats = cache.stats()
+    assert stats["misses"] == 1 and stats["hits"] == 1
+    assert stats["downloaded_mb"] == 1024 / 1024**2
+    # No temporary file is left behind
+    assert sorted(p.name for p in local_path.parent.iterdir()) == ["file-001.mp4"]
+
+
+def test_prefetch(tmp_path):
+    remote = make_remote(tmp_path, num_files=3)
+    cache = StreamingFileCache(str(remote), tmp_path / "cache", "repo", max_size_in_mb=1, num_workers=2)
+
+    cache.prefetch([f"videos/file-{i:03d}.mp4" for i in range(3)])
+    cache.close()  # waits for the downloads
+
+    assert all(cache.is_cached(f"videos/file-{i:03d}.mp4") for i in range(3))
+    cache.get("videos/file-002.mp4")
+    assert cache.stats()["misses"] == 0 and cache.stats()["stall_s"] == 0
+
+
+def test_least_recently_used_files_are_evicted(tmp_path):
+    remote = make_remote(tmp_path, num_files=4)
+    # Room for 3 files
+    cache = StreamingFileCache(str(remote), tmp_path / "cache", "repo", max_size_in_mb=3.5 * 1024 / 1024**2)
+    for i in range(3):
+        path = cache.get(f"videos/file-{i:03d}.mp4")
+        os.utime(path, (i, i))
+    os.utime(cache.local_path("videos/file-000.mp4"))  # most recently used
+
+    cache.get("videos/file-003.mp4")
+
+    assert [cache.is_cached(f"videos/file-{i:03d}.mp4") for i in range(4)] == [True, False, True, True]
+
+
+def test_pinned_files_are_not_evicted(tmp_path):
+    remote = make_remote(tmp_path, num_files=4)
+    cache = StreamingFileCache(str(remote), tmp_path / "cache", "repo", max_size_in_mb=2.5 * 1024 / 1024**2)
+    for i in range(2):
+        path = cache.get(f"videos/file-{i:03d}.mp4")
+        os.utime(path, (i, i))
+    cache.pin(["videos/file-000.mp4"])
+
+    cache.get("videos/file-002.mp4")
+    cache.get("videos/file-003.mp4")
+    assert [cache.is_cached(f"videos/file-{i:03d}.mp4") for i in range(4)] == [True, False, False, True]
+
+    cache.unpin(["videos/file-000.mp4"])
+    os.utime(cache.local_path("videos/file-000.mp4"), (0, 0))
+    cache.get("videos/file-001.mp4")
+    assert [cache.is_cached(f"videos/file-{i:03d}.mp4") for i in range(4)] == [False, True, False, True]
+
+
+def test_cache_dir_is_only_scanned_when_full(tmp_path, monkeypatch):
+    remote = make_remote(tmp_path, num_files=8)
+    # Room for 5 files, evicting down to 90% of it leaves 4
+    cache = StreamingFileCache(str(remote), tmp_path / "cache", "repo", max_size_in_mb=5 * 1024 / 1024**2)
+    scans = []
+    scan = cache._scan
+    monkeypatch.setattr(cache, "_scan", lambda: scans.append(1) or scan())
+
+    for i in range(5):
+        cache.get(f"videos/file-{i:03d}.mp4")
+    assert len(scans) == 1  # the running size is initialized on the first download
+
+    cache.get("videos/file-005.mp4")
+    assert len(scans) == 2
+    assert sum(cache.is_cached(f"videos/file-{i:03d}.mp4") for i in range(6)) == 4
+    cache.get("videos/file-006.mp4")
+    assert len(scans) == 2
+
+
+def test_pickle(tmp_path):
+    remote = make_remote(tmp_path, num_files=1)
+    cache = StreamingFileCache(str(remote), tmp_path / "cache", "repo", max_size_in_mb=1)
+    cache.prefetch(["videos/file-000.mp4"])
+
+    unpickled = pickle.loads(pickle.dumps(cache))
+    cache.close()
+    assert unpickled.get("videos/file-000.mp4").is_file()
+    unpickled.close()
@@ -113,6 +113,44 @@ def test_policy_instantiation():
         raise
 
 
+@require_cuda
+def test_cache_language_embeddings():
+    """Test that caching the language embeddings doesn't change the predicted actions."""
+    from lerobot.configs.types import FeatureType, PolicyFeature
+
+    set_seed(42)
+    config = PI0Config(max_action_dim=7, max_state_dim=14, dtype="float32")
+    config.input_features = {
+        "observation.state": PolicyFeature(type=FeatureType.STATE, shape=(14,)),
+        "observation.images.base_0_rgb": PolicyFeature(type=FeatureType.VISUAL, shape=(3, 224, 224)),
+    }
+    config.output_features = {"action": PolicyFeature(type=FeatureType.ACTION, shape=(7,))}
+    dataset_stats = {
+        "observation.state": {"mean": torch.zeros(14), "std": torch.ones(14)},
+        "action": {"mean": torch.zeros(7), "std": torch.ones(7)},
+    }
+
+    policy = PI0Policy(config)
+    preprocessor, _ = make_pi0_pre_post_processors(config=config, dataset_stats=dataset_stats)
+    device = config.device
+    batch = preprocessor(
+        {
+            "observation.state": torch.randn(2, 14, dtype=torch.float32, device=device),
+            "observation.images.base_0_rgb": torch.rand(2, 3, 224, 224, dtype=torch.float32, device=device),
+            "task": ["Pick up the object", "Pick up the red object"],
+        }
+    )
+
+    actions = []
+    for cache_language_embeddings in [False, True, True]:
+        policy.config.cache_language_embeddings = cache_language_embeddings
+        set_seed(0)
+        with torch.no_grad():
+            actions.append(policy.predict_action_chunk(batch))
+    torch.testing.assert_close(actions[0], actions[1], rtol=1e-4, atol=1e-4)
+    torch.testing.assert_close(actions[1], actions[2])
+
+
 @require_cuda
 def test_config_creation():
     """Test policy config creation through factory."""
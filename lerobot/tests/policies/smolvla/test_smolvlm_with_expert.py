@@ -0,0 +1,51 @@
+#!/usr/bin/env python
+
+# Copyright 2025 The HuggingFace Inc. team. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Test the attention implementations of the SmolVLM backbone with action expert."""
+
+import pytest
+import torch
+
+pytest.importorskip("transformers")
+
+from lerobot.policies.smolvla.modeling_smolvla import make_att_2d_masks  # noqa: E402
+from lerobot.policies.smolvla.smolvlm_with_expert import SmolVLMWithExpertModel  # noqa: E402
+
+
+def test_sdpa_attention_matches_eager():
+    # Only the attention heads are needed, so skip loading the VLM.
+    model = object.__new__(SmolVLMWithExpertModel)
+    model.num_attention_heads, model.num_key_value_heads = 6, 2
+
+    batch_size, seq_len, head_dim = 2, 12, 16
+    query_states = torch.randn(batch_size, seq_len, 6, head_dim)
+    key_states = torch.randn(batch_size, seq_len, 2, head_dim)
+    value_states = torch.randn(batch_size, seq_len, 2, head_dim)
+
+    # Prefix-LM attention, with padding at the end of the prefix of the first element.
+    pad_masks = torch.ones(batch_size, seq_len, dtype=torch.bool)
+    pad_masks[0, 8:10] = False
+    att_masks = torch.zeros(batch_size, seq_len, dtype=torch.bool)
+    att_masks[:, 10:] = True
+    attention_mask = make_att_2d_masks(pad_masks, att_masks)
+
+    args = (attention_mask, batch_size, head_dim, query_states, key_states, value_states)
+    eager_output = model.eager_attention_forward(*args)
+    sdpa_output = model.sdpa_attention_forward(*args)
+
+    assert torch.isfinite(sdpa_output).all()
+    valid = pad_masks[:, :, None].expand_as(eager_output)
+    torch.testing.assert_close(sdpa_output[valid], eager_output[valid], rtol=1e-5, atol=1e-5)
@@ -41,6 +41,7 @@ from lerobot.policies.factory import (
     make_pre_post_processors,
 )
 from lerobot.policies.pretrained import PreTrainedPolicy
+from lerobot.policies.utils import LanguageEmbeddingCache
 from lerobot.utils.constants import ACTION, OBS_IMAGES, OBS_STATE
 from lerobot.utils.random_utils import seeded_context
 from tests.artifacts.policies.save_policy_to_safetensors import get_policy_stats
@@ -399,6 +400,139 @@ def test_backward_compatibility(ds_repo_id: str, policy_name: str, policy_kwargs
         torch.testing.assert_close(actions[key], saved_actions[key], rtol=rtol, atol=atol)
 
 
+@pytest.mark.parametrize(
+    "policy_name, policy_kwargs",
+    [
+        ("diffusion", {"down_dims": (32, 64), "num_inference_steps": 3, "n_action_steps": 1}),
+        ("vqbet", {"n_obs_steps": 3, "action_chunk_size": 1, "gpt_n_layer": 2}),
+    ],
+)
+def test_cache_image_features(dummy_dataset_metadata, policy_name: str, policy_kwargs: dict):
+    """Check that caching per-frame image features in `select_action` doesn't change the selected actions."""
+    policy_cls = get_policy_class(policy_name)
+    features = dataset_to_policy_features(dummy_dataset_metadata.features)
+    output_features = {key: ft for key, ft in features.items() if ft.type is FeatureType.ACTION}
+    input_features = {key: ft for key, ft in features.items() if key not in output_features}
+
+    policies = []
+    for cache_image_features in [False, True]:
+        policy_cfg = make_policy_config(
+            policy_name,
+            device="cpu",
+            input_features=input_features,
+            output_features=output_features,
+            cache_image_features=cache_image_features,
+            **policy_kwargs,
+        )
+        policy = policy_cls(policy_cfg)
+        if policies:
+            policy.load_state_dict(policies[0].state_dict())
+        policy.eval()
+        policy.reset()
+        policies.append(policy)
+
+    for step in range(5):
+        observation = {
+            OBS_STATE: torch.randn(2, 6),
+            f"{OBS_IMAGES}.laptop": torch.rand(2, 3, 84, 84),
+        }
+        actions = []
+        for policy in policies:
+            with seeded_context(step):
+                actions.append(policy.select_action(dict(observation)))
+        torch.testing.assert_close(actions[0], actions[1], rtol=1e-4, atol=1e-4)
+
+
+@pytest.mark.parametrize(
+    "inference_noise_scheduler_type, denoise_loop_backend",
+    [
+        ("DPMSolver++", "eager"),
+        ("UniPC", "eager"),
+        ("DDIM", "compile"),
+        pytest.param(
+            "DDIM",
+            "cuda_graph",
+            marks=pytest.mark.skipif(not torch.cuda.is_available(), reason="CUDA not available"),
+        ),
+    ],
+)
+def test_diffusion_inference_sampler(
+    dummy_dataset_metadata, inference_noise_scheduler_type: str, denoise_loop_backend: str
+):
+    """Check that the inference sampler can differ from the training noise scheduler."""
+    features = dataset_to_policy_features(dummy_dataset_metadata.features)
+    output_features = {key: ft for key, ft in features.items() if ft.type is FeatureType.ACTION}
+    input_features = {key: ft for key, ft in features.items() if key not in output_features}
+    policy_cfg = make_policy_config(
+        "diffusion",
+        device=DEVICE,
+        input_features=input_features,
+        output_features=output_features,
+        down_dims=(32, 64),
+        noise_scheduler_type="DDPM",
+        inference_noise_scheduler_type=inference_noise_scheduler_type,
+        num_inference_steps=4,
+        denoise_loop_backend=denoise_loop_backend,
+    )
+    policy = get_policy_class("diffusion")(policy_cfg)
+    policy.eval()
+
+    model = policy.diffusion
+    assert type(model.noise_scheduler).__name__ == "DDPMScheduler"
+    assert model.inference_noise_scheduler is not model.noise_scheduler
+
+    global_cond_dim = (
+        model.unet.down_modules[0][0].cond_encoder[1].in_features - policy_cfg.diffusion_step_embed_dim
+    )
+    global_cond = torch.randn(2, global_cond_dim, device=DEVICE)
+    noise = torch.randn(2, policy_cfg.horizon, policy_cfg.action_feature.shape[0], device=DEVICE)
+    with torch.no_grad():
+        actions = model.conditional_sample(2, global_cond=global_cond, noise=noise)
+        # Replaying a captured CUDA graph must give the same result as the first call.
+        actions_again = model.conditional_sample(2, global_cond=global_cond, noise=noise)
+        eager_actions = model.denoise(noise.clone(), global_cond)
+
+    assert actions.shape == noise.shape
+    assert actions.abs().max() <= policy_cfg.clip_sample_range + 1e-4
+    torch.testing.assert_close(actions, actions_again)
+    torch.testing.assert_close(actions, eager_actions, rtol=1e-4, atol=1e-4)
+
+    # Changing the number of inference steps must not replay a loop captured for another one.
+    model.num_inference_steps = 2
+    with torch.no_grad():
+        actions = model.conditional_sample(2, global_cond=global_cond, noise=noise)
+        eager_actions = model.denoise(noise.clone(), global_cond)
+    torch.testing.assert_close(actions, eager_actions, rtol=1e-4, atol=1e-4)
+
+
+def test_language_embedding_cache():
+    """Check that the cache only calls the embedding function when the tokens change, and trims padding."""
+    embedding = torch.nn.Embedding(10, 4)
+    calls = []
+
+    def embed_fn(tokens):
+        calls.append(tokens)
+        return embedding(tokens)
+
+    cache = LanguageEmbeddingCache()
+    lang_tokens = torch.tensor([[1, 2, 3, 0, 0], [4, 5, 0, 0, 0]])
+    lang_masks = lang_tokens != 0
+
+    for _ in range(3):
+        lang_emb, masks = cache.get(lang_tokens.clone(), lang_masks.clone(), embed_fn)
+    assert len(calls) == 1
+    assert lang_emb.shape == (2, 3, 4)
+    torch.testing.assert_close(lang_emb, embedding(lang_tokens[:, :3]))
+    torch.testing.assert_close(masks, lang_masks[:, :3])
+
+    cache.get(torch.tensor([[1, 2, 0, 0, 0], [4, 5, 0, 0, 0]]), lang_masks, embed_fn)
+    assert len(calls) == 2
+
+    cache.clear()
+    cache.get(lang_tokens, lang_masks, embed_fn)
+    assert len(calls) == 3
+
+
 def test_act_temporal_ensembler():
     """Check that the online method in ACTTemporalEnsembler matches a simple offline calculation."""
     temporal_ensemble_coeff = 0.01
@@ -0,0 +1,159 @@
+#!/usr/bin/env python
+
+# Copyright 2025 The HuggingFace Inc. team. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("faker")
+pytest.importorskip("matplotlib")
+
+import numpy as np
+import pyarrow.parquet as pq
+import torch
+
+from lerobot.policies.sarm import compute_rabc_weights
+from lerobot.policies.sarm.compute_rabc_weights import (
+    _episode_progress_rows,
+    compute_sarm_progress,
+    get_episode_query_indices,
+    read_progress_parts,
+    split_batch_by_task,
+    write_progress_part,
+)
+
+RUN_METADATA = {b"reward_model_path": b"user/sarm", b"head_mode": b"sparse", b"stride": b"1"}
+
+
+def test_get_episode_query_indices_includes_last_frame():
+    np.testing.assert_array_equal(get_episode_query_indices(10, 20, stride=1), np.arange(10, 20))
+    np.testing.assert_array_equal(get_episode_query_indices(10, 20, stride=4), [10, 14, 18, 19])
+    np.testing.assert_array_equal(get_episode_query_indices(10, 19, stride=3), [10, 13, 16, 18])
+
+
+def test_split_batch_by_task():
+    batch = {
+        "task": ["a", "a", "b", "b", "a"],
+        "index": torch.arange(5),
+        "episode_index": torch.tensor([0, 0, 1, 1, 2]),
+    }
+    chunks = split_batch_by_task(batch)
+
+    assert [chunk["task"] for chunk in chunks] == [["a", "a"], ["b", "b"], ["a"]]
+    assert [chunk["index"].tolist() for chunk in chunks] == [[0, 1], [2, 3], [4]]
+
+    homogeneous = {"task": ["a", "a"], "index": torch.arange(2)}
+    assert split_batch_by_task(homogeneous) == [homogeneous]
+
+
+def test_episode_progress_rows_interpolates_strided_queries():
+    ep_pending = {"indices": [108, 100, 104], "sparse": [1.0, 0.0, 0.5]}
+    rows = _episode_progress_rows(ep_pending, episode_idx=3, ep_start=100, ep_end=109, heads=["sparse"])
+
+    np.testing.assert_array_equal(rows["index"], np.arange(100, 109))
+    np.testing.assert_array_equal(rows["frame_index"], np.arange(9))
+    assert (rows["episode_index"] == 3).all()
+    np.testing.assert_allclose(rows["progress_sparse"], np.linspace(0.0, 1.0, 9), atol=1e-6)
+
+
+def test_progress_parts_roundtrip(tmp_path):
+    parts_dir = tmp_path / "sarm_progress.parts"
+    assert read_progress_parts(parts_dir, RUN_METADATA) is None
+
+    for part_idx, episode_idx in enumerate([0, 1]):
+        ep_pending = {"indices": [10 * episode_idx, 10 * episode_idx + 1], "sparse": [0.0, 1.0]}
+        rows = _episode_progress_rows(
+            ep_pending, episode_idx, 10 * episode_idx, 10 * episode_idx + 2, ["sparse"]
+        )
+        write_progress_part(parts_dir, part_idx, [rows], RUN_METADATA)
+
+    table = read_progress_parts(parts_dir, RUN_METADATA)
+    assert table.num_rows == 4
+    assert sorted(set(table["episode_index"].to_pylist())) == [0, 1]
+    assert not list(parts_dir.glob("*.tmp"))
+
+
+def test_progress_parts_discarded_on_settings_change(tmp_path):
+    parts_dir = tmp_path / "sarm_progress.parts"
+    rows = _episode_progress_rows({"indices": [0], "sparse": [0.5]}, 0, 0, 1, ["sparse"])
+    write_progress_part(parts_dir, 0, [rows], RUN_METADATA)
+
+    other_metadata = {**RUN_METADATA, b"stride": b"5"}
+    assert read_progress_parts(parts_dir, other_metadata) is None
+    assert not parts_dir.exists()
+
+
+def test_compute_sarm_progress_without_frames(tmp_path, monkeypatch):
+    dataset = SimpleNamespace(num_episodes=0, num_frames=0, root=tmp_path)
+    config = SimpleNamespace(image_key="image", state_key="state", uses_dual_heads=False, n_obs_steps=8)
+    preprocess = SimpleNamespace(steps=[])
+    monkeypatch.setattr(
+        compute_rabc_weights,
+        "load_sarm_resources",
+        lambda *args: (dataset, SimpleNamespace(config=config), preprocess),
+    )
+
+    with pytest.raises(ValueError, match="has no frames"):
+        compute_sarm_progress("user/empty", "user/sarm", num_visualizations=0)
+    assert not (tmp_path / "sarm_progress.parquet").exists()
+
+
+class FakeEpisodesDataset(torch.utils.data.Dataset):
+    """Three episodes of three frames, whose images hold their index."""
+
+    def __init__(self, root):
+        self.root = root
+        self.num_episodes, self.num_frames = 3, 9
+        episodes = [{"dataset_from_index": 3 * i, "dataset_to_index": 3 * i + 3} for i in range(3)]
+        self.meta = SimpleNamespace(episodes=episodes)
+
+    def __len__(self):
+        return self.num_frames
+
+    def __getitem__(self, idx):
+        return {"image": torch.tensor(float(idx)), "task": "task"}
+
+
+def test_compute_sarm_progress_retries_failed_episodes(tmp_path, monkeypatch):
+    dataset = FakeEpisodesDataset(tmp_path)
+    failing_episodes = {1}
+
+    class Preprocess:
+        steps = []
+
+        def __call__(self, chunk):
+            if failing_episodes & set(chunk["episode_index"].tolist()):
+                raise RuntimeError("out of memory")
+            return {"text_features": None, "video_features": chunk["image"]}
+
+    config = SimpleNamespace(image_key="image", state_key="state", uses_dual_heads=False, n_obs_steps=8)
+    reward_model = SimpleNamespace(
+        config=config, calculate_rewards=lambda video_embeddings, **kwargs: video_embeddings.numpy() / 10
+    )
+    monkeypatch.setattr(
+        compute_rabc_weights, "load_sarm_resources", lambda *args: (dataset, reward_model, Preprocess())
+    )
+    kwargs = {"device": "cpu", "num_visualizations": 0, "batch_size": 3, "num_workers": 0}
+
+    with pytest.raises(RuntimeError, match=r"episodes \[1\]"):
+        compute_sarm_progress("user/dataset", "user/sarm", **kwargs)
+    parts = read_progress_parts(tmp_path / "sarm_progress.parts", RUN_METADATA)
+    assert sorted(set(parts["episode_index"].to_pylist())) == [0, 2]
+
+    failing_episodes.clear()
+    compute_sarm_progress("user/dataset", "user/sarm", **kwargs)
+    table = pq.read_table(tmp_path / "sarm_progress.parquet")
+    np.testing.assert_allclose(table["progress_sparse"].to_numpy(), np.arange(9) / 10, atol=1e-6)
@@ -0,0 +1,307 @@
+#!/usr/bin/env python
+
+# Copyright 2025 The HuggingFace Inc. team. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import multiprocessing as mp
+import queue
+import sys
+from pathlib import Path
+
+import cloudpickle
+import gymnasium as gym
+import numpy as np
+import pytest
+import torch
+
+from lerobot.configs.types import FeatureType, PolicyFeature
+from lerobot.policies.act.configuration_act import ACTConfig
+from lerobot.policies.act.modeling_act import ACTPolicy
+from lerobot.scripts.lerobot_eval import (
+    AsyncEvaluator,
+    _latest_request,
+    autoreset_rollout,
+    eval_policy_all,
+    rollout,
+)
+from lerobot.utils.constants import ACTION, OBS_ENV_STATE, OBS_STATE
+
+
+class SeededLengthEnv(gym.Env):
+    """Episodes last `2 + seed % 4` steps with a reward of 1 per step, and succeed for even seeds."""
+
+    observation_space = gym.spaces.Dict({"agent_pos": gym.spaces.Box(-1, 1, shape=(2,))})
+    action_space = gym.spaces.Box(-1, 1, shape=(1,))
+
+    def reset(self, seed=None, options=None):
+        super().reset(seed=seed)
+        # Unseeded resets come from the vector env's own autoreset.
+        seed = int(self.np_random.integers(4)) if seed is None else seed
+        self.length = 2 + seed % 4
+        self.success = seed % 2 == 0
+        self.t = 0
+        return {"agent_pos": np.zeros(2, dtype=np.float32)}, {}
+
+    def step(self, action):
+        self.t += 1
+        terminated = self.t >= self.length
+        info = {"is_success": terminated and self.success}
+        return {"agent_pos": np.zeros(2, dtype=np.float32)}, 1.0, terminated, False, info
+
+
+class SeededStateEnv(SeededLengthEnv):
+    """SeededLengthEnv observing its step and seed, and rewarding the action."""
+
+    observation_space = gym.spaces.Dict(
+        {
+            "agent_pos": gym.spaces.Box(-1, 1, shape=(2,)),
+            "environment_state": gym.spaces.Box(-np.inf, np.inf, shape=(2,)),
+        }
+    )
+
+    def reset(self, seed=None, options=None):
+        observation, info = super().reset(seed=seed, options=options)
+        self.seed_ = -1 if seed is None else seed
+        return self._observe(observation), info
+
+    def step(self, action):
+        observation, _, terminated, truncated, info = super().step(action)
+        return self._observe(observation), float(action[0]), terminated, truncated, info
+
+    def _observe(self, observation):
+        return {**observation, "environment_state": np.array([self.t, self.seed_], dtype=np.float32)}
+
+
+def make_chunking_policy() -> ACTPolicy:
+    config = ACTConfig(
+        input_features={
+            OBS_STATE: PolicyFeature(type=FeatureType.STATE, shape=(2,)),
+            OBS_ENV_STATE: PolicyFeature(type=FeatureType.ENV, shape=(2,)),
+        },
+        output_features={ACTION: PolicyFeature(type=FeatureType.ACTION, shape=(1,))},
+        chunk_size=4,
+        n_action_steps=4,
+        dim_model=16,
+        n_heads=2,
+        dim_feedforward=32,
+        n_encoder_layers=1,
+        n_decoder_layers=1,
+        use_vae=False,
+        pretrained_backbone_weights=None,
+        device="cpu",
+    )
+    torch.manual_seed(0)
+    return ACTPolicy(config)
+
+
+class ZeroPolicy(torch.nn.Module):
+    def __init__(self):
+        super().__init__()
+        self.num_resets = 0
+
+    def reset(self):
+        self.num_resets += 1
+
+    def select_action(self, observation):
+        return torch.zeros(len(observation["observation.state"]), 1)
+
+
+def test_latest_request_skips_stale_snapshots():
+    requests = queue.Queue()
+    for step in (2, 3):
+        requests.put((step, Path(f"{step}")))
+    skipped = []
+
+    assert _latest_request(requests, (1, Path("1")), skipped.append) == (3, Path("3"))
+    assert skipped == [(1, Path("1")), (2, Path("2"))]
+    assert requests.empty()
+
+
+def test_latest_request_keeps_stop_sentinel():
+    requests = queue.Queue()
+    requests.put((2, Path("2")))
+    requests.put(None)
+    skipped = []
+
+    assert _latest_request(requests, (1, Path("1")), skipped.append) == (2, Path("2"))
+    assert skipped == [(1, Path("1"))]
+    assert requests.get_nowait() is None
+
+
+@pytest.mark.parametrize("block", [False, True])
+def test_async_evaluator_poll_raises_when_worker_died(block):
+    ctx = mp.get_context("spawn")
+    evaluator = AsyncEvaluator.__new__(AsyncEvaluator)
+    evaluator._num_pending = 1
+    evaluator._results = ctx.Queue()
+    evaluator._process = ctx.Process(target=sys.exit, args=(3,))
+    evaluator._process.start()
+    evaluator._process.join()
+
+    with pytest.raises(RuntimeError, match="exited with code 3"):
+        evaluator.poll(block=block)
+
+
+def test_autoreset_rollout():
+    env = gym.vector.SyncVectorEnv(
+        [lambda: gym.wrappers.TimeLimit(SeededLengthEnv(), max_episode_steps=4) for _ in range(3)],
+        autoreset_mode=gym.vector.AutoresetMode.SAME_STEP,
+    )
+    identity = lambda x: x  # noqa: E731
+    n_episodes = 7
+
+    results = autoreset_rollout(
+        env, ZeroPolicy(), identity, identity, identity, identity, n_episodes=n_episodes, start_seed=0
+    )
+
+    expected_lengths = np.array([min(2 + i % 4, 4) for i in range(n_episodes)])
+    np.testing.assert_array_equal(results["length"], expected_lengths)
+    np.testing.assert_array_equal(results["sum_reward"], expected_lengths)
+    np.testing.assert_array_equal(results["max_reward"], np.ones(n_episodes))
+    np.testing.assert_array_equal(
+        results["success"], [i % 2 == 0 and 2 + i % 4 <= 4 for i in range(n_episodes)]
+    )
+    # Running 3 batches of 3 episodes would take 3 * 4 vectorized steps.
+    assert results["env_steps"] < 12
+
+
+def test_autoreset_rollout_keeps_policy_state_of_ongoing_episodes():
+    """The environments are refilled in the middle of the action chunks of the other episodes, which must
+    still run as in the regular rollouts."""
+    env = gym.vector.SyncVectorEnv(
+        [lambda: gym.wrappers.TimeLimit(SeededStateEnv(), max_episode_steps=5) for _ in range(3)],
+        autoreset_mode=gym.vector.AutoresetMode.SAME_STEP,
+    )
+    identity = lambda x: x  # noqa: E731
+    processors = (identity, identity, identity, identity)
+    policy = make_chunking_policy()
+    n_episodes = 9
+
+    expected_rewards = []
+    for start_seed in range(0, n_episodes, env.num_envs):
+        seeds = list(range(start_seed, start_seed + env.num_envs))
+        data = rollout(env, policy, *processors, seeds=seeds)
+        done_indices = torch.argmax(data["done"].to(int), dim=1)
+        expected_rewards += [
+            data["reward"][i, : done_indices[i] + 1].sum().item() for i in range(env.num_envs)
+        ]
+    results = autoreset_rollout(env, policy, *processors, n_episodes=n_episodes, start_seed=0)
+    env.close()
+
+    # Episodes lasting up to 5 steps with chunks of 4 actions: the refills happen in the middle of chunks.
+    assert set(results["length"].tolist()) == {2, 3, 4, 5}
+    np.testing.assert_allclose(results["sum_reward"], expected_rewards, rtol=1e-5)
+
+
+@pytest.mark.parametrize("auto_reset", [False, True])
+def test_eval_policy_all_process_backend(auto_reset):
+    # The env workers are spawned and need the environments of this module.
+    cloudpickle.register_pickle_by_value(sys.modules[__name__])
+    max_episode_steps = {0: 3, 1: 4, 2: 5}
+    envs = {
+        "suite": {
+            task_id: gym.vector.SyncVectorEnv(
+                [
+                    lambda steps=steps: gym.wrappers.TimeLimit(SeededLengthEnv(), max_episode_steps=steps)
+                    for _ in range(2)
+                ],
+                autoreset_mode=gym.vector.AutoresetMode.SAME_STEP,
+            )
+            for task_id, steps in max_episode_steps.items()
+        }
+    }
+    identity = lambda x: x  # noqa: E731
+    batch_sizes = []
+
+    class RecordingPolicy(ZeroPolicy):
+        def select_action(self, observation):
+            batch_sizes.append(len(observation["observation.state"]))
+            return super().select_action(observation)
+
+    policy = RecordingPolicy()
+    n_episodes = 5
+
+    info = eval_policy_all(
+        envs,
+        policy,
+        identity,
+        identity,
+        identity,
+        identity,
+        n_episodes=n_episodes,
+        start_seed=0,
+        max_parallel_tasks=2,
+        auto_reset=auto_reset,
+        parallel_backend="process",
+    )
+    for env in envs["suite"].values():
+        env.close()
+
+    assert sorted(task["task_id"] for task in info["per_task"]) == [0, 1, 2]
+    for task in info["per_task"]:
+        steps = max_episode_steps[task["task_id"]]
+        assert task["metrics"]["successes"] == [i % 2 == 0 and 2 + i % 4 <= steps for i in range(n_episodes)]
+    assert info["overall"]["n_episodes"] == 3 * n_episodes
+    assert policy.num_resets > 0
+    # The observations of the 2 workers are merged into a single batch, until the worker evaluating only 1 of
+    # the 3 tasks is done. With auto_reset, the refilled environments are also run in their own sub-batches.
+    assert batch_sizes[0] == 4
+    if not auto_reset:
+        assert set(batch_sizes) == {2, 4}
+
+
+def test_eval_policy_all_process_backend_keeps_policy_state_of_ongoing_episodes():
+    """The episodes of the tasks evaluated by the 2 workers share the merged batch of the policy: refilling
+    the environments of a worker mustn't reset the policy state of the other episodes."""
+    cloudpickle.register_pickle_by_value(sys.modules[__name__])
+
+    def make_envs():
+        return {
+            "suite": {
+                task_id: gym.vector.SyncVectorEnv(
+                    [
+                        lambda steps=steps: gym.wrappers.TimeLimit(SeededStateEnv(), max_episode_steps=steps)
+                        for _ in range(2)
+                    ],
+                    autoreset_mode=gym.vector.AutoresetMode.SAME_STEP,
+                )
+                for task_id, steps in {0: 4, 1: 5}.items()
+            }
+        }
+
+    identity = lambda x: x  # noqa: E731
+    policy = make_chunking_policy()
+    sum_rewards = {}
+    # The reference evaluates the tasks one after the other, as the threads would share the policy state.
+    for backend, max_parallel_tasks in (("thread", 1), ("process", 2)):
+        envs = make_envs()
+        info = eval_policy_all(
+            envs,
+            policy,
+            identity,
+            identity,
+            identity,
+            identity,
+            n_episodes=5,
+            start_seed=0,
+            max_parallel_tasks=max_parallel_tasks,
+            auto_reset=True,
+            parallel_backend=backend,
+        )
+        for env in envs["suite"].values():
+            env.close()
+        sum_rewards[backend] = {task["task_id"]: task["metrics"]["sum_rewards"] for task in info["per_task"]}
+
+    for task_id, rewards in sum_rewards["thread"].items():
+        np.testing.assert_allclose(sum_rewards["process"][task_id], rewards, rtol=1e-5)
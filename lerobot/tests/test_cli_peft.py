@@ -3,6 +3,7 @@ import os
 from unittest.mock import MagicMock, patch
 
 import pytest
+import torch
 from safetensors.torch import load_file
 
 from .utils import require_package
@@ -131,15 +132,13 @@ def test_peft_training_params_are_fewer(policy_type, tmp_path):
     output_dir = tmp_path / f"output_{policy_type}"
     model_id = resolve_model_id_for_peft_training(policy_type)
 
-    def dummy_update_policy(
-        train_metrics, policy, batch, optimizer, grad_clip_norm: float, accelerator, **kwargs
-    ):
+    def dummy_update_policy(policy, batch, optimizer, grad_clip_norm: float, accelerator, **kwargs):
         params_total = sum(p.numel() for p in policy.parameters())
         params_trainable = sum(p.numel() for p in policy.parameters() if p.requires_grad)
 
         assert params_total > params_trainable
 
-        return train_metrics, {}
+        return torch.tensor(0.0), None, {}, 0.0
 
     with patch("lerobot.scripts.lerobot_train.update_policy", dummy_update_policy):
         lerobot_train(
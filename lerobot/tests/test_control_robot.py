@@ -14,6 +14,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import json
 from unittest.mock import patch
 
 from lerobot.scripts.lerobot_calibrate import CalibrateConfig, calibrate
@@ -31,16 +32,22 @@ def test_calibrate():
     calibrate(cfg)
 
 
-def test_teleoperate():
+def test_teleoperate(tmp_path):
     robot_cfg = MockRobotConfig()
     teleop_cfg = MockTeleopConfig()
     cfg = TeleoperateConfig(
         robot=robot_cfg,
         teleop=teleop_cfg,
         teleop_time_s=0.1,
+        profile_path=tmp_path / "profile.json",
     )
     teleoperate(cfg)
 
+    with open(tmp_path / "profile.json") as f:
+        profile = json.load(f)
+    assert profile["num_loops"] > 0
+    assert {"robot_observation", "teleop_action", "send_action"} <= set(profile["stages"])
+
 
 def test_record_and_resume(tmp_path):
     robot_cfg = MockRobotConfig()
@@ -59,10 +66,15 @@ def test_record_and_resume(tmp_path):
         dataset=dataset_cfg,
         teleop=teleop_cfg,
         play_sounds=False,
+        profile_path=tmp_path / "profile.json",
     )
 
     dataset = record(cfg)
 
+    with open(tmp_path / "profile.json") as f:
+        profile = json.load(f)
+    assert profile["stages"]["dataset_add_frame"]["count"] == 3
+
     assert dataset.fps == 30
     assert dataset.meta.total_episodes == dataset.num_episodes == 1
     assert dataset.meta.total_frames == dataset.num_frames == 3
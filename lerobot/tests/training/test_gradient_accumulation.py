@@ -0,0 +1,140 @@
+#!/usr/bin/env python
+
+# Copyright 2025 The HuggingFace Inc. team. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from unittest.mock import patch
+
+import pytest
+import torch
+
+from lerobot.scripts.lerobot_train import make_accelerator, train_step
+from lerobot.utils.logging_utils import AverageMeter, MetricsTracker
+
+
+class DummyPolicy(torch.nn.Module):
+    def __init__(self):
+        super().__init__()
+        self.linear = torch.nn.Linear(3, 2)
+        self.num_updates = 0
+
+    def forward(self, batch, reduction="mean"):
+        per_sample_loss = ((self.linear(batch["x"]) - batch["y"]) ** 2).mean(dim=-1)
+        loss = per_sample_loss if reduction == "none" else per_sample_loss.mean()
+        return loss, {"ones": 1.0}
+
+    def update(self):
+        self.num_updates += 1
+
+
+class DummyRABCWeights:
+    def compute_batch_weights(self, batch):
+        weights = batch["w"] * len(batch["w"]) / batch["w"].sum()
+        return weights, {"raw_mean_weight": 1.0, "num_zero_weight": 0, "num_full_weight": 0}
+
+
+def train(batches, gradient_accumulation_steps, micro_batch_size=None, rabc=False, preprocessor=None):
+    torch.manual_seed(0)
+    accelerator = make_accelerator(gradient_accumulation_steps, cpu=True)
+    policy = DummyPolicy()
+    optimizer = torch.optim.SGD(policy.parameters(), lr=0.1)
+    lr_scheduler = torch.optim.lr_scheduler.StepLR(optimizer, step_size=1, gamma=0.5)
+    policy, optimizer, lr_scheduler = accelerator.prepare(policy, optimizer, lr_scheduler)
+    metrics = {name: AverageMeter(name) for name in ["loss", "grad_norm", "lr", "update_s", "dataloading_s"]}
+    tracker = MetricsTracker(len(batches[0]["x"]), 100, 10, metrics, accelerator=accelerator)
+
+    dl_iter = iter(batches)
+    for _ in range(len(batches) // gradient_accumulation_steps):
+        tracker, output_dict = train_step(
+            tracker,
+            policy,
+            dl_iter,
+            optimizer,
+            grad_clip_norm=0,
+            accelerator=accelerator,
+            preprocessor=preprocessor,
+            lr_scheduler=lr_scheduler,
+            rabc_weights_provider=DummyRABCWeights() if rabc else None,
+            micro_batch_size=micro_batch_size,
+        )
+    # Scalar outputs are averaged over the micro-batches.
+    assert output_dict["ones"] == pytest.approx(1.0)
+    return accelerator.unwrap_model(policy), lr_scheduler, tracker
+
+
+def make_batch(generator, batch_size):
+    return {
+        "x": torch.randn(batch_size, 3, generator=generator),
+        "y": torch.randn(batch_size, 2, generator=generator),
+        "w": torch.rand(batch_size, generator=generator),
+        "task": ["task"] * batch_size,
+    }
+
+
+def test_gradient_accumulation_matches_full_batch():
+    generator = torch.Generator().manual_seed(1)
+    batches = [make_batch(generator, 8) for _ in range(4)]
+    full_batches = [
+        {key: torch.cat([batches[i][key], batches[i + 1][key]]) for key in ["x", "y", "w"]}
+        | {"task": batches[i]["task"] + batches[i + 1]["task"]}
+        for i in range(0, len(batches), 2)
+    ]
+
+    reference, reference_scheduler, _ = train(full_batches, gradient_accumulation_steps=1)
+    policy, scheduler, _ = train(batches, gradient_accumulation_steps=2)
+
+    assert policy.num_updates == reference.num_updates == 2
+    assert scheduler.scheduler.last_epoch == reference_scheduler.scheduler.last_epoch == 2
+    torch.testing.assert_close(policy.linear.weight, reference.linear.weight)
+    torch.testing.assert_close(policy.linear.bias, reference.linear.bias)
+
+
+@pytest.mark.parametrize("rabc", [False, True])
+def test_micro_batches_match_full_batch(rabc):
+    generator = torch.Generator().manual_seed(1)
+    batches = [make_batch(generator, 8) for _ in range(4)]
+
+    reference, _, _ = train(batches, gradient_accumulation_steps=2, rabc=rabc)
+    policy, _, _ = train(batches, gradient_accumulation_steps=2, micro_batch_size=3, rabc=rabc)
+
+    assert policy.num_updates == reference.num_updates == 2
+    torch.testing.assert_close(policy.linear.weight, reference.linear.weight)
+    torch.testing.assert_close(policy.linear.bias, reference.linear.bias)
+
+
+def test_metrics_are_recorded_once_per_optimizer_step():
+    generator = torch.Generator().manual_seed(1)
+    batches = [make_batch(generator, 8) for _ in range(4)]
+    clock = [0.0]
+    forward = DummyPolicy.forward
+
+    def preprocessor(batch):
+        clock[0] += 1.0
+        return batch
+
+    def timed_forward(self, batch, reduction="mean"):
+        clock[0] += 0.5
+        return forward(self, batch, reduction)
+
+    with (
+        patch("lerobot.scripts.lerobot_train.time.perf_counter", side_effect=lambda: clock[0]),
+        patch.object(DummyPolicy, "forward", timed_forward),
+    ):
+        _, _, tracker = train(batches, gradient_accumulation_steps=2, preprocessor=preprocessor)
+
+    for meter in ["loss", "grad_norm", "lr", "update_s", "dataloading_s"]:
+        assert getattr(tracker, meter).count == 2
+    # The times of the accumulated batches are summed
+    assert tracker.dataloading_s.avg == pytest.approx(2.0)
+    assert tracker.update_s.avg == pytest.approx(1.0)
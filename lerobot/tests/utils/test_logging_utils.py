@@ -15,6 +15,7 @@
 # limitations under the License.
 
 import pytest
+import torch
 
 from lerobot.utils.logging_utils import AverageMeter, MetricsTracker
 
@@ -43,6 +44,17 @@ def test_average_meter_update():
     assert meter.avg == 5
 
 
+def test_average_meter_update_tensor():
+    meter = AverageMeter("loss")
+    meter.update(torch.tensor(2.0, requires_grad=True), n=2)
+    meter.update(torch.tensor(5.0))
+    assert meter.count == 3
+    assert meter.val == 5.0
+    assert meter.sum == 9.0
+    assert meter.avg == 3.0
+    assert str(meter) == "loss:3.000000"
+
+
 def test_average_meter_reset():
     meter = AverageMeter("loss")
     meter.update(3, 4)
@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+
+# Copyright 2025 The HuggingFace Inc. team. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import json
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+from lerobot.utils.loop_profiler import ControlLoopProfiler
+
+
+def run_loop(profiler, durations_s):
+    """Simulates iterations whose single stage lasts `durations_s[i]`, with a fake clock."""
+    clock = [0.0]
+    with patch("lerobot.utils.utils.time.perf_counter", side_effect=lambda: clock[0]):
+        for duration_s in durations_s:
+            profiler.start_loop()
+            with profiler.stage("send_action"):
+                clock[0] += duration_s
+            if duration_s > 0.02:
+                with profiler.stage("policy"):
+                    clock[0] += 0.001
+            profiler.end_loop()
+
+
+def test_summary():
+    profiler = ControlLoopProfiler(fps=50)
+    run_loop(profiler, [0.001] * 98 + [0.03, 0.1])
+
+    summary = profiler.summary()
+    assert summary["budget_ms"] == pytest.approx(20)
+    assert summary["num_loops"] == 100
+    assert summary["num_overruns"] == 2
+
+    send_action = summary["stages"]["send_action"]
+    assert send_action["count"] == 100
+    assert send_action["p50_ms"] == pytest.approx(1)
+    assert send_action["max_ms"] == pytest.approx(100)
+    # Bins of 2 ms up to twice the budget, the last one also counting longer iterations
+    assert len(send_action["histogram"]["edges_ms"]) == 21
+    assert send_action["histogram"]["counts"][0] == 98
+    assert send_action["histogram"]["counts"][-1] == 1
+    assert sum(send_action["histogram"]["counts"]) == 100
+
+    assert summary["stages"]["policy"]["count"] == 2
+    assert summary["stages"]["loop"]["max_ms"] == pytest.approx(101)
+    assert "overruns" in profiler.format_summary()
+
+
+def test_save(tmp_path):
+    profiler = ControlLoopProfiler(fps=30)
+    run_loop(profiler, [0.01] * 3)
+    profiler.save(tmp_path / "profile" / "loop.json")
+
+    with open(tmp_path / "profile" / "loop.json") as f:
+        saved = json.load(f)
+    assert saved["num_loops"] == 3
+    assert set(saved["stages"]) == {"loop", "send_action"}
+
+
+def test_disabled():
+    profiler = ControlLoopProfiler(fps=30, enabled=False)
+    run_loop(profiler, [0.1] * 3)
+
+    summary = profiler.summary()
+    assert summary["num_loops"] == summary["num_overruns"] == 0
+    assert summary["stages"] == {}
+
+
+def test_record_loop_closes_skipped_iterations():
+    from lerobot.scripts.lerobot_record import record_loop
+
+    events = {"exit_early": False}
+    num_observations = [0]
+
+    def get_observation():
+        # No policy nor teleop: the iterations are skipped before sending an action
+        num_observations[0] += 1
+        events["exit_early"] = num_observations[0] == 3
+        return {}
+
+    profiler = ControlLoopProfiler(fps=1000)
+    record_loop(
+        robot=SimpleNamespace(get_observation=get_observation),
+        events=events,
+        fps=1000,
+        teleop_action_processor=None,
+        robot_action_processor=None,
+        robot_observation_processor=lambda obs: obs,
+        control_time_s=10,
+        profiler=profiler,
+    )
+
+    summary = profiler.summary()
+    assert summary["num_loops"] == 3
+    assert summary["stages"]["robot_observation"]["count"] == 3
+    assert not events["exit_early"]
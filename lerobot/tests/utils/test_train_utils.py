@@ -17,17 +17,23 @@
 from pathlib import Path
 from unittest.mock import Mock, patch
 
+import torch
+from huggingface_hub.constants import SAFETENSORS_SINGLE_FILE
+from safetensors.torch import load_file
+
 from lerobot.utils.constants import (
     CHECKPOINTS_DIR,
     LAST_CHECKPOINT_LINK,
     OPTIMIZER_PARAM_GROUPS,
     OPTIMIZER_STATE,
+    PRETRAINED_MODEL_DIR,
     RNG_STATE,
     SCHEDULER_STATE,
     TRAINING_STATE_DIR,
     TRAINING_STEP,
 )
 from lerobot.utils.train_utils import (
+    AsyncCheckpointWriter,
     get_step_checkpoint_dir,
     get_step_identifier,
     load_training_state,
@@ -112,3 +118,30 @@ def test_save_load_training_state(tmp_path, optimizer, scheduler):
     assert loaded_step == 10
     assert loaded_optimizer is optimizer
     assert loaded_scheduler is scheduler
+
+
+def test_async_checkpoint_writer(tmp_path, optimizer, scheduler):
+    policy = torch.nn.Linear(4, 4)
+    policy.config = Mock()
+    cfg = Mock()
+    on_complete = Mock()
+    writer = AsyncCheckpointWriter(max_pending=1)
+
+    for step in (10, 20):
+        checkpoint_dir = tmp_path / CHECKPOINTS_DIR / f"{step:06d}"
+        writer.save(checkpoint_dir, step, cfg, policy, optimizer, scheduler, on_complete=on_complete)
+        # Later updates must not leak into the checkpoint being written.
+        expected_weight = policy.weight.detach().clone()
+        with torch.no_grad():
+            policy.weight.add_(1.0)
+    writer.close()
+
+    assert on_complete.call_count == 2
+    last_checkpoint = tmp_path / CHECKPOINTS_DIR / LAST_CHECKPOINT_LINK
+    assert last_checkpoint.resolve() == checkpoint_dir
+    weights = load_file(checkpoint_dir / PRETRAINED_MODEL_DIR / SAFETENSORS_SINGLE_FILE)
+    torch.testing.assert_close(weights["weight"], expected_weight)
+    assert not list(checkpoint_dir.rglob("*.tmp"))
+
+    loaded_step, _, _ = load_training_state(checkpoint_dir, optimizer, scheduler)
+    assert loaded_step == 20
@@ -35,11 +35,20 @@ def mock_rerun(monkeypatch):
 
     class DummyScalar:
         def __init__(self, value):
-            self.value = float(value)
+            self.value = float(value) if np.ndim(value) == 0 else np.asarray(value, dtype=float)
+
+    class DummySeriesLines:
+        def __init__(self, names):
+            self.names = names
 
     class DummyImage:
         def __init__(self, arr):
             self.arr = arr
+            self.compressed = False
+
+        def compress(self):
+            self.compressed = True
+            return self
 
     def dummy_log(key, obj=None, **kwargs):
         # Accept either positional `obj` or keyword `entity` and record remaining kwargs.
@@ -49,6 +58,7 @@ def mock_rerun(monkeypatch):
 
     dummy_rr = SimpleNamespace(
         Scalars=DummyScalar,
+        SeriesLines=DummySeriesLines,
         Image=DummyImage,
         log=dummy_log,
         init=lambda *a, **k: None,
@@ -227,3 +237,61 @@ def test_log_rerun_data_kwargs_only(mock_rerun):
     a = _obj_for(calls, "action.a")
     assert type(a).__name__ == "DummyScalar"
     assert a.value == pytest.approx(1.0)
+
+
+def test_rerun_logger_batches_scalars(mock_rerun):
+    vu, calls = mock_rerun
+
+    obs = {
+        f"{OBS_STATE}.temperature": np.float32(25.0),
+        "observation.camera": np.zeros((3, 10, 20), dtype=np.uint8),
+        "vec": np.array([9, 8, 7], dtype=np.float32),
+    }
+    act = {"action.throttle": 0.7, "steer": 0.1, "action.vector": np.array([[1.0], [2.0]])}
+
+    logger = vu.RerunLogger()
+    logger.log(observation=obs, action=act)
+    logger.log(observation=obs, action=act)
+    logger.close()
+
+    # The names of the series are only logged once, statically
+    series = [(k, obj.names) for k, obj, kw in calls if kw.get("static") and hasattr(obj, "names")]
+    assert series == [
+        ("observation.vec", ["observation.vec_0", "observation.vec_1", "observation.vec_2"]),
+        ("observation", [f"{OBS_STATE}.temperature"]),
+        ("action.vector", ["action.vector_0", "action.vector_1"]),
+        ("action", ["action.throttle", "action.steer"]),
+    ]
+
+    scalars = [(k, obj.value) for k, obj, _kw in calls if hasattr(obj, "value")]
+    assert len(scalars) == 8
+    np.testing.assert_allclose(dict(scalars)["observation.vec"], [9, 8, 7])
+    np.testing.assert_allclose(dict(scalars)["observation"], [25.0])
+    np.testing.assert_allclose(dict(scalars)["action"], [0.7, 0.1])
+    np.testing.assert_allclose(dict(scalars)["action.vector"], [1.0, 2.0])
+
+    # Images are transposed to HWC and logged statically
+    images = [(k, obj, kw) for k, obj, kw in calls if hasattr(obj, "arr")]
+    assert images
+    for key, img, kw in images:
+        assert key == "observation.camera"
+        assert img.arr.shape == (10, 20, 3)
+        assert not img.compressed
+        assert kw.get("static") is True
+
+
+def test_rerun_logger_rate_limits_images(mock_rerun):
+    vu, calls = mock_rerun
+
+    obs = {"observation.camera": np.zeros((8, 8, 3), dtype=np.uint8), "observation.state": 1.0}
+    logger = vu.RerunLogger(compress_images=True, image_fps=1e-3)
+    for _ in range(5):
+        logger.log(observation=obs)
+    logger.close()
+
+    # All the scalars are logged, but only the first image
+    scalars = [obj for k, obj, _kw in calls if k == "observation" and hasattr(obj, "value")]
+    assert len(scalars) == 5
+    images = [obj for k, obj, _kw in calls if k == "observation.camera"]
+    assert len(images) == 1
+    assert images[0].compressed